@@ -1,18 +1,9 @@
 # core/ai_client.py — memory-injecting candidate
-import os, sys, time, logging
+import os, sys, time, logging, contextlib
 from typing import Dict, Any
 
-# lazy SDK imports (allow tests without SDKs)
-try: import openai
-except Exception: openai=None
-try: import anthropic
-except Exception: anthropic=None
-try: import google.generativeai as genai
-except Exception: genai=None
-try: import groq
-except Exception: groq=None
-
-import yaml
+# provider SDKs are imported by core.providers adapters on first use (allows tests without SDKs)
+from core.providers import RequestCancelled, count_tokens, get_adapter
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -40,10 +31,9 @@ ROOT = Path(__file__).resolve().parents[1]
 PROJ_CFG = ROOT / "config" / "projects" / "persistent_assistant_v3.yaml"
 
 def _load_project_cfg():
-    try:
-        return yaml.safe_load(PROJ_CFG.read_text(encoding="utf-8")) or {}
-    except Exception:
-        return {}
+    from core.config_store import get_store
+    cfg = get_store().load(PROJ_CFG, {})        # parsed once, re-read only when the file changes
+    return cfg if isinstance(cfg, dict) else {}
 
 def _memory_enabled_and_limit():
     cfg = _load_project_cfg()
@@ -58,8 +48,38 @@ def _maybe_build_memory(max_snips: int) -> str:
         logging.warning("memory_manager unavailable: %s", e)
         return ""
 
+def _cost(provider: str, model: str, tokens_in: int, tokens_out: int,
+          cache_read: int = 0, cache_write: int = 0) -> float:
+    """USD for one call from the compiled cost table (catalogue < COSTS < overrides), else COSTS."""
+    try:
+        from core.cost_engine import get_engine
+        return get_engine().cost(provider, model, tokens_in, tokens_out, cache_read, cache_write)
+    except Exception as e:
+        logging.debug("cost engine unavailable: %s", e)
+    rates = COSTS.get(provider, {}).get(model) or {"in": 0.0, "out": 0.0}
+    return tokens_in*rates["in"] + tokens_out*rates["out"]   # rates are USD per token
+
+def _calibrate(provider: str, chars: int, tokens: int) -> None:
+    try:
+        from core.cost_engine import get_engine
+        get_engine().tokens.observe(provider, chars, tokens)
+    except Exception:
+        pass
+
+def _observe(provider: str, model: str, latency: float, **kw) -> None:
+    """Feed core.metrics; telemetry must never break a call."""
+    try:
+        from core.metrics import observe_call
+        observe_call(provider, model, latency, **kw)
+    except Exception as e:
+        logging.debug("metrics unavailable: %s", e)
+
 class AIClient:
-    def __init__(self, provider: str, key: str, model: str | None = None):
+    def __init__(self, provider: str, key: str, model: str | None = None, base_url: str | None = None):
+        """
+        base_url: point the SDK at another endpoint (e.g. tools/mock_provider.py);
+        defaults to PA_<PROVIDER>_BASE_URL, then the SDK's own env/default.
+        """
         if not provider:
             raise ValueError("Provider must be specified")
         provider = provider.lower()
@@ -68,83 +88,99 @@ class AIClient:
         self.provider = provider
         self.model = model or DEFAULT_MODEL[provider]
         self.key = key
-        self.client = None
-
-        if provider == "openai":
-            if openai:
-                openai.api_key = key
-                self.client = openai.OpenAI(api_key=key)
-        elif provider == "anthropic":
-            if anthropic:
-                self.client = anthropic.Anthropic(api_key=key)
-        elif provider == "groq":
-            if groq:
-                self.client = groq.Groq(api_key=key)
-        elif provider == "google":
-            if genai:
-                genai.configure(api_key=key)
-                self.client = genai.GenerativeModel(self.model)
-        elif provider == "deepseek":
-            # not wired
-            self.client = None
-
-    def send(self, prompt: str, *, include_memory: bool | None = None) -> Dict[str, Any]:
+        self.base_url = base_url or os.getenv(f"PA_{provider.upper()}_BASE_URL") or None
+        # adapter (and its SDK) imported on first use; deepseek has none yet
+        self.adapter = get_adapter(provider)
+        self.client = self.adapter.make_client(key, self.model, self.base_url) if self.adapter else None
+
+    def send(self, prompt: str, *, include_memory: bool | None = None, system: str | None = None,
+             session=None, on_delta=None, cancel=None) -> Dict[str, Any]:
         """
-        Optionally prepend memory context before sending.
+        Send one prompt. The stable parts (system text, memory context) go in a
+        separate prefix ahead of the user message so providers can cache it:
+        Anthropic via cache_control blocks, OpenAI/Groq via a leading system
+        message (automatic prefix caching).
         include_memory: None -> read from project config; True/False overrides.
+        system: role/system text for the prefix.
+        session: core.conversation.ConversationSession (or a session id); the
+                 compacted history is sent ahead of the prompt and both turns
+                 are appended and saved afterwards. Sends on one session id
+                 run one at a time (ConversationSession.lock()).
+        on_delta: stream the reply; called with each text chunk as it arrives.
+        cancel: zero-arg callable polled between chunks; True aborts the call
+                with RequestCancelled (nothing is saved to the session).
         """
         mem_on, mem_limit = _memory_enabled_and_limit()
         use_mem = mem_on if include_memory is None else bool(include_memory)
-        context_used = False
-        final_prompt = prompt
+        system_text = (system or "").strip()
+        memory_text = ""
 
         if use_mem:
             ctx = _maybe_build_memory(mem_limit)
             if ctx.strip():
-                final_prompt = f"=== Context (latest) ===\n{ctx}\n\n=== Prompt ===\n{prompt}"
-                context_used = True
+                memory_text = f"=== Context (latest) ===\n{ctx}"
+
+        guard = contextlib.nullcontext()
+        if session is not None:
+            from core.conversation import ConversationSession
+            if isinstance(session, str):
+                session = ConversationSession.load(session)
+            guard = session.lock()
+        with guard:
+            return self._send(prompt, system_text, memory_text, session, mem_limit, on_delta, cancel)
+
+    def _send(self, prompt, system_text, memory_text, session, mem_limit, on_delta, cancel) -> Dict[str, Any]:
+        """send() body; runs under the session lock when there is a session."""
+        context_used = bool(memory_text)
+        history: list = []
+        if session is not None:
+            session.sync()                      # another sender may have added turns meanwhile
+            session.compact()
+            history = session.history()
+            if session.summary:
+                memory_text = "\n\n".join(t for t in (memory_text, session.summary_text()) if t)
 
         start = time.time()
-        reply = None
-        tokens_in = tokens_out = 0
-
-        if self.provider == "openai" and self.client:
-            resp = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role":"user","content": final_prompt}],
-            )
-            reply = resp.choices[0].message.content
-            tokens_in = getattr(resp.usage,"prompt_tokens",0)
-            tokens_out = getattr(resp.usage,"completion_tokens",0)
-        elif self.provider == "anthropic" and self.client:
-            resp = self.client.messages.create(
-                model=self.model, max_tokens=512,
-                messages=[{"role":"user","content": final_prompt}],
-            )
-            reply = resp.content[0].text if getattr(resp,"content",None) else ""
-            tokens_in = getattr(resp.usage,"input_tokens",0)
-            tokens_out = getattr(resp.usage,"output_tokens",0)
-        elif self.provider == "groq" and self.client:
-            resp = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role":"user","content": final_prompt}],
-            )
-            reply = resp.choices[0].message.content
-            tokens_in = getattr(resp.usage,"prompt_tokens",0)
-            tokens_out = getattr(resp.usage,"completion_tokens",0)
-        elif self.provider == "google" and self.client:
-            resp = self.client.generate_content(final_prompt)
-            reply = getattr(resp,"text","")
-            tokens_in = int(len(final_prompt.split())*1.3)
-            tokens_out = int(len((reply or "").split())*1.3)
-        else:
-            reply = "(no client bound for provider)"
+        first: list = []
+        if on_delta is not None:
+            user_delta = on_delta
+
+            def on_delta(text: str) -> None:
+                if not first:
+                    first.append(time.time() - start)
+                user_delta(text)
+        try:
+            if self.client:
+                from core.scheduler import get_scheduler
+                est = (len(system_text) + len(memory_text) + len(prompt)
+                       + sum(len(m["content"]) for m in history)) // 4 + 512
+                # a half-streamed reply cannot be replayed, so streams are not retried
+                reply, usage = get_scheduler().call(
+                    self.provider, self.model,
+                    lambda: self._dispatch(prompt, system_text, memory_text, history, on_delta, cancel),
+                    tokens=est, max_retries=0 if on_delta is not None else None)
+            else:
+                reply, usage = self._dispatch(prompt, system_text, memory_text, history)
+        except RequestCancelled:
+            raise                               # the caller stopped it: not a provider failure
+        except Exception as e:
+            _observe(self.provider, self.model, time.time() - start, ok=False, error=str(e))
+            raise
 
         elapsed = time.time() - start
-        rates = COSTS.get(self.provider, {}).get(self.model, {"in":0.0,"out":0.0})
-        cost = (tokens_in*rates["in"] + tokens_out*rates["out"]) / 1000.0
+        tokens_in, tokens_out = usage["in"], usage["out"]
+        cost = _cost(self.provider, self.model, tokens_in, tokens_out, usage["cache_read"], usage["cache_write"])
+        _observe(self.provider, self.model, elapsed, ttft_s=first[0] if first else None,
+                 tokens_in=tokens_in, tokens_out=tokens_out, cost=cost, ok=self.client is not None,
+                 error=None if self.client is not None else "no client bound")
+
+        logging.info("[MEM INJECT] used=%s, limit=%d, cache_read=%d", context_used, mem_limit, usage["cache_read"])
 
-        logging.info("[MEM INJECT] used=%s, limit=%d", context_used, mem_limit)
+        if session is not None and self.client is not None:
+            session.add("user", prompt)
+            session.add("assistant", reply or "", tokens=usage["out"] or None)
+            session.meta.update(provider=self.provider, model=self.model)
+            session.save()
 
         return {
             "reply": reply,
@@ -152,28 +188,201 @@ class AIClient:
             "model": self.model,
             "tokens_in": tokens_in,
             "tokens_out": tokens_out,
+            "cache_read_tokens": usage["cache_read"],
+            "cache_write_tokens": usage["cache_write"],
             "cost": cost,
             "time": elapsed,
             "context_used": context_used,
+            "session_id": getattr(session, "id", None),
+            "history_messages": len(history),
+            "ttft": first[0] if first else None,
         }
 
-if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python core/ai_client.py '<prompt>' <provider>")
-        sys.exit(1)
-    prompt = sys.argv[1]
-    provider = sys.argv[2].lower()
-    # Load key from env or YAML (OpenAI path only for demo)
-    key = os.getenv("OPENAI_API_KEY") if provider=="openai" else None
-    if not key:
+    def send_many(self, prompts, *, concurrency: int = 4, **kw) -> list:
+        """
+        send() each prompt on a small thread pool; results come back in input
+        order. A failed prompt yields {"error": ..., "prompt_index": i} instead
+        of raising, so one bad call does not sink the batch.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        prompts = list(prompts)
+
+        def one(i: int):
+            try:
+                return self.send(prompts[i], **kw)
+            except Exception as e:
+                return {"error": str(e), "prompt_index": i, "provider": self.provider, "model": self.model}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(prompts) or 1)),
+                                thread_name_prefix="ai-send") as ex:
+            return list(ex.map(one, range(len(prompts))))
+
+    def _dispatch(self, prompt: str, system_text: str = "", memory_text: str = "", history=(),
+                  on_delta=None, cancel=None):
+        """
+        One provider round-trip -> (reply, usage). usage["in"] is the full
+        prompt size including cached tokens; cache_read/cache_write split it out.
+        With on_delta the provider is asked to stream and each text chunk is
+        passed on as it arrives.
+        """
+        reply = None
+        usage = {"in": 0, "out": 0, "cache_read": 0, "cache_write": 0}
+        prefix = [t for t in (system_text, memory_text) if t]
+        stream = on_delta is not None
+
+        if self.client and self.adapter:
+            reply = self.adapter.dispatch(self.client, self.model, prompt, prefix, history, usage,
+                                          on_delta if stream else None, cancel)
+        else:
+            reply = "(no client bound for provider)"
+        if stream and self.client and not usage["in"]:
+            # stream ended without a usage record: estimate rather than bill zero
+            usage["in"] = count_tokens("\n\n".join(prefix + [m["content"] for m in history] + [prompt]),
+                                        self.provider, self.model)
+            usage["out"] = usage["out"] or count_tokens(reply or "", self.provider, self.model)
+        elif self.provider != "google" and usage["in"]:
+            _calibrate(self.provider, sum(map(len, prefix)) + sum(len(m["content"]) for m in history) + len(prompt),
+                       usage["in"])
+        return reply, usage
+
+    @classmethod
+    def auto(cls, prompt: str, *, keys: Dict[str, str] | None = None,
+             capabilities: Dict[str, Any] | None = None, prefer: str = "balanced",
+             max_output_tokens: int = 512, providers=None, max_cost: float | None = None,
+             attempts: int = 3, router=None, include_memory: bool | None = None) -> Dict[str, Any]:
+        """
+        Route one prompt to the best provider/model (see core.model_router) and
+        fall back down the ranking on failure. Every outcome is fed back into the
+        router's rolling latency/cost/error window.
+        keys: provider -> API key; defaults to tools._env.load_keys().
+        """
+        from core.model_router import RouteRequest, estimate_tokens, get_router
+        router = router or get_router()
+        if keys is None:
+            from tools._env import load_keys
+            keys = load_keys()
+        usable = {p for p, k in (keys or {}).items() if k and p in DEFAULT_MODEL}
+        if providers is not None:
+            usable &= {p.lower() for p in providers}
+        req = RouteRequest(prompt_tokens=estimate_tokens(prompt), max_output_tokens=max_output_tokens,
+                           capabilities=capabilities or {}, providers=usable, prefer=prefer, max_cost=max_cost)
+        ranked = router.rank(req)
+        if not ranked:
+            raise RuntimeError(f"No model satisfies the request (providers with keys: {sorted(usable) or 'none'})")
+
+        tried = []
+        for cand in ranked[:max(1, attempts)]:
+            start = time.time()
+            try:
+                res = cls(cand.provider, keys[cand.provider], model=cand.model).send(
+                    prompt, include_memory=include_memory)
+                if res.get("reply") == "(no client bound for provider)":
+                    raise RuntimeError("no client bound for provider")
+            except Exception as e:
+                router.record(cand.provider, cand.model, time.time() - start, ok=False)
+                tried.append({"provider": cand.provider, "model": cand.model, "error": str(e)[:200]})
+                logging.warning("[ROUTER] %s/%s failed, falling back: %s", cand.provider, cand.model, e)
+                continue
+            router.record(cand.provider, cand.model, res["time"], cost=res["cost"], ok=True)
+            res["routed"] = {"score": round(cand.score, 4), "est_cost": cand.est_cost,
+                             "candidates": len(ranked), "failed": tried}
+            return res
+        raise RuntimeError(f"All routed models failed: {tried}")
+
+    @classmethod
+    def race(cls, prompt: str, candidates=None, *, keys: Dict[str, str] | None = None, n: int = 2,
+             timeout: float | None = None, router=None, include_memory: bool | None = None,
+             system: str | None = None) -> Dict[str, Any]:
+        """
+        Send the same prompt to several provider/model pairs at once and return
+        the first successful reply. Every call streams, so once a winner is
+        picked (or the timeout passes) the others stop at their next chunk and
+        are not recorded as failures. candidates: [(provider, model), ...];
+        default is the router's n fastest models with keys.
+        """
+        import threading
+        from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutTimeout
+        from core.model_router import RouteRequest, estimate_tokens, get_router
+        router = router or get_router()
+        if keys is None:
+            from tools._env import load_keys
+            keys = load_keys()
+        if candidates is None:
+            usable = {p for p, k in (keys or {}).items() if k and p in DEFAULT_MODEL}
+            ranked = router.rank(RouteRequest(prompt_tokens=estimate_tokens(prompt), providers=usable, prefer="latency"))
+            candidates = [(c.provider, c.model) for c in ranked[:n]]
+        candidates = [(p.lower(), m or DEFAULT_MODEL.get(p.lower())) for p, m in candidates if (keys or {}).get(p.lower())]
+        if not candidates:
+            raise RuntimeError("race: no candidates with API keys")
+
+        t0 = time.time()
+        decided = threading.Event()
+
+        def run(p: str, m: str) -> Dict[str, Any]:
+            res = cls(p, keys[p], model=m).send(prompt, include_memory=include_memory, system=system,
+                                                on_delta=lambda _t: None, cancel=decided.is_set)
+            if res.get("reply") == "(no client bound for provider)":
+                raise RuntimeError("no client bound for provider")
+            return res
+
+        def recorder(p: str, m: str):
+            def done(f):
+                if f.cancelled():
+                    return
+                err = f.exception()
+                if isinstance(err, RequestCancelled):
+                    return                          # lost the race; record_race covers it
+                router.record(p, m, time.time() - t0, cost=0.0 if err else f.result()["cost"], ok=err is None)
+            return done
+
+        pool = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="ai-race")
+        futs = {}
+        for p, m in candidates:
+            f = pool.submit(run, p, m)
+            f.add_done_callback(recorder(p, m))
+            futs[f] = (p, m)
+        failed, winner = [], None
         try:
-            with open("C:/Secure/api_keys/keys.yaml","r",encoding="utf-8") as f:
-                keys = yaml.safe_load(f) or {}
-            key = (((keys.get("keys") or {}).get("default") or {}).get(provider) or {}).get("paid")
-        except Exception:
+            for f in as_completed(futs, timeout=timeout):
+                if f.exception() is None:
+                    winner = f
+                    break
+                p, m = futs[f]
+                failed.append({"provider": p, "model": m, "error": str(f.exception())[:200]})
+        except FutTimeout:
             pass
+        finally:
+            decided.set()                           # stop the streams still running
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        latency = time.time() - t0
+        router.record_race(futs[winner] if winner else None, candidates, latency if winner else None)
+        if winner is None:
+            raise RuntimeError(f"race: no successful reply ({failed or 'timeout'})")
+        res = winner.result()
+        p, m = futs[winner]
+        logging.info("[RACE] winner=%s/%s latency=%.3fs contenders=%d", p, m, latency, len(candidates))
+        res["race"] = {"winner": f"{p}/{m}", "latency": latency,
+                       "contenders": [f"{a}/{b}" for a, b in candidates], "failed": failed}
+        return res
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Send one prompt through AIClient")
+    ap.add_argument("prompt")
+    ap.add_argument("provider")
+    ap.add_argument("--model", default=None)
+    ap.add_argument("--base-url", default=None, help="e.g. a tools/mock_provider.py endpoint")
+    args = ap.parse_args()
+    provider = args.provider.lower()
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from tools._env import load_keys
+    key = load_keys().get(provider)
+    if not key and args.base_url:
+        key = "mock"                        # stand-in servers accept any key
     if not key:
         print(f"No API key found for {provider}")
         sys.exit(1)
-    client = AIClient(provider=provider, key=key)
-    print(client.send(prompt))
+    client = AIClient(provider=provider, key=key, model=args.model, base_url=args.base_url)
+    print(client.send(args.prompt))
@@ -0,0 +1,304 @@
+# core/catalogue.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Compiled model catalogue. Merges every model-metadata source (ai_client
+#   constants, ai_models_raw.yaml, config/ai_models.yaml, ai_models_enrichment.yaml,
+#   ai_models.yaml, ai_models_health.yaml) once into a cached snapshot
+#   (data/catalogue/catalogue.json, git-ignored; PA_CATALOGUE_CACHE moves it)
+#   and serves it through a memoized, indexed Catalogue object. The snapshot is
+#   recompiled automatically when any source file changes (size/mtime).
+
+from __future__ import annotations
+import os
+import json
+import time
+import threading
+import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+SNAPSHOT_PATH = Path(os.environ.get("PA_CATALOGUE_CACHE") or ROOT / "data" / "catalogue" / "catalogue.json")
+SNAPSHOT_VERSION = 1
+
+# Merge order: later sources win for non-empty values
+SOURCES: List[Tuple[str, Path, str]] = [
+    ("raw",         ROOT / "ai_models_raw.yaml",          "providers"),
+    ("config",      ROOT / "config" / "ai_models.yaml",   "providers"),
+    ("enrichment",  ROOT / "ai_models_enrichment.yaml",   "flat"),       # provider keys at top level
+    ("catalogue",   ROOT / "ai_models.yaml",              "providers"),
+    ("health",      ROOT / "ai_models_health.yaml",       "health"),
+]
+
+# Same hints tools/model_loader used to infer coarse capability tags
+TAG_HINTS = {
+    "chat":   ["gpt", "chat", "sonnet", "llama", "mixtral", "qwen", "claude", "gemini", "opus", "haiku"],
+    "image":  ["vision", "image", "sd", "diffusion", " dall", "dall-e", "flux", "kandinsky"],
+    "audio":  ["audio", "whisper", "tts", "asr", "speech"],
+    "embedding": ["embed"],
+}
+
+STALE_CHECK_SEC = 2.0   # at most one stat() sweep of the sources per interval
+
+def _infer_tags(model_id: str, interface: str | None) -> List[str]:
+    mid = (model_id or "").lower()
+    tags = [t for t, keys in TAG_HINTS.items() if any(k in mid for k in keys)]
+    if interface and interface not in ("other",) and interface not in tags:
+        tags.append(interface)
+    return tags or ["other"]
+
+def _empty(v: Any) -> bool:
+    return v is None or v == "" or v == {} or v == []
+
+def _merge(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    for k, v in (src or {}).items():
+        if _empty(v):
+            continue
+        if k == "pricing" and isinstance(v, dict) and not any(v.get(x) for x in ("in", "out")):
+            continue   # 0.0/0.0 placeholders in the enrichment file carry no price
+        if isinstance(v, dict) and isinstance(dst.get(k), dict):
+            _merge(dst[k], v)
+        else:
+            dst[k] = v
+
+def _source_stamp(paths: Iterable[Path]) -> Dict[str, List[int]]:
+    out: Dict[str, List[int]] = {}
+    for p in paths:
+        try:
+            st = os.stat(p)
+            out[str(p)] = [st.st_size, st.st_mtime_ns]
+        except OSError:
+            out[str(p)] = [-1, 0]
+    return out
+
+def _builtin() -> Tuple[Dict[str, Dict[str, float]], Dict[str, str]]:
+    try:
+        from core.ai_client import COSTS, DEFAULT_MODEL
+        return COSTS, DEFAULT_MODEL
+    except Exception:
+        return {}, {}
+
+def _load_yaml(path: Path) -> Dict[str, Any]:
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.load(f, Loader=loader) or {}
+    except Exception:
+        return {}
+
+# --------------------------------------------------------------------------- #
+# Compiler
+# --------------------------------------------------------------------------- #
+def compile_catalogue(sources: List[Tuple[str, Path, str]] = SOURCES,
+                      out_path: Path | None = None) -> Dict[str, Any]:
+    """Merge all sources into one snapshot dict; write it to out_path when given."""
+    costs, defaults = _builtin()
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def rec(p: str, m: str) -> Dict[str, Any]:
+        return merged.setdefault((p, m), {"provider": p, "model": m, "sources": []})
+
+    for p, models in costs.items():
+        for m, rate in models.items():
+            r = rec(p, m)
+            _merge(r, {"pricing": {"in": rate.get("in"), "out": rate.get("out")}})
+            r["sources"].append("builtin")
+    for p, m in defaults.items():
+        rec(p, m)["default"] = True
+
+    for name, path, shape in sources:
+        if not path.exists():
+            continue
+        data = _load_yaml(path)
+        if shape == "health":
+            for p, pd in (data.get("providers") or {}).items():
+                for m, h in ((pd or {}).get("models") or {}).items():
+                    r = rec(p, m)
+                    r["health"] = h or {}
+                    r["sources"].append(name)
+            continue
+        providers = data.get("providers") if shape == "providers" else data
+        for p, pd in (providers or {}).items():
+            if not isinstance(pd, dict):
+                continue
+            for m, meta in (pd.get("models") or {}).items():
+                r = rec(p, m)
+                _merge(r, {k: v for k, v in (meta or {}).items() if k != "health"})
+                if isinstance((meta or {}).get("health"), dict):
+                    r["health"] = meta["health"]
+                r["sources"].append(name)
+
+    models: List[Dict[str, Any]] = []
+    for (p, m), r in sorted(merged.items()):
+        pr = r.get("pricing") or {}
+        r["pricing"] = {"in": pr.get("in"), "out": pr.get("out")}
+        r["max_tokens"] = (r.pop("limits", None) or {}).get("max_tokens")
+        r["tags"] = _infer_tags(m, r.get("interface"))
+        r.setdefault("display_name", m)
+        r["default"] = bool(r.get("default"))
+        models.append(r)
+
+    snap = {
+        "version": SNAPSHOT_VERSION,
+        "built": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "sources": _source_stamp([s[1] for s in sources] + [ROOT / "core" / "ai_client.py"]),
+        "models": models,
+    }
+    if out_path:
+        from core.fileutil import atomic_write_text
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(str(out_path), json.dumps(snap, separators=(",", ":"), default=str))
+    return snap
+
+# --------------------------------------------------------------------------- #
+# Indexed view
+# --------------------------------------------------------------------------- #
+class Catalogue:
+    """Read-only, indexed view of a compiled snapshot."""
+    def __init__(self, snapshot: Dict[str, Any]):
+        self.snapshot = snapshot
+        self.built = snapshot.get("built")
+        self._by_key: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._by_provider: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_tag: Dict[str, List[Dict[str, Any]]] = {}
+        self._defaults: Dict[str, str] = {}
+        for r in snapshot.get("models") or []:
+            key = (r["provider"], r["model"])
+            self._by_key[key] = r
+            self._by_provider.setdefault(r["provider"], []).append(r)
+            for t in r.get("tags") or []:
+                self._by_tag.setdefault(t, []).append(r)
+            for cap, score in (r.get("capabilities") or {}).items() if isinstance(r.get("capabilities"), dict) else ():
+                if score:
+                    self._by_tag.setdefault(cap, []).append(r)
+            if r.get("default"):
+                self._defaults[r["provider"]] = r["model"]
+        # price index: priced models, cheapest (in+out) first
+        self._by_price = sorted((r for r in self._by_key.values() if self._priced(r)),
+                                key=lambda r: (r["pricing"]["in"] or 0) + (r["pricing"]["out"] or 0))
+
+    @staticmethod
+    def _priced(r: Dict[str, Any]) -> bool:
+        pr = r.get("pricing") or {}
+        return pr.get("in") is not None and pr.get("out") is not None
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def get(self, provider: str, model: str) -> Optional[Dict[str, Any]]:
+        return self._by_key.get((provider.lower(), model))
+
+    def providers(self) -> List[str]:
+        return sorted(self._by_provider)
+
+    def default_model(self, provider: str) -> Optional[str]:
+        return self._defaults.get(provider.lower())
+
+    def price(self, provider: str, model: str) -> Optional[Tuple[float, float]]:
+        """(input, output) USD per token, or None if unpriced/unknown."""
+        r = self.get(provider, model)
+        if r is None or not self._priced(r):
+            return None
+        return float(r["pricing"]["in"]), float(r["pricing"]["out"])
+
+    def models(self, provider: str | None = None, capability: str | None = None,
+               healthy_only: bool = False, priced_only: bool = False) -> List[Dict[str, Any]]:
+        """Filter via the provider/capability indexes; capability matches tags or scored capabilities."""
+        if capability:
+            pool = self._by_tag.get(capability, [])
+            if provider:
+                pool = [r for r in pool if r["provider"] == provider.lower()]
+        elif provider:
+            pool = self._by_provider.get(provider.lower(), [])
+        else:
+            pool = list(self._by_key.values())
+        if healthy_only:
+            pool = [r for r in pool if (r.get("health") or {}).get("probe_ok")]
+        if priced_only:
+            pool = [r for r in pool if self._priced(r)]
+        return list(pool)
+
+    def cheapest(self, capability: str | None = None, providers: Iterable[str] | None = None,
+                 limit: int = 5) -> List[Dict[str, Any]]:
+        allowed = set(p.lower() for p in providers) if providers else None
+        cap_keys = None
+        if capability:
+            cap_keys = {(r["provider"], r["model"]) for r in self._by_tag.get(capability, [])}
+        out = []
+        for r in self._by_price:
+            if allowed is not None and r["provider"] not in allowed:
+                continue
+            if cap_keys is not None and (r["provider"], r["model"]) not in cap_keys:
+                continue
+            out.append(r)
+            if len(out) >= limit:
+                break
+        return out
+
+    def as_providers_dict(self) -> Dict[str, Any]:
+        """Legacy shape used by tools/model_loader consumers."""
+        providers: Dict[str, Any] = {}
+        for p, recs in self._by_provider.items():
+            models = {}
+            for r in recs:
+                pr = r.get("pricing") or {}
+                models[r["model"]] = {
+                    "capabilities": list(r.get("tags") or ["other"]),
+                    "input_cost_per_1k": pr["in"] * 1000 if pr.get("in") is not None else None,
+                    "output_cost_per_1k": pr["out"] * 1000 if pr.get("out") is not None else None,
+                    "display_name": r.get("display_name"),
+                    "max_tokens": r.get("max_tokens"),
+                }
+            providers[p] = {"models": models}
+        return {"providers": providers}
+
+# --------------------------------------------------------------------------- #
+# Memoized access
+# --------------------------------------------------------------------------- #
+_lock = threading.Lock()
+_current: Optional[Catalogue] = None
+_last_check = 0.0
+
+def _is_stale(snap: Dict[str, Any]) -> bool:
+    if snap.get("version") != SNAPSHOT_VERSION:
+        return True
+    recorded = snap.get("sources") or {}
+    return _source_stamp(Path(p) for p in recorded) != recorded
+
+def _load_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def get_catalogue(refresh: bool = False, snapshot_path: Path | None = None) -> Catalogue:
+    """
+    Process-wide Catalogue. Loads the cached snapshot (default SNAPSHOT_PATH),
+    compiling and re-caching it if missing or stale; afterwards source
+    freshness is re-checked at most every STALE_CHECK_SEC, so lookups are
+    plain dict hits.
+    """
+    global _current, _last_check
+    snapshot_path = snapshot_path or SNAPSHOT_PATH
+    now = time.monotonic()
+    cur = _current
+    if cur is not None and not refresh and now - _last_check < STALE_CHECK_SEC:
+        return cur
+    with _lock:
+        if _current is not None and not refresh and now - _last_check < STALE_CHECK_SEC:
+            return _current
+        snap = _current.snapshot if (_current is not None and not refresh) else _load_snapshot(snapshot_path)
+        if refresh or snap is None or _is_stale(snap):
+            try:
+                snap = compile_catalogue(out_path=snapshot_path)
+            except OSError:
+                snap = compile_catalogue(out_path=None)   # read-only checkout: keep it in memory
+        if _current is None or snap is not _current.snapshot:
+            _current = Catalogue(snap)
+        _last_check = now
+        return _current
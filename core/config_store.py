@@ -0,0 +1,208 @@
+# core/config_store.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Process-wide cache for YAML/JSON config files. Each file is parsed once
+#   and served from memory; a file is re-stat'ed at most every
+#   `check_interval` seconds and re-parsed only when its mtime/size change.
+#   view() caches a typed object built from the data (rebuilt on change),
+#   and subscribe() calls back when a file changes, which a background
+#   poller detects even when nobody reads the file (token rotation).
+#   Returned data is shared: treat it as read-only.
+
+from __future__ import annotations
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+CHECK_INTERVAL = 1.0        # seconds between stat() calls for one file
+WATCH_INTERVAL = 1.0        # background poll period once something subscribes
+
+_MISSING = object()
+
+class _Entry:
+    __slots__ = ("path", "stamp", "data", "checked", "version", "views", "subscribers")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.stamp: Optional[Tuple[int, int]] = None
+        self.data: Any = _MISSING
+        self.checked = 0.0
+        self.version = 0
+        self.views: Dict[Any, Tuple[int, Any]] = {}
+        self.subscribers: List[Callable[[Any], None]] = []
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _parse(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".json"):
+        return json.loads(text) if text.strip() else None
+    import yaml
+    return yaml.safe_load(text)
+
+class ConfigStore:
+    """
+    store = get_store()
+    store.load("config/x.yaml", default={})        -> parsed document (cached)
+    store.get("config/x.yaml", "a", "b", default=1) -> nested key
+    store.view("config/x.yaml", Factory)            -> Factory(data), rebuilt on change
+    unsub = store.subscribe("config/x.yaml", cb)    -> cb(data) after each change
+    Relative paths resolve against the project root.
+    """
+    def __init__(self, root: Path | str = ROOT, *, check_interval: float = CHECK_INTERVAL,
+                 watch_interval: float = WATCH_INTERVAL):
+        self.root = Path(root)
+        self.check_interval = check_interval
+        self.watch_interval = watch_interval
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.RLock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.loads = 0                                  # parses done (for tests/diagnostics)
+
+    def _key(self, path) -> str:
+        p = Path(path)
+        return str(p if p.is_absolute() else self.root / p)
+
+    def _entry(self, path) -> _Entry:
+        key = self._key(path)
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                e = self._entries[key] = _Entry(key)
+            return e
+
+    # -- reading ----------------------------------------------------------------
+    def _refresh(self, e: _Entry, force: bool = False) -> bool:
+        """Re-stat (and re-parse if changed); True if the data changed."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and e.data is not _MISSING and now - e.checked < self.check_interval:
+                return False
+            e.checked = now
+            stamp = _stamp(e.path)
+            if e.data is not _MISSING and stamp == e.stamp and not force:
+                return False
+            try:
+                data = _parse(e.path) if stamp is not None else None
+            except Exception as ex:
+                logging.warning("config %s unreadable, keeping last good copy: %s", e.path, ex)
+                e.stamp = stamp
+                if e.data is _MISSING:
+                    e.data = None
+                return False
+            changed = e.data is not _MISSING and data != e.data
+            first = e.data is _MISSING
+            e.stamp, e.data = stamp, data
+            e.version += 1
+            self.loads += 1
+            subs = list(e.subscribers) if changed else []
+        for cb in subs:
+            try:
+                cb(data)
+            except Exception as ex:
+                logging.warning("config subscriber for %s failed: %s", e.path, ex)
+        return changed or first
+
+    def load(self, path, default: Any = None) -> Any:
+        e = self._entry(path)
+        self._refresh(e)
+        return default if e.data is None else e.data
+
+    def get(self, path, *keys: str, default: Any = None) -> Any:
+        cur = self.load(path)
+        for k in keys:
+            if not isinstance(cur, dict) or k not in cur:
+                return default
+            cur = cur[k]
+        return default if cur is None else cur
+
+    def view(self, path, factory: Callable[[Any], Any]) -> Any:
+        """factory(data) built once per file version (data is None when the file is missing)."""
+        e = self._entry(path)
+        self._refresh(e)
+        with self._lock:
+            cached = e.views.get(factory)
+            if cached and cached[0] == e.version:
+                return cached[1]
+            version, data = e.version, e.data
+        obj = factory(data)
+        with self._lock:
+            e.views[factory] = (version, obj)
+        return obj
+
+    def version(self, path) -> int:
+        e = self._entry(path)
+        self._refresh(e)
+        return e.version
+
+    def invalidate(self, path=None) -> None:
+        """Force the next read to re-parse (after writing a file yourself)."""
+        with self._lock:
+            entries = self._entries.values() if path is None else [self._entry(path)]
+            for e in entries:
+                e.checked, e.stamp = float("-inf"), None
+
+    # -- change notification ----------------------------------------------------
+    def subscribe(self, path, callback: Callable[[Any], None]) -> Callable[[], None]:
+        """callback(new_data) on every change; starts the background poller. Returns unsubscribe()."""
+        e = self._entry(path)
+        self._refresh(e)
+        with self._lock:
+            e.subscribers.append(callback)
+        self._start_watcher()
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in e.subscribers:
+                    e.subscribers.remove(callback)
+        return unsubscribe
+
+    def poll(self) -> List[str]:
+        """Check every watched file now; returns the paths that changed."""
+        with self._lock:
+            watched = [e for e in self._entries.values() if e.subscribers]
+        return [e.path for e in watched if self._refresh(e, force=_stamp(e.path) != e.stamp)]
+
+    def _start_watcher(self) -> None:
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="config-store", daemon=True)
+            self._watcher.start()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.watch_interval):
+            try:
+                self.poll()
+            except Exception as ex:
+                logging.debug("config poll failed: %s", ex)
+
+    def close(self) -> None:
+        self._stop.set()
+
+_default: Optional[ConfigStore] = None
+_default_lock = threading.Lock()
+
+def get_store() -> ConfigStore:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = ConfigStore()
+    return _default
@@ -0,0 +1,171 @@
+# core/conversation.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Multi-turn conversation sessions. A ConversationSession keeps ordered
+#   messages per session id under data/conversations/<id>.json (atomic writes).
+#   Once the live history passes a token budget, the oldest turns are folded
+#   into a rolling summary, so each send carries summary + recent turns + the
+#   new message and stays bounded in tokens and latency.
+
+from __future__ import annotations
+import re
+import json
+import time
+import uuid
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+SESSIONS_DIR = ROOT / "data" / "conversations"
+
+HISTORY_BUDGET = 3000       # tokens of live history before compaction
+KEEP_RECENT = 6             # messages never folded into the summary
+SUMMARY_MAX_CHARS = 4000
+LINE_CHARS = 240            # per-message excerpt in the extractive summary
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+Summarizer = Callable[[str, List[Dict[str, Any]]], str]
+
+def valid_session_id(sid: str) -> bool:
+    return bool(_ID_RE.match(sid or ""))
+
+def _count(text: str, provider: str = "openai") -> int:
+    try:
+        from core.cost_engine import get_engine
+        return get_engine().tokens.count(text, provider)
+    except Exception:
+        return max(1, len(text or "") // 4)
+
+def extractive_summary(previous: str, messages: List[Dict[str, Any]]) -> str:
+    """Default summarizer: previous summary + one clipped line per folded message."""
+    lines = [previous] if previous else []
+    for m in messages:
+        text = " ".join(str(m.get("content", "")).split())
+        if len(text) > LINE_CHARS:
+            text = text[:LINE_CHARS] + "..."
+        lines.append(f"- {m.get('role')}: {text}")
+    out = "\n".join(lines)
+    return out if len(out) <= SUMMARY_MAX_CHARS else "..." + out[-SUMMARY_MAX_CHARS:]
+
+class ConversationSession:
+    def __init__(self, session_id: str, root: Path = SESSIONS_DIR):
+        if not valid_session_id(session_id):
+            raise ValueError(f"invalid session id: {session_id!r}")
+        self.id = session_id
+        self.root = Path(root)
+        self.messages: List[Dict[str, Any]] = []
+        self.summary = ""
+        self.folded = 0            # messages folded into the summary so far
+        self.created = time.time()
+        self.updated = self.created
+        self.meta: Dict[str, Any] = {}
+
+    # -- persistence ----------------------------------------------------------
+    @property
+    def path(self) -> Path:
+        return self.root / f"{self.id}.json"
+
+    @classmethod
+    def new(cls, root: Path = SESSIONS_DIR) -> "ConversationSession":
+        return cls(uuid.uuid4().hex[:16], root)
+
+    @classmethod
+    def load(cls, session_id: str, root: Path = SESSIONS_DIR, create: bool = True) -> "ConversationSession":
+        s = cls(session_id, root)
+        try:
+            s._apply(json.loads(s.path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            if not create:
+                raise
+        return s
+
+    def _apply(self, d: Dict[str, Any]) -> None:
+        self.messages = d.get("messages") or []
+        self.summary = d.get("summary") or ""
+        self.folded = int(d.get("folded") or 0)
+        self.created = d.get("created") or self.created
+        self.updated = d.get("updated") or self.updated
+        self.meta = d.get("meta") or {}
+
+    def sync(self) -> None:
+        """Pick up turns another holder of this id saved since this object last loaded or saved."""
+        try:
+            d = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if (d.get("updated") or 0) > self.updated:
+            self._apply(d)
+
+    def lock(self) -> threading.Lock:
+        """
+        Per-id lock; AIClient.send holds it from reading the history to saving
+        the reply, so concurrent turns on one id run one after another.
+        """
+        with _locks_guard:
+            return _locks.setdefault(self.id, threading.Lock())
+
+    def save(self) -> None:
+        from core.fileutil import atomic_write_text
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.updated = time.time()
+        atomic_write_text(str(self.path), json.dumps({
+            "id": self.id, "created": self.created, "updated": self.updated,
+            "summary": self.summary, "folded": self.folded,
+            "meta": self.meta, "messages": self.messages,
+        }, ensure_ascii=False, indent=1))
+
+    # -- history ----------------------------------------------------------------
+    def add(self, role: str, content: str, tokens: int | None = None) -> None:
+        self.messages.append({"role": role, "content": content, "ts": time.time(),
+                              "tokens": tokens if tokens is not None else _count(content)})
+
+    def history_tokens(self) -> int:
+        return sum(int(m.get("tokens") or 0) for m in self.messages)
+
+    def compact(self, budget: int = HISTORY_BUDGET, keep_recent: int = KEEP_RECENT,
+                summarizer: Summarizer | None = None) -> int:
+        """
+        Fold the oldest messages into the summary until the live history fits
+        the budget (always keeping `keep_recent`). Returns messages folded.
+        """
+        if self.history_tokens() <= budget or len(self.messages) <= keep_recent:
+            return 0
+        total = self.history_tokens()
+        cut = 0
+        limit = len(self.messages) - keep_recent
+        while cut < limit and total > budget:
+            total -= int(self.messages[cut].get("tokens") or 0)
+            cut += 1
+        # keep the live history starting on a user turn (Anthropic requires it)
+        while cut < len(self.messages) - 1 and self.messages[cut].get("role") != "user":
+            cut += 1
+        folded, self.messages = self.messages[:cut], self.messages[cut:]
+        self.summary = (summarizer or extractive_summary)(self.summary, folded)
+        self.folded += len(folded)
+        return len(folded)
+
+    def history(self) -> List[Dict[str, str]]:
+        """Provider-shaped messages for the live (unsummarized) history."""
+        return [{"role": m["role"], "content": m["content"]} for m in self.messages
+                if m.get("role") in ("user", "assistant")]
+
+    def summary_text(self) -> str:
+        return f"=== Earlier in this conversation (summary) ===\n{self.summary}" if self.summary else ""
+
+def list_sessions(root: Path = SESSIONS_DIR) -> List[Dict[str, Any]]:
+    out = []
+    for p in sorted(Path(root).glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            d = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        out.append({"id": d.get("id"), "updated": d.get("updated"),
+                    "messages": len(d.get("messages") or []) + int(d.get("folded") or 0)})
+    return out
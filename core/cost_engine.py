@@ -0,0 +1,359 @@
+# core/cost_engine.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Cost engine. Compiles one per-token rate table from the model catalogue,
+#   ai_client.COSTS and config/provider_pricing_overrides.yaml (both the
+#   per-1k scaffold and the provider_docs "models/pricing" shape), resolves
+#   model aliases once, counts tokens (tiktoken when installed, otherwise a
+#   per-provider chars/token ratio calibrated from real usage) and prices
+#   batches of interaction records with array maths for daily spend reports.
+
+from __future__ import annotations
+import os
+import re
+import csv
+import glob
+import json
+import atexit
+import logging
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np  # optional: vectorized batch pricing
+except Exception:
+    np = None
+
+try:
+    import tiktoken  # optional: exact OpenAI token counts
+except Exception:
+    tiktoken = None
+
+ROOT = Path(__file__).resolve().parents[1]
+OVERRIDES_PATH = ROOT / "config" / "provider_pricing_overrides.yaml"
+CALIBRATION_PATH = ROOT / "data" / "insights" / "token_calibration.json"
+INTERACTIONS_DIR = ROOT / "data" / "interactions"
+REQUEST_LOG = ROOT / "logs" / "ai_request_log.csv"
+
+CHARS_PER_TOKEN = {"openai": 4.0, "anthropic": 3.5, "google": 4.0, "groq": 4.0, "deepseek": 4.0}
+CALIBRATION_ALPHA = 0.1     # EMA weight of each observed (chars, tokens) pair
+CALIBRATION_SAVE_SEC = 5.0  # observe() saves the ratios this long after the first unsaved change
+
+# Prompt-cache pricing as a multiple of the input rate
+CACHE_READ_MULT = {"anthropic": 0.1, "openai": 0.5, "google": 0.25, "groq": 0.5, "deepseek": 0.1}
+CACHE_WRITE_MULT = {"anthropic": 1.25}
+
+Rate = Tuple[float, float]  # USD per input token, per output token
+
+# --------------------------------------------------------------------------- #
+# Rate table
+# --------------------------------------------------------------------------- #
+def _alias_keys(model: str) -> List[str]:
+    """Candidate spellings: as-is, dots->dashes, without -latest / date suffix."""
+    m = model.strip()
+    out = [m, m.replace(".", "-")]
+    for base in list(out):
+        stripped = re.sub(r"-(latest|\d{8}|\d{4}-\d{2}-\d{2})$", "", base)
+        if stripped != base:
+            out.append(stripped)
+    return list(dict.fromkeys(out))
+
+def _read_overrides(path: Path) -> Dict[Tuple[str, str], Rate]:
+    """Both override shapes; null values mean 'keep the default'."""
+    try:
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except Exception:
+        return {}
+    out: Dict[Tuple[str, str], Rate] = {}
+    for prov, block in (data or {}).items():
+        if not isinstance(block, dict):
+            continue
+        models = block.get("models") if isinstance(block.get("models"), dict) else block
+        for model, node in models.items():
+            if not isinstance(node, dict):
+                continue
+            pr = node.get("pricing") or {}
+            rin, rout = pr.get("in"), pr.get("out")
+            if rin is None and node.get("input_cost_per_1k") is not None:
+                rin = float(node["input_cost_per_1k"]) / 1000.0
+            if rout is None and node.get("output_cost_per_1k") is not None:
+                rout = float(node["output_cost_per_1k"]) / 1000.0
+            if rin is not None and rout is not None:
+                out[(str(prov).lower(), str(model))] = (float(rin), float(rout))
+    return out
+
+class RateTable:
+    """Flat (provider, model) -> (in, out) per-token rates with alias resolution."""
+    def __init__(self, rates: Dict[Tuple[str, str], Rate], sources: Dict[Tuple[str, str], str] | None = None):
+        self.rates = dict(rates)
+        self.sources = dict(sources or {})
+        self._alias: Dict[Tuple[str, str], Optional[Tuple[str, str]]] = {}
+        self._by_alias: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        for (p, m) in self.rates:
+            for a in _alias_keys(m):
+                self._by_alias.setdefault((p, a), (p, m))
+        # dense arrays for batch pricing; index 0 is the "unknown" zero rate
+        self.keys: List[Tuple[str, str]] = [("", "")] + sorted(self.rates)
+        self.index = {k: i for i, k in enumerate(self.keys)}
+        self.in_rates = [0.0] + [self.rates[k][0] for k in self.keys[1:]]
+        self.out_rates = [0.0] + [self.rates[k][1] for k in self.keys[1:]]
+
+    @classmethod
+    def compile(cls, catalogue=None, costs: Dict[str, Dict[str, Dict[str, float]]] | None = None,
+                overrides_path: Path | None = OVERRIDES_PATH) -> "RateTable":
+        rates: Dict[Tuple[str, str], Rate] = {}
+        sources: Dict[Tuple[str, str], str] = {}
+        if catalogue is not None:
+            for rec in catalogue.models(priced_only=True):
+                k = (rec["provider"], rec["model"])
+                rates[k] = (float(rec["pricing"]["in"]), float(rec["pricing"]["out"]))
+                sources[k] = "catalogue"
+        for p, models in (costs or {}).items():
+            for m, r in models.items():
+                rates[(p, m)] = (float(r["in"]), float(r["out"]))
+                sources[(p, m)] = "builtin"
+        if overrides_path is not None:
+            for k, r in _read_overrides(overrides_path).items():
+                rates[k] = r
+                sources[k] = "override"
+        return cls(rates, sources)
+
+    def key(self, provider: str, model: str) -> Optional[Tuple[str, str]]:
+        """Canonical table key for a provider/model spelling, or None."""
+        q = (provider.lower(), model)
+        hit = self._alias.get(q, False)
+        if hit is not False:
+            return hit
+        found = q if q in self.rates else None
+        if found is None:
+            for a in _alias_keys(model):
+                found = self._by_alias.get((q[0], a))
+                if found:
+                    break
+        self._alias[q] = found
+        return found
+
+    def rate(self, provider: str, model: str) -> Optional[Rate]:
+        k = self.key(provider, model)
+        return self.rates[k] if k else None
+
+    def cost(self, provider: str, model: str, tokens_in: int, tokens_out: int) -> float:
+        r = self.rate(provider, model) or (0.0, 0.0)
+        return tokens_in * r[0] + tokens_out * r[1]
+
+    def price_batch(self, providers: List[str], models: List[str],
+                    tokens_in: List[float], tokens_out: List[float]) -> List[float]:
+        """Cost per record; resolves each distinct provider/model once."""
+        memo: Dict[Tuple[str, str], int] = {}
+        idx = []
+        for p, m in zip(providers, models):
+            i = memo.get((p, m))
+            if i is None:
+                k = self.key(p or "", m or "")
+                i = memo[(p, m)] = self.index[k] if k else 0
+            idx.append(i)
+        if np is not None:
+            ix = np.asarray(idx, dtype=np.int64)
+            cin = np.asarray(self.in_rates)[ix] * np.asarray(tokens_in, dtype=float)
+            cout = np.asarray(self.out_rates)[ix] * np.asarray(tokens_out, dtype=float)
+            return (cin + cout).tolist()
+        return [ti * self.in_rates[i] + to * self.out_rates[i]
+                for i, ti, to in zip(idx, tokens_in, tokens_out)]
+
+# --------------------------------------------------------------------------- #
+# Token counting
+# --------------------------------------------------------------------------- #
+class TokenCounter:
+    def __init__(self, calibration_path: Path | None = CALIBRATION_PATH,
+                 save_delay: float = CALIBRATION_SAVE_SEC):
+        self.path = calibration_path
+        self.save_delay = save_delay
+        self.ratio = dict(CHARS_PER_TOKEN)
+        self._enc: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        if calibration_path is not None:
+            try:
+                self.ratio.update(json.loads(calibration_path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                pass
+            _counters.add(self)
+
+    def _encoding(self, model: str):
+        name = "o200k_base" if re.match(r"(gpt-4o|gpt-4\.1|gpt-5|o\d)", model or "") else "cl100k_base"
+        enc = self._enc.get(name)
+        if enc is None:
+            enc = self._enc[name] = tiktoken.get_encoding(name)
+        return enc
+
+    def count(self, text: str, provider: str = "openai", model: str = "") -> int:
+        if not text:
+            return 0
+        if tiktoken is not None and provider == "openai":
+            try:
+                return len(self._encoding(model).encode(text))
+            except Exception:
+                pass
+        return max(1, round(len(text) / self.ratio.get(provider, 4.0)))
+
+    def observe(self, provider: str, chars: int, tokens: int) -> None:
+        """Fold a real (chars, tokens) pair from an API usage block into the ratio (saved shortly after)."""
+        if chars <= 0 or tokens <= 0:
+            return
+        with self._lock:
+            cur = self.ratio.get(provider, 4.0)
+            self.ratio[provider] = cur + CALIBRATION_ALPHA * (chars / tokens - cur)
+            self._dirty = True
+            if self.path is not None and self._timer is None:
+                self._timer = threading.Timer(self.save_delay, self._timed_save)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_save(self) -> None:
+        try:
+            self.save()
+        except Exception as e:
+            logging.warning("token calibration not saved: %s", e)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        from core.fileutil import atomic_write_text
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(str(self.path), json.dumps(self.ratio, indent=1))
+            self._dirty = False
+
+_counters: "weakref.WeakSet[TokenCounter]" = weakref.WeakSet()
+
+@atexit.register
+def _save_counters() -> None:
+    for c in list(_counters):
+        if c._dirty:
+            try:
+                c.save()
+            except Exception as e:
+                logging.warning("token calibration not saved at exit: %s", e)
+
+# --------------------------------------------------------------------------- #
+# Interaction store + reports
+# --------------------------------------------------------------------------- #
+def _num(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+def load_records(request_log: Path = REQUEST_LOG, interactions_dir: Path = INTERACTIONS_DIR) -> List[Dict[str, Any]]:
+    """Interaction records from the CSV request log, else from the per-call YAML files."""
+    rows: List[Dict[str, Any]] = []
+    if request_log.exists():
+        with open(request_log, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        import yaml
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        for p in sorted(glob.glob(str(interactions_dir / "INT_*.yaml"))):
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    rows.append(yaml.load(f, Loader=loader) or {})
+            except Exception:
+                continue
+    return rows
+
+def daily_report(records: Iterable[Dict[str, Any]], table: RateTable, since: str | None = None) -> Dict[str, Any]:
+    """Recompute cost for every record from the current rates and aggregate per day and provider/model."""
+    recs = [r for r in records if not since or str(r.get("timestamp", ""))[:10] >= since]
+    prov = [str(r.get("provider") or "") for r in recs]
+    mods = [str(r.get("model") or "") for r in recs]
+    tin = [_num(r.get("tokens_in")) for r in recs]
+    tout = [_num(r.get("tokens_out")) for r in recs]
+    costs = table.price_batch(prov, mods, tin, tout)
+
+    days: Dict[str, Dict[str, Dict[str, float]]] = {}
+    unpriced = set()
+    for r, p, m, ti, to, c in zip(recs, prov, mods, tin, tout, costs):
+        day = str(r.get("timestamp", ""))[:10] or "unknown"
+        if table.key(p, m) is None:
+            unpriced.add(f"{p}/{m}")
+        g = days.setdefault(day, {}).setdefault(f"{p}/{m}", {"calls": 0, "tokens_in": 0, "tokens_out": 0, "cost_usd": 0.0})
+        g["calls"] += 1
+        g["tokens_in"] += int(ti)
+        g["tokens_out"] += int(to)
+        g["cost_usd"] += c
+    totals = {d: round(sum(g["cost_usd"] for g in groups.values()), 6) for d, groups in days.items()}
+    return {
+        "records": len(recs),
+        "total_usd": round(sum(costs), 6),
+        "per_day_usd": dict(sorted(totals.items())),
+        "days": {d: days[d] for d in sorted(days)},
+        "unpriced": sorted(unpriced),
+    }
+
+# --------------------------------------------------------------------------- #
+# Process-wide engine
+# --------------------------------------------------------------------------- #
+class CostEngine:
+    def __init__(self, table: RateTable, counter: TokenCounter | None = None):
+        self.table = table
+        self.tokens = counter or TokenCounter(CALIBRATION_PATH)
+
+    def rates(self, provider: str, model: str) -> Dict[str, float]:
+        r = self.table.rate(provider, model) or (0.0, 0.0)
+        return {"in": r[0], "out": r[1]}
+
+    def cost(self, provider: str, model: str, tokens_in: int, tokens_out: int,
+             cache_read: int = 0, cache_write: int = 0) -> float:
+        """tokens_in includes cache_read/cache_write tokens, which are billed at their own multiples."""
+        rin, rout = self.table.rate(provider, model) or (0.0, 0.0)
+        fresh = max(0, tokens_in - cache_read - cache_write)
+        return (fresh * rin
+                + cache_read * rin * CACHE_READ_MULT.get(provider, 1.0)
+                + cache_write * rin * CACHE_WRITE_MULT.get(provider, 1.0)
+                + tokens_out * rout)
+
+_lock = threading.Lock()
+_engine: Optional[CostEngine] = None
+_engine_stamp: Any = None
+
+def _stamp():
+    try:
+        from core.catalogue import get_catalogue
+        cat = get_catalogue()
+    except Exception:
+        cat = None
+    try:
+        st = os.stat(OVERRIDES_PATH)
+        ov = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        ov = None
+    return cat, ov
+
+def get_engine() -> CostEngine:
+    """Engine compiled once; rebuilt when the catalogue snapshot or the overrides file changes."""
+    global _engine, _engine_stamp
+    cat, ov = _stamp()
+    stamp = (id(cat), ov)
+    if _engine is not None and stamp == _engine_stamp:
+        return _engine
+    with _lock:
+        if _engine is None or stamp != _engine_stamp:
+            try:
+                from core.ai_client import COSTS
+            except Exception:
+                COSTS = {}
+            table = RateTable.compile(cat, COSTS, OVERRIDES_PATH)
+            _engine = CostEngine(table, _engine.tokens if _engine else None)
+            _engine_stamp = stamp
+    return _engine
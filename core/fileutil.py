@@ -0,0 +1,71 @@
+# core/fileutil.py
+# Persistent Assistant v3
+# Created: 2025-08-18
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Small file helpers shared by core and tools: atomic writes (temp file in
+#   the target directory + fsync + os.replace) and chunked sha256.
+
+from __future__ import annotations
+import os
+import hashlib
+import secrets
+
+_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def write_temp_beside(path: str, data: bytes, tag: str = "tmp") -> str:
+    """
+    Write data to a fsync'd temp file in the same directory as `path` (so a
+    later os.replace is atomic on the same filesystem). Returns the temp path.
+    """
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o777        # keep the target's mode
+    except OSError:
+        mode = None
+    # created 0666 so the kernel applies the process umask, as for a plain open()
+    while True:
+        tmp = os.path.join(d, f".{os.path.basename(path)}.{secrets.token_hex(4)}.{tag}")
+        try:
+            fd = os.open(tmp, _FLAGS, 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp, mode)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return tmp
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """Replace `path` with `data` atomically; readers see the old or the new file, never a partial one."""
+    tmp = write_temp_beside(path, data)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def atomic_write_text(path: str, text: str, encoding: str = "utf-8") -> None:
+    atomic_write_bytes(path, text.encode(encoding))
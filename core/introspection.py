@@ -6,14 +6,23 @@
 # Description:
 #   Reads the structure snapshot and writes a YAML introspection report with
 #   actionable findings: missing headers, missing docstrings, empty/large modules, etc.
+#   Findings are cached per file keyed by content hash, so repeated runs only
+#   recompute files whose content changed (the change set is reported too).
 
 from __future__ import annotations
 import os
+import json
+import hashlib
 import yaml
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Tuple
 
 SNAPSHOT_PATH = os.path.join("project", "structure", "project_structure_snapshot_full.yaml")
 REPORT_PATH   = os.path.join("data", "insights", "introspection_report.yaml")
+CACHE_PATH    = os.path.join("data", "insights", "introspection_cache.json")
+
+# Prefer the libyaml bindings when present (same output, much faster on big snapshots)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 # Thresholds (tune later)
 LOC_EMPTY_MAX = 5          # <= 5 LOC considered (near-)empty
@@ -27,6 +36,8 @@ REQUIRED_HEADER_KEYS = [
     "Description:",          # Description line
 ]
 
+CACHE_VERSION = 1
+
 def _has_required_header(header_comment: str | None) -> bool:
     if not header_comment:
         return False
@@ -41,12 +52,158 @@ def _first_line(s: str | None) -> str:
         return ""
     return s.strip().splitlines()[0].strip()
 
+def _rules_fingerprint() -> str:
+    """Hash of the active rule set; a change invalidates every cached finding."""
+    raw = json.dumps([CACHE_VERSION, LOC_EMPTY_MAX, LOC_LARGE_MIN, REQUIRED_HEADER_KEYS])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _entry_digest(entry: Dict[str, Any]) -> str:
+    """
+    Content key for a snapshot entry. structure_sync records 'sha1' of the file
+    text; older snapshots without it fall back to hashing the entry itself.
+    """
+    sha = entry.get("sha1")
+    if sha:
+        return str(sha)
+    stable = {k: v for k, v in entry.items() if k != "last_modified"}
+    raw = json.dumps(stable, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _finding(path: str, issue: str, detail: str, symbol: str | None = None) -> Dict[str, Any]:
+    f: Dict[str, Any] = {"path": path, "issue": issue, "detail": detail}
+    if symbol:
+        f["symbol"] = symbol
+    return f
+
+def findings_for_entry(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Compute the findings for a single Python snapshot entry."""
+    findings: List[Dict[str, Any]] = []
+    path = entry.get("path", "")
+    loc  = int(entry.get("lines_of_code", 0))
+    header_comment = entry.get("header_comment")
+    mod_doc = entry.get("docstring")  # module docstring (from AST parse)
+
+    # Missing standard header
+    if not _has_required_header(header_comment):
+        findings.append(_finding(path, "missing_standard_header",
+                                 "Header comment missing or incomplete (required keys not found)."))
+
+    # Module docstring missing
+    if not mod_doc:
+        findings.append(_finding(path, "missing_module_docstring",
+                                 "Top-level module docstring is missing."))
+
+    # Empty / near-empty module
+    if loc <= LOC_EMPTY_MAX:
+        findings.append(_finding(path, "module_too_small",
+                                 f"Module has very few nonblank LOC ({loc} <= {LOC_EMPTY_MAX})."))
+
+    # Oversized module
+    if loc >= LOC_LARGE_MIN:
+        findings.append(_finding(path, "module_too_large",
+                                 f"Module is large ({loc} >= {LOC_LARGE_MIN} LOC). Consider refactor."))
+
+    # Functions & classes docstrings
+    for fn in entry.get("functions", []):
+        # entry['functions'] is list of dicts when using upgraded structure_sync
+        name = fn.get("name") if isinstance(fn, dict) else str(fn)
+        doc1 = fn.get("doc1line") if isinstance(fn, dict) else None
+        if not doc1:
+            findings.append(_finding(path, "function_missing_doc",
+                                     f"Function '{name}' missing docstring.", name))
+
+    for cls in entry.get("classes", []):
+        # entry['classes'] is list of dicts when using upgraded structure_sync
+        if isinstance(cls, dict):
+            cname = cls.get("name")
+            cdoc1 = cls.get("doc1line")
+            if not cdoc1:
+                findings.append(_finding(path, "class_missing_doc",
+                                         f"Class '{cname}' missing docstring.", cname))
+            for m in cls.get("methods", []) or []:
+                mname = m.get("name")
+                mdoc1 = m.get("doc1line")
+                if not mdoc1:
+                    findings.append(_finding(path, "method_missing_doc",
+                                             f"Method '{cname}.{mname}' missing docstring.",
+                                             f"{cname}.{mname}"))
+        else:
+            # older snapshot format (class names only)
+            cname = str(cls)
+            findings.append(_finding(path, "class_missing_doc",
+                                     f"Class '{cname}' missing docstring (snapshot lacks details).",
+                                     cname))
+    return findings
+
+def _load_cache(cache_path: str) -> Dict[str, Dict[str, Any]]:
+    """Return {path: {"digest", "findings"}}; empty if missing, stale or corrupt."""
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    if not isinstance(data, dict) or data.get("rules") != _rules_fingerprint():
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+def _save_cache(cache_path: str, files: Dict[str, Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp = cache_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"rules": _rules_fingerprint(), "files": files}, f, separators=(",", ":"))
+    os.replace(tmp, cache_path)
+
+def compute_findings(py_entries: List[Dict[str, Any]],
+                     cached: Dict[str, Dict[str, Any]],
+                     progress: Callable[[int, int, str], None] | None = None,
+                     ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """
+    Merge cached findings with fresh findings for changed entries.
+
+    Returns (findings, new_cache_files, changes) where changes lists the
+    'changed' paths (new or modified), 'removed' paths (cached but gone) and
+    the 'unchanged' count. progress(n, m, path) is called after each entry.
+    """
+    findings: List[Dict[str, Any]] = []
+    new_files: Dict[str, Dict[str, Any]] = {}
+    changed: List[str] = []
+    unchanged = 0
+
+    for entry in py_entries:
+        path = entry.get("path", "")
+        digest = _entry_digest(entry)
+        hit = cached.get(path)
+        if hit and hit.get("digest") == digest and isinstance(hit.get("findings"), list):
+            file_findings = hit["findings"]
+            unchanged += 1
+        else:
+            file_findings = findings_for_entry(entry)
+            changed.append(path)
+        new_files[path] = {"digest": digest, "findings": file_findings}
+        findings.extend(file_findings)
+        if progress:
+            progress(len(new_files), len(py_entries), path)
+
+    removed = sorted(p for p in cached if p not in new_files)
+    return findings, new_files, {"changed": changed, "removed": removed, "unchanged": unchanged}
+
 def generate_introspection_report(snapshot_path: str = SNAPSHOT_PATH,
-                                  report_path: str = REPORT_PATH) -> Dict[str, Any]:
+                                  report_path: str = REPORT_PATH,
+                                  cache_path: str | None = CACHE_PATH,
+                                  progress: Callable[[int, int, str], None] | None = None) -> Dict[str, Any]:
     """
     Reads the project_structure_snapshot_full.yaml and writes a findings report.
     Returns the in-memory report dict for UI display/logging.
 
+    Only files whose content hash differs from the cache are re-analysed; the
+    report's 'changes' section carries the change set for downstream consumers
+    (core.tasks upserts tickets for those files only). Pass cache_path=None to
+    force a full recompute. progress(n, m, path) reports per-file progress
+    (GUI jobs use it as their cancellation point).
+
     Raises:
         FileNotFoundError: if the snapshot file is missing.
         Exception: for YAML parse or unexpected errors.
@@ -55,7 +212,7 @@ def generate_introspection_report(snapshot_path: str = SNAPSHOT_PATH,
         raise FileNotFoundError(f"Snapshot not found: {snapshot_path}")
 
     with open(snapshot_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_YAML_LOADER)
 
     if not isinstance(data, list):
         raise ValueError("Snapshot content invalid: expected list of file entries.")
@@ -65,86 +222,10 @@ def generate_introspection_report(snapshot_path: str = SNAPSHOT_PATH,
     yaml_files  = [d for d in data if d.get("path", "").endswith((".yaml", ".yml"))]
     md_files    = [d for d in data if d.get("path", "").endswith(".md")]
 
-    findings: List[Dict[str, Any]] = []
-
-    for entry in py_files:
-        path = entry.get("path", "")
-        loc  = int(entry.get("lines_of_code", 0))
-        header_comment = entry.get("header_comment")
-        mod_doc = entry.get("docstring")  # module docstring (from AST parse)
-
-        # Missing standard header
-        if not _has_required_header(header_comment):
-            findings.append({
-                "path": path,
-                "issue": "missing_standard_header",
-                "detail": "Header comment missing or incomplete (required keys not found).",
-            })
-
-        # Module docstring missing
-        if not mod_doc:
-            findings.append({
-                "path": path,
-                "issue": "missing_module_docstring",
-                "detail": "Top-level module docstring is missing.",
-            })
-
-        # Empty / near-empty module
-        if loc <= LOC_EMPTY_MAX:
-            findings.append({
-                "path": path,
-                "issue": "module_too_small",
-                "detail": f"Module has very few nonblank LOC ({loc} <= {LOC_EMPTY_MAX}).",
-            })
-
-        # Oversized module
-        if loc >= LOC_LARGE_MIN:
-            findings.append({
-                "path": path,
-                "issue": "module_too_large",
-                "detail": f"Module is large ({loc} >= {LOC_LARGE_MIN} LOC). Consider refactor.",
-            })
-
-        # Functions & classes docstrings
-        for fn in entry.get("functions", []):
-            # entry['functions'] is list of dicts when using upgraded structure_sync
-            name = fn.get("name") if isinstance(fn, dict) else str(fn)
-            doc1 = fn.get("doc1line") if isinstance(fn, dict) else None
-            if not doc1:
-                findings.append({
-                    "path": path,
-                    "issue": "function_missing_doc",
-                    "detail": f"Function '{name}' missing docstring.",
-                })
-
-        for cls in entry.get("classes", []):
-            # entry['classes'] is list of dicts when using upgraded structure_sync
-            if isinstance(cls, dict):
-                cname = cls.get("name")
-                cdoc1 = cls.get("doc1line")
-                if not cdoc1:
-                    findings.append({
-                        "path": path,
-                        "issue": "class_missing_doc",
-                        "detail": f"Class '{cname}' missing docstring.",
-                    })
-                for m in cls.get("methods", []) or []:
-                    mname = m.get("name")
-                    mdoc1 = m.get("doc1line")
-                    if not mdoc1:
-                        findings.append({
-                            "path": path,
-                            "issue": "method_missing_doc",
-                            "detail": f"Method '{cname}.{mname}' missing docstring.",
-                        })
-            else:
-                # older snapshot format (class names only)
-                cname = str(cls)
-                findings.append({
-                    "path": path,
-                    "issue": "class_missing_doc",
-                    "detail": f"Class '{cname}' missing docstring (snapshot lacks details).",
-                })
+    cached = _load_cache(cache_path) if cache_path else {}
+    findings, cache_files, changes = compute_findings(py_files, cached, progress)
+    if cache_path:
+        _save_cache(cache_path, cache_files)
 
     report: Dict[str, Any] = {
         "meta": {
@@ -154,16 +235,21 @@ def generate_introspection_report(snapshot_path: str = SNAPSHOT_PATH,
             "yaml_files": len(yaml_files),
             "markdown_files": len(md_files),
             "loc_thresholds": {"empty_max": LOC_EMPTY_MAX, "large_min": LOC_LARGE_MIN},
+            "incremental": bool(cached),
         },
         "summary": {
             "files_with_findings": len(set(e["path"] for e in findings)),
             "total_findings": len(findings),
+            "files_changed": len(changes["changed"]),
+            "files_removed": len(changes["removed"]),
+            "files_unchanged": changes["unchanged"],
         },
+        "changes": changes,
         "findings": findings,
     }
 
     os.makedirs(os.path.dirname(report_path), exist_ok=True)
     with open(report_path, "w", encoding="utf-8") as f:
-        yaml.dump(report, f, allow_unicode=True, sort_keys=False)
+        yaml.dump(report, f, Dumper=_YAML_DUMPER, allow_unicode=True, sort_keys=False)
 
     return report
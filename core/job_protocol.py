@@ -0,0 +1,75 @@
+# core/job_protocol.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   The PROGRESS:/SUMMARY: line protocol shared by tool scripts and the GUI.
+#   Tools print `PROGRESS: {json}` while working and one `SUMMARY: {json}` at
+#   the end; LineProtocol turns a byte/str stream (split at arbitrary points)
+#   back into events, and progress_text renders a progress payload the way the
+#   Tools tab status line always has.
+
+from __future__ import annotations
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+PROGRESS = "PROGRESS:"
+SUMMARY = "SUMMARY:"
+
+Event = Tuple[str, Any, str]      # (kind, payload, raw line); kind: progress | summary | text
+
+def parse_line(line: str) -> Event:
+    s = line.strip()
+    for prefix, kind in ((PROGRESS, "progress"), (SUMMARY, "summary")):
+        if s.startswith(prefix):
+            try:
+                return kind, json.loads(s[len(prefix):].strip()), s
+            except ValueError:
+                return "text", s, s
+    return "text", s, s
+
+class LineProtocol:
+    """Incremental parser: feed() chunks, get complete-line events back."""
+    def __init__(self):
+        self._tail = ""
+        self.summary: Dict[str, Any] = {}
+        self.last_progress: Dict[str, Any] = {}
+
+    def feed(self, chunk) -> List[Event]:
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = bytes(chunk).decode("utf-8", errors="replace")
+        lines = (self._tail + chunk).split("\n")
+        self._tail = lines.pop()
+        return [self._track(parse_line(ln)) for ln in lines if ln.strip()]
+
+    def close(self) -> List[Event]:
+        tail, self._tail = self._tail, ""
+        return [self._track(parse_line(tail))] if tail.strip() else []
+
+    def _track(self, ev: Event) -> Event:
+        kind, payload, _ = ev
+        if kind == "summary" and isinstance(payload, dict):
+            self.summary = payload
+        elif kind == "progress" and isinstance(payload, dict):
+            self.last_progress = payload
+        return ev
+
+def progress_text(title: str, prog: Dict[str, Any]) -> str:
+    """'Title… n/m • ok:a fail:b skip:c • label' (only the parts present)."""
+    parts = []
+    if prog.get("n") is not None:
+        parts.append(f"{prog.get('n')}/{prog.get('m', '?')}")
+    if any(k in prog for k in ("ok", "fail", "skipped")):
+        parts.append(f"ok:{prog.get('ok', 0)} fail:{prog.get('fail', 0)} skip:{prog.get('skipped', 0)}")
+    if prog.get("label"):
+        parts.append(str(prog["label"]))
+    return f"{title}… " + " • ".join(parts) if parts else f"{title}…"
+
+def emit(kind: str, payload: Dict[str, Any], stream=None) -> None:
+    """Print one protocol line (kind: 'progress' or 'summary') and flush."""
+    prefix = PROGRESS if kind == "progress" else SUMMARY
+    out = stream or sys.stdout
+    out.write(f"{prefix} {json.dumps(payload, ensure_ascii=False, default=str)}\n")
+    out.flush()
@@ -2,14 +2,16 @@
 # Minimal HTTP client for Local Exec Bridge (LEB)
 import json, time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 import requests
 
+from core.leb_jobs import parse_sse
+
 @dataclass
 class LEBClient:
     host: str = "127.0.0.1"
     port: int = 8765
-    timeout: float = 20.0
+    timeout: float = 20.0           # per HTTP request; streamed jobs are not bounded by it
 
     @property
     def base(self) -> str:
@@ -20,11 +22,86 @@ class LEBClient:
         r.raise_for_status()
         return r.json()
 
-    def run(self, cmd: str) -> Dict[str, Any]:
-        r = requests.post(self.base + "/run", json={"cmd": cmd}, timeout=self.timeout)
+    def run(self, cmd: str, *, on_output: Optional[Callable[[str, str], None]] = None,
+            job_timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run cmd to completion -> {"ok", "rc", "stdout", "stderr", "id", "state"}.
+        Uses the job API, so long commands stream (on_output(stream, line)) and
+        are not cut off by `timeout`; falls back to the blocking /run on an
+        older LEB without /jobs.
+        """
+        try:
+            job_id = self.submit(cmd, timeout=job_timeout)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in (404, 405):
+                raise
+            r = requests.post(self.base + "/run", json={"cmd": cmd}, timeout=job_timeout or self.timeout)
+            r.raise_for_status()
+            return r.json()
+        out: Dict[str, list] = {"stdout": [], "stderr": []}
+
+        def collect(stream: str, line: str) -> None:
+            out.setdefault(stream, []).append(line + "\n")
+            if on_output:
+                on_output(stream, line)
+        final = self.stream(job_id, collect)
+        return {"ok": True, "id": job_id, "state": final.get("state"), "rc": final.get("rc"),
+                "stdout": "".join(out["stdout"]), "stderr": "".join(out["stderr"])}
+
+    # -- job API ------------------------------------------------------------------
+    def submit(self, cmd: str, *, cwd: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        """Start cmd on the LEB; returns the job id immediately."""
+        body: Dict[str, Any] = {"cmd": cmd}
+        if cwd:
+            body["cwd"] = cwd
+        if timeout:
+            body["timeout"] = timeout
+        r = requests.post(self.base + "/jobs", json=body, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()["id"]
+
+    def status(self, job_id: str, output: bool = False) -> Dict[str, Any]:
+        r = requests.get(self.base + f"/jobs/{job_id}", params={"output": 1} if output else None,
+                         timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def jobs(self) -> Dict[str, Any]:
+        r = requests.get(self.base + "/jobs", timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        r = requests.post(self.base + f"/jobs/{job_id}/cancel", timeout=self.timeout)
         r.raise_for_status()
         return r.json()
 
+    def stream(self, job_id: str, on_output: Optional[Callable[[str, str], None]] = None,
+               since: int = 0, retries: int = 3) -> Dict[str, Any]:
+        """
+        Follow a job's SSE stream until it exits; on_output(stream, line) per
+        line. Reconnects (resuming after the last seen line) if the connection
+        drops. Returns the final job status.
+        """
+        for attempt in range(retries + 1):
+            try:
+                # read timeout just has to outlast the server's 15 s keepalive
+                with requests.get(self.base + f"/jobs/{job_id}/stream", params={"since": since},
+                                  stream=True, timeout=(self.timeout, 60.0)) as r:
+                    r.raise_for_status()
+                    for event, data, eid in parse_sse(r.iter_lines(decode_unicode=True)):
+                        if event == "exit":
+                            return json.loads(data)
+                        if eid is not None:
+                            since = int(eid) + 1
+                        if on_output:
+                            on_output(event, data)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == retries:
+                    raise
+                time.sleep(min(2.0, 0.25 * 2 ** attempt))
+        return self.status(job_id)
+
     def logs(self) -> Dict[str, Any]:
         r = requests.get(self.base + "/logs", timeout=self.timeout)
         r.raise_for_status()
@@ -0,0 +1,307 @@
+# core/leb_jobs.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Job engine behind the Local Exec Bridge (tools/leb_server.py). submit()
+#   queues a shell command and returns a handle at once. At most
+#   `max_workers` commands run at a time; each one's stdout/stderr lines are
+#   appended to a bounded per-job buffer as they arrive. read(since, wait)
+#   long-polls that buffer, which is what the server's SSE stream is built
+#   on. Jobs can be cancelled while queued or running (terminate, then kill
+#   after a grace period) and finished jobs are kept in a short history.
+#   With a core.leb_warm_pool.WarmPool attached, python/pytest commands run
+#   in a pre-started interpreter instead of a fresh process.
+
+from __future__ import annotations
+import os
+import time
+import signal
+import itertools
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_WORKERS = 2
+BUFFER_LINES = 10000        # output lines kept per job (older ones are dropped)
+HISTORY_MAX = 100
+KILL_GRACE = 3.0            # seconds between terminate and kill on cancel
+
+TERMINAL = ("ok", "failed", "cancelled", "timeout")
+
+class LEBJob:
+    """One command. Output entries are (seq, stream, text) with stream 'stdout' | 'stderr'."""
+    def __init__(self, job_id: str, cmd: str, *, cwd: Optional[str] = None,
+                 env: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                 buffer_lines: int = BUFFER_LINES):
+        self.id = job_id
+        self.cmd = cmd
+        self.cwd = cwd
+        self.env = env
+        self.timeout = timeout
+        self.state = "queued"               # queued | running | ok | failed | cancelled | timeout
+        self.rc: Optional[int] = None
+        self.error = ""
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.ended: Optional[float] = None
+        self._out: deque = deque(maxlen=buffer_lines)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._proc: Optional[subprocess.Popen] = None
+        self._cancel = threading.Event()
+        self.warm = False
+
+    @property
+    def done(self) -> bool:
+        return self.state in TERMINAL
+
+    def _append(self, stream: str, text: str) -> None:
+        with self._cond:
+            self._out.append((self._seq, stream, text))
+            self._seq += 1
+            self._cond.notify_all()
+
+    def _finish(self, state: str, rc: Optional[int] = None, error: str = "") -> None:
+        with self._cond:
+            if self.done:
+                return
+            self.state, self.rc, self.error = state, rc, error
+            self.ended = time.time()
+            self._cond.notify_all()
+
+    def read(self, since: int = 0, wait: float = 0.0) -> Tuple[List[Tuple[int, str, str]], int, bool]:
+        """
+        Output with seq >= since -> (entries, next_since, done). Blocks up to
+        `wait` seconds when there is nothing new and the job is still going.
+        Entries that fell out of the buffer are skipped (next_since still advances).
+        """
+        deadline = time.monotonic() + max(0.0, wait)
+        with self._cond:
+            while self._seq <= since and not self.done:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            entries = [e for e in self._out if e[0] >= since]
+            return entries, max(since, self._seq), self.done
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job ends; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.done, timeout)
+
+    def output(self, stream: Optional[str] = None) -> str:
+        with self._cond:
+            return "".join(t + "\n" for _, s, t in self._out if stream is None or s == stream)
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.ended or time.time()
+        return {"id": self.id, "cmd": self.cmd, "state": self.state, "rc": self.rc, "error": self.error,
+                "created": self.created, "started": self.started, "ended": self.ended,
+                "duration": round(end - self.started, 3) if self.started else None,
+                "lines": self._seq, "warm": self.warm}
+
+class JobRunner:
+    def __init__(self, max_workers: int = MAX_WORKERS, *, buffer_lines: int = BUFFER_LINES,
+                 history: int = HISTORY_MAX, kill_grace: float = KILL_GRACE, warm=None):
+        self.max_workers = max_workers
+        self.warm = warm                    # optional WarmPool
+        self.buffer_lines = buffer_lines
+        self.history = history
+        self.kill_grace = kill_grace
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="leb-job")
+        self._jobs: Dict[str, LEBJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # -- public API ---------------------------------------------------------------
+    def submit(self, cmd: str, *, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+               timeout: Optional[float] = None) -> LEBJob:
+        if not cmd or not isinstance(cmd, str):
+            raise ValueError("missing cmd")
+        with self._lock:
+            job = LEBJob(f"j{int(time.time())}-{next(self._ids)}", cmd, cwd=cwd, env=env, timeout=timeout,
+                         buffer_lines=self.buffer_lines)
+            self._jobs[job.id] = job
+            self._trim()
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[LEBJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Newest first."""
+        return [j.to_dict() for j in sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)]
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job._cancel.set()
+        if job.state == "queued":
+            job._finish("cancelled")
+        else:
+            self._stop(job)
+        return True
+
+    def shutdown(self, cancel: bool = True) -> None:
+        if cancel:
+            for jid in list(self._jobs):
+                self.cancel(jid)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.warm is not None:
+            self.warm.close()
+
+    # -- internals ----------------------------------------------------------------
+    def _trim(self) -> None:
+        finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.created)
+        for j in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[j.id]
+
+    def _stop(self, job: LEBJob) -> None:
+        proc = job._proc
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, signal.SIGTERM)         # the shell and its children
+            else:
+                proc.terminate()
+        except OSError:
+            pass
+
+        def hard_kill() -> None:
+            if proc.poll() is None:
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL) if os.name == "posix" else proc.kill()
+                except OSError:
+                    pass
+        t = threading.Timer(self.kill_grace, hard_kill)
+        t.daemon = True
+        t.start()
+
+    def _pump(self, job: LEBJob, pipe, stream: str) -> None:
+        try:
+            for line in iter(pipe.readline, ""):
+                job._append(stream, line.rstrip("\r\n"))
+        finally:
+            pipe.close()
+
+    def _started(self, job: LEBJob, proc: subprocess.Popen) -> bool:
+        """Mark the job running once its process exists; False if it was cancelled meanwhile."""
+        job._proc = proc
+        with job._cond:
+            cancelled = job.done                    # cancelled while the process was starting
+            if not cancelled:
+                job.state, job.started = "running", time.time()
+                job._cond.notify_all()
+        if cancelled or job._cancel.is_set():
+            self._stop(job)
+        return not cancelled
+
+    def _run_warm(self, job: LEBJob, spec: Dict[str, Any]) -> bool:
+        """Run on a warm worker; False if none was free (caller runs it cold)."""
+        job.warm = True
+        res = self.warm.run(spec, job._append, cwd=job.cwd, timeout=job.timeout,
+                            on_start=lambda proc: self._started(job, proc))
+        if res is None:
+            job.warm = False
+            return False
+        rc, status = res
+        if job._cancel.is_set():
+            job._finish("cancelled", rc)
+        elif status == "timeout":
+            job._finish("timeout", rc, error=f"timed out after {job.timeout}s")
+        elif status != "ok":
+            job._finish("failed", rc, error="warm worker exited unexpectedly")
+        else:
+            job._finish("ok" if rc == 0 else "failed", rc)
+        return True
+
+    def _run(self, job: LEBJob) -> None:
+        if job._cancel.is_set() or job.done:
+            return
+        spec = self.warm.parse(job.cmd) if self.warm is not None and not job.env else None
+        if spec is not None and self._run_warm(job, spec):
+            return
+        env = dict(os.environ, PYTHONUNBUFFERED="1")
+        env.update(job.env or {})
+        try:
+            proc = subprocess.Popen(job.cmd, shell=True, cwd=job.cwd, env=env, text=True,
+                                    encoding="utf-8", errors="replace", bufsize=1,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    start_new_session=(os.name == "posix"))
+        except Exception as e:
+            job._finish("failed", error=f"{type(e).__name__}: {e}")
+            return
+        if not self._started(job, proc):
+            proc.communicate()
+            return
+        readers = [threading.Thread(target=self._pump, args=(job, proc.stdout, "stdout"), daemon=True),
+                   threading.Thread(target=self._pump, args=(job, proc.stderr, "stderr"), daemon=True)]
+        for r in readers:
+            r.start()
+        timed_out = False
+        try:
+            proc.wait(timeout=job.timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            self._stop(job)
+            proc.wait()
+        for r in readers:
+            r.join(timeout=5)
+        if job._cancel.is_set():
+            job._finish("cancelled", proc.returncode)
+        elif timed_out:
+            job._finish("timeout", proc.returncode, error=f"timed out after {job.timeout}s")
+        else:
+            job._finish("ok" if proc.returncode == 0 else "failed", proc.returncode)
+
+def _sse(seq: int, stream: str, text: str) -> str:
+    return f"id: {seq}\nevent: {stream}\ndata: {text.replace(chr(13), '')}\n\n"
+
+def sse_events(job: LEBJob, since: int = 0, keepalive: float = 15.0):
+    """
+    Server-sent events for a job: `id: <seq>` / `event: stdout|stderr` / `data: <line>`,
+    `: keepalive` comments while idle, then one `event: exit` with the final status as JSON.
+    """
+    import json
+    while True:
+        entries, since, done = job.read(since, wait=keepalive)
+        for seq, stream, text in entries:
+            yield _sse(seq, stream, text)
+        if done:
+            # drain anything appended between the read and the state change
+            entries, since, _ = job.read(since)
+            for seq, stream, text in entries:
+                yield _sse(seq, stream, text)
+            yield f"event: exit\ndata: {json.dumps(job.to_dict())}\n\n"
+            return
+        if not entries:
+            yield ": keepalive\n\n"
+
+def parse_sse(lines):
+    """Client side: iterate (event, data, id) from an iterable of SSE text lines."""
+    event, data, eid = "message", [], None
+    for raw in lines:
+        line = raw.rstrip("\r\n") if isinstance(raw, str) else raw.decode("utf-8", "replace").rstrip("\r\n")
+        if not line:
+            if data:
+                yield event, "\n".join(data), eid
+            event, data = "message", []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
+        elif field == "id":
+            eid = value
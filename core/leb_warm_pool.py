@@ -0,0 +1,421 @@
+# core/leb_warm_pool.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Warm Python workers for the Local Exec Bridge. A cold `python tools/x.py`
+#   or `pytest ...` pays for interpreter start-up and for importing yaml,
+#   flask, pytest and the project modules on every run. WarmPool keeps a few
+#   interpreters started ahead of time with the project on sys.path and those
+#   modules already imported; each command runs in one of them via runpy in a
+#   fresh __main__ namespace, with modules it imported dropped afterwards.
+#   A worker is replaced after `max_runs` commands, when a command dies with an
+#   uncaught exception, or when a preloaded project file changes on disk.
+#   A worker that fails to start is retried with a growing delay; while no
+#   worker is alive or starting, run() returns None at once so the caller
+#   runs the command cold instead of waiting out boot_timeout.
+#   Commands the pool can't run faithfully (shell syntax, interpreter flags,
+#   scripts outside the project) are left to the normal subprocess path.
+#
+#   Wire protocol (one JSON object per line): the parent writes a request
+#   {"mode": "script"|"module", "target", "argv", "cwd"} to the worker's stdin;
+#   the worker answers on its stdout with {"ev": "out", "s": stream, "t": line}
+#   messages, then {"ev": "exit", "rc", "recycle"}, or {"ev": "stale"} instead
+#   of running when it should be replaced first.
+
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import shlex
+import logging
+import threading
+import subprocess
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+POOL_SIZE = 2
+MAX_RUNS = 50               # commands per worker before it is replaced
+BOOT_TIMEOUT = 30.0         # seconds to wait for an idle worker before running cold
+SPAWN_RETRY = 1.0           # first delay after a worker fails to start; doubles per failure
+SPAWN_RETRY_MAX = 60.0
+PRELOAD = ("yaml", "flask", "pytest", "core.fileutil", "core.config_store")
+
+PYTHON_NAMES = ("python", "python3", "python.exe", "python3.exe", "py", "py.exe")
+SHELL_CHARS = set("|&;<>()$`*?\n")
+END_MARK = "\x00leb-warm-end\x00"
+
+def parse_command(cmd: str, root: Path | str = ROOT) -> Optional[Dict[str, Any]]:
+    """
+    Request for a command a warm worker can run, or None:
+      python path/to/script.py args   (script inside root)
+      python -m module args
+      pytest args
+    """
+    if not cmd or SHELL_CHARS & set(cmd):
+        return None
+    try:
+        argv = shlex.split(cmd, posix=(os.name == "posix"))
+    except ValueError:
+        return None
+    if not argv:
+        return None
+    head, rest = os.path.basename(argv[0]).lower(), argv[1:]
+    if head in ("pytest", "pytest.exe", "py.test"):
+        return {"mode": "module", "target": "pytest", "argv": ["pytest", *rest]}
+    if head not in PYTHON_NAMES or not rest:
+        return None
+    if rest[0] == "-m" and len(rest) > 1:
+        return {"mode": "module", "target": rest[1], "argv": rest[1:]}
+    if rest[0].startswith("-") or not rest[0].endswith(".py"):
+        return None
+    script = (Path(root) / rest[0]).resolve()
+    try:
+        script.relative_to(Path(root).resolve())
+    except ValueError:
+        return None
+    if not script.is_file():
+        return None
+    return {"mode": "script", "target": str(script), "argv": [str(script), *rest[1:]]}
+
+class _Worker:
+    def __init__(self, proc: subprocess.Popen):
+        self.proc = proc
+        self.runs = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def send(self, req: Dict[str, Any]) -> None:
+        self.proc.stdin.write(json.dumps(req) + "\n")
+        self.proc.stdin.flush()
+
+    def recv(self) -> Optional[Dict[str, Any]]:
+        line = self.proc.stdout.readline()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return {"ev": "out", "s": "stderr", "t": line.rstrip("\n")}
+
+    def kill(self) -> None:
+        if self.alive:
+            try:
+                self.proc.kill()
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()             # EOF: the worker exits on its own
+            self.proc.wait(timeout=2)
+        except Exception:
+            self.kill()
+
+class WarmPool:
+    """
+    pool = WarmPool(size=2)
+    spec = pool.parse("pytest -q tests")              # None -> run it the normal way
+    rc, status = pool.run(spec, on_output)            # status: ok | timeout | killed
+    pool.run() returns None when no worker became free within boot_timeout.
+    """
+    def __init__(self, size: int = POOL_SIZE, *, max_runs: int = MAX_RUNS,
+                 preload: Tuple[str, ...] = PRELOAD, root: Path | str = ROOT,
+                 boot_timeout: float = BOOT_TIMEOUT):
+        self.size = size
+        self.max_runs = max_runs
+        self.preload = tuple(preload)
+        self.root = Path(root)
+        self.boot_timeout = boot_timeout
+        self._idle: "deque[_Worker]" = deque()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._live = 0                          # workers alive or starting right now
+        self._closing = threading.Event()
+        self.stats = {"warm_runs": 0, "spawned": 0, "recycled": 0, "spawn_failures": 0}
+        for _ in range(size):
+            self._spawn_async()
+
+    @property
+    def _closed(self) -> bool:
+        return self._closing.is_set()
+
+    # -- workers ------------------------------------------------------------------
+    def _spawn(self) -> Optional[_Worker]:
+        env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8",
+                   LEB_WARM_PRELOAD=",".join(self.preload))
+        try:
+            proc = subprocess.Popen([sys.executable, "-u", "-m", "core.leb_warm_pool", "--worker"],
+                                    cwd=str(self.root), env=env, text=True, encoding="utf-8",
+                                    errors="replace", bufsize=1,
+                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                    start_new_session=(os.name == "posix"))
+        except Exception as e:
+            logging.error("warm worker failed to start: %s", e)
+            return None
+        w = _Worker(proc)
+        hello = w.recv()
+        if not hello or hello.get("ev") != "ready":
+            logging.error("warm worker did not come up: %r", hello)
+            w.kill()
+            return None
+        with self._lock:
+            self.stats["spawned"] += 1
+        return w
+
+    def _spawn_async(self) -> None:
+        with self._lock:
+            self._live += 1
+
+        def boot() -> None:
+            delay = SPAWN_RETRY
+            while True:
+                w = self._spawn()
+                if w is not None:
+                    break
+                with self._cond:
+                    self.stats["spawn_failures"] += 1
+                    self._live -= 1             # waiters fall back to cold runs meanwhile
+                    self._cond.notify_all()
+                if self._closing.wait(delay):
+                    return
+                delay = min(delay * 2, SPAWN_RETRY_MAX)
+                with self._lock:
+                    self._live += 1
+            with self._cond:
+                if not self._closed:
+                    self._idle.append(w)
+                    self._cond.notify()
+                    return
+                self._live -= 1
+            w.close()
+        threading.Thread(target=boot, name="leb-warm-boot", daemon=True).start()
+
+    def _retire(self, w: _Worker) -> None:
+        with self._cond:
+            self.stats["recycled"] += 1
+            self._live -= 1
+            self._cond.notify_all()
+        if w.alive:
+            w.close()
+        if not self._closed:
+            self._spawn_async()
+
+    def _acquire(self) -> Optional[_Worker]:
+        deadline = time.monotonic() + self.boot_timeout
+        while True:
+            with self._cond:
+                while not self._idle:
+                    left = deadline - time.monotonic()
+                    if self._closed or self._live == 0 or left <= 0:
+                        return None
+                    self._cond.wait(left)
+                w = self._idle.popleft()
+            if w.alive:
+                return w
+            self._retire(w)
+
+    # -- running ------------------------------------------------------------------
+    def parse(self, cmd: str) -> Optional[Dict[str, Any]]:
+        return parse_command(cmd, self.root)
+
+    def run(self, spec: Dict[str, Any], on_output: Callable[[str, str], None], *,
+            cwd: Optional[str] = None, timeout: Optional[float] = None,
+            on_start: Optional[Callable[[subprocess.Popen], None]] = None) -> Optional[Tuple[Optional[int], str]]:
+        """
+        Run a parse() result on a warm worker; on_output(stream, line) per line.
+        on_start(proc) gets the worker process (kill its process group to cancel).
+        Returns (rc, status) or None if no worker was available.
+        """
+        for _ in range(2):                      # a stale worker is swapped once
+            w = self._acquire()
+            if w is None:
+                return None
+            if on_start:
+                on_start(w.proc)
+            fired = threading.Event()
+
+            def expire(w=w) -> None:
+                fired.set()
+                w.kill()
+            timer = threading.Timer(timeout, expire) if timeout else None
+            if timer:
+                timer.daemon = True
+                timer.start()
+            rc, status, recycle = None, "killed", True
+            try:
+                w.send(dict(spec, cwd=cwd or str(self.root)))
+                while True:
+                    msg = w.recv()
+                    if msg is None:
+                        break
+                    ev = msg.get("ev")
+                    if ev == "out":
+                        on_output(msg.get("s", "stdout"), msg.get("t", ""))
+                    elif ev == "exit":
+                        rc, status, recycle = msg.get("rc"), "ok", bool(msg.get("recycle"))
+                        break
+                    elif ev == "stale":
+                        status = "stale"
+                        break
+            except (OSError, ValueError):
+                pass                            # pipe closed under us: worker was killed
+            finally:
+                if timer:
+                    timer.cancel()
+            if fired.is_set():
+                status = "timeout"
+            w.runs += 1
+            if status == "ok" and not recycle and w.runs < self.max_runs and w.alive:
+                with self._cond:
+                    self._idle.append(w)
+                    self._cond.notify()
+            else:
+                self._retire(w)
+            if status != "stale":
+                if status == "ok":
+                    with self._lock:
+                        self.stats["warm_runs"] += 1
+                return rc, status
+        return None
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, size=self.size, idle=len(self._idle), live=self._live,
+                        max_runs=self.max_runs)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closing.set()
+            idle, self._idle = list(self._idle), deque()
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for w in idle:
+            w.close()
+
+# -- worker side ---------------------------------------------------------------------
+def _project_mtimes(root: Path) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for mod in list(sys.modules.values()):
+        f = getattr(mod, "__file__", None)
+        if f and f.startswith(str(root)):
+            try:
+                out[f] = os.stat(f).st_mtime
+            except OSError:
+                pass
+    return out
+
+def _pump(fd: int, stream: str, emit: Callable[[Dict[str, Any]], None], marked: threading.Event) -> None:
+    with os.fdopen(fd, "r", encoding="utf-8", errors="replace", newline="\n") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line.endswith(END_MARK):
+                line = line[:-len(END_MARK)]
+                if line:
+                    emit({"ev": "out", "s": stream, "t": line})
+                marked.set()
+                continue
+            emit({"ev": "out", "s": stream, "t": line})
+
+def _execute(req: Dict[str, Any]) -> Tuple[int, bool]:
+    """Run one request in this process -> (rc, recycle)."""
+    import runpy
+    import traceback
+    argv, path, cwd, stdout, stderr = sys.argv[:], sys.path[:], os.getcwd(), sys.stdout, sys.stderr
+    before = set(sys.modules)
+    threads = set(threading.enumerate())
+    rc, recycle = 0, False
+    try:
+        os.chdir(req.get("cwd") or str(ROOT))
+        sys.argv = list(req["argv"])
+        if req["mode"] == "script":
+            sys.path.insert(0, os.path.dirname(req["target"]))
+            runpy.run_path(req["target"], run_name="__main__")
+        else:
+            runpy.run_module(req["target"], run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            rc = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            rc = 1
+    except BaseException:
+        traceback.print_exc()
+        rc, recycle = 1, True
+    finally:
+        sys.argv, sys.path[:], sys.stdout, sys.stderr = argv, path, stdout, stderr
+        os.chdir(cwd)
+        for name in set(sys.modules) - before:
+            del sys.modules[name]
+    # threads the command left running would leak into the next one
+    if any(t.is_alive() and not t.daemon for t in set(threading.enumerate()) - threads):
+        recycle = True
+    return rc, recycle
+
+def _worker_main() -> int:
+    root = Path.cwd()
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    # private copies of the control pipes; the command gets /dev/null for stdin
+    ctl_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    ctl_out = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    null = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null, 0)
+    os.close(null)
+    sys.stdin = open(os.devnull, "r", encoding="utf-8")
+    write_lock = threading.Lock()
+
+    def emit(msg: Dict[str, Any]) -> None:
+        with write_lock:
+            ctl_out.write(json.dumps(msg) + "\n")
+            ctl_out.flush()
+
+    # fd 1/2 (and so anything the command or its children print) go through pipes we frame
+    marks = {}
+    for fd, stream in ((1, "stdout"), (2, "stderr")):
+        r, w = os.pipe()
+        os.dup2(w, fd)
+        os.close(w)
+        marks[fd] = threading.Event()
+        threading.Thread(target=_pump, args=(r, stream, emit, marks[fd]), daemon=True).start()
+
+    for name in filter(None, os.environ.get("LEB_WARM_PRELOAD", ",".join(PRELOAD)).split(",")):
+        try:
+            __import__(name)
+        except Exception:
+            pass                                # optional: the command imports it itself if needed
+    baseline = _project_mtimes(root)
+    emit({"ev": "ready", "pid": os.getpid()})
+
+    for line in ctl_in:
+        try:
+            req = json.loads(line)
+        except ValueError:
+            continue
+        if _project_mtimes(root) != baseline:
+            emit({"ev": "stale"})
+            return 0
+        rc, recycle = _execute(req)
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        for fd in (1, 2):
+            os.write(fd, (END_MARK + "\n").encode("utf-8"))
+        for ev in marks.values():
+            ev.wait(5)
+            ev.clear()
+        emit({"ev": "exit", "rc": rc, "recycle": recycle})
+        if recycle:
+            return 0
+    return 0
+
+if __name__ == "__main__" and sys.argv[1:] == ["--worker"]:
+    raise SystemExit(_worker_main())
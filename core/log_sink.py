@@ -0,0 +1,118 @@
+# core/log_sink.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Buffered run-log writer. Lines go into an in-memory ring (for live
+#   viewers) and a pending buffer that a background thread flushes to the
+#   log file every `flush_interval` seconds or once `flush_bytes` have
+#   piled up, through one file handle kept open for the run. Callers on the
+#   UI thread only append to lists; they never touch the disk.
+
+from __future__ import annotations
+import os
+import threading
+from collections import deque
+from typing import List, Tuple
+
+FLUSH_INTERVAL = 0.5        # seconds
+FLUSH_BYTES = 64 * 1024
+RING_LINES = 5000
+
+class LogSink:
+    """
+    sink = LogSink(path); sink.write(line) ...; sink.close()
+    Viewers poll sink.since(seq) -> (next_seq, new_lines, dropped) and keep
+    next_seq for the following call.
+    """
+    def __init__(self, path: str, *, flush_interval: float = FLUSH_INTERVAL,
+                 flush_bytes: int = FLUSH_BYTES, ring_lines: int = RING_LINES):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self._ring: deque = deque(maxlen=ring_lines)
+        self._seq = 0                          # sequence number of the next line
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._lock = threading.Lock()          # ring/pending; held only briefly
+        self._flush_lock = threading.Lock()    # one flush at a time, chunks in order
+        self._wake = threading.Event()
+        self._closed = False
+        self._fh = None
+        self.flushes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    # -- producer side --------------------------------------------------------
+    def write(self, text: str) -> None:
+        """Queue one or more lines (a trailing newline is optional)."""
+        if self._closed:
+            return
+        lines = text.splitlines() or [""]
+        with self._lock:
+            for ln in lines:
+                self._ring.append(ln)
+                self._pending.append(ln + "\n")
+                self._pending_bytes += len(ln) + 1
+            self._seq += len(lines)
+            full = self._pending_bytes >= self.flush_bytes
+        if full:
+            self._wake.set()
+
+    # -- viewer side ----------------------------------------------------------
+    def since(self, seq: int) -> Tuple[int, List[str], int]:
+        """Lines written since `seq` still in the ring, and how many fell out of it."""
+        with self._lock:
+            first = self._seq - len(self._ring)
+            start = max(seq, first)
+            lines = list(self._ring)[start - first:] if start < self._seq else []
+            return self._seq, lines, start - seq
+
+    def tail(self, n: int = 200) -> List[str]:
+        with self._lock:
+            return list(self._ring)[-n:]
+
+    # -- flushing -------------------------------------------------------------
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                chunk, self._pending, self._pending_bytes = self._pending, [], 0
+            if not chunk:
+                return
+            try:
+                if self._fh is None:
+                    self._fh = open(self.path, "a", encoding="utf-8")
+                self._fh.write("".join(chunk))
+                self._fh.flush()
+                self.flushes += 1
+            except OSError:
+                pass                               # logging must never break a run
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=2.0)
+        self.flush()
+        with self._flush_lock:
+            if self._fh is not None:
+                try:
+                    self._fh.close()
+                except OSError:
+                    pass
+                self._fh = None
+
+    def __enter__(self) -> "LogSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
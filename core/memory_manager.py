@@ -8,11 +8,12 @@ ROOT = Path(__file__).resolve().parents[1]
 MEMDIR = ROOT / "memory"
 RULES  = ROOT / "config" / "memory" / "include_rules.yaml"
 
+DEFAULT_RULES = {"include_last_n_days": 7, "max_records": 12, "max_chars": 2000, "dedupe_by_source": True}
+
 def _load_rules():
-    try:
-        return yaml.safe_load(RULES.read_text(encoding="utf-8")) or {}
-    except Exception:
-        return {"include_last_n_days": 7, "max_records": 12, "max_chars": 2000, "dedupe_by_source": True}
+    from core.config_store import get_store
+    rules = get_store().load(RULES)
+    return rules if isinstance(rules, dict) and rules else dict(DEFAULT_RULES)
 
 def _iter_summaries(days: int):
     if not MEMDIR.exists():
@@ -32,8 +33,35 @@ def _iter_summaries(days: int):
             keep.append(f)
     return keep
 
+_CTX_CACHE: dict = {}
+
+def _stamp(paths) -> tuple:
+    out = []
+    for p in paths:
+        try:
+            st = p.stat()
+            out.append((p.name, st.st_size, st.st_mtime_ns))
+        except OSError:
+            out.append((p.name, -1, 0))
+    return tuple(out)
+
 def build_context(max_snippets: int | None = None) -> str:
+    """
+    Memoized: the block is rebuilt only when the rules or the summary files
+    change, so repeated sends reuse a byte-identical (prompt-cacheable) prefix.
+    """
     rules = _load_rules()
+    days = int(rules.get("include_last_n_days", 7) or 7)
+    from core.config_store import get_store
+    key = (max_snippets, get_store().version(RULES), _stamp(_iter_summaries(days)))
+    hit = _CTX_CACHE.get("key")
+    if hit == key:
+        return _CTX_CACHE["block"]
+    block = _build_context(rules, max_snippets)
+    _CTX_CACHE.update(key=key, block=block)
+    return block
+
+def _build_context(rules: dict, max_snippets: int | None) -> str:
     days   = int(rules.get("include_last_n_days", 7) or 7)
     maxrec = int(rules.get("max_records", 12) or 12)
     maxch  = int(rules.get("max_chars", 2000) or 2000)
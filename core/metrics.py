@@ -0,0 +1,269 @@
+# core/metrics.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   In-process metrics registry for AI calls. Log-linear (HDR-style) histograms
+#   for latency and time-to-first-token, plus counters for calls, errors, tokens
+#   and cost, all labelled by provider/model. Percentiles come from a rolling
+#   window of time slots; Prometheus totals are cumulative. Exported through
+#   render_prometheus() (served at /metrics by server/app_registry) and a
+#   periodic JSON snapshot under data/insights.
+
+from __future__ import annotations
+import os
+import json
+import time
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+SNAPSHOT_PATH = ROOT / "data" / "insights" / "metrics_snapshot.json"
+SNAPSHOT_INTERVAL_SEC = 30.0
+
+SUB_BITS = 5                        # 32 sub-buckets per power of two -> ~3% relative error
+WINDOW_SLOTS = 12                   # rolling window = WINDOW_SLOTS * SLOT_SEC
+SLOT_SEC = 10.0
+LE_BOUNDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)   # Prometheus buckets (s)
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+Labels = Tuple[str, str]            # (provider, model)
+
+# --------------------------------------------------------------------------- #
+# Histogram
+# --------------------------------------------------------------------------- #
+def _bucket(us: int) -> int:
+    if us < (1 << SUB_BITS):
+        return max(us, 0)
+    shift = us.bit_length() - SUB_BITS
+    return (shift << (SUB_BITS - 1)) + (us >> shift)
+
+def _bucket_range(idx: int) -> Tuple[int, int]:
+    """Inclusive [lo, hi] microsecond range of a bucket index."""
+    if idx < (1 << SUB_BITS):
+        return idx, idx
+    half = 1 << (SUB_BITS - 1)
+    shift = (idx - half) // half
+    lo = (idx - (shift << (SUB_BITS - 1))) << shift
+    return lo, lo + (1 << shift) - 1
+
+class Histogram:
+    """Sparse log-linear histogram of durations (stored in microseconds)."""
+    __slots__ = ("counts", "n", "total_us", "max_us")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.n = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        us = int(max(seconds, 0.0) * 1e6)
+        idx = _bucket(us)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.n += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        for idx, c in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + c
+        self.n += other.n
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.n:
+            return None
+        rank = max(1, int(q * self.n + 0.5))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                lo, hi = _bucket_range(idx)
+                return min((lo + hi) / 2.0, self.max_us) / 1e6
+        return self.max_us / 1e6
+
+    def count_le(self, seconds: float) -> int:
+        limit = seconds * 1e6
+        return sum(c for idx, c in self.counts.items() if _bucket_range(idx)[1] <= limit)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"counts": {str(k): v for k, v in self.counts.items()},
+                "n": self.n, "total_us": self.total_us, "max_us": self.max_us}
+
+class _Rolling:
+    """Ring of per-slot histograms; merged on read for windowed percentiles."""
+    __slots__ = ("slots",)
+
+    def __init__(self):
+        self.slots: Deque[Tuple[int, Histogram]] = deque(maxlen=WINDOW_SLOTS)
+
+    def record(self, seconds: float, now: float) -> None:
+        slot = int(now // SLOT_SEC)
+        if not self.slots or self.slots[-1][0] != slot:
+            self.slots.append((slot, Histogram()))
+        self.slots[-1][1].record(seconds)
+
+    def window(self, now: float) -> Histogram:
+        oldest = int(now // SLOT_SEC) - WINDOW_SLOTS + 1
+        out = Histogram()
+        for slot, h in self.slots:
+            if slot >= oldest:
+                out.merge(h)
+        return out
+
+# --------------------------------------------------------------------------- #
+# Registry
+# --------------------------------------------------------------------------- #
+class _Series:
+    __slots__ = ("latency", "ttft", "latency_win", "ttft_win", "calls", "errors",
+                 "tokens_in", "tokens_out", "cost", "busy_sec", "last_error")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.ttft = Histogram()
+        self.latency_win = _Rolling()
+        self.ttft_win = _Rolling()
+        self.calls = self.errors = self.tokens_in = self.tokens_out = 0
+        self.cost = 0.0
+        self.busy_sec = 0.0
+        self.last_error: Optional[str] = None
+
+class MetricsRegistry:
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._series: Dict[Labels, _Series] = {}
+        self._lock = threading.Lock()
+        self._snapshotter: Optional[threading.Thread] = None
+
+    def observe_call(self, provider: str, model: str, latency_s: float, *,
+                     ttft_s: float | None = None, tokens_in: int = 0, tokens_out: int = 0,
+                     cost: float = 0.0, ok: bool = True, error: str | None = None) -> None:
+        now = self._clock()
+        with self._lock:
+            s = self._series.setdefault((provider, model), _Series())
+            s.calls += 1
+            s.latency.record(latency_s)
+            s.latency_win.record(latency_s, now)
+            if ttft_s is not None:
+                s.ttft.record(ttft_s)
+                s.ttft_win.record(ttft_s, now)
+            if ok:
+                s.tokens_in += int(tokens_in or 0)
+                s.tokens_out += int(tokens_out or 0)
+                s.cost += float(cost or 0.0)
+                s.busy_sec += max(latency_s, 0.0)
+            else:
+                s.errors += 1
+                s.last_error = (error or "error")[:200]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    # -- export -------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """Rolling-window percentiles plus cumulative counters, per provider/model."""
+        now = self._clock()
+        out: Dict[str, Any] = {}
+        with self._lock:
+            for (p, m), s in sorted(self._series.items()):
+                win = s.latency_win.window(now)
+                twin = s.ttft_win.window(now)
+                out[f"{p}/{m}"] = {
+                    "provider": p, "model": m,
+                    "calls": s.calls, "errors": s.errors,
+                    "error_rate": round(s.errors / s.calls, 4) if s.calls else 0.0,
+                    "tokens_in": s.tokens_in, "tokens_out": s.tokens_out,
+                    "cost_usd": round(s.cost, 8),
+                    "tokens_per_sec": round(s.tokens_out / s.busy_sec, 2) if s.busy_sec else None,
+                    "window_sec": WINDOW_SLOTS * SLOT_SEC,
+                    "window_calls": win.n,
+                    "latency_s": {f"p{int(q * 100)}": win.quantile(q) for q in QUANTILES},
+                    "latency_max_s": win.max_us / 1e6 if win.n else None,
+                    "ttft_s": {f"p{int(q * 100)}": twin.quantile(q) for q in QUANTILES} if twin.n else None,
+                    "last_error": s.last_error,
+                }
+        return {"ts": now, "pid": os.getpid(), "series": out}
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def lbl(p: str, m: str, extra: str = "") -> str:
+            base = 'provider="%s",model="%s"' % (p.replace('"', ""), m.replace('"', ""))
+            return "{" + base + (("," + extra) if extra else "") + "}"
+
+        with self._lock:
+            items = sorted(self._series.items())
+            for metric, kind, help_ in (
+                ("pa_ai_calls_total", "counter", "AI calls"),
+                ("pa_ai_errors_total", "counter", "Failed AI calls"),
+                ("pa_ai_tokens_in_total", "counter", "Prompt tokens"),
+                ("pa_ai_tokens_out_total", "counter", "Completion tokens"),
+                ("pa_ai_cost_usd_total", "counter", "Estimated spend (USD)"),
+            ):
+                lines += [f"# HELP {metric} {help_}", f"# TYPE {metric} {kind}"]
+                attr = metric[len("pa_ai_"):-len("_total")].replace("cost_usd", "cost")
+                for (p, m), s in items:
+                    lines.append(f"{metric}{lbl(p, m)} {getattr(s, attr)}")
+            for metric, attr, help_ in (("pa_ai_latency_seconds", "latency", "End-to-end call latency"),
+                                        ("pa_ai_ttft_seconds", "ttft", "Time to first token")):
+                lines += [f"# HELP {metric} {help_}", f"# TYPE {metric} histogram"]
+                for (p, m), s in items:
+                    h: Histogram = getattr(s, attr)
+                    if not h.n:
+                        continue
+                    for le in LE_BOUNDS:
+                        lines.append("%s_bucket%s %d" % (metric, lbl(p, m, 'le="%s"' % le), h.count_le(le)))
+                    lines.append("%s_bucket%s %d" % (metric, lbl(p, m, 'le="+Inf"'), h.n))
+                    lines.append(f"{metric}_sum{lbl(p, m)} {h.total_us / 1e6:.6f}")
+                    lines.append(f"{metric}_count{lbl(p, m)} {h.n}")
+        snap = self.snapshot()["series"]
+        lines += ["# HELP pa_ai_latency_window_seconds Rolling-window latency quantiles",
+                  "# TYPE pa_ai_latency_window_seconds gauge"]
+        for rec in snap.values():
+            for q in QUANTILES:
+                v = rec["latency_s"][f"p{int(q * 100)}"]
+                if v is not None:
+                    lines.append("pa_ai_latency_window_seconds%s %.6f"
+                                 % (lbl(rec["provider"], rec["model"], 'quantile="%s"' % q), v))
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: Path = SNAPSHOT_PATH) -> Path:
+        from core.fileutil import atomic_write_text
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(str(path), json.dumps(self.snapshot(), indent=2))
+        return path
+
+    def start_snapshotter(self, interval: float = SNAPSHOT_INTERVAL_SEC, path: Path = SNAPSHOT_PATH) -> None:
+        """Daemon thread writing the snapshot file every `interval` seconds (idempotent)."""
+        with self._lock:
+            if self._snapshotter is not None:
+                return
+
+            def loop():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        if self._series:
+                            self.write_snapshot(path)
+                    except Exception:
+                        pass
+
+            self._snapshotter = threading.Thread(target=loop, name="metrics-snapshot", daemon=True)
+            self._snapshotter.start()
+
+REGISTRY = MetricsRegistry()
+
+def observe_call(provider: str, model: str, latency_s: float, **kw) -> None:
+    """Record into the process registry; starts the snapshot writer on first use
+    unless PA_METRICS_SNAPSHOT=0."""
+    REGISTRY.observe_call(provider, model, latency_s, **kw)
+    if REGISTRY._snapshotter is None and os.environ.get("PA_METRICS_SNAPSHOT", "1") != "0":
+        REGISTRY.start_snapshotter()
@@ -0,0 +1,246 @@
+# core/model_router.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Cost- and latency-aware model selection for AIClient.auto(). Candidates come
+#   from the compiled catalogue (core.catalogue) and are filtered by required
+#   capability scores, context window (prompt + output tokens vs max_tokens) and
+#   probe health. They are then ranked by estimated cost and observed latency.
+#   A rolling window of real outcomes per model (latency, cost, errors) feeds
+#   the ranking, so failing or slow models drift down automatically. Wins from
+#   AIClient.race() are kept (data/insights/race_history.jsonl) and give models
+#   that usually answer first a bonus when latency matters.
+
+from __future__ import annotations
+import json
+import math
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+RACE_LOG = ROOT / "data" / "insights" / "race_history.jsonl"
+RACE_HISTORY = 500          # races replayed from the log at startup
+RACE_BONUS = 0.5            # score multiplier reduction at a 100% win share (weighted by latency preference)
+
+# Fallbacks when nothing has been observed yet
+DEFAULT_LATENCY_S = 2.5
+UNPRICED_PENALTY = 4.0      # unpriced models rank as if this many times the cheapest
+ERROR_PENALTY = 6.0         # score multiplier at 100% recent error rate
+WINDOW = 50                 # outcomes kept per model
+
+PREFER_WEIGHTS = {
+    "cost":     (0.8, 0.2),
+    "latency":  (0.2, 0.8),
+    "balanced": (0.5, 0.5),
+}
+
+CHAT_INTERFACES = {"chat", None, ""}    # what AIClient.send can drive
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars/token); good enough for routing."""
+    return max(1, math.ceil(len(text or "") / 4))
+
+@dataclass
+class RouteRequest:
+    """
+    What a call needs.
+
+    capabilities: minimum scores, e.g. {"coding": 3, "long_context": 2};
+                  a list of names means "score >= 1". 'multimodal' is boolean.
+    """
+    prompt_tokens: int
+    max_output_tokens: int = 512
+    capabilities: Dict[str, Any] = field(default_factory=dict)
+    providers: Optional[Iterable[str]] = None
+    prefer: str = "balanced"
+    max_cost: Optional[float] = None    # USD per call upper bound
+
+@dataclass
+class Candidate:
+    provider: str
+    model: str
+    est_cost: Optional[float]
+    est_latency: float
+    error_rate: float
+    score: float = 0.0
+
+class _Window:
+    """Rolling outcomes for one model."""
+    __slots__ = ("lat", "cost", "ok")
+    def __init__(self, n: int):
+        self.lat: Deque[float] = deque(maxlen=n)
+        self.cost: Deque[float] = deque(maxlen=n)
+        self.ok: Deque[bool] = deque(maxlen=n)
+
+    def p95(self) -> Optional[float]:
+        if not self.lat:
+            return None
+        s = sorted(self.lat)
+        return s[min(len(s) - 1, int(math.ceil(0.95 * len(s))) - 1)]
+
+    def error_rate(self) -> float:
+        return (1.0 - sum(self.ok) / len(self.ok)) if self.ok else 0.0
+
+class ModelRouter:
+    """Ranks catalogue models for a RouteRequest; learns from record()."""
+    def __init__(self, catalogue=None, window: int = WINDOW, race_log: Path | None = None):
+        self._catalogue = catalogue
+        self._window = window
+        self._stats: Dict[Tuple[str, str], _Window] = {}
+        self._lock = threading.Lock()
+        self._races: Dict[Tuple[str, str], List[int]] = {}     # key -> [entered, won]
+        self._race_log = race_log
+        if race_log is not None:
+            self._replay_races(race_log)
+
+    @property
+    def catalogue(self):
+        if self._catalogue is not None:
+            return self._catalogue
+        from core.catalogue import get_catalogue
+        return get_catalogue()
+
+    # -- observations ----------------------------------------------------
+    def record(self, provider: str, model: str, latency_s: float, cost: float = 0.0, ok: bool = True) -> None:
+        with self._lock:
+            w = self._stats.setdefault((provider, model), _Window(self._window))
+            if ok:
+                w.lat.append(float(latency_s))
+                w.cost.append(float(cost or 0.0))
+            w.ok.append(bool(ok))
+
+    def record_race(self, winner: Tuple[str, str] | None, contenders: Iterable[Tuple[str, str]],
+                    latency_s: float | None = None) -> None:
+        contenders = [tuple(c) for c in contenders]
+        with self._lock:
+            for c in contenders:
+                e = self._races.setdefault(c, [0, 0])
+                e[0] += 1
+                if winner is not None and c == tuple(winner):
+                    e[1] += 1
+        if self._race_log is not None:
+            try:
+                self._race_log.parent.mkdir(parents=True, exist_ok=True)
+                with open(self._race_log, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"ts": time.time(), "winner": "/".join(winner) if winner else None,
+                                        "contenders": ["/".join(c) for c in contenders],
+                                        "latency_s": latency_s}) + "\n")
+            except OSError:
+                pass
+
+    def _replay_races(self, path: Path) -> None:
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()[-RACE_HISTORY:]
+        except OSError:
+            return
+        for ln in lines:
+            try:
+                r = json.loads(ln)
+            except ValueError:
+                continue
+            for c in r.get("contenders") or []:
+                e = self._races.setdefault(tuple(c.split("/", 1)), [0, 0])
+                e[0] += 1
+                if c == r.get("winner"):
+                    e[1] += 1
+
+    def win_share(self, provider: str, model: str) -> float:
+        with self._lock:
+            entered, won = self._races.get((provider, model), (0, 0))
+        return won / entered if entered else 0.0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {f"{p}/{m}": {"n": len(w.ok), "p95_s": w.p95(), "error_rate": round(w.error_rate(), 3)}
+                    for (p, m), w in self._stats.items()}
+
+    # -- filtering --------------------------------------------------------
+    @staticmethod
+    def _meets(rec: Dict[str, Any], caps: Dict[str, Any]) -> bool:
+        have = rec.get("capabilities") if isinstance(rec.get("capabilities"), dict) else {}
+        for name, need in caps.items():
+            got = have.get(name)
+            if isinstance(need, bool):
+                if bool(got) != need:
+                    return False
+            elif (got or 0) < need:
+                return False
+        return True
+
+    @staticmethod
+    def _healthy(rec: Dict[str, Any]) -> bool:
+        h = rec.get("health") or {}
+        if not h:
+            return True                     # never probed: allowed
+        return bool(h.get("probe_ok")) or h.get("category") in ("not_probed", "endpoint_mismatch")
+
+    def candidates(self, req: RouteRequest) -> List[Candidate]:
+        caps = dict.fromkeys(req.capabilities, 1) if isinstance(req.capabilities, (list, tuple, set)) \
+            else dict(req.capabilities or {})
+        allowed = {p.lower() for p in req.providers} if req.providers is not None else None
+        need_ctx = req.prompt_tokens + req.max_output_tokens
+        out: List[Candidate] = []
+        for rec in self.catalogue.models():
+            p, m = rec["provider"], rec["model"]
+            if allowed is not None and p not in allowed:
+                continue
+            if rec.get("interface") not in CHAT_INTERFACES:
+                continue
+            if "chat" not in (rec.get("tags") or []) and not rec.get("default"):
+                continue
+            if not self._meets(rec, caps) or not self._healthy(rec):
+                continue
+            max_ctx = rec.get("max_tokens")
+            if max_ctx and need_ctx > int(max_ctx):
+                continue
+            pr = rec.get("pricing") or {}
+            est_cost = None
+            if pr.get("in") is not None and pr.get("out") is not None:
+                est_cost = req.prompt_tokens * float(pr["in"]) + req.max_output_tokens * float(pr["out"])
+                if req.max_cost is not None and est_cost > req.max_cost:
+                    continue
+            with self._lock:
+                w = self._stats.get((p, m))
+                p95 = w.p95() if w else None
+                err = w.error_rate() if w else 0.0
+            if p95 is None:
+                lat_ms = (rec.get("health") or {}).get("latency_ms")
+                p95 = float(lat_ms) / 1000.0 if lat_ms else DEFAULT_LATENCY_S
+            out.append(Candidate(p, m, est_cost, p95, err))
+        return out
+
+    # -- ranking ----------------------------------------------------------
+    def rank(self, req: RouteRequest) -> List[Candidate]:
+        """Candidates best-first. Scores are relative to the cheapest/fastest candidate."""
+        cands = self.candidates(req)
+        if not cands:
+            return []
+        w_cost, w_lat = PREFER_WEIGHTS.get(req.prefer, PREFER_WEIGHTS["balanced"])
+        priced = [c.est_cost for c in cands if c.est_cost is not None]
+        min_cost = max(min(priced), 1e-12) if priced else None
+        min_lat = max(min(c.est_latency for c in cands), 1e-3)
+        for c in cands:
+            cost_rel = (c.est_cost / min_cost) if (c.est_cost is not None and min_cost) else UNPRICED_PENALTY
+            lat_rel = c.est_latency / min_lat
+            c.score = (w_cost * cost_rel + w_lat * lat_rel) * (1.0 + ERROR_PENALTY * c.error_rate)
+            c.score *= 1.0 - RACE_BONUS * w_lat * self.win_share(c.provider, c.model)
+        cands.sort(key=lambda c: (c.score, c.provider, c.model))
+        return cands
+
+_default_router: Optional[ModelRouter] = None
+_default_lock = threading.Lock()
+
+def get_router() -> ModelRouter:
+    """Process-wide router so observations accumulate across AIClient.auto() calls."""
+    global _default_router
+    if _default_router is None:
+        with _default_lock:
+            if _default_router is None:
+                _default_router = ModelRouter(race_log=RACE_LOG)
+    return _default_router
@@ -0,0 +1,167 @@
+# core/plan_index.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Cached, keyed index of the project plan (phases -> steps -> items) for
+#   the plan views. The YAML is re-parsed only when the file's stat changes,
+#   and reload() returns a PlanDiff (changed nodes + per-parent child
+#   insert/remove ops) so views update rows in place instead of rebuilding.
+
+from __future__ import annotations
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+ROOT_KEY = ""
+FIELDS = ("title", "status", "id", "detail")
+
+@dataclass
+class PlanNode:
+    key: str
+    kind: str                     # root | phase | step | item
+    title: str = ""
+    status: str = ""
+    id: str = ""
+    detail: str = ""
+    parent: Optional[str] = None
+    children: List[str] = field(default_factory=list)
+
+    def same(self, other: "PlanNode") -> bool:
+        return all(getattr(self, f) == getattr(other, f) for f in FIELDS)
+
+@dataclass
+class ChildDiff:
+    """
+    How one parent's child list moved from old to new. Apply `removed` rows
+    (descending) then `inserted` (row, key) pairs (ascending). `reset` means
+    the surviving children were reordered: replace the whole list.
+    """
+    parent: str
+    removed: List[int] = field(default_factory=list)
+    inserted: List[Tuple[int, str]] = field(default_factory=list)
+    reset: bool = False
+
+@dataclass
+class PlanDiff:
+    changed: List[str] = field(default_factory=list)
+    children: List[ChildDiff] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.children)
+
+def _s(v: Any) -> str:
+    return "" if v is None else str(v)
+
+def build_nodes(doc: Dict[str, Any]) -> Dict[str, PlanNode]:
+    """Flatten a plan document into {key: PlanNode}; keys are stable across edits."""
+    nodes: Dict[str, PlanNode] = {ROOT_KEY: PlanNode(ROOT_KEY, "root")}
+
+    def add(node: PlanNode) -> str:
+        key, n = node.key, 2
+        while key in nodes:                      # duplicate ids/names stay distinct
+            key = f"{node.key}#{n}"
+            n += 1
+        node.key = key
+        nodes[key] = node
+        nodes[node.parent].children.append(key)
+        return key
+
+    for pi, ph in enumerate((doc or {}).get("phases") or []):
+        if not isinstance(ph, dict):
+            continue
+        name = _s(ph.get("name")) or f"Phase {pi}"
+        pkey = add(PlanNode(f"phase:{name}", "phase", title=name, status=_s(ph.get("status")),
+                            detail=_s(ph.get("description")), parent=ROOT_KEY))
+        for si, st in enumerate(ph.get("steps") or []):
+            if not isinstance(st, dict):
+                continue
+            sid = _s(st.get("id"))
+            skey = add(PlanNode(f"step:{sid}" if sid else f"{pkey}/step:{si}", "step",
+                                title=_s(st.get("description")) or f"Step {sid}", status=_s(st.get("status")),
+                                id=sid, detail=_s(st.get("notes")), parent=pkey))
+            for ii, it in enumerate(st.get("items") or []):
+                if isinstance(it, dict):
+                    title, status = _s(it.get("title")), _s(it.get("status"))
+                else:
+                    title, status = _s(it), ""
+                add(PlanNode(f"{skey}/item:{ii}", "item", title=title, status=status, parent=skey))
+    return nodes
+
+def diff_children(parent: str, old: List[str], new: List[str]) -> Optional[ChildDiff]:
+    if old == new:
+        return None
+    old_set, new_set = set(old), set(new)
+    if [k for k in old if k in new_set] != [k for k in new if k in old_set]:
+        return ChildDiff(parent, reset=True)
+    return ChildDiff(parent,
+                     removed=[i for i in range(len(old) - 1, -1, -1) if old[i] not in new_set],
+                     inserted=[(i, k) for i, k in enumerate(new) if k not in old_set])
+
+def diff_nodes(old: Dict[str, PlanNode], new: Dict[str, PlanNode]) -> PlanDiff:
+    d = PlanDiff()
+    for key, n in new.items():
+        o = old.get(key)
+        if o is None:
+            continue
+        if not n.same(o):
+            d.changed.append(key)
+        cd = diff_children(key, o.children, n.children)
+        if cd:
+            d.children.append(cd)
+    return d
+
+class PlanIndex:
+    """
+    index = PlanIndex(path); index.reload() -> PlanDiff (empty when nothing
+    changed). Nodes are read via index.node(key) / index.children(key).
+    """
+    def __init__(self, path):
+        self.path = str(path)
+        self.nodes: Dict[str, PlanNode] = {ROOT_KEY: PlanNode(ROOT_KEY, "root")}
+        self.doc: Dict[str, Any] = {}
+        self.error: str = ""
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def stale(self) -> bool:
+        return self._stat() != self._stamp
+
+    def reload(self, force: bool = False) -> PlanDiff:
+        stamp = self._stat()
+        if not force and stamp == self._stamp:
+            return PlanDiff()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                doc = yaml.load(f, Loader=_YAML_LOADER) or {}
+            self.error = ""
+        except (OSError, yaml.YAMLError) as e:
+            # keep showing the last good plan; a half-written file will be retried
+            self.error = str(e)
+            return PlanDiff()
+        self._stamp = stamp
+        new = build_nodes(doc if isinstance(doc, dict) else {})
+        d = diff_nodes(self.nodes, new)
+        self.nodes, self.doc = new, doc
+        return d
+
+    def node(self, key: str) -> Optional[PlanNode]:
+        return self.nodes.get(key)
+
+    def children(self, key: str = ROOT_KEY) -> List[str]:
+        n = self.nodes.get(key)
+        return n.children if n else []
+
+    def find(self, step_id: str) -> Optional[PlanNode]:
+        return self.nodes.get(f"step:{step_id}")
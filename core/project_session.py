@@ -12,6 +12,8 @@ import os
 import yaml
 from typing import Dict, Any
 
+from core.session_store import Field, get_session_store
+
 SESSION_PATH = os.path.join("config", "session.yaml")
 
 DEFAULTS = {
@@ -49,10 +51,18 @@ def load_session() -> Dict[str, Any] | None:
         data["plan_path"] = candidate
     return data
 
+SESSION_SCHEMA = {
+    "project_name": Field(str),
+    "project_root": Field(str),
+    "plan_path": Field(str),
+    "project_config_path": Field(str),
+}
+
 def save_session(session: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(SESSION_PATH), exist_ok=True)
-    with open(SESSION_PATH, "w", encoding="utf-8") as f:
-        yaml.dump(session, f, allow_unicode=True, sort_keys=False)
+    """Persist now, atomically (temp file + os.replace); a crash never leaves a torn session.yaml."""
+    store = get_session_store(SESSION_PATH, schema=SESSION_SCHEMA)
+    store.replace(session)
+    store.flush(force=True)
 
 def make_default_session() -> Dict[str, Any]:
     sess = dict(DEFAULTS)
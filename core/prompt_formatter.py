@@ -9,10 +9,9 @@ MEMDIR = ROOT / "memory"
 RULES  = ROOT / "config" / "memory" / "include_rules.yaml"
 
 def _load_rules():
-    try:
-        return yaml.safe_load(RULES.read_text(encoding="utf-8")) or {}
-    except Exception:
-        return {}
+    from core.config_store import get_store
+    rules = get_store().load(RULES, {})
+    return rules if isinstance(rules, dict) else {}
 
 def _iter_summaries(from_days: int):
     if not MEMDIR.exists(): return []
@@ -0,0 +1,92 @@
+# core/providers/__init__.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Provider adapter registry for core.ai_client. Each provider is a plugin
+#   module (core/providers/<name>_adapter.py) that the registry imports the
+#   first time the provider is used, and the adapter imports its SDK only
+#   when a client is made. Importing core.ai_client (or anything that only
+#   needs COSTS) never loads openai / anthropic / google.generativeai / groq.
+#
+#   An adapter module provides:
+#     make_client(key, model, base_url) -> SDK client, or None if the SDK is missing
+#     dispatch(client, model, prompt, prefix, history, usage, on_delta=None, cancel=None) -> reply
+#       prefix: stable system/memory texts; usage: dict to fill (in/out/cache_read/cache_write)
+#   and can use drain() for streams and count_tokens() when a response has no usage.
+
+from __future__ import annotations
+import importlib
+import logging
+import threading
+from types import ModuleType
+from typing import Dict, List, Optional
+
+ADAPTERS: Dict[str, str] = {
+    "openai": "core.providers.openai_adapter",
+    "anthropic": "core.providers.anthropic_adapter",
+    "groq": "core.providers.groq_adapter",
+    "google": "core.providers.google_adapter",
+    # deepseek: priced in COSTS but not wired to an SDK yet
+}
+
+_loaded: Dict[str, Optional[ModuleType]] = {}
+_lock = threading.Lock()
+
+class RequestCancelled(Exception):
+    """Raised from a streaming send() when its cancel callback returns True."""
+
+def register(provider: str, module: str) -> None:
+    """Add or replace a provider plugin (dotted module path)."""
+    with _lock:
+        ADAPTERS[provider.lower()] = module
+        _loaded.pop(provider.lower(), None)
+
+def get_adapter(provider: str) -> Optional[ModuleType]:
+    """The provider's adapter module, imported on first use; None if unknown or broken."""
+    provider = (provider or "").lower()
+    mod = _loaded.get(provider)
+    if mod is not None or provider in _loaded:
+        return mod
+    with _lock:
+        if provider not in _loaded:
+            path = ADAPTERS.get(provider)
+            try:
+                _loaded[provider] = importlib.import_module(path) if path else None
+            except Exception as e:
+                logging.warning("provider adapter %s unavailable: %s", path, e)
+                _loaded[provider] = None
+        return _loaded[provider]
+
+def loaded() -> List[str]:
+    """Providers whose adapters have been imported so far."""
+    return sorted(p for p, m in _loaded.items() if m is not None)
+
+def drain(stream, pick, on_delta, cancel) -> str:
+    """Consume a provider stream: pick(event) -> text or None, forwarded to on_delta."""
+    parts = []
+    try:
+        for ev in stream:
+            if cancel is not None and cancel():
+                raise RequestCancelled("request cancelled")
+            text = pick(ev)
+            if text:
+                parts.append(text)
+                on_delta(text)
+    finally:
+        close = getattr(stream, "close", None)
+        if callable(close):
+            try:
+                close()                         # drop the HTTP connection on cancel/error
+            except Exception:
+                pass
+    return "".join(parts)
+
+def count_tokens(text: str, provider: str, model: str) -> int:
+    """Token estimate from the cost engine's calibrated counter, else ~4 chars per token."""
+    try:
+        from core.cost_engine import get_engine
+        return get_engine().tokens.count(text, provider, model)
+    except Exception:
+        return max(1, len(text or "") // 4)
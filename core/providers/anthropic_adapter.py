@@ -0,0 +1,50 @@
+# core/providers/anthropic_adapter.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Anthropic adapter (imported by core.providers on first use). The stable
+#   prefix goes in system blocks marked cache_control: ephemeral.
+
+from __future__ import annotations
+
+from core.providers import drain
+
+def make_client(key, model, base_url=None):
+    try:
+        import anthropic
+    except Exception:
+        return None                     # SDK not installed
+    return anthropic.Anthropic(api_key=key, **({"base_url": base_url} if base_url else {}))
+
+def dispatch(client, model, prompt, prefix, history, usage, on_delta=None, cancel=None):
+    kwargs = {}
+    if prefix:
+        kwargs["system"] = [{"type":"text","text": t, "cache_control": {"type":"ephemeral"}} for t in prefix]
+    messages = list(history) + [{"role":"user","content": prompt}]
+    if on_delta is not None:
+        resp = client.messages.create(model=model, max_tokens=512, messages=messages, stream=True, **kwargs)
+        u, out = None, 0
+
+        def pick(ev):
+            nonlocal u, out
+            kind = getattr(ev, "type", "")
+            if kind == "message_start":
+                u = ev.message.usage
+            elif kind == "message_delta":
+                out = getattr(getattr(ev, "usage", None), "output_tokens", 0) or out
+            elif kind == "content_block_delta":
+                return getattr(ev.delta, "text", None)
+            return None
+        reply = drain(resp, pick, on_delta, cancel)
+    else:
+        resp = client.messages.create(model=model, max_tokens=512, messages=messages, **kwargs)
+        reply = resp.content[0].text if getattr(resp,"content",None) else ""
+        u = resp.usage
+        out = getattr(u,"output_tokens",0) or 0
+    usage["cache_read"] = getattr(u,"cache_read_input_tokens",0) or 0
+    usage["cache_write"] = getattr(u,"cache_creation_input_tokens",0) or 0
+    usage["in"] = (getattr(u,"input_tokens",0) or 0) + usage["cache_read"] + usage["cache_write"]
+    usage["out"] = out
+    return reply
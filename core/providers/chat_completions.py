@@ -0,0 +1,36 @@
+# core/providers/chat_completions.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   dispatch() shared by the OpenAI-style chat.completions adapters (openai,
+#   groq). No SDK import here; the adapters bring their own client.
+
+from __future__ import annotations
+
+from core.providers import drain
+
+def dispatch(client, model, prompt, prefix, history, usage, on_delta=None, cancel=None, *, provider="openai"):
+    # stable prefix as a leading system message: automatic prefix caching
+    messages = ([{"role":"system","content": "\n\n".join(prefix)}] if prefix else []) + \
+               list(history) + [{"role":"user","content": prompt}]
+    if on_delta is not None:
+        kw = {"stream_options": {"include_usage": True}} if provider == "openai" else {}
+        resp = client.chat.completions.create(model=model, messages=messages, stream=True, **kw)
+        u = None
+
+        def pick(chunk):
+            nonlocal u
+            u = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None) or u
+            return chunk.choices[0].delta.content if getattr(chunk, "choices", None) else None
+        reply = drain(resp, pick, on_delta, cancel)
+    else:
+        resp = client.chat.completions.create(model=model, messages=messages)
+        reply = resp.choices[0].message.content
+        u = resp.usage
+    details = getattr(u, "prompt_tokens_details", None)
+    usage["in"] = getattr(u,"prompt_tokens",0) or 0
+    usage["out"] = getattr(u,"completion_tokens",0) or 0
+    usage["cache_read"] = getattr(details, "cached_tokens", 0) or 0
+    return reply
@@ -0,0 +1,41 @@
+# core/providers/google_adapter.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Google Gemini adapter (imported by core.providers on first use). Prefix,
+#   history and prompt are flattened into one text; token counts fall back
+#   to the cost engine's estimate when the response carries no usage.
+
+from __future__ import annotations
+
+from core.providers import count_tokens, drain
+
+def make_client(key, model, base_url=None):
+    try:
+        import google.generativeai as genai
+    except Exception:
+        return None                     # SDK not installed
+    genai.configure(api_key=key)
+    return genai.GenerativeModel(model)
+
+def dispatch(client, model, prompt, prefix, history, usage, on_delta=None, cancel=None):
+    turns = [f"{m['role'].capitalize()}: {m['content']}" for m in history]
+    final_prompt = "\n\n".join(list(prefix) + turns + [f"=== Prompt ===\n{prompt}" if (prefix or turns) else prompt])
+    if on_delta is not None:
+        u = None
+
+        def pick(chunk):
+            nonlocal u
+            u = getattr(chunk, "usage_metadata", None) or u
+            return getattr(chunk, "text", None)
+        reply = drain(client.generate_content(final_prompt, stream=True), pick, on_delta, cancel)
+    else:
+        resp = client.generate_content(final_prompt)
+        reply = getattr(resp,"text","")
+        u = getattr(resp, "usage_metadata", None)
+    usage["in"] = getattr(u, "prompt_token_count", 0) or count_tokens(final_prompt, "google", model)
+    usage["out"] = getattr(u, "candidates_token_count", 0) or count_tokens(reply or "", "google", model)
+    usage["cache_read"] = getattr(u, "cached_content_token_count", 0) or 0
+    return reply
@@ -0,0 +1,23 @@
+# core/providers/groq_adapter.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Groq adapter (imported by core.providers on first use). Groq speaks the
+#   OpenAI chat.completions shape; usage arrives on x_groq when streaming.
+
+from __future__ import annotations
+
+from core.providers import chat_completions
+
+def make_client(key, model, base_url=None):
+    try:
+        import groq
+    except Exception:
+        return None                     # SDK not installed
+    return groq.Groq(api_key=key, **({"base_url": base_url} if base_url else {}))
+
+def dispatch(client, model, prompt, prefix, history, usage, on_delta=None, cancel=None):
+    return chat_completions.dispatch(client, model, prompt, prefix, history, usage, on_delta, cancel,
+                                     provider="groq")
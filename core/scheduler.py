@@ -0,0 +1,292 @@
+# core/scheduler.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Shared call scheduler for provider requests: per provider/model token
+#   buckets (requests and tokens per minute, adaptively lowered on 429 and
+#   recovered on success), retry with full-jitter exponential backoff that
+#   honours Retry-After, and a circuit breaker per endpoint. Limits come from
+#   config/rate_limits.yaml. Used by AIClient.send and tools/probe_models.py.
+
+from __future__ import annotations
+import re
+import time
+import random
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.providers import RequestCancelled
+
+ROOT = Path(__file__).resolve().parents[1]
+CONFIG_PATH = ROOT / "config" / "rate_limits.yaml"
+
+DEFAULTS: Dict[str, Any] = {
+    "rpm": 60, "tpm": 0, "burst_sec": 10, "max_retries": 4,
+    "base_delay": 0.5, "max_delay": 30.0,
+    "breaker": {"failures": 5, "cooldown_sec": 30.0},
+}
+ADAPT_DOWN = 0.7        # rate multiplier on 429
+ADAPT_UP = 0.05         # fraction of configured rate regained per success
+ADAPT_FLOOR = 0.1       # never below this fraction of configured rate
+
+log = logging.getLogger("scheduler")
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while an endpoint's breaker is open."""
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"circuit open for {key}; retry in {retry_in:.1f}s")
+        self.key = key
+        self.retry_in = retry_in
+
+# --------------------------------------------------------------------------- #
+# Error classification
+# --------------------------------------------------------------------------- #
+_STATUS_RE = re.compile(r"\b(429|5\d\d)\b")
+_RETRY_AFTER_RE = re.compile(r"retry[- _]after[\"':\s]*([0-9.]+)", re.I)
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "status", "http_status", "code"):
+        v = getattr(exc, attr, None)
+        if isinstance(v, int) and 100 <= v < 600:
+            return v
+    resp = getattr(exc, "response", None)
+    v = getattr(resp, "status_code", None) or getattr(resp, "status", None)
+    return v if isinstance(v, int) else None
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header/attribute/message, if present."""
+    v = getattr(exc, "retry_after", None)
+    if v is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        try:
+            v = headers.get("retry-after") or headers.get("Retry-After")
+        except Exception:
+            v = None
+    if v is None:
+        m = _RETRY_AFTER_RE.search(str(exc))
+        v = m.group(1) if m else None
+    try:
+        return max(0.0, float(v)) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def classify(exc: BaseException) -> Tuple[bool, bool]:
+    """(retryable, rate_limited) for an exception from a provider SDK."""
+    if isinstance(exc, CircuitOpenError):
+        return False, False
+    status = _status_of(exc)
+    txt = f"{type(exc).__name__}: {exc}".lower()
+    if status is None:
+        m = _STATUS_RE.search(txt)
+        status = int(m.group(1)) if m else None
+    if status == 429 or "rate limit" in txt or "ratelimit" in txt or "overloaded" in txt:
+        return True, True
+    if status is not None:
+        return status >= 500 or status == 408, False
+    if isinstance(exc, (TimeoutError, ConnectionError)) or any(
+            k in txt for k in ("timeout", "timed out", "connection", "temporarily unavailable")):
+        return True, False
+    return False, False
+
+# --------------------------------------------------------------------------- #
+# Primitives
+# --------------------------------------------------------------------------- #
+class TokenBucket:
+    """Refills at `per_min`/60 per second up to `burst_sec` worth; rate adapts on 429."""
+    def __init__(self, per_min: float, burst_sec: float = 10.0, clock=time.monotonic):
+        self.configured = float(per_min)
+        self.rate = float(per_min)
+        self.burst_sec = burst_sec
+        self._clock = clock
+        self.tokens = self.capacity
+        self._t = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> float:
+        return max(1.0, self.rate * self.burst_sec / 60.0)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._t) * self.rate / 60.0)
+        self._t = now
+
+    def reserve(self, n: float = 1.0) -> float:
+        """Take n tokens (going into debt if needed); returns seconds to wait before using them."""
+        if self.configured <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            n = min(n, self.capacity)
+            self.tokens -= n
+            return 0.0 if self.tokens >= 0 else -self.tokens * 60.0 / self.rate
+
+    def throttle(self) -> None:
+        with self._lock:
+            self.rate = max(self.configured * ADAPT_FLOOR, self.rate * ADAPT_DOWN)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def recover(self) -> None:
+        with self._lock:
+            if self.rate < self.configured:
+                self.rate = min(self.configured, self.rate + self.configured * ADAPT_UP)
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half-open (one trial) after cooldown."""
+    def __init__(self, failures: int = 5, cooldown_sec: float = 30.0, clock=time.monotonic):
+        self.threshold = max(1, int(failures))
+        self.cooldown = float(cooldown_sec)
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._clock() - self.opened_at >= self.cooldown else "open"
+
+    def before(self) -> Optional[float]:
+        """None if the call may proceed, else seconds until the breaker allows a trial."""
+        with self._lock:
+            if self.opened_at is None:
+                return None
+            left = self.cooldown - (self._clock() - self.opened_at)
+            if left > 0:
+                return left
+            if self._trial:
+                return self.cooldown
+            self._trial = True
+            return None
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release(self) -> None:
+        """The call ended without telling us anything (cancelled): free a half-open trial slot."""
+        with self._lock:
+            self._trial = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.failures >= self.threshold:
+                self.opened_at = self._clock()
+
+# --------------------------------------------------------------------------- #
+# Scheduler
+# --------------------------------------------------------------------------- #
+class _Endpoint:
+    def __init__(self, cfg: Dict[str, Any], clock):
+        self.cfg = cfg
+        self.rpm = TokenBucket(cfg.get("rpm") or 0, cfg.get("burst_sec", 10), clock)
+        self.tpm = TokenBucket(cfg.get("tpm") or 0, cfg.get("burst_sec", 10), clock)
+        br = cfg.get("breaker") or {}
+        self.breaker = CircuitBreaker(br.get("failures", 5), br.get("cooldown_sec", 30.0), clock)
+
+def _load_config(path: Path) -> Dict[str, Any]:
+    try:
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    except Exception:
+        return {}
+
+class Scheduler:
+    def __init__(self, config: Dict[str, Any] | None = None, *, clock=time.monotonic,
+                 sleep=time.sleep, rng: random.Random | None = None):
+        self.config = config if config is not None else _load_config(CONFIG_PATH)
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._endpoints: Dict[Tuple[str, str], _Endpoint] = {}
+        self._lock = threading.Lock()
+
+    def limits(self, provider: str, model: str) -> Dict[str, Any]:
+        cfg = {**DEFAULTS, **(self.config.get("defaults") or {})}
+        for extra in ((self.config.get("providers") or {}).get(provider),
+                      (self.config.get("models") or {}).get(f"{provider}/{model}")):
+            if extra:
+                cfg.update(extra)
+        return cfg
+
+    def endpoint(self, provider: str, model: str) -> _Endpoint:
+        key = (provider, model)
+        ep = self._endpoints.get(key)
+        if ep is None:
+            with self._lock:
+                ep = self._endpoints.setdefault(key, _Endpoint(self.limits(provider, model), self._clock))
+        return ep
+
+    def backoff(self, attempt: int, cfg: Dict[str, Any], hint: Optional[float]) -> float:
+        cap = min(float(cfg["max_delay"]), float(cfg["base_delay"]) * (2 ** attempt))
+        delay = self._rng.uniform(0, cap)          # full jitter
+        return max(delay, hint) if hint is not None else delay
+
+    def call(self, provider: str, model: str, fn: Callable[[], Any], *, tokens: int = 0,
+             max_retries: int | None = None) -> Any:
+        """
+        Run fn() under the endpoint's limits. Retryable failures (429, 5xx,
+        network) back off and retry; anything else is raised at once.
+        """
+        ep = self.endpoint(provider, model)
+        retries = ep.cfg["max_retries"] if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            wait = ep.breaker.before()
+            if wait is not None:
+                raise CircuitOpenError(f"{provider}/{model}", wait)
+            delay = max(ep.rpm.reserve(1), ep.tpm.reserve(tokens) if tokens else 0.0)
+            if delay > 0:
+                self._sleep(delay)
+            try:
+                result = fn()
+            except RequestCancelled:
+                ep.breaker.release()
+                raise
+            except Exception as e:
+                retryable, limited = classify(e)
+                if not retryable:
+                    ep.breaker.success()        # the endpoint answered; the request was bad
+                    raise
+                ep.breaker.failure()
+                if limited:
+                    ep.rpm.throttle()
+                    ep.tpm.throttle()
+                if attempt >= retries or ep.breaker.state == "open":
+                    raise
+                d = self.backoff(attempt, ep.cfg, retry_after(e))
+                log.info("retry %s/%s in %.2fs after %s (attempt %d)", provider, model, d, e, attempt + 1)
+                self._sleep(d)
+                attempt += 1
+                continue
+            ep.breaker.success()
+            ep.rpm.recover()
+            ep.tpm.recover()
+            return result
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {f"{p}/{m}": {"breaker": ep.breaker.state, "rpm_rate": round(ep.rpm.rate, 2),
+                             "tpm_rate": round(ep.tpm.rate, 2)}
+                for (p, m), ep in sorted(self._endpoints.items())}
+
+_default: Optional[Scheduler] = None
+_default_lock = threading.Lock()
+
+def get_scheduler() -> Scheduler:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = Scheduler()
+    return _default
@@ -0,0 +1,274 @@
+# core/session_store.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Write-back store for small YAML session files. The document is loaded
+#   once and kept in memory; set() updates it, notifies subscribers and marks
+#   it dirty, and a single timer writes it `debounce` seconds after the first
+#   unsaved change, so a burst of UI changes costs one write. Writes are
+#   atomic (core.fileutil temp file + os.replace). If another process
+#   rewrites the file while nothing is unsaved here, the next access re-reads
+#   it. An optional schema of dotted keys -> Field(type, default, choices)
+#   validates values on set() and supplies defaults on get().
+
+from __future__ import annotations
+import os
+import copy
+import atexit
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from core.fileutil import atomic_write_text
+
+DEBOUNCE = 0.5              # seconds from the first unsaved change to the write
+
+Key = Union[str, Sequence[str]]
+
+@dataclass(frozen=True)
+class Field:
+    type: Union[type, Tuple[type, ...]] = object
+    default: Any = None
+    choices: Tuple[Any, ...] = ()
+
+    def check(self, key: str, value: Any) -> None:
+        if value is None:
+            return
+        if not isinstance(value, self.type):
+            names = getattr(self.type, "__name__", None) or "/".join(t.__name__ for t in self.type)
+            raise TypeError(f"session key {key!r} expects {names}, got {type(value).__name__}")
+        if self.choices and value not in self.choices:
+            raise ValueError(f"session key {key!r} must be one of {list(self.choices)}, got {value!r}")
+
+def _parts(key: Key) -> List[str]:
+    return [p for p in key.split(".") if p] if isinstance(key, str) else [str(p) for p in key]
+
+def _lookup(doc: Any, parts: List[str]) -> Any:
+    cur = doc
+    for p in parts:
+        if not isinstance(cur, dict) or p not in cur:
+            return None
+        cur = cur[p]
+    return cur
+
+class SessionStore:
+    """
+    store = SessionStore("project_session.yaml", schema={"chat_tab.selection.mode": Field(str, "API")})
+    store.get("chat_tab.selection.mode")          # or ["chat_tab", "selection", "mode"]
+    store.set("chat_tab.selection", {...})        # validated, notified, written later
+    unsub = store.subscribe(cb, prefix="chat_tab")  # cb(key, old, new)
+    store.flush() / store.close()                  # write now
+    Returned values are live: copy before mutating (snapshot() gives a deep copy).
+    """
+    def __init__(self, path: str, *, schema: Optional[Dict[str, Field]] = None, debounce: float = DEBOUNCE):
+        self.path = os.path.abspath(path)
+        self.schema = dict(schema or {})
+        self.debounce = debounce
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()    # one flush at a time: snapshot + write
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._subs: List[Tuple[str, Callable[[str, Any, Any], None]]] = []
+        self.writes = 0
+        self._stamp = self._stat()             # file as last read or written here
+        self._data: Dict[str, Any] = self._read()
+
+    # -- persistence ------------------------------------------------------------
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            import yaml
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logging.warning("session %s unreadable, starting empty: %s", self.path, e)
+            return {}
+
+    def reload(self) -> None:
+        """Drop unsaved changes and re-read the file."""
+        with self._lock:
+            self._cancel_timer()
+            self._dirty = False
+            self._stamp = self._stat()
+            self._data = self._read()
+
+    def _sync(self) -> None:
+        """Pick up an external rewrite of the file; unsaved changes here win."""
+        with self._lock:
+            if self._dirty:
+                return
+            stamp = self._stat()
+            if stamp == self._stamp:
+                return
+            old, self._stamp = self._data, stamp
+            self._data = self._read()
+            new = self._data
+            changed = [k for k in set(old) | set(new) if old.get(k) != new.get(k)]
+        for k in sorted(changed):
+            self._notify(k, old.get(k), new.get(k))
+
+    def flush(self, force: bool = False) -> bool:
+        """Write now if there are unsaved changes (or force); True if a write happened."""
+        import yaml
+        with self._write_lock:                  # an older snapshot never lands after a newer one
+            with self._lock:
+                self._cancel_timer()
+                if not self._dirty and not force:
+                    return False
+                text = yaml.safe_dump(self._data, allow_unicode=True, sort_keys=False)
+                self._dirty = False
+            try:
+                atomic_write_text(self.path, text)
+            except Exception:
+                with self._lock:
+                    self._dirty = True          # keep it for the next flush
+                raise
+            with self._lock:
+                self._stamp = self._stat()
+            self.writes += 1
+        return True
+
+    def _timed_flush(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logging.error("session %s write failed: %s", self.path, e)
+
+    def _schedule(self) -> None:
+        # one timer per dirty period: later changes ride along with the pending write
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.debounce, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def close(self) -> None:
+        self.flush()
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    # -- access -----------------------------------------------------------------
+    def get(self, key: Key, default: Any = None) -> Any:
+        parts = _parts(key)
+        self._sync()
+        with self._lock:
+            val = _lookup(self._data, parts)
+        if val is None:
+            field = self.schema.get(".".join(parts))
+            return field.default if field is not None and field.default is not None else default
+        return val
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._sync()
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    def _validate(self, parts: List[str], value: Any) -> None:
+        key = ".".join(parts)
+        for skey, field in self.schema.items():
+            if skey == key:
+                field.check(skey, value)
+            elif not key or skey.startswith(key + "."):
+                rest = skey[len(key) + 1:] if key else skey
+                field.check(skey, _lookup(value, rest.split(".")))
+
+    def set(self, key: Key, value: Any) -> None:
+        parts = _parts(key)
+        if not parts:
+            raise KeyError("empty session key")
+        self._validate(parts, value)
+        self._sync()
+        with self._lock:
+            cur = self._data
+            for p in parts[:-1]:
+                if not isinstance(cur.get(p), dict):
+                    cur[p] = {}
+                cur = cur[p]
+            old = cur.get(parts[-1])
+            if old == value:
+                return
+            cur[parts[-1]] = copy.deepcopy(value)
+            self._schedule()
+        self._notify(".".join(parts), old, value)
+
+    def update(self, values: Dict[str, Any]) -> None:
+        """set() several dotted keys; still one write."""
+        for k, v in values.items():
+            self.set(k, v)
+
+    def replace(self, data: Dict[str, Any]) -> None:
+        """Swap the whole document (notifies per changed top-level key)."""
+        self._validate([], data)
+        with self._lock:
+            old = self._data
+            self._data = copy.deepcopy(dict(data))
+            changed = [k for k in set(old) | set(data) if old.get(k) != data.get(k)]
+            if changed:
+                self._schedule()
+        for k in sorted(changed):
+            self._notify(k, old.get(k), data.get(k))
+
+    # -- change notification ------------------------------------------------------
+    def subscribe(self, callback: Callable[[str, Any, Any], None], prefix: str = "") -> Callable[[], None]:
+        """callback(key, old, new) for changes at, above or below `prefix`. Returns unsubscribe()."""
+        entry = (prefix, callback)
+        with self._lock:
+            self._subs.append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if entry in self._subs:
+                    self._subs.remove(entry)
+        return unsubscribe
+
+    def _notify(self, key: str, old: Any, new: Any) -> None:
+        with self._lock:
+            subs = [cb for prefix, cb in self._subs
+                    if not prefix or key == prefix or key.startswith(prefix + ".") or prefix.startswith(key + ".")]
+        for cb in subs:
+            try:
+                cb(key, old, new)
+            except Exception as e:
+                logging.warning("session subscriber failed for %s: %s", key, e)
+
+_stores: Dict[str, SessionStore] = {}
+_stores_lock = threading.Lock()
+
+def get_session_store(path: str, *, schema: Optional[Dict[str, Field]] = None,
+                      debounce: float = DEBOUNCE) -> SessionStore:
+    """One shared store per file; pending changes are written at interpreter exit."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SessionStore(key, schema=schema, debounce=debounce)
+        elif schema:
+            store.schema.update(schema)
+        return store
+
+@atexit.register
+def _flush_all() -> None:
+    for store in list(_stores.values()):
+        try:
+            store.flush()
+        except Exception as e:
+            logging.error("session %s not saved at exit: %s", store.path, e)
@@ -0,0 +1,90 @@
+# core/startup_profile.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Launch-time profiling. main.py imports this first, so T0 is (close to)
+#   interpreter start; mark() records named milestones (imports done, window
+#   built, first paint, project loaded) in ms since T0. Per-module import
+#   cost comes from `python -X importtime`, whose stderr parse_importtime()
+#   reads (tools/profile_startup.py runs the app that way). Enabled with
+#   PA_PROFILE_STARTUP=1, or =exit to quit once the window is ready.
+
+from __future__ import annotations
+import os
+import re
+import sys
+import json
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional
+
+T0 = time.perf_counter()
+ENV = "PA_PROFILE_STARTUP"
+REPORT_PATH = os.path.join("logs", "startup_profile.json")
+
+_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+@dataclass
+class ImportCost:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int = 0
+
+def parse_importtime(text: str) -> List[ImportCost]:
+    """Rows of `-X importtime` output (header and unrelated lines skipped)."""
+    out: List[ImportCost] = []
+    for line in (text or "").splitlines():
+        m = _LINE.match(line.rstrip())
+        if m:
+            out.append(ImportCost(m.group(4), int(m.group(1)), int(m.group(2)),
+                                  max(0, (len(m.group(3)) - 1) // 2)))
+    return out
+
+def top_imports(costs: Iterable[ImportCost], n: int = 25, key: str = "cumulative_us") -> List[Dict[str, Any]]:
+    return [asdict(c) for c in sorted(costs, key=lambda c: getattr(c, key), reverse=True)[:n]]
+
+def by_package(costs: Iterable[ImportCost]) -> Dict[str, int]:
+    """Self time (us) summed per top-level package, most expensive first."""
+    totals: Dict[str, int] = {}
+    for c in costs:
+        pkg = c.module.split(".", 1)[0]
+        totals[pkg] = totals.get(pkg, 0) + c.self_us
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+class StartupProfile:
+    def __init__(self, t0: Optional[float] = None):
+        self.t0 = T0 if t0 is None else t0
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        """Record `name` once (first call wins); returns ms since T0."""
+        ms = round((time.perf_counter() - self.t0) * 1000.0, 1)
+        self.marks.setdefault(name, ms)
+        return self.marks[name]
+
+    def report(self, importtime_text: str = "", top: int = 25) -> Dict[str, Any]:
+        rep: Dict[str, Any] = {"marks_ms": dict(self.marks), "modules_loaded": len(sys.modules)}
+        costs = parse_importtime(importtime_text)
+        if costs:
+            rep["imports"] = top_imports(costs, top)
+            rep["packages_us"] = dict(list(by_package(costs).items())[:top])
+        return rep
+
+    def save(self, path: str = REPORT_PATH, **kw) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(**kw), f, indent=2)
+        return path
+
+PROFILE = StartupProfile()
+
+def mode() -> str:
+    """'' (off), '1' (record and save) or 'exit' (also quit when ready)."""
+    v = (os.environ.get(ENV) or "").strip().lower()
+    return "" if v in ("", "0", "false", "no") else v
+
+def mark(name: str) -> float:
+    return PROFILE.mark(name)
@@ -4,21 +4,35 @@
 # Author: G. Rapson
 # Company: GR-Analysis
 # Description:
-#   Generates improvement task YAML files from the introspection report.
-#   Writes individual task files and an aggregated index.
+#   Generates improvement tasks from the introspection report into the ticket
+#   store (core.ticket_store), exporting task YAML files and the index for
+#   compatibility.
+#   Tickets are upserted by a stable (file, issue, symbol) key; only files whose
+#   findings changed since the last run are touched.
 
 from __future__ import annotations
 import os
 import yaml
 import datetime
+import hashlib
+import json
 import re
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Tuple
+
+from core.ticket_store import TicketStore
 
 REPORT_PATH = os.path.join("data", "insights", "introspection_report.yaml")
 TICKETS_DIR = os.path.join("data", "tickets")
 INDEX_PATH  = os.path.join(TICKETS_DIR, "index.yaml")
+DB_PATH     = os.path.join(TICKETS_DIR, "tickets.db")
 
 SAFE_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+SYMBOL_RE = re.compile(r"(Function|Class|Method) '([^']+)'")
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+AUTO_SOURCE = "introspection_v1"
+RESOLVED = "resolved"   # status set when an auto ticket's finding disappears
 
 ISSUE_TITLES = {
     "missing_standard_header": "Add standard file header",
@@ -36,112 +50,187 @@ def _safe_stem(path: str) -> str:
     stem = SAFE_RE.sub("-", stem).strip("-")
     return stem or "file"
 
+def ticket_key(file_path: str, issue: str, symbol: str | None) -> str:
+    """Stable identity of a ticket: one per (file, issue, symbol)."""
+    return f"{file_path.replace(chr(92), '/')}|{issue}|{symbol or ''}"
+
+def _ticket_id(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+def _finding_symbol(f: Dict[str, Any]) -> str | None:
+    # Reports from core.introspection carry 'symbol'; older ones only the detail text
+    # ("Function 'name'.../Class 'X'.../Method 'X.y'...").
+    if f.get("symbol"):
+        return str(f["symbol"])
+    m = SYMBOL_RE.search(f.get("detail", "") or "")
+    return m.group(2) if m else None
+
 def _load_report(path: str) -> Dict[str, Any]:
     if not os.path.exists(path):
         raise FileNotFoundError(f"Introspection report not found: {path}")
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_YAML_LOADER)
     if not isinstance(data, dict) or "findings" not in data:
         raise ValueError("Invalid report format: missing 'findings'")
     return data
 
-def _load_index(path: str) -> Dict[str, Any]:
-    if not os.path.exists(path):
-        return {"tasks": []}
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    if "tasks" not in data or not isinstance(data["tasks"], list):
-        data["tasks"] = []
-    return data
-
-def _save_index(path: str, index: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        yaml.dump(index, f, allow_unicode=True, sort_keys=False)
-
-def _write_task_file(directory: str, payload: Dict[str, Any]) -> str:
-    os.makedirs(directory, exist_ok=True)
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+def _task_file_path(directory: str, payload: Dict[str, Any]) -> str:
+    """YAML export location for a ticket; the name is derived from the stable key."""
     stem = f"{_safe_stem(payload.get('file_path','file'))}_{payload.get('issue','issue')}"
-    filename = f"task_{ts}_{stem}.yaml"
-    full = os.path.join(directory, filename)
-    with open(full, "w", encoding="utf-8") as f:
-        yaml.dump(payload, f, allow_unicode=True, sort_keys=False)
-    return full
+    return os.path.join(directory, f"task_{stem}_{payload['id']}.yaml").replace("\\", "/")
 
 def _default_title(issue: str, file_path: str) -> str:
     base = ISSUE_TITLES.get(issue, f"Resolve issue '{issue}'")
     return f"{base}: {file_path}"
 
-def create_tasks_from_introspection(report_path: str = REPORT_PATH) -> Dict[str, Any]:
+def _group_findings(findings: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    by_path: Dict[str, List[Dict[str, Any]]] = {}
+    for f in findings:
+        by_path.setdefault(f.get("path", ""), []).append(f)
+    return by_path
+
+def _fingerprint(findings: List[Dict[str, Any]]) -> str:
+    rows = sorted((f.get("issue", ""), _finding_symbol(f) or "", f.get("detail", "")) for f in findings)
+    return hashlib.sha1(json.dumps(rows).encode("utf-8")).hexdigest()
+
+def _payload(key: str, file_path: str, issue: str, symbol: str | None, detail: str, now: str) -> Dict[str, Any]:
+    return {
+        "id": _ticket_id(key),
+        "key": key,
+        "title": _default_title(issue, file_path),
+        "status": "open",
+        "issue": issue,
+        "file_path": file_path,
+        "symbol": symbol,
+        "detail": detail,
+        "source": AUTO_SOURCE,
+        "created": now,
+        "updated": now,
+        "priority": "normal",
+        "labels": ["auto", "introspection", issue],
+        "acceptance_criteria": [
+            "Code compiles & existing functionality preserved",
+            "Add/Update docstrings/headers where applicable",
+            "Ensure tests/lints (if any) pass",
+        ],
+    }
+
+def sync_tickets(findings: List[Dict[str, Any]], store: TicketStore,
+                 tickets_dir: str = TICKETS_DIR,
+                 progress: Callable[[int, int, str], None] | None = None,
+                 ) -> Tuple[Dict[str, int], List[str], List[str], List[str]]:
+    """
+    Upsert tickets for files whose findings changed since the store was last
+    synced. Returns (counts, touched_paths, changed_ticket_ids, stale_files).
+    stale_files are legacy task files superseded by keyed ones; the caller
+    deletes them once the replacements have been exported.
+    progress(n, m, path) is called per dirty file, before anything is written,
+    so raising from it aborts the sync cleanly.
+
+    - new (file, issue, symbol) keys -> ticket created
+    - existing keys with new detail, or previously auto-resolved -> updated/reopened
+    - open auto tickets whose finding disappeared -> status 'resolved'
+    """
+    counts = {"created": 0, "updated": 0, "resolved": 0, "unchanged": 0}
+    by_path = _group_findings(findings)
+    sources = store.get_sources()
+
+    # Only files whose finding set differs from the last sync are processed
+    current_fp = {p: _fingerprint(fs) for p, fs in by_path.items()}
+    dirty = [p for p, fp in current_fp.items() if sources.get(p) != fp]
+    dirty += [p for p in sources if p not in current_fp]
+    if not dirty:
+        return counts, [], [], []
+
+    now = datetime.datetime.now().isoformat()
+    upserts: List[Dict[str, Any]] = []
+    stale_files: List[str] = []
+    for i, path in enumerate(dirty, 1):
+        if progress:
+            progress(i, len(dirty), path)
+        existing = {t["key"]: t for t in store.query(file_path=path, limit=None)}
+        live_keys = set()
+        for f in by_path.get(path, []):
+            issue = f.get("issue", "unknown_issue")
+            detail = f.get("detail", "")
+            symbol = _finding_symbol(f)
+            key = ticket_key(path, issue, symbol)
+            if key in live_keys:
+                continue
+            live_keys.add(key)
+
+            t = existing.get(key)
+            if t is None:
+                t = _payload(key, path, issue, symbol, detail, now)
+                t["path"] = _task_file_path(tickets_dir, t)
+                upserts.append(t)
+                counts["created"] += 1
+                continue
+
+            reopen = t.get("status") == RESOLVED
+            if t.get("detail") == detail and not reopen:
+                counts["unchanged"] += 1
+                continue
+            t.update({"detail": detail, "updated": now})
+            if reopen:
+                t["status"] = "open"
+            new_path = _task_file_path(tickets_dir, t)
+            if t.get("path") and t["path"] != new_path:
+                stale_files.append(t["path"])  # legacy timestamped file superseded by the keyed one
+            t["path"] = new_path
+            upserts.append(t)
+            counts["updated"] += 1
+
+        # Auto tickets for this file whose finding is gone
+        for key, t in existing.items():
+            if key in live_keys or t.get("status") != "open" or t.get("source", AUTO_SOURCE) != AUTO_SOURCE:
+                continue
+            t.update({"status": RESOLVED, "updated": now})
+            upserts.append(t)
+            counts["resolved"] += 1
+
+    store.upsert_many(upserts)
+    store.set_sources({p: current_fp[p] for p in dirty if p in current_fp},
+                      removed=[p for p in dirty if p not in current_fp])
+    return counts, dirty, [t["id"] for t in upserts], stale_files
+
+def open_store(db_path: str | None = None) -> TicketStore:
+    """Open the ticket DB, migrating a legacy index.yaml on first use."""
+    store = TicketStore(db_path or DB_PATH)
+    if store.is_empty() and os.path.exists(INDEX_PATH):
+        store.import_yaml(INDEX_PATH, key_func=ticket_key)
+    return store
+
+def create_tasks_from_introspection(report_path: str = REPORT_PATH, export_yaml: bool = True,
+                                    progress: Callable[[int, int, str], None] | None = None) -> Dict[str, Any]:
     """
-    Reads the introspection report and creates task YAML files per finding.
+    Reads the introspection report and upserts one ticket per
+    (file, issue, symbol) into the ticket store. Re-running on an unchanged
+    report writes nothing. With export_yaml, changed tickets are also written
+    to the legacy YAML layout (task files + index.yaml).
+    progress: per-file callback passed to sync_tickets.
     Returns a summary dict with counts.
     """
     report = _load_report(report_path)
-    findings: List[Dict[str, Any]] = report.get("findings", [])
-    if not findings:
-        return {"created": 0, "files_affected": 0, "index_path": INDEX_PATH, "tickets_dir": TICKETS_DIR}
+    findings: List[Dict[str, Any]] = report.get("findings", []) or []
+
+    store = open_store()
+    try:
+        counts, touched, changed_ids, stale_files = sync_tickets(findings, store, TICKETS_DIR, progress)
+        if export_yaml and touched:
+            store.export_yaml(INDEX_PATH, ids=changed_ids)
+            for old in stale_files:             # only now that the keyed files exist
+                if os.path.exists(old):
+                    os.remove(old)
+        total = store.count()
+    finally:
+        store.close()
 
-    index = _load_index(INDEX_PATH)
-    created_paths: List[str] = []
-    seen_keys = set()  # de-duplicate tasks per (file, issue, name) where relevant
-
-    for f in findings:
-        file_path = f.get("path", "")
-        issue     = f.get("issue", "unknown_issue")
-        detail    = f.get("detail", "")
-
-        # optional: include function/class names in task title if available
-        # We try to parse from detail when it's "Function 'name'.../Class 'X'.../Method 'X.y'..."
-        m = re.search(r"(Function|Class|Method) '([^']+)'", detail)
-        symbol = m.group(2) if m else None
-
-        dedupe_key = (file_path, issue, symbol)
-        if dedupe_key in seen_keys:
-            continue
-        seen_keys.add(dedupe_key)
-
-        payload = {
-            "title": _default_title(issue, file_path),
-            "status": "open",
-            "issue": issue,
-            "file_path": file_path,
-            "symbol": symbol,
-            "detail": detail,
-            "source": "introspection_v1",
-            "created": datetime.datetime.now().isoformat(),
-            "priority": "normal",
-            "labels": ["auto", "introspection", issue],
-            "acceptance_criteria": [
-                "Code compiles & existing functionality preserved",
-                "Add/Update docstrings/headers where applicable",
-                "Ensure tests/lints (if any) pass",
-            ],
-        }
-
-        task_file = _write_task_file(TICKETS_DIR, payload)
-        created_paths.append(task_file)
-
-        # update index
-        index["tasks"].append({
-            "file": os.path.basename(task_file),
-            "path": task_file.replace("\\", "/"),
-            "title": payload["title"],
-            "issue": issue,
-            "file_path": file_path,
-            "status": "open",
-            "created": payload["created"],
-            "labels": payload["labels"],
-        })
-
-    _save_index(INDEX_PATH, index)
-
-    # summary
-    files_affected = len({t["file_path"] for t in findings if "file_path" in t})
     return {
-        "created": len(created_paths),
-        "files_affected": files_affected,
+        **counts,
+        "total": total,
+        "files_affected": len(touched),
         "index_path": INDEX_PATH,
+        "db_path": DB_PATH,
         "tickets_dir": TICKETS_DIR,
     }
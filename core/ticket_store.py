@@ -0,0 +1,316 @@
+# core/ticket_store.py
+# Persistent Assistant v3
+# Created: 2025-08-18
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   SQLite-backed ticket store. Tickets live in one indexed table (status, issue,
+#   file_path, created) with labels in a side table, so filtering and paging do
+#   not load everything. Exports to / imports from the legacy YAML layout
+#   (data/tickets/index.yaml + one task_*.yaml per ticket).
+
+from __future__ import annotations
+import os
+import json
+import hashlib
+import sqlite3
+import yaml
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+DB_PATH = os.path.join("data", "tickets", "tickets.db")
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Columns mirrored out of the ticket payload for indexing/filtering
+COLUMNS = ["id", "key", "title", "status", "issue", "file_path", "symbol", "detail",
+           "source", "priority", "created", "updated", "path"]
+
+# Index rows in the legacy index.yaml (order preserved for compatibility)
+INDEX_FIELDS = ["id", "key", "file", "path", "title", "issue", "file_path", "symbol",
+                "status", "created", "updated", "labels"]
+
+ORDERABLE = {"created", "updated", "status", "issue", "file_path", "priority", "title"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id        TEXT PRIMARY KEY,
+    key       TEXT UNIQUE NOT NULL,
+    title     TEXT,
+    status    TEXT,
+    issue     TEXT,
+    file_path TEXT,
+    symbol    TEXT,
+    detail    TEXT,
+    source    TEXT,
+    priority  TEXT,
+    created   TEXT,
+    updated   TEXT,
+    path      TEXT,
+    payload   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_tickets_status    ON tickets(status);
+CREATE INDEX IF NOT EXISTS ix_tickets_issue     ON tickets(issue);
+CREATE INDEX IF NOT EXISTS ix_tickets_file_path ON tickets(file_path);
+CREATE INDEX IF NOT EXISTS ix_tickets_created   ON tickets(created);
+CREATE TABLE IF NOT EXISTS ticket_labels (
+    ticket_id TEXT NOT NULL REFERENCES tickets(id) ON DELETE CASCADE,
+    label     TEXT NOT NULL,
+    PRIMARY KEY (ticket_id, label)
+);
+CREATE INDEX IF NOT EXISTS ix_ticket_labels_label ON ticket_labels(label);
+CREATE TABLE IF NOT EXISTS sources (
+    path        TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+"""
+
+class TicketStore:
+    """
+    Local ticket database. Ticket dicts use the same keys as the YAML ticket
+    files; 'path' is the YAML file the ticket exports to.
+
+    Usage:
+        with TicketStore() as store:
+            store.upsert_many(tickets)
+            rows = store.query(status="open", label="introspection", limit=50)
+    """
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------ #
+    # lifecycle
+    # ------------------------------------------------------------------ #
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "TicketStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+        self.close()
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    # ------------------------------------------------------------------ #
+    # writes
+    # ------------------------------------------------------------------ #
+    def upsert_many(self, tickets: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or replace tickets by id (labels replaced too). Returns count.
+        `key` is unique as well: an incoming ticket replaces any stored ticket
+        with the same key under another id, and within one batch the last
+        ticket for a key wins.
+        """
+        by_key: Dict[str, Dict[str, Any]] = {}
+        for t in tickets:
+            by_key.pop(t["key"], None)          # re-insert so batch order follows the winner
+            by_key[t["key"]] = t
+        rows: List[Tuple] = []
+        labels: List[Tuple[str, str]] = []
+        ids: List[Tuple[str]] = []
+        stale: List[Tuple[str, str]] = []
+        for t in by_key.values():
+            stale.append((t["key"], t["id"]))
+            payload = {k: v for k, v in t.items() if k != "path"}
+            rows.append(tuple(t.get(c) for c in COLUMNS) + (json.dumps(payload, default=str),))
+            ids.append((t["id"],))
+            labels.extend((t["id"], str(l)) for l in (t.get("labels") or []))
+        if not rows:
+            return 0
+        cols = ", ".join(COLUMNS + ["payload"])
+        marks = ", ".join("?" for _ in range(len(COLUMNS) + 1))
+        updates = ", ".join(f"{c}=excluded.{c}" for c in COLUMNS[1:] + ["payload"])
+        with self._conn:
+            self._conn.executemany("DELETE FROM tickets WHERE key=? AND id<>?", stale)
+            self._conn.executemany(
+                f"INSERT INTO tickets ({cols}) VALUES ({marks}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}", rows)
+            self._conn.executemany("DELETE FROM ticket_labels WHERE ticket_id=?", ids)
+            self._conn.executemany("INSERT OR IGNORE INTO ticket_labels VALUES (?, ?)", labels)
+        return len(rows)
+
+    def set_status(self, ids: Iterable[str], status: str, updated: Optional[str] = None) -> int:
+        """Change status for the given ticket ids (payload kept in sync)."""
+        n = 0
+        with self._conn:
+            for tid in ids:
+                t = self.get(tid)
+                if t is None:
+                    continue
+                t["status"] = status
+                if updated:
+                    t["updated"] = updated
+                payload = {k: v for k, v in t.items() if k != "path"}
+                self._conn.execute(
+                    "UPDATE tickets SET status=?, updated=?, payload=? WHERE id=?",
+                    (status, t.get("updated"), json.dumps(payload, default=str), tid))
+                n += 1
+        return n
+
+    def delete(self, ids: Iterable[str]) -> None:
+        with self._conn:
+            self._conn.executemany("DELETE FROM tickets WHERE id=?", [(i,) for i in ids])
+
+    # ------------------------------------------------------------------ #
+    # reads
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        d = json.loads(row["payload"])
+        for c in COLUMNS:
+            d[c] = row[c]
+        return d
+
+    def get(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT * FROM tickets WHERE id=?", (ticket_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_by_key(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT * FROM tickets WHERE key=?", (key,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def _where(self, status=None, issue=None, file_path=None, label=None, search=None) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        args: List[Any] = []
+        for col, val in (("status", status), ("issue", issue), ("file_path", file_path)):
+            if val is None:
+                continue
+            if isinstance(val, (list, tuple, set)):
+                clauses.append(f"{col} IN ({', '.join('?' for _ in val)})")
+                args.extend(val)
+            else:
+                clauses.append(f"{col}=?")
+                args.append(val)
+        if label:
+            clauses.append("id IN (SELECT ticket_id FROM ticket_labels WHERE label=?)")
+            args.append(label)
+        if search:
+            clauses.append("(title LIKE ? OR file_path LIKE ? OR detail LIKE ?)")
+            args.extend([f"%{search}%"] * 3)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def query(self, *, status=None, issue=None, file_path=None, label=None, search=None,
+              order_by: str = "created", descending: bool = False,
+              limit: Optional[int] = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Filtered page of tickets. limit=None returns every match."""
+        if order_by not in ORDERABLE:
+            raise ValueError(f"Cannot order by {order_by!r}")
+        where, args = self._where(status, issue, file_path, label, search)
+        sql = f"SELECT * FROM tickets{where} ORDER BY {order_by} {'DESC' if descending else 'ASC'}, id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            args += [int(limit), int(offset)]
+        return [self._to_dict(r) for r in self._conn.execute(sql, args)]
+
+    def count(self, *, status=None, issue=None, file_path=None, label=None, search=None) -> int:
+        where, args = self._where(status, issue, file_path, label, search)
+        return self._conn.execute(f"SELECT COUNT(*) FROM tickets{where}", args).fetchone()[0]
+
+    def distinct(self, column: str) -> List[str]:
+        """Distinct values of an indexed column (for filter combos)."""
+        if column == "label":
+            sql = "SELECT DISTINCT label FROM ticket_labels ORDER BY label"
+        elif column in ("status", "issue", "file_path"):
+            sql = f"SELECT DISTINCT {column} FROM tickets WHERE {column} IS NOT NULL ORDER BY {column}"
+        else:
+            raise ValueError(f"Unsupported column {column!r}")
+        return [r[0] for r in self._conn.execute(sql)]
+
+    # ------------------------------------------------------------------ #
+    # per-file finding fingerprints (used by core.tasks for incremental sync)
+    # ------------------------------------------------------------------ #
+    def get_sources(self) -> Dict[str, str]:
+        return {r[0]: r[1] for r in self._conn.execute("SELECT path, fingerprint FROM sources")}
+
+    def set_sources(self, updates: Dict[str, str], removed: Iterable[str] = ()) -> None:
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO sources VALUES (?, ?)", list(updates.items()))
+            self._conn.executemany("DELETE FROM sources WHERE path=?", [(p,) for p in removed])
+
+    # ------------------------------------------------------------------ #
+    # YAML compatibility
+    # ------------------------------------------------------------------ #
+    def is_empty(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM tickets LIMIT 1").fetchone() is None
+
+    def export_yaml(self, index_path: str, ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Write the legacy index.yaml (all tickets) and the per-ticket YAML files
+        for `ids` (all tickets when None). Returns the number of ticket files written.
+        """
+        written = 0
+        wanted = None if ids is None else set(ids)
+        index_rows: List[Dict[str, Any]] = []
+        for row in self._conn.execute("SELECT * FROM tickets ORDER BY created, id"):
+            t = self._to_dict(row)
+            path = t.get("path")
+            if path and (wanted is None or t["id"] in wanted):
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                payload = {k: v for k, v in t.items() if k != "path"}
+                with open(path, "w", encoding="utf-8") as f:
+                    yaml.dump(payload, f, allow_unicode=True, sort_keys=False)
+                written += 1
+            entry = {k: t.get(k) for k in INDEX_FIELDS if k not in ("file", "labels")}
+            entry["file"] = os.path.basename(path or "")
+            entry["labels"] = t.get("labels") or []
+            index_rows.append({k: entry.get(k) for k in INDEX_FIELDS})
+
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        tmp = index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            yaml.dump({"tasks": index_rows, "sources": self.get_sources()}, f,
+                      allow_unicode=True, sort_keys=False)
+        os.replace(tmp, index_path)
+        return written
+
+    def import_yaml(self, index_path: str, key_func=None) -> int:
+        """
+        Load tickets from a legacy index.yaml (+ their ticket files when present).
+        key_func(file_path, issue, symbol) supplies keys for pre-upsert entries;
+        duplicates by key collapse to the first.
+        """
+        if not os.path.exists(index_path):
+            return 0
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = yaml.load(f, Loader=_YAML_LOADER) or {}
+        seen: Dict[str, Dict[str, Any]] = {}
+        for row in data.get("tasks") or []:
+            payload: Dict[str, Any] = {}
+            p = row.get("path")
+            if p and os.path.exists(p):
+                try:
+                    with open(p, "r", encoding="utf-8") as fh:
+                        payload = yaml.load(fh, Loader=_YAML_LOADER) or {}
+                except Exception:
+                    payload = {}
+            t = {**row, **payload}
+            t.pop("file", None)
+            t["path"] = p
+            key = t.get("key") or (key_func(t.get("file_path", ""), t.get("issue", ""), t.get("symbol"))
+                                   if key_func else f"{t.get('file_path','')}|{t.get('issue','')}|{t.get('symbol') or ''}")
+            if key in seen:
+                continue
+            t["key"] = key
+            t.setdefault("id", _hash_id(key))
+            seen[key] = t
+        n = self.upsert_many(seen.values())
+        sources = data.get("sources")
+        if isinstance(sources, dict):
+            self.set_sources({str(k): str(v) for k, v in sources.items()})
+        return n
+
+def _hash_id(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
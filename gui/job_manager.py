@@ -0,0 +1,310 @@
+# job_manager.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Background jobs for MainWindow. Tool scripts run as QProcess jobs whose
+#   stdout is read with the PROGRESS:/SUMMARY: protocol (core.job_protocol);
+#   in-process analyses run on a QThreadPool and report through a progress
+#   callback. Every job can be cancelled (process jobs are killed, in-process
+#   jobs stop at their next progress call) and is kept in a short history
+#   that the Jobs tab displays.
+
+from __future__ import annotations
+import os
+import sys
+import time
+import datetime
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QProcess, QRunnable, QThreadPool, pyqtSignal
+
+from core.job_protocol import LineProtocol, progress_text
+from core.log_sink import LogSink
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOG_DIR = os.path.join(PROJECT_ROOT, "logs")
+HISTORY_MAX = 50
+
+class JobCancelled(Exception):
+    """Raised inside an in-process job at its next progress() call after cancel()."""
+
+@dataclass
+class Job:
+    id: str
+    title: str
+    kind: str                                  # "process" | "thread"
+    state: str = "running"                     # running | ok | failed | cancelled
+    started: float = field(default_factory=time.time)
+    ended: Optional[float] = None
+    status: str = ""                           # latest progress text
+    summary: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+    log_path: str = ""
+
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+    @property
+    def duration(self) -> float:
+        return (self.ended or time.time()) - self.started
+
+class JobContext:
+    """Handed to in-process jobs: progress(n, m, label) doubles as the cancel check."""
+    def __init__(self, job_id: str, manager: "JobManager"):
+        self.job_id = job_id
+        self._manager = manager
+        self.cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def progress(self, n=None, m=None, label: str = "", **extra) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        prog = dict(extra, n=n, m=m, label=label)
+        self._manager._signals.progress.emit(self.job_id, {k: v for k, v in prog.items() if v is not None})
+
+class _Signals(QObject):
+    # worker thread -> UI thread
+    progress = pyqtSignal(str, dict)
+    done = pyqtSignal(str, str, object)        # job id, state, result or error text
+
+class _ThreadJob(QRunnable):
+    def __init__(self, ctx: JobContext, fn: Callable[[JobContext], Any]):
+        super().__init__()
+        self.ctx = ctx
+        self.fn = fn
+        self.setAutoDelete(True)
+
+    def run(self) -> None:
+        sig = self.ctx._manager._signals
+        try:
+            result = self.fn(self.ctx)
+            sig.done.emit(self.ctx.job_id, "cancelled" if self.ctx.cancelled else "ok", result)
+        except JobCancelled:
+            sig.done.emit(self.ctx.job_id, "cancelled", None)
+        except Exception as e:
+            sig.done.emit(self.ctx.job_id, "failed", f"{type(e).__name__}: {e}")
+
+class JobManager(QObject):
+    """
+    Signals (UI thread):
+      job_started(id)
+      job_progress(id, text)      rendered like the Tools tab status line
+      job_finished(id, state)     state: ok | failed | cancelled
+      history_changed()
+    on_done(job, result) passed to run_* is called on the UI thread when the
+    job ends; result is the callable's return value or the process SUMMARY.
+    """
+    job_started = pyqtSignal(str)
+    job_progress = pyqtSignal(str, str)
+    job_finished = pyqtSignal(str, str)
+    history_changed = pyqtSignal()
+
+    def __init__(self, parent=None, logger=None):
+        super().__init__(parent)
+        self.logger = logger
+        self._ids = itertools.count(1)
+        self._jobs: Dict[str, Job] = {}
+        self._procs: Dict[str, QProcess] = {}
+        self._parsers: Dict[str, LineProtocol] = {}
+        self._sinks: Dict[str, LogSink] = {}
+        self._contexts: Dict[str, JobContext] = {}
+        self._callbacks: Dict[str, Callable] = {}
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        self._signals = _Signals()
+        self._signals.progress.connect(self._on_progress)
+        self._signals.done.connect(self._on_thread_done)
+
+    # -- queries ------------------------------------------------------------
+    def history(self) -> List[Job]:
+        """Newest first."""
+        return sorted(self._jobs.values(), key=lambda j: j.started, reverse=True)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def running(self, title: str) -> Optional[Job]:
+        return next((j for j in self._jobs.values() if j.title == title and j.running), None)
+
+    # -- starting jobs --------------------------------------------------------
+    def _new_job(self, title: str, kind: str, on_done: Optional[Callable]) -> Job:
+        job = Job(id=f"job{next(self._ids)}", title=title, kind=kind, status=f"{title}…")
+        self._jobs[job.id] = job
+        if on_done:
+            self._callbacks[job.id] = on_done
+        self._trim()
+        self.job_started.emit(job.id)
+        self.history_changed.emit()
+        return job
+
+    def run_process(self, title: str, args: List[str], *, env: Optional[Dict[str, str]] = None,
+                    on_done: Optional[Callable] = None) -> str:
+        """Run `python <args>` from the project root; one instance per title."""
+        existing = self.running(title)
+        if existing:
+            return existing.id
+        job = self._new_job(title, "process", on_done)
+        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        stem = os.path.splitext(os.path.basename(args[0]))[0] if args else "job"
+        job.log_path = os.path.join(LOG_DIR, f"{stem}_run_{ts}.log")
+        self._sinks[job.id] = LogSink(job.log_path)
+        self._append_log(job, f"Command: {[sys.executable] + list(args)}\n")
+
+        proc = QProcess(self)
+        proc.setProgram(sys.executable)
+        proc.setArguments(list(args))
+        proc.setWorkingDirectory(PROJECT_ROOT)
+        from PyQt6.QtCore import QProcessEnvironment
+        pe = QProcessEnvironment.systemEnvironment()
+        for k, v in dict(env or {}, PYTHONIOENCODING="utf-8").items():
+            pe.insert(k, v)
+        proc.setProcessEnvironment(pe)
+        self._procs[job.id] = proc
+        self._parsers[job.id] = LineProtocol()
+        proc.readyReadStandardOutput.connect(lambda jid=job.id: self._on_stdout(jid))
+        proc.readyReadStandardError.connect(lambda jid=job.id: self._on_stderr(jid))
+        proc.finished.connect(lambda code, _status, jid=job.id: self._on_proc_finished(jid, code))
+        proc.start()
+        return job.id
+
+    def run_callable(self, title: str, fn: Callable[[JobContext], Any], *,
+                     on_done: Optional[Callable] = None) -> str:
+        """Run fn(ctx) on the pool; one instance per title."""
+        existing = self.running(title)
+        if existing:
+            return existing.id
+        job = self._new_job(title, "thread", on_done)
+        ctx = JobContext(job.id, self)
+        self._contexts[job.id] = ctx
+        self._pool.start(_ThreadJob(ctx, fn))
+        return job.id
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if not job or not job.running:
+            return False
+        job.status = f"{job.title}… cancelling"
+        if job.id in self._procs:
+            job.state = "cancelled"            # _on_proc_finished keeps this state
+            self._procs[job.id].kill()
+        elif job.id in self._contexts:
+            self._contexts[job.id].cancel_event.set()
+        self.history_changed.emit()
+        return True
+
+    def cancel_all(self) -> None:
+        for j in list(self._jobs.values()):
+            self.cancel(j.id)
+
+    def clear_finished(self) -> None:
+        for jid in [j.id for j in self._jobs.values() if not j.running]:
+            del self._jobs[jid]
+        self.history_changed.emit()
+
+    # -- internals ------------------------------------------------------------
+    def _trim(self) -> None:
+        done = [j for j in self.history() if not j.running]
+        for j in done[HISTORY_MAX:]:
+            del self._jobs[j.id]
+
+    def _append_log(self, job: Job, text: str) -> None:
+        sink = self._sinks.get(job.id)
+        if sink is not None:
+            sink.write(text)
+
+    def sink(self, job_id: str) -> Optional[LogSink]:
+        """Live log of a running process job (for a LogViewer)."""
+        return self._sinks.get(job_id)
+
+    def _on_progress(self, job_id: str, prog: dict) -> None:
+        job = self._jobs.get(job_id)
+        if job is None or not job.running:
+            return
+        job.status = progress_text(job.title, prog)
+        self.job_progress.emit(job_id, job.status)
+        self.history_changed.emit()
+
+    def _on_stdout(self, job_id: str) -> None:
+        proc, job = self._procs.get(job_id), self._jobs.get(job_id)
+        if proc is None or job is None:
+            return
+        self._dispatch(job, self._parsers[job_id].feed(bytes(proc.readAllStandardOutput())))
+
+    def _dispatch(self, job: Job, events: list) -> None:
+        for kind, payload, line in events:
+            self._append_log(job, line)
+            if kind == "progress" and isinstance(payload, dict):
+                self._on_progress(job.id, payload)
+
+    def _on_stderr(self, job_id: str) -> None:
+        proc, job = self._procs.get(job_id), self._jobs.get(job_id)
+        if proc is None or job is None:
+            return
+        text = bytes(proc.readAllStandardError()).decode("utf-8", errors="replace")
+        for line in text.splitlines():
+            self._append_log(job, "[stderr] " + line.rstrip())
+            job.error = line.strip() or job.error
+
+    def _on_proc_finished(self, job_id: str, code: int) -> None:
+        self._on_stdout(job_id)
+        parser = self._parsers.pop(job_id, None)
+        tail = parser.close() if parser else []     # unterminated last line
+        proc = self._procs.pop(job_id, None)
+        if proc is not None:
+            proc.deleteLater()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        self._dispatch(job, tail)
+        job.summary = parser.summary if parser else {}
+        self._append_log(job, f"Return code: {code}")
+        sink = self._sinks.pop(job_id, None)
+        if sink is not None:
+            sink.close()
+        state = job.state if job.state == "cancelled" else ("ok" if code == 0 else "failed")
+        if state == "failed" and not job.error:
+            job.error = f"rc={code}"
+        self._finish(job, state, job.summary)
+
+    def _on_thread_done(self, job_id: str, state: str, payload: object) -> None:
+        self._contexts.pop(job_id, None)
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        if state == "failed":
+            job.error = str(payload)
+            payload = None
+        elif isinstance(payload, dict):
+            job.summary = payload
+        self._finish(job, state, payload)
+
+    def _finish(self, job: Job, state: str, result: Any) -> None:
+        job.state = state
+        job.ended = time.time()
+        if state == "ok":
+            job.status = f"{job.title} done in {job.duration:.1f}s"
+        elif state == "cancelled":
+            job.status = f"{job.title} cancelled"
+        else:
+            job.status = f"{job.title} failed: {job.error}"
+        if self.logger:
+            (self.logger.info if state == "ok" else self.logger.warning)(
+                "%s [%s] %s", job.title, state, job.log_path or job.error or "")
+        cb = self._callbacks.pop(job.id, None)
+        if cb:
+            try:
+                cb(job, result)
+            except Exception as e:
+                if self.logger:
+                    self.logger.exception(f"job callback failed: {e}")
+        self.job_finished.emit(job.id, state)
+        self.history_changed.emit()
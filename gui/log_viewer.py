@@ -0,0 +1,63 @@
+# log_viewer.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Live log pane for a core.log_sink.LogSink. A timer pulls only the lines
+#   added since the last tick from the sink's ring and appends them in one
+#   insert, so verbose tool runs never make the GUI re-read the log file.
+
+from __future__ import annotations
+from typing import Optional
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QPlainTextEdit
+
+POLL_MS = 100
+MAX_BLOCKS = 5000          # lines kept in the widget
+
+class LogViewer(QPlainTextEdit):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(MAX_BLOCKS)
+        self.setPlaceholderText("Tool output appears here while a run is active.")
+        self._sink = None
+        self._seq = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(POLL_MS)
+        self._timer.timeout.connect(self.pull)
+
+    def attach(self, sink, clear: bool = True) -> None:
+        """Follow a new sink (a new run); the previous one is released."""
+        self._sink = sink
+        self._seq = 0
+        if clear:
+            self.clear()
+        self.pull()
+        self._timer.start()
+
+    def detach(self) -> None:
+        """Stop polling after pulling whatever the sink still holds."""
+        self.pull()
+        self._timer.stop()
+        self._sink = None
+
+    def pull(self) -> None:
+        sink: Optional[object] = self._sink
+        if sink is None:
+            return
+        self._seq, lines, dropped = sink.since(self._seq)
+        if not lines and not dropped:
+            return
+        if dropped:
+            lines = [f"... {dropped} lines skipped (see log file) ..."] + lines
+        bar = self.verticalScrollBar()
+        follow = bar.value() >= bar.maximum() - 2          # only autoscroll when already at the bottom
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(("\n" if not self.document().isEmpty() else "") + "\n".join(lines))
+        if follow:
+            bar.setValue(bar.maximum())
@@ -8,29 +8,21 @@
 #   for raw input, prompt formatting, AI response, plan tracking, chat,
 #   and a dedicated Tools tab.
 
-from PyQt6.QtWidgets import QMainWindow, QTabWidget, QApplication, QLabel, QStatusBar, QMenuBar, QMenu, QMessageBox
+from PyQt6.QtWidgets import QMainWindow, QTabWidget, QApplication, QLabel, QStatusBar, QMenuBar, QMenu, QMessageBox, QWidget
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import QTimer, pyqtSignal
 
 from gui.tabs.input_tab import InputTab
-from gui.tabs.prompt_tab import PromptTab
-from gui.tabs.response_tab import ResponseTab
-from gui.tabs.plan_tracker_tab_compat import PlanTrackerTab
-from gui.tabs.chat_tab import ChatTab
-from gui.tabs.tools_tab import ToolsTab
-from gui.tabs.plan_tree_tab import PlanTreeTab  # added Plan (Tree) tab
+from gui.job_manager import JobManager
 
 from core.prompt_formatter import format_prompt
-from core.introspection import generate_introspection_report
-from core.tasks import create_tasks_from_introspection
 from core.project_session import load_project_config, save_session, make_default_session
-from gui.dialogs.project_selector import ProjectSelectorDialog
 from core.logger import get_logger
+from core import startup_profile
 
 import os
-import yaml
+import time
 import datetime
-import subprocess
 import sys
 
 print(f"Interpreter: {sys.executable}")
@@ -46,14 +38,27 @@ class MainWindow(QMainWindow):
       - Plan
       - Chat
       - Tools (external file; preserves previous functionality + new model updater)
+      - Tasks (ticket store browser)
+      - Jobs (background job history; snapshot/introspection/tasks run there)
+
+    Only the Input tab is built up front. The others start as empty
+    placeholders and are constructed (module import included) the first time
+    they are shown or their attribute (self.tools_tab, ...) is used;
+    PA_EAGER_TABS=1 restores building everything in __init__. The project
+    config is loaded on a background job once the window has painted.
     """
+    first_painted = pyqtSignal()
+    project_loaded = pyqtSignal()
+
     def __init__(self, project_session: dict | None = None):
         super().__init__()
         self.logger = getattr(self, "logger", None) or (get_logger("gui") if "get_logger" in globals() else None)
 
         self.setWindowTitle("Persistent Assistant v3")
         self.project_session = project_session or {}
-        self.project_config = load_project_config(self.project_session)
+        # paths straight from the session until the config file is read (_load_project)
+        self.project_config = {k: self.project_session.get(k) for k in ("project_name", "project_root", "plan_path")}
+        self._shown = False
 
         # Status bar
         self.status = QStatusBar(self)
@@ -63,28 +68,134 @@ class MainWindow(QMainWindow):
         # Tabs
         self.tab_widget = QTabWidget()
         self.setCentralWidget(self.tab_widget)
+        self._tab_factories = {}       # attr -> (label, factory) for tabs not built yet
+        self._placeholders = {}        # attr -> placeholder widget in tab_widget
 
-        self.input_tab = InputTab()
-        self.prompt_tab = PromptTab()
-        self.response_tab = ResponseTab(
-            input_tab=self.input_tab,
-            prompt_tab=self.prompt_tab
-        )
-        self.plan_tracker_tab = PlanTrackerTab(plan_path=self.project_config.get("plan_path"))
-        self.chat_tab = ChatTab()
-        self.tools_tab = ToolsTab(controller=self)  # <-- new tools tab
+        self.jobs = JobManager(self, logger=self.logger)
+        self.jobs.job_progress.connect(lambda _jid, text: self._tools_status(text))
 
+        self.input_tab = InputTab()
         self.tab_widget.addTab(self.input_tab, "Input")
-        self.tab_widget.addTab(self.prompt_tab, "Prompt")
-        self.tab_widget.addTab(self.response_tab, "Response")
-        self.tab_widget.addTab(self.plan_tracker_tab, "Plan")
-        self.tab_widget.addTab(self.chat_tab, "Chat")
-        self.tab_widget.addTab(self.tools_tab, "Tools")
+        self._add_lazy_tab("prompt_tab", "Prompt", self._make_prompt_tab)
+        self._add_lazy_tab("response_tab", "Response", self._make_response_tab)
+        self._add_lazy_tab("plan_tracker_tab", "Plan", self._make_plan_tab)
+        self._add_lazy_tab("chat_tab", "Chat", self._make_chat_tab)
+        self._add_lazy_tab("tools_tab", "Tools", self._make_tools_tab)
+        self._add_lazy_tab("tasks_tab", "Tasks", self._make_tasks_tab)
+        self._add_lazy_tab("jobs_tab", "Jobs", self._make_jobs_tab)
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
+        if os.environ.get("PA_EAGER_TABS", "").strip() in ("1", "true", "yes"):
+            for attr in list(self._tab_factories):
+                self._build_tab(attr)
 
         # Menu bar
         self._build_menu()
 
         self.resize(1000, 700)
+        startup_profile.mark("window_built")
+
+    # ------------------------------------------------------------------ #
+    # Lazy tabs
+    # ------------------------------------------------------------------ #
+    def _make_prompt_tab(self):
+        from gui.tabs.prompt_tab import PromptTab
+        return PromptTab()
+
+    def _make_response_tab(self):
+        from gui.tabs.response_tab import ResponseTab
+        return ResponseTab(input_tab=self.input_tab, prompt_tab=self.prompt_tab)
+
+    def _make_plan_tab(self):
+        from gui.tabs.plan_tracker_tab_compat import PlanTrackerTab
+        return PlanTrackerTab(plan_path=self.project_config.get("plan_path"))
+
+    def _make_chat_tab(self):
+        from gui.tabs.chat_tab import ChatTab
+        return ChatTab(response_tab=self.response_tab)
+
+    def _make_tools_tab(self):
+        from gui.tabs.tools_tab import ToolsTab
+        return ToolsTab(controller=self)
+
+    def _make_tasks_tab(self):
+        from gui.tabs.tasks_tab import TasksTab
+        return TasksTab()
+
+    def _make_jobs_tab(self):
+        from gui.tabs.jobs_tab import JobsTab
+        return JobsTab(self.jobs)
+
+    def _add_lazy_tab(self, attr: str, label: str, factory) -> None:
+        ph = QWidget()
+        self._tab_factories[attr] = (label, factory)
+        self._placeholders[attr] = ph
+        self.tab_widget.addTab(ph, label)
+
+    def __getattr__(self, name):
+        # only reached for attributes that don't exist yet: build pending tabs on first use
+        factories = self.__dict__.get("_tab_factories")
+        if factories and name in factories:
+            return self._build_tab(name)
+        raise AttributeError(f"{type(self).__name__!s} has no attribute {name!r}")
+
+    def _tab_built(self, attr: str) -> bool:
+        return attr in self.__dict__
+
+    def _build_tab(self, attr: str):
+        label, factory = self._tab_factories.pop(attr)
+        t = time.perf_counter()
+        widget = factory()
+        setattr(self, attr, widget)
+        ph = self._placeholders.pop(attr)
+        idx = self.tab_widget.indexOf(ph)
+        was_blocked = self.tab_widget.blockSignals(True)
+        current = self.tab_widget.currentIndex()
+        self.tab_widget.removeTab(idx)
+        self.tab_widget.insertTab(idx, widget, label)
+        self.tab_widget.setCurrentIndex(current)
+        self.tab_widget.blockSignals(was_blocked)
+        ph.deleteLater()
+        ms = (time.perf_counter() - t) * 1000.0
+        startup_profile.PROFILE.marks.setdefault(f"tab:{label}", round(ms, 1))
+        if self.logger: self.logger.debug(f"Built {label} tab in {ms:.0f} ms")
+        return widget
+
+    def _on_tab_changed(self, index: int):
+        ph = self.tab_widget.widget(index)
+        for attr, placeholder in list(self._placeholders.items()):
+            if placeholder is ph:
+                self._build_tab(attr)
+                break
+
+    # ------------------------------------------------------------------ #
+    # First paint & deferred loading
+    # ------------------------------------------------------------------ #
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._shown:
+            self._shown = True
+            # queued behind the expose/paint events of the first show
+            QTimer.singleShot(0, self._after_first_paint)
+
+    def _after_first_paint(self):
+        startup_profile.mark("first_paint")
+        self.first_painted.emit()
+        self._load_project()
+
+    def _load_project(self):
+        def done(job, config):
+            if job.state == "ok" and isinstance(config, dict):
+                self.project_config = config
+                if self._tab_built("plan_tracker_tab") and hasattr(self.plan_tracker_tab, "set_plan_path"):
+                    self.plan_tracker_tab.set_plan_path(config.get("plan_path"))
+                self._refresh_status_bar()
+            elif self.logger:
+                self.logger.warning(f"Project config not loaded: {job.error or job.state}")
+            startup_profile.mark("project_loaded")
+            self.project_loaded.emit()
+
+        session = dict(self.project_session)
+        self.jobs.run_callable("Load project", lambda ctx: load_project_config(session), on_done=done)
 
     # ------------------------------------------------------------------ #
     # Status & project switching
@@ -110,8 +221,9 @@ class MainWindow(QMainWindow):
             "project_root": self.project_config.get("project_root", ""),
             "plan_path":    self.project_config.get("plan_path", ""),
         }
-        dlg = ProjectSelectorDialog(defaults, self)
+        from gui.dialogs.project_selector import ProjectSelectorDialog
         from PyQt6.QtWidgets import QDialog
+        dlg = ProjectSelectorDialog(defaults, self)
         if dlg.exec() != QDialog.DialogCode.Accepted:
             return
 
@@ -120,7 +232,8 @@ class MainWindow(QMainWindow):
             save_session(new_session)
             self.project_session = new_session
             self.project_config = load_project_config(self.project_session)
-            self.plan_tracker_tab.set_plan_path(self.project_config.get("plan_path", "project/plans/project_plan_v3.yaml"))
+            if self._tab_built("plan_tracker_tab") and hasattr(self.plan_tracker_tab, "set_plan_path"):
+                self.plan_tracker_tab.set_plan_path(self.project_config.get("plan_path", "project/plans/project_plan_v3.yaml"))
             self._refresh_status_bar()
             QMessageBox.information(self, "Project switched", "Project session saved and configuration reloaded.")
         except Exception as e:
@@ -152,6 +265,7 @@ class MainWindow(QMainWindow):
             "prompt_text": prompt_text,
             "response_text": response_text,
         }
+        import yaml
         yaml_text = yaml.dump(payload, allow_unicode=True, sort_keys=False)
 
         log_dir = os.path.join("data", "interactions")
@@ -166,73 +280,68 @@ class MainWindow(QMainWindow):
             self.response_tab.status_label.setText(f"Saved combined YAML and copied to clipboard: {filepath}")
             QTimer.singleShot(5000, lambda: self.response_tab.status_label.setText(""))
 
+    def _tools_status(self, text: str):
+        # don't build the Tools tab just to show a status line
+        if self._tab_built("tools_tab") and hasattr(self.tools_tab, "set_status"):
+            self.tools_tab.set_status(text)
+        else:
+            self.status.showMessage(text)
+            QTimer.singleShot(10000, lambda: self.status.currentMessage() == text and self._refresh_status_bar())
+
+    def _job_failed(self, job, what: str) -> bool:
+        """Status/log for a non-ok job; True if the caller should stop."""
+        if job.state == "ok":
+            return False
+        if job.state == "cancelled":
+            self._tools_status(f"{what} cancelled.")
+        else:
+            err = f"❌ {what} failed: {job.error}" + (f". See {job.log_path}" if job.log_path else "")
+            self._tools_status(err)
+            if self.logger: self.logger.error(err)
+        return True
+
     def run_structure_snapshot(self):
-        try:
-            if hasattr(self.tools_tab, "set_status"):
-                self.tools_tab.set_status("Running structure snapshot…")
-
-            ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            cmd = [sys.executable, "tools/structure_sync.py"]
-            env = dict(os.environ)
-            env.setdefault("PYTHONIOENCODING", "utf-8")
-
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False, env=env)
-            stdout = (result.stdout or "").strip()
-            stderr = (result.stderr or "").strip()
-
-            os.makedirs("logs", exist_ok=True)
-            run_log_path = os.path.join("logs", f"structure_sync_run_{ts}.log")
-            with open(run_log_path, "w", encoding="utf-8") as f:
-                f.write(f"Command: {cmd}\nReturn code: {result.returncode}\n\n")
-                if stdout:
-                    f.write("---- STDOUT ----\n")
-                    f.write(stdout + "\n\n")
-                if stderr:
-                    f.write("---- STDERR ----\n")
-                    f.write(stderr + "\n")
-
-            if result.returncode == 0:
-                msg = f"Structure snapshot OK. See {run_log_path}"
-                if self.logger: self.logger.info(msg)
-                ui_msg = stdout if stdout else "✅ Snapshot complete."
-                if hasattr(self.tools_tab, "set_status"):
-                    self.tools_tab.set_status(ui_msg)
-            else:
-                msg = f"Structure snapshot FAILED rc={result.returncode}. See {run_log_path}"
-                if self.logger: self.logger.error(msg)
-                if stderr and self.logger: self.logger.error(f"stderr: {stderr}")
-                if hasattr(self.tools_tab, "set_status"):
-                    self.tools_tab.set_status(f"❌ Snapshot failed (rc={result.returncode}). See logs.")
-        except Exception as e:
-            if self.logger: self.logger.exception(f"Exception in run_structure_snapshot: {e}")
-            if hasattr(self.tools_tab, "set_status"):
-                self.tools_tab.set_status(f"❌ Error: {e}. See logs.")
+        """tools/structure_sync.py as a background process job (PROGRESS/SUMMARY on stdout)."""
+        def done(job, summary):
+            if self._job_failed(job, "Snapshot"):
+                return
+            if self.logger: self.logger.info(f"Structure snapshot OK. See {job.log_path}")
+            count = (summary or {}).get("count")
+            self._tools_status(f"✅ Snapshot complete: {count} files." if count is not None else "✅ Snapshot complete.")
+
+        self._tools_status("Running structure snapshot…")
+        self.jobs.run_process("Structure snapshot", ["tools/structure_sync.py"], on_done=done)
 
     def run_introspection_report(self):
-        try:
-            report = generate_introspection_report()
+        def done(job, report):
+            if self._job_failed(job, "Introspection"):
+                return
             issues = report.get("summary", {}).get("files_with_findings", 0)
             total = report.get("summary", {}).get("total_findings", 0)
-            msg = f"Introspection OK: {issues} files with findings, {total} findings. See data/insights/introspection_report.yaml"
-            if hasattr(self.tools_tab, "set_status"):
-                self.tools_tab.set_status(msg)
-        except Exception as e:
-            err = f"Introspection FAILED: {e}"
-            if hasattr(self.tools_tab, "set_status"):
-                self.tools_tab.set_status(err)
-            if self.logger: self.logger.exception(err)
+            self._tools_status(f"Introspection OK: {issues} files with findings, {total} findings. "
+                               f"See data/insights/introspection_report.yaml")
+
+        from core.introspection import generate_introspection_report
+        self.jobs.run_callable("Introspection",
+                               lambda ctx: generate_introspection_report(progress=ctx.progress), on_done=done)
 
     def create_improvement_tasks(self):
-        try:
-            summary = create_tasks_from_introspection()
-            msg = (f"Created {summary['created']} tasks "
+        def done(job, summary):
+            if self._job_failed(job, "Task generation"):
+                return
+            msg = (f"Tasks: {summary['created']} created, {summary.get('updated', 0)} updated, "
+                   f"{summary.get('resolved', 0)} resolved "
                    f"(files affected: {summary['files_affected']}). "
-                   f"Index: {summary['index_path']}")
-            if hasattr(self.tools_tab, "set_status"):
-                self.tools_tab.set_status(msg)
+                   f"Total: {summary.get('total', 0)}. DB: {summary.get('db_path', summary['index_path'])}")
+            self._tools_status(msg)
             if self.logger: self.logger.info(msg)
-        except Exception as e:
-            err = f"❌ Task generation failed: {e}"
-            if hasattr(self.tools_tab, "set_status"):
-                self.tools_tab.set_status(err)
-            if self.logger: self.logger.exception(err)
\ No newline at end of file
+            if self._tab_built("tasks_tab"):
+                self.tasks_tab.refresh()
+
+        from core.tasks import create_tasks_from_introspection
+        self.jobs.run_callable("Task generation",
+                               lambda ctx: create_tasks_from_introspection(progress=ctx.progress), on_done=done)
+
+    def closeEvent(self, event):
+        self.jobs.cancel_all()
+        super().closeEvent(event)
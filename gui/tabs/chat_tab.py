@@ -9,8 +9,11 @@ class ChatTab(QWidget):
     Embedded ChatGPT browser + API send.
     Adds a Role selector (Architect / CodeGen / Reviewer) for API sends.
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, response_tab=None):
         super().__init__(parent)
+        self.response_tab = response_tab    # streamed replies land here when given
+        self._pool = None
+        self._roles = {}                     # request id -> role, for reply titles
         self.init_ui()
 
     def init_ui(self):
@@ -31,6 +34,19 @@ class ChatTab(QWidget):
         self.api_send_btn.clicked.connect(self.on_send_api_clicked)
         hdr.addWidget(self.api_send_btn)
 
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setObjectName("btn_cancel_api")
+        self.cancel_btn.setToolTip("Cancel running API requests")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.on_cancel_clicked)
+        hdr.addWidget(self.cancel_btn)
+
+        self.new_chat_btn = QPushButton("New Chat")
+        self.new_chat_btn.setObjectName("btn_new_chat")
+        self.new_chat_btn.setToolTip("Start a new API conversation (history is kept per session)")
+        self.new_chat_btn.clicked.connect(self.on_new_chat_clicked)
+        hdr.addWidget(self.new_chat_btn)
+
         layout.addLayout(hdr)
 
         self.browser = QWebEngineView()
@@ -50,11 +66,28 @@ class ChatTab(QWidget):
         except Exception:
             pass
 
+    def on_new_chat_clicked(self):
+        self._session = None
+
+    def on_cancel_clicked(self):
+        if self._pool is not None:
+            self._pool.cancel_all()
+
+    def _request_pool(self):
+        if self._pool is None:
+            from gui.workers import AIRequestPool
+            self._pool = AIRequestPool(self)
+            self._pool.delta.connect(self._on_delta)
+            self._pool.finished.connect(self._on_finished)
+            self._pool.failed.connect(self._on_failed)
+            self._pool.cancelled.connect(self._on_cancelled)
+        return self._pool
+
     def on_send_api_clicked(self):
-        """Prompt text, apply Role system preface, send via AIClient."""
+        """Prompt text, apply Role system preface, send via AIClient off the UI thread."""
         try:
-            from core.ai_client import AIClient
             from tools.role_context import get_role_system_text
+            pool = self._request_pool()
         except Exception as e:
             QMessageBox.critical(self, "AI Error", f"Imports failed: {e}")
             return
@@ -65,17 +98,44 @@ class ChatTab(QWidget):
 
         role = self.role_combo.currentText() if hasattr(self, "role_combo") else "Architect"
         system = get_role_system_text(role) or f"You are the {role}."
-        full_prompt = f"[ROLE={role}]\n{system}\n\n{text}"
 
-        try:
-            client = AIClient()  # default openai model per your ai_client
-            res = client.send(full_prompt)
-            msg = res if isinstance(res, str) else str(res)
-            if isinstance(res, dict) and "reply" in res:
-                msg = res["reply"]
-            if len(msg) > 4000: msg = msg[:4000] + "\n... [truncated]"
-            QMessageBox.information(self, f"AI Reply ({role})", msg)
-        except Exception as e:
-            # first line of error for popup (summary) + full str for details
-            first_line = str(e).splitlines()[0] if str(e) else "Unknown error"
-            QMessageBox.critical(self, "AI Error", first_line)
+        if getattr(self, "_session", None) is None:
+            from core.conversation import ConversationSession
+            self._session = ConversationSession.new()
+        # role text goes in the cacheable system prefix, the prompt stays the only varying part
+        req_id = pool.submit(text, provider="openai", system=f"[ROLE={role}]\n{system}", session=self._session)
+        self._roles[req_id] = role
+        self.cancel_btn.setEnabled(True)
+        if self.response_tab is not None:
+            first = text.strip().splitlines()[0]
+            self.response_tab.begin_stream(req_id, f"{role}: {first[:40]}")
+
+    # -- AIRequestPool signals (UI thread) ----------------------------------
+    def _on_delta(self, req_id, text):
+        if self.response_tab is not None:
+            self.response_tab.append_stream(req_id, text)
+
+    def _settle(self, req_id):
+        self.cancel_btn.setEnabled(bool(self._pool and self._pool.active()))
+        return self._roles.pop(req_id, "AI")
+
+    def _on_finished(self, req_id, res):
+        role = self._settle(req_id)
+        if self.response_tab is not None:
+            self.response_tab.end_stream(req_id, "done in %.1fs" % (res.get("time") or 0.0))
+            return
+        msg = str(res.get("reply") or "")
+        if len(msg) > 4000: msg = msg[:4000] + "\n... [truncated]"
+        QMessageBox.information(self, f"AI Reply ({role})", msg)
+
+    def _on_failed(self, req_id, message):
+        self._settle(req_id)
+        if self.response_tab is not None:
+            self.response_tab.end_stream(req_id, "failed")
+        # first line of error for popup (summary)
+        QMessageBox.critical(self, "AI Error", message.splitlines()[0] if message else "Unknown error")
+
+    def _on_cancelled(self, req_id):
+        self._settle(req_id)
+        if self.response_tab is not None:
+            self.response_tab.end_stream(req_id, "cancelled")
@@ -0,0 +1,102 @@
+# gui/tabs/jobs_tab.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Jobs tab: history of background jobs run by gui.job_manager.JobManager
+#   (structure snapshot, introspection, task generation). Shows state,
+#   duration and the latest progress/summary, and cancels running jobs.
+
+from __future__ import annotations
+import datetime
+import json
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+    QLabel, QTextEdit, QSplitter, QAbstractItemView, QHeaderView
+)
+from PyQt6.QtCore import Qt
+
+COLUMNS = ["Job", "State", "Started", "Duration", "Status"]
+
+class JobsTab(QWidget):
+    def __init__(self, jobs, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs
+        self._ids = []
+        self.init_ui()
+        jobs.history_changed.connect(self.refresh)
+        self.refresh()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        bar = QHBoxLayout()
+        self.cancel_btn = QPushButton("Cancel Job")
+        self.cancel_btn.setObjectName("btn_cancel_job")
+        self.cancel_btn.clicked.connect(self.on_cancel_clicked)
+        bar.addWidget(self.cancel_btn)
+        self.clear_btn = QPushButton("Clear Finished")
+        self.clear_btn.clicked.connect(lambda: self.jobs.clear_finished())
+        bar.addWidget(self.clear_btn)
+        bar.addStretch(1)
+        self.count_label = QLabel("")
+        bar.addWidget(self.count_label)
+        layout.addLayout(bar)
+
+        split = QSplitter(Qt.Orientation.Vertical)
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(len(COLUMNS) - 1, QHeaderView.ResizeMode.Stretch)
+        self.table.itemSelectionChanged.connect(self._show_detail)
+        split.addWidget(self.table)
+
+        self.detail = QTextEdit()
+        self.detail.setReadOnly(True)
+        self.detail.setPlaceholderText("Select a job to see its summary and log path.")
+        split.addWidget(self.detail)
+        layout.addWidget(split)
+
+    def _selected_id(self):
+        rows = self.table.selectionModel().selectedRows()
+        return self._ids[rows[0].row()] if rows and rows[0].row() < len(self._ids) else None
+
+    def refresh(self):
+        keep = self._selected_id()
+        history = self.jobs.history()
+        self._ids = [j.id for j in history]
+        self.table.setRowCount(len(history))
+        for r, j in enumerate(history):
+            started = datetime.datetime.fromtimestamp(j.started).strftime("%H:%M:%S")
+            cells = [j.title, j.state, started, f"{j.duration:.1f}s", j.status]
+            for c, text in enumerate(cells):
+                self.table.setItem(r, c, QTableWidgetItem(text))
+        running = sum(1 for j in history if j.running)
+        self.count_label.setText(f"{running} running • {len(history)} in history")
+        if keep in self._ids:
+            self.table.selectRow(self._ids.index(keep))
+        self._show_detail()
+
+    def _show_detail(self):
+        job = self.jobs.get(self._selected_id() or "")
+        self.cancel_btn.setEnabled(bool(job and job.running))
+        if job is None:
+            self.detail.clear()
+            return
+        lines = [f"{job.title} [{job.state}]", job.status]
+        if job.error:
+            lines.append(f"Error: {job.error}")
+        if job.log_path:
+            lines.append(f"Log: {job.log_path}")
+        if job.summary:
+            lines.append(json.dumps(job.summary, indent=2, default=str))
+        self.detail.setPlainText("\n".join(lines))
+
+    def on_cancel_clicked(self):
+        jid = self._selected_id()
+        if jid:
+            self.jobs.cancel(jid)
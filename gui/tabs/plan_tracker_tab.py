@@ -4,19 +4,25 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
     QTableWidgetItem, QTextEdit, QMessageBox, QFileDialog
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QProcess
 import os, subprocess, sys, pathlib, json
 
+MEMORY_LIST = pathlib.Path(__file__).resolve().parents[2] / "tools" / "memory_list.py"
+
+def _parse_summaries(rc, out):
+    try:
+        if rc == 0 and out.strip():
+            return json.loads(out)
+    except Exception:
+        pass
+    return []
+
 # Try to use tools/memory_list.py (works standalone if UI differs upstream)
 def list_summaries_json():
     try:
-        here = pathlib.Path(__file__).resolve().parents[2]  # project root
-        py = sys.executable
-        tool = here / "tools" / "memory_list.py"
-        if tool.exists():
-            p = subprocess.run([py, str(tool), "--as", "json"], capture_output=True, text=True)
-            if p.returncode == 0 and p.stdout.strip():
-                return json.loads(p.stdout)
+        if MEMORY_LIST.exists():
+            p = subprocess.run([sys.executable, str(MEMORY_LIST), "--as", "json"], capture_output=True, text=True)
+            return _parse_summaries(p.returncode, p.stdout)
     except Exception:
         pass
     return []
@@ -28,8 +34,10 @@ class PlanTrackerTab(QWidget):
     """
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._mem_proc = None
         self.init_ui()
-        self.refresh_memory()
+        # start the memory_list.py process once the tab has painted
+        QTimer.singleShot(0, self.refresh_memory)
 
     def init_ui(self):
         lay = QVBoxLayout(self)
@@ -76,7 +84,34 @@ class PlanTrackerTab(QWidget):
         self.btn_open_file.clicked.connect(self.open_selected_file)
 
     def refresh_memory(self):
-        rows = list_summaries_json()
+        """List memory summaries in a QProcess; the table fills in when it finishes."""
+        if self._mem_proc is not None:
+            return                                  # a listing is already on its way
+        if not MEMORY_LIST.exists():
+            self._show_memory([])
+            return
+        proc = self._mem_proc = QProcess(self)
+        proc.setProgram(sys.executable)
+        proc.setArguments([str(MEMORY_LIST), "--as", "json"])
+        proc.finished.connect(lambda code, _status: self._on_memory_listed(code))
+        proc.errorOccurred.connect(self._on_memory_error)
+        self.btn_mem_refresh.setEnabled(False)
+        proc.start()
+
+    def _on_memory_error(self, err):
+        if err == QProcess.ProcessError.FailedToStart:   # no finished() follows
+            self._on_memory_listed(-1)
+
+    def _on_memory_listed(self, code):
+        proc, self._mem_proc = self._mem_proc, None
+        if proc is None:
+            return
+        out = bytes(proc.readAllStandardOutput()).decode("utf-8", errors="replace")
+        proc.deleteLater()
+        self.btn_mem_refresh.setEnabled(True)
+        self._show_memory(_parse_summaries(code, out))
+
+    def _show_memory(self, rows):
         self.tbl.setRowCount(0)
         for r in rows:
             row = self.tbl.rowCount()
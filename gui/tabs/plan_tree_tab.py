@@ -1,11 +1,13 @@
 from __future__ import annotations
-import pathlib, yaml
-from PyQt6.QtCore import Qt
+import pathlib
+from typing import Dict, List
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex, QFileSystemWatcher, QTimer
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QSplitter, QTreeWidget, QTreeWidgetItem,
-    QTextEdit, QLabel
+    QWidget, QVBoxLayout, QSplitter, QTreeView, QTextEdit, QLabel
 )
 
+from core.plan_index import PlanIndex, PlanDiff, ROOT_KEY
+
 ROOT = pathlib.Path(__file__).resolve().parents[2]
 PLAN_PATH = ROOT / "project" / "plans" / "project_plan_v3.yaml"
 
@@ -17,16 +19,188 @@ _STATUS_COLOR = {
     None: "#666",
 }
 
+COLUMNS = ["Item", "Status", "ID"]
+DEBOUNCE_MS = 250          # editors save in bursts; reload once they settle
+
 def _status_color(s: str) -> str:
     return _STATUS_COLOR.get((s or "").strip(), "#666")
 
+class PlanTreeModel(QAbstractItemModel):
+    """
+    Tree model over a core.plan_index.PlanIndex. A node's children are only
+    exposed once the view asks for them (fetchMore), and apply(diff) turns
+    plan edits into dataChanged / rowsInserted / rowsRemoved for the rows
+    that actually changed.
+
+    The structure (rows and parents) is the model's own copy: by the time
+    apply() runs the index already holds the new plan, and the view must keep
+    seeing the old shape until each begin/end pair moves it along.
+    """
+    def __init__(self, index: PlanIndex, parent=None):
+        super().__init__(parent)
+        self._index = index
+        self._rows: Dict[str, List[str]] = {}     # fetched parents only
+        self._parent: Dict[str, str] = {}         # key -> parent, for every row in _rows
+        self._set_rows(ROOT_KEY, list(index.children(ROOT_KEY)))
+        self._ids: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._brushes: Dict[str, object] = {}
+
+    # -- key <-> QModelIndex ------------------------------------------------
+    def _id(self, key: str) -> int:
+        i = self._ids.get(key)
+        if i is None:
+            i = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+        return i
+
+    def key(self, index: QModelIndex) -> str:
+        return self._keys[index.internalId()] if index.isValid() else ROOT_KEY
+
+    def node(self, index: QModelIndex):
+        return self._index.node(self.key(index))
+
+    def index_of(self, key: str, column: int = 0) -> QModelIndex:
+        parent = self._parent.get(key)
+        if parent is None:
+            return QModelIndex()
+        return self.createIndex(self._rows[parent].index(key), column, self._id(key))
+
+    # -- QAbstractItemModel ---------------------------------------------------
+    def index(self, row, column, parent=QModelIndex()):
+        rows = self._rows.get(self.key(parent))
+        if rows is None or not (0 <= row < len(rows)) or not (0 <= column < len(COLUMNS)):
+            return QModelIndex()
+        return self.createIndex(row, column, self._id(rows[row]))
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        return self.index_of(self._parent.get(self.key(index), ROOT_KEY))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() and parent.column() != 0:
+            return 0
+        return len(self._rows.get(self.key(parent), ()))
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        key = self.key(parent)
+        rows = self._rows.get(key)
+        return bool(rows) if rows is not None else bool(self._index.children(key))
+
+    def canFetchMore(self, parent):
+        key = self.key(parent)
+        return key not in self._rows and bool(self._index.children(key))
+
+    def fetchMore(self, parent):
+        key = self.key(parent)
+        kids = list(self._index.children(key))
+        if key in self._rows or not kids:
+            return
+        self.beginInsertRows(parent, 0, len(kids) - 1)
+        self._set_rows(key, kids)
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        n = self.node(index)
+        if n is None:
+            return None
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (n.title, n.status, n.id)[col]
+        if role == Qt.ItemDataRole.ForegroundRole and col == 1:
+            return self._brush(_status_color(n.status))
+        if role == Qt.ItemDataRole.ToolTipRole and col == 0:
+            return n.title
+        return None
+
+    def _brush(self, hex_rgb: str):
+        b = self._brushes.get(hex_rgb)
+        if b is None:
+            from PyQt6.QtGui import QColor, QBrush
+            b = self._brushes[hex_rgb] = QBrush(QColor(hex_rgb))
+        return b
+
+    # -- incremental updates --------------------------------------------------
+    def _set_rows(self, key: str, kids: List[str]) -> None:
+        self._rows[key] = kids
+        for k in kids:
+            self._parent[k] = key
+
+    def _forget(self, key: str) -> None:
+        """Drop a removed row and any fetched state under it."""
+        self._parent.pop(key, None)
+        for child in self._rows.pop(key, ()):
+            self._forget(child)
+
+    def _parent_index(self, key: str):
+        """QModelIndex for a fetched parent that is still shown, else None."""
+        if key not in self._rows:
+            return None                                   # never expanded, or removed above
+        return QModelIndex() if key == ROOT_KEY else self.index_of(key)
+
+    def apply(self, diff: PlanDiff) -> None:
+        # every removal before any insertion, so a key moving between parents
+        # is never shown in two places at once
+        for cd in diff.children:
+            parent = self._parent_index(cd.parent)
+            if parent is None:
+                continue
+            rows = self._rows[cd.parent]
+            if cd.reset:
+                if rows:
+                    self.beginRemoveRows(parent, 0, len(rows) - 1)
+                    for k in rows:
+                        self._forget(k)
+                    rows.clear()
+                    self.endRemoveRows()
+                continue
+            for r in cd.removed:                          # descending
+                self.beginRemoveRows(parent, r, r)
+                self._forget(rows.pop(r))
+                self.endRemoveRows()
+        for cd in diff.children:
+            parent = self._parent_index(cd.parent)
+            if parent is None:
+                continue
+            rows = self._rows[cd.parent]
+            if cd.reset:
+                new = list(self._index.children(cd.parent))
+                if new:
+                    self.beginInsertRows(parent, 0, len(new) - 1)
+                    rows.extend(new)
+                    for k in new:
+                        self._parent[k] = cd.parent
+                    self.endInsertRows()
+                continue
+            for r, k in cd.inserted:                      # ascending
+                self.beginInsertRows(parent, r, r)
+                rows.insert(r, k)
+                self._parent[k] = cd.parent
+                self.endInsertRows()
+        for key in diff.changed:
+            left = self.index_of(key, 0)
+            if left.isValid():
+                self.dataChanged.emit(left, self.index_of(key, len(COLUMNS) - 1))
+
 class PlanTreeTab(QWidget):
-    """Read-only tree/list view of plan phases/steps with a detail pane."""
+    """Read-only tree/list view of plan phases/steps with a detail pane; follows plan edits live."""
     def __init__(self, plan_path: str | None = None, parent=None):
         super().__init__(parent)
         self.plan_path = pathlib.Path(plan_path) if plan_path else PLAN_PATH
+        self.index = PlanIndex(self.plan_path)
+        self.index.reload()
+        self.model = PlanTreeModel(self.index, self)
         self._init_ui()
-        self.refresh()
+        self._init_watcher()
 
     def _init_ui(self):
         layout = QVBoxLayout(self)
@@ -34,10 +208,11 @@ class PlanTreeTab(QWidget):
         layout.addWidget(self.header)
 
         self.split = QSplitter(Qt.Orientation.Horizontal, self)
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Item", "Status", "ID"])
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
         self.tree.setColumnWidth(0, 260)
-        self.tree.itemSelectionChanged.connect(self._on_select)
+        self.tree.selectionModel().currentChanged.connect(lambda cur, _prev: self._on_select(cur))
 
         self.detail = QTextEdit()
         self.detail.setReadOnly(True)
@@ -49,48 +224,55 @@ class PlanTreeTab(QWidget):
 
         layout.addWidget(self.split)
         self.setLayout(layout)
+        self.tree.expandToDepth(0)
+        self._show_error()
+
+    def _init_watcher(self):
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.refresh)
+        self.watcher = QFileSystemWatcher(self)
+        # watch the folder too: atomic saves replace the file and drop the file watch
+        self.watcher.addPaths([str(self.plan_path), str(self.plan_path.parent)])
+        self.watcher.fileChanged.connect(lambda _p: self._debounce.start())
+        self.watcher.directoryChanged.connect(lambda _p: self._debounce.start())
+
+    def set_plan_path(self, plan_path: str):
+        """Switch plans: the only case that rebuilds the whole model."""
+        self.watcher.removePaths(self.watcher.files() + self.watcher.directories())
+        self.plan_path = pathlib.Path(plan_path)
+        self.index = PlanIndex(self.plan_path)
+        self.index.reload()
+        self.model = PlanTreeModel(self.index, self)
+        self.tree.setModel(self.model)
+        self.tree.selectionModel().currentChanged.connect(lambda cur, _prev: self._on_select(cur))
+        self.tree.expandToDepth(0)
+        self.watcher.addPaths([str(self.plan_path), str(self.plan_path.parent)])
+        self._show_error()
 
     def refresh(self):
-        self.tree.clear()
-        d = {}
-        try:
-            with open(self.plan_path, "r", encoding="utf-8") as f:
-                d = yaml.safe_load(f) or {}
-        except Exception as e:
-            self.detail.setPlainText(f"[PlanTree] Failed to load plan: {e}")
-            return
+        """Re-read the plan if it changed on disk and apply only the differences."""
+        if str(self.plan_path) not in self.watcher.files() and self.plan_path.exists():
+            self.watcher.addPath(str(self.plan_path))
+        diff = self.index.reload()
+        if diff:
+            self.model.apply(diff)
+            self._on_select(self.tree.currentIndex())
+        self._show_error()
+
+    def _show_error(self):
+        if self.index.error:
+            self.detail.setPlainText(f"[PlanTree] Failed to load plan: {self.index.error}")
 
-        phases = d.get("phases", [])
-        for ph in phases:
-            pname = ph.get("name") or "Phase"
-            pstatus = ph.get("status") or ""
-            pitem = QTreeWidgetItem([pname, pstatus, ""])
-            pitem.setForeground(1, self._qt_color(_status_color(pstatus)))
-            self.tree.addTopLevelItem(pitem)
-
-            for st in ph.get("steps", []) or []:
-                sid = st.get("id", "")
-                sdesc = st.get("description", f"Step {sid}")
-                sstatus = st.get("status") or ""
-                it = QTreeWidgetItem([sdesc, sstatus, str(sid)])
-                it.setForeground(1, self._qt_color(_status_color(sstatus)))
-                pitem.addChild(it)
-
-        self.tree.expandToDepth(1)
-
-    def _on_select(self):
-        items = self.tree.selectedItems()
-        if not items:
+    def _on_select(self, index: QModelIndex):
+        n = self.model.node(index) if index.isValid() else None
+        if n is None:
             return
-        it = items[0]
-        sid = it.text(2).strip()
-        txt = [f"Title: {it.text(0)}", f"Status: {it.text(1)}"]
-        if sid:
-            txt.append(f"ID: {sid}")
+        txt = [f"Title: {n.title}", f"Status: {n.status}"]
+        if n.id:
+            txt.append(f"ID: {n.id}")
+        if n.detail:
+            txt.append("")
+            txt.append(n.detail)
         self.detail.setPlainText("\n".join(txt))
-
-    @staticmethod
-    def _qt_color(hex_rgb: str):
-        from PyQt6.QtGui import QColor, QBrush
-        c = QColor(hex_rgb)
-        return QBrush(c)
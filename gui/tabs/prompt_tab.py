@@ -2,7 +2,6 @@
 from __future__ import annotations
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit, QPushButton, QMessageBox
 from PyQt6.QtCore import Qt
-from core.ai_client import AIClient
 
 class PromptTab(QWidget):
     """
@@ -55,6 +54,7 @@ class PromptTab(QWidget):
             if not key:
                 QMessageBox.critical(self, "Key Error", "Missing API key for OpenAI.")
                 return
+            from core.ai_client import AIClient     # provider SDKs load on first send, not at startup
             client = AIClient(provider=provider, key=key)
             res = client.send(text, include_memory=True)
             head = (res.get("reply") or "")[:4000]
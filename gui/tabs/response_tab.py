@@ -8,8 +8,8 @@
 #   For now, it uses a non-editable text viewer as a placeholder. Logs interactions automatically on paste.
 
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTextEdit
-from PyQt6.QtWidgets import QPushButton, QFileDialog, QMessageBox
-from PyQt6.QtGui import QClipboard
+from PyQt6.QtWidgets import QPushButton, QFileDialog, QMessageBox, QComboBox
+from PyQt6.QtGui import QClipboard, QTextCursor
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QTimer
 import os
@@ -28,6 +28,7 @@ class ResponseTab(QWidget):
         self.input_tab = input_tab
         self.prompt_tab = prompt_tab
         self.status_label = QLabel("")
+        self._streams = {}          # request id -> text received so far
         self.init_ui()
 
     def init_ui(self):
@@ -39,6 +40,13 @@ class ResponseTab(QWidget):
         self.label = QLabel("AI Response (read-only):")
         layout.addWidget(self.label)
 
+        self.stream_combo = QComboBox()
+        self.stream_combo.setObjectName("stream_selector")
+        self.stream_combo.setToolTip("API requests sent from the Chat tab")
+        self.stream_combo.setVisible(False)
+        self.stream_combo.currentIndexChanged.connect(self._show_selected_stream)
+        layout.addWidget(self.stream_combo)
+
         self.response_view = QTextEdit()
         self.response_view.setReadOnly(True)
         self.response_view.setPlaceholderText("Response from AI model will appear here...")
@@ -81,6 +89,52 @@ class ResponseTab(QWidget):
         """
         self.response_view.setPlainText(text)
 
+    # ------------------------------------------------------------------ #
+    # Streamed API replies (fed by gui.workers.AIRequestPool)
+    # ------------------------------------------------------------------ #
+    def begin_stream(self, req_id: str, title: str):
+        """
+        Starts a new streamed response and shows it.
+
+        Args:
+            req_id (str): Request id from AIRequestPool.
+            title (str): Label for the request selector.
+        """
+        self._streams[req_id] = ""
+        self.stream_combo.setVisible(True)
+        self.stream_combo.addItem(title, req_id)
+        self.stream_combo.setCurrentIndex(self.stream_combo.count() - 1)
+
+    def append_stream(self, req_id: str, text: str):
+        """
+        Appends streamed text. Only the visible request touches the widget, and
+        only at the end of the document, so long replies stay cheap to render.
+        """
+        if req_id not in self._streams:
+            return
+        self._streams[req_id] += text
+        if self.stream_combo.currentData() == req_id:
+            cursor = self.response_view.textCursor()
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text)
+
+    def end_stream(self, req_id: str, status: str = ""):
+        """
+        Marks a streamed response finished and tags its selector entry.
+        """
+        i = self.stream_combo.findData(req_id)
+        if i >= 0 and status:
+            self.stream_combo.setItemText(i, f"{self.stream_combo.itemText(i)} [{status}]")
+        if status and self.stream_combo.currentData() == req_id:
+            self.status_label.setText(status)
+            QTimer.singleShot(4000, lambda: self.status_label.setText(""))
+
+    def _show_selected_stream(self, index: int):
+        req_id = self.stream_combo.itemData(index)
+        if req_id in self._streams:
+            self.response_view.setPlainText(self._streams[req_id])
+            self.response_view.moveCursor(QTextCursor.MoveOperation.End)
+
     def get_response_text(self) -> str:
         """
         Returns the current displayed response.
@@ -0,0 +1,219 @@
+# gui/tabs/tasks_tab.py
+# Persistent Assistant v3
+# Created: 2025-08-18
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Tasks tab: pages through the ticket store (core.ticket_store) with a lazy
+#   table model. Rows are fetched PAGE_SIZE at a time as the view scrolls, so
+#   thousands of tickets open instantly. Filters map straight onto indexed
+#   store queries.
+
+from __future__ import annotations
+import os
+import datetime
+from typing import Any, Dict, List
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView, QComboBox, QLineEdit,
+    QPushButton, QLabel, QTextEdit, QSplitter, QAbstractItemView, QHeaderView
+)
+
+from core.ticket_store import TicketStore
+from core import tasks as task_gen
+
+PAGE_SIZE = 200
+ALL = "(all)"
+
+COLUMNS = [
+    ("status", "Status"),
+    ("issue", "Issue"),
+    ("file_path", "File"),
+    ("symbol", "Symbol"),
+    ("title", "Title"),
+    ("created", "Created"),
+]
+
+class TicketTableModel(QAbstractTableModel):
+    """Table model that pulls tickets from the store one page at a time."""
+    def __init__(self, store: TicketStore, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._rows: List[Dict[str, Any]] = []
+        self._total = 0
+        self._filters: Dict[str, Any] = {}
+
+    # -- filtering --------------------------------------------------------
+    def set_filters(self, **filters) -> None:
+        self.beginResetModel()
+        self._filters = {k: v for k, v in filters.items() if v not in (None, "", ALL)}
+        self._total = self._store.count(**self._filters)
+        self._rows = self._store.query(**self._filters, limit=PAGE_SIZE, offset=0)
+        self.endResetModel()
+
+    def total(self) -> int:
+        return self._total
+
+    def ticket(self, row: int) -> Dict[str, Any] | None:
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    # -- lazy paging ------------------------------------------------------
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and len(self._rows) < self._total
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        page = self._store.query(**self._filters, limit=PAGE_SIZE, offset=len(self._rows))
+        if not page:
+            self._total = len(self._rows)
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    # -- model API --------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        val = self._rows[index.row()].get(COLUMNS[index.column()][0])
+        return "" if val is None else str(val)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section][1]
+        return None
+
+class TasksTab(QWidget):
+    """Browse, filter and triage generated tickets."""
+    def __init__(self, db_path: str | None = None, parent=None):
+        super().__init__(parent)
+        self.store = task_gen.open_store(db_path)
+        self.model = TicketTableModel(self.store, self)
+        self._init_ui()
+        self.refresh()
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+
+        bar = QHBoxLayout()
+        self.status_combo = QComboBox()
+        self.issue_combo = QComboBox()
+        self.label_combo = QComboBox()
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Search title / file / detail…")
+        btn_refresh = QPushButton("Refresh")
+        btn_refresh.clicked.connect(self.refresh)
+        for w, label in ((self.status_combo, "Status"), (self.issue_combo, "Issue"), (self.label_combo, "Label")):
+            bar.addWidget(QLabel(label))
+            bar.addWidget(w)
+            w.currentIndexChanged.connect(self._apply_filters)
+        bar.addWidget(self.search, 1)
+        bar.addWidget(btn_refresh)
+        layout.addLayout(bar)
+
+        # Debounce typing so each keystroke doesn't hit the DB
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self._apply_filters)
+        self.search.textChanged.connect(lambda _t: self._search_timer.start())
+
+        split = QSplitter(Qt.Orientation.Vertical, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.selectionModel().selectionChanged.connect(self._on_select)
+        self.detail = QTextEdit()
+        self.detail.setReadOnly(True)
+        split.addWidget(self.table)
+        split.addWidget(self.detail)
+        split.setStretchFactor(0, 4)
+        split.setStretchFactor(1, 1)
+        layout.addWidget(split)
+
+        actions = QHBoxLayout()
+        self.count_label = QLabel("")
+        actions.addWidget(self.count_label, 1)
+        for text, status in (("Mark done", "done"), ("Reopen", "open"), ("Won't fix", "wontfix")):
+            b = QPushButton(text)
+            b.clicked.connect(lambda _c=False, s=status: self.set_selected_status(s))
+            actions.addWidget(b)
+        btn_export = QPushButton("Export YAML")
+        btn_export.clicked.connect(self.export_yaml)
+        actions.addWidget(btn_export)
+        layout.addLayout(actions)
+
+    @staticmethod
+    def _fill(combo: QComboBox, values: List[str]) -> None:
+        current = combo.currentText()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems([ALL] + [v for v in values if v])
+        i = combo.findText(current)
+        combo.setCurrentIndex(i if i >= 0 else 0)
+        combo.blockSignals(False)
+
+    def refresh(self):
+        self._fill(self.status_combo, self.store.distinct("status"))
+        self._fill(self.issue_combo, self.store.distinct("issue"))
+        self._fill(self.label_combo, self.store.distinct("label"))
+        self._apply_filters()
+
+    def _apply_filters(self, *_):
+        self.model.set_filters(
+            status=self.status_combo.currentText(),
+            issue=self.issue_combo.currentText(),
+            label=self.label_combo.currentText(),
+            search=self.search.text().strip(),
+        )
+        self.count_label.setText(f"{self.model.total()} ticket(s)")
+        self.detail.clear()
+
+    def _selected(self) -> List[Dict[str, Any]]:
+        rows = sorted({i.row() for i in self.table.selectionModel().selectedRows()})
+        return [t for t in (self.model.ticket(r) for r in rows) if t]
+
+    def _on_select(self, *_):
+        sel = self._selected()
+        if not sel:
+            self.detail.clear()
+            return
+        t = sel[0]
+        lines = [f"{k}: {t.get(k)}" for k in ("id", "title", "status", "issue", "file_path", "symbol", "detail", "path")]
+        lines.append("labels: " + ", ".join(t.get("labels") or []))
+        for c in t.get("acceptance_criteria") or []:
+            lines.append(f"  - {c}")
+        self.detail.setPlainText("\n".join(lines))
+
+    def set_selected_status(self, status: str):
+        sel = self._selected()
+        if not sel:
+            return
+        ids = [t["id"] for t in sel]
+        self.store.set_status(ids, status, updated=datetime.datetime.now().isoformat())
+        # keep index.yaml and the ticket files in step for tools that read the YAML
+        self.store.export_yaml(task_gen.INDEX_PATH, ids=ids)
+        self.refresh()
+
+    def export_yaml(self):
+        n = self.store.export_yaml(task_gen.INDEX_PATH)
+        self.count_label.setText(f"{self.model.total()} ticket(s) • exported {n} file(s) to "
+                                 f"{os.path.dirname(task_gen.INDEX_PATH)}")
+
+    def closeEvent(self, ev):
+        try:
+            self.store.close()
+        finally:
+            super().closeEvent(ev)
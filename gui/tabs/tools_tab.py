@@ -10,6 +10,10 @@
 # Update History:
 #   - 2025-08-19 11:55 BST: Switch to QProcess (non-blocking), live PROGRESS parsing,
 #       JSON SUMMARY capture, per-run logs, PYTHONPATH enforcement, status mirrored.
+#   - 2025-08-23 18:30 BST: stdout parsed with the shared core.job_protocol parser
+#       (lines split across reads are no longer dropped).
+#   - 2025-08-23 19:10 BST: run logs go through a buffered core.log_sink.LogSink
+#       (background flush) and stream into a live LogViewer pane.
 # =============================================================================
 
 from __future__ import annotations
@@ -20,7 +24,7 @@ import ast
 import json
 import logging
 import datetime
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, List, Dict, Any
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QMessageBox
@@ -38,6 +42,10 @@ except Exception:
     def load_keys(): return {}
     def mask_key(k): return "MISSING"
 
+from core.job_protocol import LineProtocol, progress_text
+from core.log_sink import LogSink
+from gui.log_viewer import LogViewer
+
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 LOG_DIR = os.path.join(PROJECT_ROOT, "logs")
 
@@ -77,8 +85,8 @@ class ToolsTab(QWidget):
         # QProcess state
         self._proc: Optional[QProcess] = None
         self._run_log_path: str = ""
+        self._sink: Optional[LogSink] = None
         self._last_summary: Dict[str, Any] = {}
-        self._pipeline: List[Tuple[List[str], Dict[str, str], str]] = []  # (cmd, env, label)
         self._current_step_label: str = ""
 
     # ------------------------------ UI setup --------------------------------- #
@@ -126,6 +134,12 @@ class ToolsTab(QWidget):
                                                                          title="Verify tools wiring"))
         row3.addWidget(self.btn_selfcheck)
 
+        self.btn_selfcheck_pipeline = QPushButton("Run Self-Check Pipeline")
+        self.btn_selfcheck_pipeline.setToolTip("All 'self_check' steps from config/pipelines.yaml")
+        self.btn_selfcheck_pipeline.clicked.connect(lambda: self._run_pipeline("self_check",
+                                                                               title="Self-check pipeline"))
+        row3.addWidget(self.btn_selfcheck_pipeline)
+
         self.btn_open_logs = QPushButton("Open Logs Folder")
         self.btn_open_logs.clicked.connect(self._on_open_logs)
         row3.addWidget(self.btn_open_logs)
@@ -139,6 +153,11 @@ class ToolsTab(QWidget):
         self.status_label.setMinimumHeight(36)
         root.addWidget(self.status_label)
 
+        # Live output of the current run (fed from the log sink's ring)
+        self.log_view = LogViewer()
+        self.log_view.setMinimumHeight(120)
+        root.addWidget(self.log_view, 1)
+
         self.setLayout(root)
 
         # Track buttons for enable/disable
@@ -265,7 +284,12 @@ class ToolsTab(QWidget):
         self._proc = QProcess(self)
         self._current_step_label = title
         self._last_summary = {}
+        self._protocol = LineProtocol()
         self._run_log_path = self._make_run_log_path(cmd)
+        self._close_sink()
+        os.makedirs(LOG_DIR, exist_ok=True)
+        self._sink = LogSink(self._run_log_path)
+        self.log_view.attach(self._sink)
 
         env = self._build_env(env_extra)
         # Prepare process
@@ -302,38 +326,35 @@ class ToolsTab(QWidget):
         """
         Write a header with masked keys and target script meta.
         """
-        os.makedirs(LOG_DIR, exist_ok=True)
         keys = load_keys()
         masked = {k: mask_key(v) for k, v in (keys or {}).items()}
+        self._append_log(f"CWD: {PROJECT_ROOT}")
+        self._append_log(f"CMD: {sys.executable} {' '.join(cmd)}")
+        self._append_log(f"ENV_KEYS: {masked}")
+        # Target meta
+        target = os.path.join(PROJECT_ROOT, cmd[0])
         try:
-            with open(self._run_log_path, "w", encoding="utf-8") as f:
-                f.write(f"CWD: {PROJECT_ROOT}\n")
-                f.write(f"CMD: {sys.executable} {' '.join(cmd)}\n")
-                f.write(f"ENV_KEYS: {masked}\n")
-                # Target meta
-                target = os.path.join(PROJECT_ROOT, cmd[0])
-                try:
-                    with open(target, "r", encoding="utf-8") as sf:
-                        src = sf.read()
-                    import ast
-                    line_count = src.count("\n") + 1
-                    fn_count = sum(isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) for n in ast.walk(ast.parse(src)))
-                    f.write(f"META: file={cmd[0]} lines={line_count} functions={fn_count}\n")
-                except Exception:
-                    pass
-                f.write("---- STREAM ----\n")
+            with open(target, "r", encoding="utf-8") as sf:
+                src = sf.read()
+            import ast
+            line_count = src.count("\n") + 1
+            fn_count = sum(isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) for n in ast.walk(ast.parse(src)))
+            self._append_log(f"META: file={cmd[0]} lines={line_count} functions={fn_count}")
         except Exception:
             pass
+        self._append_log("---- STREAM ----")
 
     def _append_log(self, text: str) -> None:
-        """Append a line to the current run log (best-effort)."""
-        try:
-            with open(self._run_log_path, "a", encoding="utf-8") as f:
-                f.write(text)
-                if not text.endswith("\n"):
-                    f.write("\n")
-        except Exception:
-            pass
+        """Queue a line for the current run log; the sink flushes in the background."""
+        if self._sink is not None:
+            self._sink.write(text)
+
+    def _close_sink(self) -> None:
+        """Final flush of the current run log; the viewer keeps what it has shown."""
+        if self._sink is not None:
+            self.log_view.detach()
+            self._sink.close()
+            self._sink = None
 
     def _on_stdout(self) -> None:
         """
@@ -342,26 +363,13 @@ class ToolsTab(QWidget):
         if not self._proc:
             return
         data: QByteArray = self._proc.readAllStandardOutput()
-        chunk = bytes(data).decode("utf-8", errors="replace")
-        for raw_line in chunk.splitlines():
-            line = raw_line.strip()
+        for kind, payload, line in self._protocol.feed(bytes(data)):
             self._append_log(line)
-            if line.startswith("PROGRESS:"):
+            if kind == "progress" and isinstance(payload, dict):
                 # Live progress JSON
-                try:
-                    prog = json.loads(line[len("PROGRESS:"):].strip())
-                    n = prog.get("n"); m = prog.get("m")
-                    ok = prog.get("ok", 0); fail = prog.get("fail", 0)
-                    skipped = prog.get("skipped", 0)
-                    label = prog.get("label", "")
-                    self._emit_status(f"{self._current_step_label}… {n}/{m} • ok:{ok} fail:{fail} skip:{skipped} • {label}")
-                except Exception:
-                    pass
-            elif line.startswith("SUMMARY:"):
-                try:
-                    self._last_summary = json.loads(line[len("SUMMARY:"):].strip())
-                except Exception:
-                    self._last_summary = {}
+                self._emit_status(progress_text(self._current_step_label, payload))
+            elif kind == "summary":
+                self._last_summary = payload if isinstance(payload, dict) else {}
 
     def _on_stderr(self) -> None:
         """
@@ -380,6 +388,11 @@ class ToolsTab(QWidget):
         """
         Handle process completion: re-enable UI, show dialog with parsed SUMMARY (if present).
         """
+        for _kind, _payload, line in self._protocol.close():
+            self._append_log(line)
+        self._last_summary = self._protocol.summary or self._last_summary
+        self._append_log(f"---- EXIT rc={exit_code} ----")
+        self._close_sink()
         title = self._current_step_label or "Tool"
         ok = (exit_code == 0)
         if ok:
@@ -392,35 +405,25 @@ class ToolsTab(QWidget):
             QMessageBox.warning(self, f"{title} – Failed",
                                 f"{json.dumps(msg, indent=2)}\n\nLog:\n{self._run_log_path}")
 
-        # If running a pipeline, continue with next step
-        if self._pipeline:
-            self._start_next_pipeline_step()
-
     # ------------------------------ High-level actions ----------------------- #
     def _on_update_ai_models(self) -> None:
         """
-        Run the 3-step AI models pipeline with live status:
+        Run the 'ai_models' pipeline (config/pipelines.yaml) in one runner process:
           1) fetch_ai_models.py
           2) update_ai_models.py (enrich; emits SUMMARY)
           3) check_ai_models.py ai_models.yaml (final validity)
+          4) compile_catalogue.py (refresh the compiled model catalogue)
+        Per-step PROGRESS lines drive the status label.
         """
-        self._pipeline = [
-            (["tools/fetch_ai_models.py"], {}, "AI Models: fetch (RAW)"),
-            (["tools/update_ai_models.py"], {"PA_ENRICH_DEBUG": "1"}, "AI Models: enrich/merge"),
-            (["tools/check_ai_models.py", "ai_models.yaml"], {}, "AI Models: final check"),
-        ]
-        self._last_summary = {}
-        self._start_next_pipeline_step()
+        self._run_pipeline("ai_models", title="AI Models")
 
-    def _start_next_pipeline_step(self) -> None:
+    def _run_pipeline(self, name: str, title: str) -> None:
         """
-        Start the next pipeline step if present; otherwise clear the queue.
+        Run a named pipeline via tools/pipeline_runner.py: steps execute in warm
+        workers (no interpreter per tool), independent steps in parallel.
         """
-        if not self._pipeline:
-            self._pipeline = []
-            return
-        cmd, envx, label = self._pipeline.pop(0)
-        self._start_process(cmd, title=label, env_extra=envx)
+        self._last_summary = {}
+        self._start_process(["tools/pipeline_runner.py", name], title=title)
 
     def _on_probe_models(self) -> None:
         """
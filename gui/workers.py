@@ -0,0 +1,181 @@
+# workers.py
+# Persistent Assistant v3
+# Created: 2025-08-23
+# Author: G. Rapson
+# Company: GR-Analysis
+# Description:
+#   Off-UI-thread AI requests for the GUI. AIRequestPool runs AIClient.send()
+#   on a QThreadPool, streams partial output back as signals and supports
+#   cancelling individual or all requests. Streamed chunks are buffered per
+#   request and flushed to the UI at most once per frame (~16 ms), so long
+#   generations never flood the event loop. Requests on the same conversation
+#   session run one after another, in submit order.
+
+from __future__ import annotations
+import itertools
+import threading
+from typing import Any, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+FRAME_MS = 16          # flush cadence for streamed text (60 fps)
+MAX_CONCURRENT = 4
+
+class _Signals(QObject):
+    # emitted from worker threads; Qt queues them onto the UI thread
+    done = pyqtSignal(str, dict)
+    error = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+class AIRequest(QRunnable):
+    """One send(); all Qt-facing output goes through the pool's buffer/signals."""
+    def __init__(self, req_id: str, pool: "AIRequestPool", provider: str, prompt: str,
+                 key: Optional[str], model: Optional[str], send_kwargs: Dict[str, Any]):
+        super().__init__()
+        self.req_id = req_id
+        self.provider = provider
+        self.prompt = prompt
+        self.key = key
+        self.model = model
+        self.send_kwargs = send_kwargs
+        self.cancel_event = threading.Event()
+        self._pool = pool
+        self.setAutoDelete(True)
+
+    def run(self) -> None:
+        from core.ai_client import AIClient, RequestCancelled
+        sig = self._pool._signals
+        if self.cancel_event.is_set():
+            sig.cancelled.emit(self.req_id)
+            return
+        try:
+            key = self.key
+            if key is None:
+                from tools._env import load_keys
+                key = load_keys().get(self.provider)
+            client = AIClient(self.provider, key, model=self.model)
+            res = client.send(self.prompt, on_delta=lambda t: self._pool._buffer(self.req_id, t),
+                              cancel=self.cancel_event.is_set, **self.send_kwargs)
+            sig.done.emit(self.req_id, res)
+        except RequestCancelled:
+            sig.cancelled.emit(self.req_id)
+        except Exception as e:
+            sig.error.emit(self.req_id, str(e) or type(e).__name__)
+
+class AIRequestPool(QObject):
+    """
+    Signals (all delivered on the UI thread, keyed by request id):
+      started(id)          request accepted
+      delta(id, text)      new streamed text since the last frame
+      finished(id, dict)   AIClient.send() result
+      failed(id, message)
+      cancelled(id)
+    Any buffered text is flushed before finished/failed/cancelled.
+    """
+    started = pyqtSignal(str)
+    delta = pyqtSignal(str, str)
+    finished = pyqtSignal(str, dict)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+    def __init__(self, parent=None, max_concurrent: int = MAX_CONCURRENT):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_concurrent)
+        self._ids = itertools.count(1)
+        self._active: Dict[str, AIRequest] = {}
+        self._pending: Dict[str, list] = {}
+        self._session_of: Dict[str, str] = {}           # request id -> session id
+        self._waiting: Dict[str, List[AIRequest]] = {}  # session id -> queued behind the running one
+        self._lock = threading.Lock()
+        self._signals = _Signals()
+        self._signals.done.connect(self._on_done)
+        self._signals.error.connect(self._on_error)
+        self._signals.cancelled.connect(self._on_cancelled)
+        self._timer = QTimer(self)
+        self._timer.setInterval(FRAME_MS)
+        self._timer.timeout.connect(self._flush)
+
+    # -- public API -------------------------------------------------------
+    def submit(self, prompt: str, *, provider: str = "openai", key: Optional[str] = None,
+               model: Optional[str] = None, **send_kwargs) -> str:
+        """
+        Queue a send; returns its request id. send_kwargs go to AIClient.send().
+        With session=..., the request waits for earlier ones on that session.
+        """
+        req_id = f"req{next(self._ids)}"
+        job = AIRequest(req_id, self, provider, prompt, key, model, send_kwargs)
+        self._active[req_id] = job
+        self.started.emit(req_id)
+        session = send_kwargs.get("session")
+        sid = session if isinstance(session, str) or session is None else session.id
+        if sid is not None:
+            self._session_of[req_id] = sid
+            if sid in self._waiting:
+                self._waiting[sid].append(job)      # started by _retire of the one ahead
+            else:
+                self._waiting[sid] = []
+                self._pool.start(job)
+        else:
+            self._pool.start(job)
+        if not self._timer.isActive():
+            self._timer.start()
+        return req_id
+
+    def cancel(self, req_id: str) -> bool:
+        """Stop a request: queued ones never call the provider, streaming ones stop at the next chunk."""
+        job = self._active.get(req_id)
+        if job is None:
+            return False
+        job.cancel_event.set()
+        return True
+
+    def cancel_all(self) -> None:
+        for req_id in list(self._active):
+            self.cancel(req_id)
+
+    def active(self) -> list:
+        return list(self._active)
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    # -- worker side --------------------------------------------------------
+    def _buffer(self, req_id: str, text: str) -> None:
+        with self._lock:
+            self._pending.setdefault(req_id, []).append(text)
+
+    # -- UI side ------------------------------------------------------------
+    def _flush(self, only: Optional[str] = None) -> None:
+        with self._lock:
+            if only is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {only: self._pending.pop(only)} if only in self._pending else {}
+        for req_id, parts in batch.items():
+            self.delta.emit(req_id, "".join(parts))
+        if only is None and not self._active:
+            self._timer.stop()
+
+    def _retire(self, req_id: str) -> None:
+        self._flush(req_id)
+        self._active.pop(req_id, None)
+        sid = self._session_of.pop(req_id, None)
+        if sid is not None:
+            queue = self._waiting.get(sid)
+            if queue:
+                self._pool.start(queue.pop(0))      # cancelled ones report straight back
+            else:
+                self._waiting.pop(sid, None)
+
+    def _on_done(self, req_id: str, res: dict) -> None:
+        self._retire(req_id)
+        self.finished.emit(req_id, res)
+
+    def _on_error(self, req_id: str, message: str) -> None:
+        self._retire(req_id)
+        self.failed.emit(req_id, message)
+
+    def _on_cancelled(self, req_id: str) -> None:
+        self._retire(req_id)
+        self.cancelled.emit(req_id)
@@ -5,19 +5,32 @@
 # Company: GR-Analysis
 # Description:
 #   App entry point. Ensures a project session exists before launching main window.
+#   PA_PROFILE_STARTUP=1 writes logs/startup_profile.json once the project has
+#   loaded (=exit also quits then; see tools/profile_startup.py).
 
+from core import startup_profile    # first: its import time is the profile's T0
 import sys
 from PyQt6.QtWidgets import QApplication, QDialog
 from gui.main_window import MainWindow
 from core.project_session import load_session, save_session, make_default_session
-from gui.dialogs.project_selector import ProjectSelectorDialog
+
+def _finish_profile(app):
+    path = startup_profile.PROFILE.save()
+    print(f"Startup profile: {startup_profile.PROFILE.marks} -> {path}")
+    if startup_profile.mode() == "exit":
+        app.quit()
 
 def main():
+    startup_profile.mark("imports")
     app = QApplication(sys.argv)
+    profiling = bool(startup_profile.mode())
 
     # Ensure we have a valid session
     session = load_session()
+    if session is None and profiling:
+        session = make_default_session()        # no dialog in a profiling run
     if session is None:
+        from gui.dialogs.project_selector import ProjectSelectorDialog
         defaults = make_default_session()
         dlg = ProjectSelectorDialog(defaults)
         # PyQt6: use QDialog.DialogCode.Accepted
@@ -26,8 +39,11 @@ def main():
             save_session(session)
         else:
             sys.exit(0)
+    startup_profile.mark("session")
 
     window = MainWindow(project_session=session)
+    if profiling:
+        window.project_loaded.connect(lambda: _finish_profile(app))
     window.show()
     sys.exit(app.exec())
 
@@ -39,6 +39,17 @@ def _load_token() -> str:
     return ''
 
 _PA_TOKEN = _load_token()
+
+def _on_token_file_change(_data) -> None:
+    # token rotation: ConfigStore's poller calls this when phone_approvals.yaml changes
+    global _PA_TOKEN
+    _PA_TOKEN = _load_token()
+
+try:
+    from core.config_store import get_store
+    get_store().subscribe(os.path.join(REPO, 'config', 'phone_approvals.yaml'), _on_token_file_change)
+except Exception:
+    pass
 def _auth_ok(req) -> bool:
     try:
         h = req.headers.get('Authorization', '')
@@ -123,12 +134,32 @@ def agent_ask():
         j = request.get_json(force=True) or {}
         text = str(j.get('text') or '').strip()
         if not text: return ('empty', 400)
+        from core.conversation import ConversationSession, valid_session_id
+        sid = str(j.get('session_id') or '').strip() or ConversationSession.new().id
+        if not valid_session_id(sid): return ('bad session_id', 400)
         ts = int(time.time()); nonce = str(j.get('nonce') or ts)
         os.makedirs(APPROVALS_DIR, exist_ok=True)
         name = 'approve_ask_{0}_{1}.json'.format(ts, nonce)
         open(os.path.join(APPROVALS_DIR, name), 'w', encoding='utf-8').write(json.dumps(
-            {'action':'ASK','text':text,'timestamp':ts,'nonce':nonce,'source':'pwa'}))
-        return jsonify({'ok': True, 'file': name})
+            {'action':'ASK','text':text,'session_id':sid,'timestamp':ts,'nonce':nonce,'source':'pwa'}))
+        return jsonify({'ok': True, 'file': name, 'session_id': sid})
+    except Exception as e:
+        return ('error: %s' % e, 500)
+
+@bp.route('/agent/session', methods=['GET'])
+def agent_session():
+    if not _auth_ok(request): return ('unauthorized', 401)
+    try:
+        from core.conversation import ConversationSession, list_sessions, valid_session_id
+        sid = str(request.args.get('id') or '').strip()
+        if not sid:
+            return jsonify({'ok': True, 'sessions': list_sessions()[:50]})
+        if not valid_session_id(sid): return ('bad session id', 400)
+        s = ConversationSession.load(sid, create=False)
+        return jsonify({'ok': True, 'id': s.id, 'summary': s.summary, 'folded': s.folded,
+                        'messages': s.messages[-50:], 'meta': s.meta})
+    except FileNotFoundError:
+        return ('not found', 404)
     except Exception as e:
         return ('error: %s' % e, 500)
 
@@ -41,6 +41,17 @@ def _load_token() -> str:
     return ''
 
 _PA_TOKEN = _load_token()
+
+def _on_token_file_change(_data) -> None:
+    # token rotation: ConfigStore's poller calls this when phone_approvals.yaml changes
+    global _PA_TOKEN
+    _PA_TOKEN = _load_token()
+
+try:
+    from core.config_store import get_store
+    get_store().subscribe(os.path.join(REPO, 'config', 'phone_approvals.yaml'), _on_token_file_change)
+except Exception:
+    pass
 def _auth_ok(req) -> bool:
     try:
         h = req.headers.get('Authorization','')
@@ -3,7 +3,8 @@ from server.agent_actions_v8 import actions_bp as _pa_actions_bp
 import os, time, json
 from typing import Any
 from flask import Flask, request, jsonify, send_file, make_response
-app = Flask('agent_sidecar')
+app = Flask('agent_sidecar')
+
 try:
     register_extensions(app)
 except Exception:
@@ -42,6 +43,14 @@ def _load_token()->str:
     except Exception: pass
     return ''
 _PA_TOKEN=_load_token()
+def _on_token_file_change(_data)->None:
+    # token rotation: ConfigStore's poller calls this when the config changes
+    global _PA_TOKEN
+    _PA_TOKEN=_load_token()
+try:
+    from core.config_store import get_store
+    get_store().subscribe(CFG,_on_token_file_change)
+except Exception: pass
 def _auth_ok(req)->bool:
     try:
         h=req.headers.get('Authorization','')
@@ -122,11 +131,14 @@ def agent_ask():
     j=request.get_json(force=True) or {}
     text=str(j.get('text') or '').strip()
     if not text: return ('empty',400)
+    from core.conversation import ConversationSession, valid_session_id
+    sid=str(j.get('session_id') or '').strip() or ConversationSession.new().id
+    if not valid_session_id(sid): return ('bad session_id',400)
     ts=int(time.time()); nonce=str(j.get('nonce') or ts)
     os.makedirs(APPROVALS_DIR, exist_ok=True)
     name='approve_ask_{0}_{1}.json'.format(ts,nonce)
-    open(os.path.join(APPROVALS_DIR,name),'w',encoding='utf-8').write(json.dumps({'action':'ASK','text':text,'timestamp':ts,'nonce':nonce,'source':'pwa'}))
-    return jsonify({'ok':True,'file':name})
+    open(os.path.join(APPROVALS_DIR,name),'w',encoding='utf-8').write(json.dumps({'action':'ASK','text':text,'session_id':sid,'timestamp':ts,'nonce':nonce,'source':'pwa'}))
+    return jsonify({'ok':True,'file':name,'session_id':sid})
 @app.route('/agent/choose', methods=['POST'])
 def agent_choose():
     if not _auth_ok(request): return ('unauthorized',401)
@@ -395,10 +407,11 @@ def _append_notes(text):
         if text and not text.endswith('\\n'): text=text+'\\n'
         f.write(text)
 
-def _ai_bridge(text, base=None):
+def _ai_bridge(text, base=None, session_id=None):
     base = base or os.environ.get('PA_AI_BASE','http://127.0.0.1:8765')
     paths = ['/ask','/v1/ask','/chat','/v1/chat']
     data = {'text': text}
+    if session_id: data['session_id'] = session_id
     body = json.dumps(data).encode('utf-8')
     for p in paths:
         url = base.rstrip('/') + p
@@ -441,7 +454,9 @@ def _process_approvals_impl(limit=50):
         if act=='ASK':
             q=str(j.get('text') or '')
             if not q: continue
-            reply=_ai_bridge(q)
+            from core.conversation import valid_session_id
+            sid=str(j.get('session_id') or '').strip()
+            reply=_ai_bridge(q, session_id=sid if valid_session_id(sid) else None)
             ts=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(j.get('timestamp') or time.time()))
             sep='\\n'+'-'*60+'\\n'
             _append_notes(sep+'ASK @ '+ts+'\\nQ: '+q+'\\nA: '+reply+'\\n')
@@ -564,10 +579,38 @@ def _append_notes(text):
     with open(NOTES_PATH,'a',encoding='utf-8') as f:
         if text and not text.endswith('\\n'): text=text+'\\n'
         f.write(text)
-def _ai_bridge(text, base=None):
+def _record_turns(session_id, text, reply):
+    """Fallback path: keep the exchange in the session so the next ASK still has it."""
+    try:
+        from core.conversation import ConversationSession
+        s=ConversationSession.load(session_id)
+        with s.lock():
+            s.sync(); s.add('user', text); s.add('assistant', reply or ''); s.save()
+    except Exception as e:
+        WORKER['last_err']=str(e)
+def _ask_in_session(text, session_id):
+    """ASK with conversation history: AIClient.send(session=...) under the session lock; None if no client."""
+    try:
+        from core.ai_client import AIClient
+        from tools._env import load_keys
+        provider=(os.environ.get('PA_AGENT_PROVIDER') or 'openai').lower()
+        key=load_keys().get(provider)
+        base_url=os.environ.get('PA_AGENT_BASE_URL') or None
+        if not key and not base_url: return None
+        client=AIClient(provider, key or 'mock', model=os.environ.get('PA_AGENT_MODEL') or None, base_url=base_url)
+        if client.client is None: return None
+        return client.send(text, session=session_id).get('reply') or ''
+    except Exception as e:
+        WORKER['last_err']=str(e)
+        return None
+def _ai_bridge(text, base=None, session_id=None):
+    if session_id:
+        reply=_ask_in_session(text, session_id)
+        if reply is not None:
+            return reply
     base = base or os.environ.get('PA_AI_BASE','http://127.0.0.1:8765')
     paths = ['/ask','/v1/ask','/chat','/v1/chat']
-    body = json.dumps({'text':text}).encode('utf-8')
+    body = json.dumps({'text':text,'session_id':session_id} if session_id else {'text':text}).encode('utf-8')
     reply=None; err=''
     for p in paths:
         url = base.rstrip('/') + p
@@ -588,6 +631,8 @@ def _ai_bridge(text, base=None):
             err=str(e); continue
     if reply is None:
         reply='[SIMULATED REPLY] '+(text[:200] if isinstance(text,str) else str(text))
+    if session_id:
+        _record_turns(session_id, text, reply)
     # track usage
     ti=_approx_tokens(text); to=_approx_tokens(reply); cin,cout=_cost_perk()
     WORKER['calls']=WORKER.get('calls',0)+1
@@ -37,6 +37,20 @@ def _next2():
     except Exception as e:
         return _j({"ok": False, "err": str(e)}, 500)
 
+def _metrics():
+    try:
+        from core.metrics import REGISTRY
+        return Response(REGISTRY.render_prometheus(), mimetype="text/plain; version=0.0.4")
+    except Exception as e:
+        return Response(f"# metrics unavailable: {e}\n", mimetype="text/plain", status=500)
+
+def _metrics_json():
+    try:
+        from core.metrics import REGISTRY
+        return _j({"ok": True, **REGISTRY.snapshot()})
+    except Exception as e:
+        return _j({"ok": False, "err": str(e)}, 500)
+
 def register_extensions(app):
     try:
         have = {r.rule for r in app.url_map.iter_rules()}
@@ -47,4 +61,10 @@ def register_extensions(app):
         except Exception: pass
     if "/agent/next2" not in have:
         try: app.add_url_rule("/agent/next2", view_func=_next2, methods=["GET","POST"])
-        except Exception: pass
\ No newline at end of file
+        except Exception: pass
+    if "/metrics" not in have:
+        try: app.add_url_rule("/metrics", view_func=_metrics, methods=["GET"])
+        except Exception: pass
+    if "/metrics.json" not in have:
+        try: app.add_url_rule("/metrics.json", view_func=_metrics_json, methods=["GET"])
+        except Exception: pass
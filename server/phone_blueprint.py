@@ -37,19 +37,22 @@ DEFAULT_CFG = {
     "state_dir": os.path.join("tmp","phone","state"),
 }
 
-def _load_cfg() -> Dict[str, Any]:
-    cfg_path = os.path.join("config", "phone_approvals.yaml")
+def _make_cfg(user_cfg: Any) -> Dict[str, Any]:
     cfg = DEFAULT_CFG.copy()
-    if yaml and os.path.exists(cfg_path):
-        with open(cfg_path, "r", encoding="utf-8") as f:
-            user_cfg = yaml.safe_load(f) or {}
-            if not isinstance(user_cfg, dict):
-                user_cfg = {}
+    if isinstance(user_cfg, dict):
         cfg.update(user_cfg)
     os.makedirs(cfg["approvals_dir"], exist_ok=True)
     os.makedirs(cfg["state_dir"], exist_ok=True)
     return cfg
 
+def _load_cfg() -> Dict[str, Any]:
+    # merged once per version of the file (ConfigStore re-reads it only when it changes)
+    cfg_path = os.path.abspath(os.path.join("config", "phone_approvals.yaml"))
+    if yaml is None:
+        return _make_cfg(None)
+    from core.config_store import get_store
+    return dict(get_store().view(cfg_path, _make_cfg))
+
 class NonceStore:
     def __init__(self, state_dir: str, ttl: int):
         self.path = os.path.join(state_dir, "nonces.json")
@@ -11,19 +11,13 @@ os.makedirs(APPROVALS_DIR, exist_ok=True); os.makedirs(STATE_DIR, exist_ok=True)
 ALLOW = ["127.0.0.1/32","127.0.0.0/8","10.0.0.0/8","172.16.0.0/12","192.168.0.0/16","::1/128","fe80::/10","fc00::/7"]
 TS_SKEW = 300; NONCE_TTL = 900; _lock = threading.Lock()
 def load_token():
+    # env wins; the YAML is cached by ConfigStore and re-read only when it changes (rotation)
     t = os.getenv("PHONE_APPROVALS_TOKEN", "")
+    if t: return t
     try:
-        p = os.path.join(REPO, "config", "phone_approvals.yaml")
-        if os.path.exists(p):
-            for ln in open(p,"r",encoding="utf-8"):
-                s = ln.strip()
-                if s.startswith("token:"):
-                    v = s.split(":",1)[1].strip()
-                    if v[:1] == "\"" and v[-1:] == "\"": v = v[1:-1]
-                    if not t: t = v
-                    break
-    except Exception: pass
-    return t
+        from core.config_store import get_store
+        return str(get_store().get(os.path.join(REPO, "config", "phone_approvals.yaml"), "token", default="")).strip()
+    except Exception: return ""
 def allowed(remote):
     try: ip = ipaddress.ip_address(remote)
     except Exception: return False
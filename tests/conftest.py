@@ -0,0 +1,13 @@
+import pytest
+
+import core.catalogue as catalogue
+import core.cost_engine as cost_engine
+
+
+@pytest.fixture(autouse=True)
+def _cache_paths(tmp_path, monkeypatch):
+    """Price lookups compile the catalogue and calibrate token counts; keep both out of the checkout."""
+    monkeypatch.setattr(catalogue, "SNAPSHOT_PATH", tmp_path / "catalogue" / "catalogue.json")
+    monkeypatch.setattr(catalogue, "_current", None)
+    monkeypatch.setattr(cost_engine, "CALIBRATION_PATH", tmp_path / "insights" / "token_calibration.json")
+    monkeypatch.setattr(cost_engine, "_engine", None)
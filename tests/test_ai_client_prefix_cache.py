@@ -0,0 +1,57 @@
+from types import SimpleNamespace as NS
+
+import pytest
+
+import core.ai_client as ai
+
+
+@pytest.fixture(autouse=True)
+def no_side_effects(monkeypatch):
+    monkeypatch.setenv("PA_METRICS_SNAPSHOT", "0")
+    monkeypatch.setattr(ai, "_maybe_build_memory", lambda n: "- [2025-08-20] memo :: a -> b")
+    monkeypatch.setattr(ai, "_calibrate", lambda *a: None)
+
+
+class FakeAnthropic:
+    def __init__(self):
+        self.calls = []
+        self.messages = self
+
+    def create(self, **kw):
+        self.calls.append(kw)
+        usage = NS(input_tokens=10, output_tokens=5, cache_read_input_tokens=2000, cache_creation_input_tokens=0)
+        return NS(content=[NS(text="hi")], usage=usage)
+
+
+class FakeOpenAI:
+    def __init__(self):
+        self.calls = []
+        self.chat = NS(completions=self)
+
+    def create(self, **kw):
+        self.calls.append(kw)
+        usage = NS(prompt_tokens=1500, completion_tokens=7, prompt_tokens_details=NS(cached_tokens=1024))
+        return NS(choices=[NS(message=NS(content="ok"))], usage=usage)
+
+
+def test_anthropic_prefix_blocks_and_cache_tokens():
+    c = ai.AIClient("anthropic", "k")
+    c.client = FakeAnthropic()
+    res = c.send("question", include_memory=True, system="You are the Architect.")
+    kw = c.client.calls[0]
+    assert kw["messages"] == [{"role": "user", "content": "question"}]
+    assert [b["text"].split("\n")[0] for b in kw["system"]] == ["You are the Architect.", "=== Context (latest) ==="]
+    assert all(b["cache_control"] == {"type": "ephemeral"} for b in kw["system"])
+    assert res["cache_read_tokens"] == 2000 and res["tokens_in"] == 2010
+    assert res["context_used"] is True
+
+
+def test_openai_stable_system_prefix_first():
+    c = ai.AIClient("openai", "k")
+    c.client = FakeOpenAI()
+    r1 = c.send("first", include_memory=True, system="SYS")
+    c.send("second", include_memory=True, system="SYS")
+    m1, m2 = c.client.calls[0]["messages"], c.client.calls[1]["messages"]
+    assert m1[0]["role"] == "system" and m1[0] == m2[0]           # byte-identical prefix
+    assert m1[1] == {"role": "user", "content": "first"}
+    assert r1["cache_read_tokens"] == 1024 and r1["cache_write_tokens"] == 0
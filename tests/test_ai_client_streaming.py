@@ -0,0 +1,96 @@
+from types import SimpleNamespace as NS
+
+import pytest
+
+import core.ai_client as ai
+
+
+@pytest.fixture(autouse=True)
+def no_side_effects(monkeypatch):
+    monkeypatch.setenv("PA_METRICS_SNAPSHOT", "0")
+    monkeypatch.setattr(ai, "_calibrate", lambda *a: None)
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeOpenAI:
+    def __init__(self, words):
+        self.words = words
+        self.calls = []
+        self.chat = NS(completions=self)
+
+    def create(self, **kw):
+        self.calls.append(kw)
+        chunks = [NS(choices=[NS(delta=NS(content=w))], usage=None) for w in self.words]
+        chunks.append(NS(choices=[], usage=NS(prompt_tokens=12, completion_tokens=len(self.words),
+                                              prompt_tokens_details=None)))
+        self.stream = FakeStream(chunks)
+        return self.stream
+
+
+class FakeAnthropic:
+    def __init__(self):
+        self.messages = self
+
+    def create(self, **kw):
+        assert kw["stream"] is True
+        return FakeStream([
+            NS(type="message_start", message=NS(usage=NS(input_tokens=9, cache_read_input_tokens=0,
+                                                         cache_creation_input_tokens=0))),
+            NS(type="content_block_delta", delta=NS(text="he")),
+            NS(type="content_block_delta", delta=NS(text="llo")),
+            NS(type="message_delta", usage=NS(output_tokens=2)),
+        ])
+
+
+def test_openai_stream_deltas_and_usage():
+    c = ai.AIClient("openai", "k")
+    c.client = FakeOpenAI(["Hel", "lo", "!"])
+    seen = []
+    res = c.send("hi", include_memory=False, on_delta=seen.append)
+    assert seen == ["Hel", "lo", "!"] and res["reply"] == "Hello!"
+    assert res["tokens_in"] == 12 and res["tokens_out"] == 3 and res["ttft"] is not None
+    assert c.client.calls[0]["stream"] is True and c.client.stream.closed
+
+
+def test_anthropic_stream_usage_from_events():
+    c = ai.AIClient("anthropic", "k")
+    c.client = FakeAnthropic()
+    res = c.send("hi", include_memory=False, on_delta=lambda t: None)
+    assert res["reply"] == "hello" and res["tokens_in"] == 9 and res["tokens_out"] == 2
+
+
+def test_cancel_stops_stream_and_skips_session(tmp_path):
+    from core.conversation import ConversationSession
+    s = ConversationSession("c1", root=tmp_path)
+    c = ai.AIClient("openai", "k")
+    c.client = FakeOpenAI(["a", "b", "c", "d"])
+    seen = []
+    with pytest.raises(ai.RequestCancelled):
+        c.send("hi", include_memory=False, session=s, on_delta=seen.append, cancel=lambda: len(seen) >= 2)
+    assert seen == ["a", "b"] and c.client.stream.closed
+    assert s.messages == []
+
+
+def test_cancel_is_not_recorded_as_provider_failure(monkeypatch):
+    from core.scheduler import get_scheduler
+    observed = []
+    monkeypatch.setattr(ai, "_observe", lambda *a, **kw: observed.append(kw))
+    c = ai.AIClient("openai", "k")
+    c.client = FakeOpenAI(["a", "b", "c"])
+    breaker = get_scheduler().endpoint("openai", c.model).breaker
+    before = breaker.failures
+    with pytest.raises(ai.RequestCancelled):
+        c.send("hi", include_memory=False, on_delta=lambda t: None, cancel=lambda: True)
+    assert not [kw for kw in observed if kw.get("ok") is False]
+    assert breaker.failures == before and not breaker._trial
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+import core.ai_client as ai
+from core.catalogue import Catalogue
+from core.model_router import ModelRouter, RouteRequest
+
+KEYS = {"openai": "k", "groq": "k"}
+
+
+def _catalogue():
+    rec = lambda p, m, ms: {"provider": p, "model": m, "interface": "chat", "tags": ["chat"],
+                            "pricing": {"in": 1e-7, "out": 1e-7}, "max_tokens": 100000,
+                            "health": {"probe_ok": True, "latency_ms": ms}}
+    return Catalogue({"models": [rec("openai", "cheap", 300), rec("groq", "fast", 250)]})
+
+
+def fake_send(delays, fail=(), stopped=None):
+    def send(self, prompt, *, include_memory=None, system=None, on_delta=None, cancel=None):
+        deadline = time.time() + delays[self.provider]
+        while time.time() < deadline:                   # "streaming": checks cancel per chunk
+            if cancel():
+                if stopped is not None:
+                    stopped.append(self.provider)
+                raise ai.RequestCancelled("request cancelled")
+            time.sleep(0.005)
+        if self.provider in fail:
+            raise RuntimeError("HTTP 503")
+        return {"reply": f"from {self.provider}", "provider": self.provider, "model": self.model,
+                "tokens_in": 1, "tokens_out": 1, "cost": 0.0, "time": delays[self.provider],
+                "context_used": False}
+    return send
+
+
+def test_race_returns_fastest_and_learns(monkeypatch, tmp_path):
+    log = tmp_path / "race.jsonl"
+    r = ModelRouter(_catalogue(), race_log=log)
+    monkeypatch.setattr(ai.AIClient, "send", fake_send({"openai": 0.01, "groq": 0.3}))
+    pair = [("openai", "cheap"), ("groq", "fast")]
+
+    res = ai.AIClient.race("hi", pair, keys=KEYS, router=r)
+    assert res["reply"] == "from openai"
+    assert res["race"]["winner"] == "openai/cheap"
+    assert r.win_share("openai", "cheap") == 1.0 and r.win_share("groq", "fast") == 0.0
+
+    # history survives a restart and tips latency ranking toward the winner
+    again = ModelRouter(_catalogue(), race_log=log)
+    assert again.win_share("openai", "cheap") == 1.0
+    req = RouteRequest(prompt_tokens=100, providers=["openai", "groq"], prefer="latency")
+    assert again.rank(req)[0].model == "cheap"
+
+
+def test_race_skips_failures_and_raises_when_all_fail(monkeypatch):
+    r = ModelRouter(_catalogue())
+    pair = [("openai", "cheap"), ("groq", "fast")]
+    monkeypatch.setattr(ai.AIClient, "send", fake_send({"openai": 0.0, "groq": 0.05}, fail={"openai"}))
+    res = ai.AIClient.race("hi", pair, keys=KEYS, router=r)
+    assert res["provider"] == "groq" and res["race"]["failed"][0]["provider"] == "openai"
+
+    monkeypatch.setattr(ai.AIClient, "send", fake_send({"openai": 0.0, "groq": 0.0}, fail={"openai", "groq"}))
+    with pytest.raises(RuntimeError):
+        ai.AIClient.race("hi", pair, keys=KEYS, router=r)
+    assert r.stats()["openai/cheap"]["error_rate"] > 0
+
+
+def test_race_cancels_the_losers(monkeypatch):
+    r = ModelRouter(_catalogue())
+    stopped = []
+    monkeypatch.setattr(ai.AIClient, "send", fake_send({"openai": 0.0, "groq": 5.0}, stopped=stopped))
+    t0 = time.time()
+    res = ai.AIClient.race("hi", [("openai", "cheap"), ("groq", "fast")], keys=KEYS, router=r)
+    assert res["provider"] == "openai"
+    deadline = time.time() + 2
+    while not stopped and time.time() < deadline:
+        time.sleep(0.01)
+    assert stopped == ["groq"] and time.time() - t0 < 2        # did not run its full 5 s
+    assert r.stats().get("groq/fast", {}).get("error_rate", 0) == 0
@@ -0,0 +1,58 @@
+from tools.archive_store import ArchiveStore, sweep_backups
+
+
+def test_dedup_and_restore(tmp_path):
+    store = ArchiveStore(tmp_path / "arc")
+    a = tmp_path / "a.py"
+    b = tmp_path / "b.py"
+    a.write_text("same\n")
+    b.write_text("same\n")
+    e1 = store.put(a, name="x/a.py")
+    store.put(a, name="x/a.py")            # same version again: no new catalog entry
+    store.put(b, name="x/b.py")            # same bytes, other name: shares the blob
+    assert len(store.versions("x/a.py")) == 1
+    assert store.stats()["blobs"] == 1
+
+    a.write_text("v2\n")
+    e2 = store.put(a, name="x/a.py")
+    assert [v["sha256"] for v in store.versions("x/a.py")] == [e1["sha256"], e2["sha256"]]
+
+    out = store.restore("x/a.py", at=e1["archived"], out=tmp_path / "r1.py")
+    assert out.read_text() == "same\n"
+    assert store.restore("x/a.py", out=tmp_path / "r2.py").read_text() == "v2\n"
+
+    # catalog survives reopening
+    assert len(ArchiveStore(tmp_path / "arc").versions("x/a.py")) == 2
+
+
+def test_sweep_backups(tmp_path):
+    src = tmp_path / "core"
+    src.mkdir()
+    (src / "m.py").write_text("cur\n")
+    (src / "m.py.bak.20250822_133454").write_text("old\n")
+    (src / "m.py.bak_step42").write_text("old\n")
+    store = ArchiveStore(tmp_path / "arc")
+    res = sweep_backups(store, [src], delete=True)
+    assert res == {"archived": 2, "removed": 2}
+    assert sorted(p.name for p in src.iterdir()) == ["m.py"]
+    assert store.stats()["blobs"] == 1
+
+
+def test_resolve_by_time(tmp_path, monkeypatch):
+    import tools.archive_store as mod
+    stamps = iter(["2025-08-22T10:00:00.000001+00:00", "2025-08-22T10:00:00.500000+00:00",
+                   "2025-08-22T12:30:00+00:00"])
+    monkeypatch.setattr(mod, "_now", lambda: next(stamps))
+    store = ArchiveStore(tmp_path / "arc")
+    for text in ("v1", "v2", "v3"):
+        store.put_bytes(text.encode(), "n.py")
+
+    def at(when):
+        return store.read(store.resolve("n.py", when)["sha256"]).decode()
+
+    assert at("2025-08-22T10:00:00.000001+00:00") == "v1"      # exact stamp of an entry
+    assert at("2025-08-22T10:00:00.2") == "v1"
+    assert at("2025-08-22T10:00:00") == "v2"                   # whole second, newest wins
+    assert at("2025-08-22T12:00") == "v2"
+    assert at("2025-08-22") == "v3"                            # whole day
+    assert store.resolve("n.py", "2025-08-21") is None
@@ -0,0 +1,82 @@
+import hashlib
+import os
+
+import pytest
+
+import tools.batch_apply as ba
+
+
+def _sha(b):
+    return hashlib.sha256(b).hexdigest()
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    (root / "pkg").mkdir(parents=True)
+    for n in ("a", "b", "c"):
+        (root / "pkg" / f"{n}.py").write_bytes(f"old {n}\n".encode())
+    return root
+
+
+def _changes(root):
+    return {"label": "t", "changes": [
+        {"path": f"pkg/{n}.py", "content": f"new {n}\n", "expected_sha": _sha(f"old {n}\n".encode())}
+        for n in ("a", "b", "c")
+    ] + [{"path": "pkg/d.py", "content": "fresh\n", "expected_sha": ba.NOT_IN_INVENTORY}]}
+
+
+def test_apply_and_rollback(tree, tmp_path):
+    jd = tmp_path / "journal"
+    res = ba.apply_changeset(_changes(tree), root=tree, manifest_path=None, journal_dir=jd)
+    assert res["ok"] and res["applied"] == 4
+    assert (tree / "pkg" / "b.py").read_text() == "new b\n"
+    assert not [n for n in os.listdir(tree / "pkg") if ".pa_" in n]  # no temp leftovers
+
+    rb = ba.rollback("last", journal_dir=jd)
+    assert rb["ok"] and rb["restored"] == 4
+    assert (tree / "pkg" / "b.py").read_text() == "old b\n"
+    assert not (tree / "pkg" / "d.py").exists()
+
+
+def test_mismatch_writes_nothing(tree, tmp_path):
+    cs = _changes(tree)
+    cs["changes"][2]["expected_sha"] = "0" * 64
+    res = ba.apply_changeset(cs, root=tree, manifest_path=None, journal_dir=tmp_path / "j")
+    assert not res["ok"] and res["failures"][0]["path"] == "pkg/c.py"
+    assert (tree / "pkg" / "a.py").read_text() == "old a\n"
+    assert not (tree / "pkg" / "d.py").exists()
+
+
+def test_failure_mid_commit_rolls_back(tree, tmp_path, monkeypatch):
+    real_replace = os.replace
+    calls = {"n": 0}
+
+    def flaky(src, dst):
+        if ".pa_" in os.path.basename(src):
+            calls["n"] += 1
+            if calls["n"] == 3:
+                raise OSError("disk full")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(ba.os, "replace", flaky)
+    res = ba.apply_changeset(_changes(tree), root=tree, manifest_path=None, journal_dir=tmp_path / "j")
+    assert not res["ok"]
+    for n in ("a", "b", "c"):
+        assert (tree / "pkg" / f"{n}.py").read_text() == f"old {n}\n"
+    assert not (tree / "pkg" / "d.py").exists()
+
+
+def test_backup_failure_leaves_no_temp_files(tree, tmp_path, monkeypatch):
+    real = ba._backup
+
+    def broken(target, stamp):
+        if target.endswith("c.py"):                                 # a.py and b.py already backed up
+            raise OSError("backup dir not writable")
+        return real(target, stamp)
+
+    monkeypatch.setattr(ba, "_backup", broken)
+    res = ba.apply_changeset(_changes(tree), root=tree, manifest_path=None, journal_dir=tmp_path / "j")
+    assert not res["ok"] and "staging failed" in res["error"]
+    assert sorted(os.listdir(tree / "pkg")) == ["a.py", "b.py", "c.py"]  # no temp files, no backups
+    assert (tree / "pkg" / "a.py").read_text() == "old a\n"
@@ -0,0 +1,55 @@
+import yaml
+
+import core.catalogue as cat_mod
+from core.catalogue import Catalogue, compile_catalogue
+
+
+def _write(path, data):
+    path.write_text(yaml.safe_dump(data))
+
+
+def test_compile_merge_and_indexes(tmp_path):
+    raw = tmp_path / "raw.yaml"
+    enr = tmp_path / "enr.yaml"
+    final = tmp_path / "final.yaml"
+    health = tmp_path / "health.yaml"
+    _write(raw, {"providers": {"openai": {"models": {
+        "gpt-x": {"interface": "chat"}, "whisper-1": {"interface": "audio"}}}}})
+    _write(enr, {"openai": {"models": {"gpt-x": {"pricing": {"in": 0.0, "out": 0.0},
+                                                 "capabilities": {"coding": 3}}}}})
+    _write(final, {"providers": {"openai": {"models": {"gpt-x": {"pricing": {"in": 1e-6, "out": 2e-6},
+                                                                 "limits": {"max_tokens": 1000}}}}}})
+    _write(health, {"providers": {"openai": {"models": {"gpt-x": {"probe_ok": True}}}}})
+    sources = [("raw", raw, "providers"), ("enrichment", enr, "flat"),
+               ("catalogue", final, "providers"), ("health", health, "health")]
+    out = tmp_path / "cat.json"
+    snap = compile_catalogue(sources, out_path=out)
+    assert out.exists()
+
+    c = Catalogue(snap)
+    assert c.price("openai", "gpt-x") == (1e-6, 2e-6)        # 0.0 placeholders don't override
+    rec = c.get("openai", "gpt-x")
+    assert rec["max_tokens"] == 1000 and rec["capabilities"]["coding"] == 3
+    assert [r["model"] for r in c.models(capability="coding", healthy_only=True)] == ["gpt-x"]
+    assert "audio" in c.get("openai", "whisper-1")["tags"]
+    legacy = c.as_providers_dict()["providers"]["openai"]["models"]["gpt-x"]
+    assert abs(legacy["input_cost_per_1k"] - 1e-3) < 1e-12
+
+
+def test_get_catalogue_memoized_and_recompiles_when_stale(tmp_path, monkeypatch):
+    src = tmp_path / "final.yaml"
+    _write(src, {"providers": {"groq": {"models": {"m1": {}}}}})
+    monkeypatch.setattr(cat_mod, "SOURCES", [("catalogue", src, "providers")])
+    monkeypatch.setattr(cat_mod, "_current", None)
+    monkeypatch.setattr(cat_mod, "STALE_CHECK_SEC", 0.0)
+    snap_path = tmp_path / "cat.json"
+    monkeypatch.setattr(cat_mod, "compile_catalogue",
+                        lambda out_path=None: compile_catalogue(cat_mod.SOURCES, out_path=out_path))
+
+    c1 = cat_mod.get_catalogue(snapshot_path=snap_path)
+    assert cat_mod.get_catalogue(snapshot_path=snap_path) is c1
+    assert c1.get("groq", "m1") is not None
+
+    _write(src, {"providers": {"groq": {"models": {"m1": {}, "m2": {}}}}})
+    c2 = cat_mod.get_catalogue(snapshot_path=snap_path)
+    assert c2 is not c1 and c2.get("groq", "m2") is not None
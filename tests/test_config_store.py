@@ -0,0 +1,66 @@
+import os
+
+from core.config_store import ConfigStore
+
+
+def _write(p, text, bump=0):
+    p.write_text(text, encoding="utf-8")
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + bump))       # defeat coarse mtimes
+
+
+def test_parsed_once_and_reloaded_on_change(tmp_path):
+    p = tmp_path / "a.yaml"
+    _write(p, "x: 1\nnested: {k: v}\n")
+    store = ConfigStore(tmp_path, check_interval=3600)
+    assert store.get("a.yaml", "nested", "k") == "v"
+    for _ in range(50):
+        store.load("a.yaml")
+    assert store.loads == 1
+
+    _write(p, "x: 2\n", 10**9)
+    assert store.get("a.yaml", "x") == 1                             # inside check_interval
+    store.invalidate("a.yaml")
+    assert store.get("a.yaml", "x") == 2 and store.get("a.yaml", "nested", "k", default="d") == "d"
+
+    fast = ConfigStore(tmp_path, check_interval=0)
+    assert fast.get("a.yaml", "x") == 2
+    _write(p, "x: 3\n", 2 * 10**9)
+    assert fast.get("a.yaml", "x") == 3
+
+
+def test_missing_and_broken_files(tmp_path):
+    store = ConfigStore(tmp_path, check_interval=0)
+    assert store.load("nope.yaml", {"d": 1}) == {"d": 1}
+    p = tmp_path / "b.yaml"
+    _write(p, "ok: true\n")
+    assert store.get(p, "ok") is True
+    _write(p, "ok: [unclosed\n", 10**9)
+    assert store.get(p, "ok") is True                                # last good copy kept
+
+
+def test_views_and_subscribers_follow_changes(tmp_path):
+    p = tmp_path / "tok.yaml"
+    _write(p, "token: one\n")
+    store = ConfigStore(tmp_path, check_interval=3600, watch_interval=3600)
+    built, seen = [], []
+
+    def factory(data):
+        built.append(data)
+        return (data or {}).get("token", "").upper()
+
+    assert store.view("tok.yaml", factory) == "ONE" and store.view("tok.yaml", factory) == "ONE"
+    unsub = store.subscribe("tok.yaml", lambda d: seen.append(d["token"]))
+    assert store.poll() == [] and seen == []
+
+    _write(p, "token: two\n", 10**9)
+    assert store.poll() == [str(p)] and seen == ["two"]
+    assert store.view("tok.yaml", factory) == "TWO" and len(built) == 2
+
+    _write(p, "token: two\n", 2 * 10**9)                             # touched, same content
+    store.poll()
+    unsub()
+    _write(p, "token: three\n", 3 * 10**9)
+    store.poll()
+    assert seen == ["two"]
+    store.close()
@@ -0,0 +1,84 @@
+from types import SimpleNamespace as NS
+
+import pytest
+
+import core.ai_client as ai
+from core.conversation import ConversationSession, list_sessions
+
+
+def test_compaction_keeps_recent_and_starts_on_user(tmp_path):
+    s = ConversationSession("abc", root=tmp_path)
+    for i in range(10):
+        s.add("user", f"question {i}", tokens=100)
+        s.add("assistant", f"answer {i}", tokens=100)
+    folded = s.compact(budget=700, keep_recent=4)
+    assert folded == 14 and s.folded == 14
+    assert s.history_tokens() <= 700 and s.messages[0]["role"] == "user"
+    assert "question 0" in s.summary and "answer 6" in s.summary
+    assert s.compact(budget=700) == 0
+
+    s.save()
+    again = ConversationSession.load("abc", root=tmp_path)
+    assert again.summary == s.summary and len(again.messages) == 6
+    assert list_sessions(tmp_path)[0]["messages"] == 20
+
+
+def test_rejects_path_like_ids(tmp_path):
+    with pytest.raises(ValueError):
+        ConversationSession("../../etc", root=tmp_path)
+
+
+class FakeOpenAI:
+    def __init__(self):
+        self.calls = []
+        self.chat = NS(completions=self)
+
+    def create(self, **kw):
+        self.calls.append(kw)
+        usage = NS(prompt_tokens=50, completion_tokens=5, prompt_tokens_details=None)
+        return NS(choices=[NS(message=NS(content=f"reply {len(self.calls)}"))], usage=usage)
+
+
+def test_send_carries_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("PA_METRICS_SNAPSHOT", "0")
+    monkeypatch.setattr(ai, "_calibrate", lambda *a: None)
+    s = ConversationSession("chat1", root=tmp_path)
+    c = ai.AIClient("openai", "k")
+    c.client = FakeOpenAI()
+    c.send("hello", include_memory=False, session=s)
+    res = c.send("and then?", include_memory=False, session=s)
+    msgs = c.client.calls[1]["messages"]
+    assert [m["role"] for m in msgs] == ["user", "assistant", "user"]
+    assert msgs[1]["content"] == "reply 1" and res["history_messages"] == 2
+    assert len(ConversationSession.load("chat1", root=tmp_path).messages) == 4
+
+
+def test_concurrent_sends_on_one_session_are_serialized(tmp_path, monkeypatch):
+    import threading
+    import time
+    monkeypatch.setenv("PA_METRICS_SNAPSHOT", "0")
+    monkeypatch.setattr(ai, "_calibrate", lambda *a: None)
+
+    class SlowOpenAI(FakeOpenAI):
+        def create(self, **kw):
+            time.sleep(0.05)
+            return super().create(**kw)
+
+    fake = SlowOpenAI()
+    clients = []
+    for _ in range(2):
+        c = ai.AIClient("openai", "k")
+        c.client = fake
+        clients.append(c)
+    # two holders of the same id (e.g. two requests loading it separately)
+    sessions = [ConversationSession("chat2", root=tmp_path) for _ in range(2)]
+    threads = [threading.Thread(target=c.send, args=(f"q{i}",),
+                                kwargs={"include_memory": False, "session": s})
+               for i, (c, s) in enumerate(zip(clients, sessions))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(len(call["messages"]) for call in fake.calls) == [1, 3]
+    saved = ConversationSession.load("chat2", root=tmp_path).messages
+    assert [m["role"] for m in saved] == ["user", "assistant", "user", "assistant"]
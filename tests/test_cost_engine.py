@@ -0,0 +1,66 @@
+import time
+import yaml
+
+from core.catalogue import Catalogue
+from core.cost_engine import RateTable, TokenCounter, daily_report
+
+
+def _table(tmp_path):
+    cat = Catalogue({"models": [
+        {"provider": "openai", "model": "gpt-x", "pricing": {"in": 1e-6, "out": 2e-6}},
+        {"provider": "openai", "model": "unpriced", "pricing": {"in": None, "out": None}},
+    ]})
+    costs = {"anthropic": {"claude-3-5-sonnet-20240620": {"in": 3e-6, "out": 1.5e-5}}}
+    ov = tmp_path / "ov.yaml"
+    ov.write_text(yaml.safe_dump({
+        "openai": {"gpt-x": {"input_cost_per_1k": 0.002, "output_cost_per_1k": None},   # incomplete: ignored
+                   "gpt-y": {"input_cost_per_1k": 0.001, "output_cost_per_1k": 0.004}},
+        "google": {"models": {"gem": {"pricing": {"in": 5e-7, "out": 1e-6}}}},
+    }))
+    return RateTable.compile(cat, costs, ov)
+
+
+def test_compile_sources_and_aliases(tmp_path):
+    t = _table(tmp_path)
+    assert t.rate("openai", "gpt-x") == (1e-6, 2e-6)
+    assert t.rate("openai", "gpt-y") == (1e-6, 4e-6) and t.sources[("openai", "gpt-y")] == "override"
+    assert t.rate("google", "gem") == (5e-7, 1e-6)
+    assert t.key("anthropic", "claude-3.5-sonnet") == ("anthropic", "claude-3-5-sonnet-20240620")
+    assert t.rate("openai", "unpriced") is None
+    assert t.cost("openai", "gpt-x", 1000, 500) == 1000 * 1e-6 + 500 * 2e-6
+
+
+def test_daily_report_batch(tmp_path):
+    t = _table(tmp_path)
+    recs = [
+        {"timestamp": "2025-08-20T10:00:00Z", "provider": "openai", "model": "gpt-x", "tokens_in": "1000", "tokens_out": "1000"},
+        {"timestamp": "2025-08-20T11:00:00Z", "provider": "openai", "model": "gpt-x", "tokens_in": 1000, "tokens_out": 0},
+        {"timestamp": "2025-08-21T09:00:00Z", "provider": "mystery", "model": "m", "tokens_in": 5, "tokens_out": 5},
+    ]
+    rep = daily_report(recs, t)
+    assert rep["records"] == 3 and rep["unpriced"] == ["mystery/m"]
+    assert abs(rep["per_day_usd"]["2025-08-20"] - 0.004) < 1e-12
+    assert rep["days"]["2025-08-20"]["openai/gpt-x"]["calls"] == 2
+    assert daily_report(recs, t, since="2025-08-21")["records"] == 1
+
+
+def test_token_counter_calibrates(tmp_path):
+    c = TokenCounter(tmp_path / "cal.json")
+    before = c.count("x" * 400, "groq")
+    for _ in range(50):
+        c.observe("groq", 400, 200)                             # 2 chars/token in practice
+    assert c.count("x" * 400, "groq") > before
+    c.save()
+    assert TokenCounter(tmp_path / "cal.json").ratio["groq"] < 4.0
+
+
+def test_token_calibration_saved_after_observe(tmp_path):
+    path = tmp_path / "cal.json"
+    c = TokenCounter(path, save_delay=0.05)
+    for _ in range(50):
+        c.observe("groq", 400, 200)
+    deadline = time.time() + 5
+    while c._dirty and time.time() < deadline:
+        time.sleep(0.01)
+    reloaded = TokenCounter(path)
+    assert reloaded.ratio["groq"] == c.ratio["groq"] < 4.0
@@ -0,0 +1,68 @@
+import threading
+
+from tools.http_cache import HttpCache
+
+
+class FakeServer:
+    def __init__(self, body=b"<html>v1</html>", etag='"v1"'):
+        self.body, self.etag = body, etag
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url, headers, timeout):
+        with self.lock:
+            self.calls.append((url, dict(headers)))
+        if headers.get("If-None-Match") == self.etag:
+            return 304, {}, b""
+        return 200, {"etag": self.etag}, self.body
+
+
+def test_conditional_get_and_max_age(tmp_path):
+    srv = FakeServer()
+    c = HttpCache(tmp_path, transport=srv)
+    r1 = c.fetch("https://x/a")
+    assert r1.source == "network" and r1.text == "<html>v1</html>"
+
+    r2 = c.fetch("https://x/a")
+    assert r2.source == "revalidated" and r2.body == r1.body
+    assert srv.calls[-1][1]["If-None-Match"] == '"v1"'
+
+    n = len(srv.calls)
+    assert c.fetch("https://x/a", max_age=60).source == "cache" and len(srv.calls) == n
+
+    srv.body, srv.etag = b"<html>v2</html>", '"v2"'
+    r3 = c.fetch("https://x/a")
+    assert r3.source == "network" and r3.sha256 != r1.sha256
+
+
+def test_fetch_many_offline_and_errors(tmp_path):
+    srv = FakeServer()
+    c = HttpCache(tmp_path, transport=srv)
+    urls = [f"https://x/{i}" for i in range(6)]
+    res = c.fetch_many(urls, workers=4)
+    assert all(r.ok for r in res.values()) and len(srv.calls) == 6
+
+    def down(url, headers, timeout):
+        raise OSError("network down")
+
+    offline = HttpCache(tmp_path, transport=down)
+    assert offline.fetch("https://x/1", offline=True).source == "offline"
+    assert not offline.fetch("https://x/missing", offline=True).ok
+    stale = offline.fetch("https://x/2")
+    assert stale.ok and stale.source == "cache" and "network down" in stale.error
+
+
+def test_parse_cache_keyed_by_body(tmp_path):
+    c = HttpCache(tmp_path, transport=FakeServer())
+    r = c.fetch("https://x/a")
+    calls = []
+
+    def parser(text):
+        calls.append(text)
+        return {"len": len(text)}
+
+    assert c.cached_parse("p", "1", r, parser) == {"len": 15}
+    assert c.cached_parse("p", "1", r, parser) == {"len": 15}
+    assert len(calls) == 1
+    c.cached_parse("p", "2", r, parser)                       # parser version bump re-parses
+    assert len(calls) == 2
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+import yaml
+
+import core.introspection as intro
+import core.tasks as tasks
+
+
+def _entry(path, sha, funcs):
+    return {
+        "path": path,
+        "sha1": sha,
+        "lines_of_code": 20,
+        "header_comment": "# x\n# Persistent Assistant v3\n# Author: a\n# Company: b\n# Description: c",
+        "docstring": "doc",
+        "functions": [{"name": n, "signature": f"{n}()", "doc1line": None} for n in funcs],
+        "classes": [],
+    }
+
+
+def _write_snapshot(path, entries):
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(entries, f)
+
+
+def test_incremental_report_and_ticket_upsert(tmp_path, monkeypatch):
+    snap = tmp_path / "snap.yaml"
+    report = tmp_path / "report.yaml"
+    cache = tmp_path / "cache.json"
+    monkeypatch.setattr(tasks, "TICKETS_DIR", str(tmp_path / "tickets"))
+    monkeypatch.setattr(tasks, "INDEX_PATH", str(tmp_path / "tickets" / "index.yaml"))
+    monkeypatch.setattr(tasks, "DB_PATH", str(tmp_path / "tickets" / "tickets.db"))
+
+    _write_snapshot(snap, [_entry("a.py", "1", ["f", "g"]), _entry("b.py", "2", ["h"])])
+    r1 = intro.generate_introspection_report(str(snap), str(report), str(cache))
+    assert r1["summary"]["files_changed"] == 2
+    s1 = tasks.create_tasks_from_introspection(str(report))
+    assert s1["created"] == 3
+
+    # Unchanged rerun: nothing recomputed, nothing written
+    r2 = intro.generate_introspection_report(str(snap), str(report), str(cache))
+    assert r2["summary"]["files_unchanged"] == 2 and r2["summary"]["files_changed"] == 0
+    s2 = tasks.create_tasks_from_introspection(str(report))
+    assert (s2["created"], s2["updated"], s2["resolved"], s2["files_affected"]) == (0, 0, 0, 0)
+
+    # a.py fixed 'g'; b.py unchanged
+    _write_snapshot(snap, [_entry("a.py", "3", ["f"]), _entry("b.py", "2", ["h"])])
+    r3 = intro.generate_introspection_report(str(snap), str(report), str(cache))
+    assert r3["changes"]["changed"] == ["a.py"]
+    s3 = tasks.create_tasks_from_introspection(str(report))
+    assert s3["created"] == 0 and s3["resolved"] == 1 and s3["files_affected"] == 1
+
+    index = yaml.safe_load(open(tasks.INDEX_PATH, encoding="utf-8"))
+    assert len(index["tasks"]) == 3
+    statuses = {t["symbol"]: t["status"] for t in index["tasks"]}
+    assert statuses == {"f": "open", "g": "resolved", "h": "open"}
+    assert len([n for n in os.listdir(tasks.TICKETS_DIR) if n.startswith("task_")]) == 3
+
+
+@pytest.mark.parametrize("export_yaml", [False, True])
+def test_legacy_task_file_removed_only_after_export(tmp_path, monkeypatch, export_yaml):
+    monkeypatch.setattr(tasks, "TICKETS_DIR", str(tmp_path / "tickets"))
+    monkeypatch.setattr(tasks, "INDEX_PATH", str(tmp_path / "tickets" / "index.yaml"))
+    monkeypatch.setattr(tasks, "DB_PATH", str(tmp_path / "tickets" / "tickets.db"))
+    report = tmp_path / "report.yaml"
+    legacy = tmp_path / "tickets" / "task_20250101_000000.yaml"
+    legacy.parent.mkdir()
+    legacy.write_text("id: old\n", encoding="utf-8")
+    key = tasks.ticket_key("a.py", "missing_header", None)
+    with tasks.open_store() as store:
+        t = tasks._payload(key, "a.py", "missing_header", None, "old detail", "2025-01-01T00:00:00")
+        store.upsert_many([dict(t, path=str(legacy))])
+
+    finding = {"path": "a.py", "issue": "missing_header", "detail": "new detail"}
+    report.write_text(yaml.safe_dump({"findings": [finding]}), encoding="utf-8")
+    assert tasks.create_tasks_from_introspection(str(report), export_yaml=export_yaml)["updated"] == 1
+    names = [n for n in os.listdir(tasks.TICKETS_DIR) if n.startswith("task_")]
+    if export_yaml:
+        assert len(names) == 1 and names != [legacy.name]   # keyed file replaced it
+    else:
+        assert names == [legacy.name]                       # nothing written to replace it
@@ -0,0 +1,47 @@
+import io
+
+import pytest
+
+from core.job_protocol import LineProtocol, emit, progress_text
+from core.tasks import sync_tickets
+from core.ticket_store import TicketStore
+
+
+def test_parser_handles_split_lines_and_bad_json():
+    p = LineProtocol()
+    assert p.feed(b'hello\nPROGRESS: {"n": 1, "m"') == [("text", "hello", "hello")]
+    ev = p.feed(': 4, "label": "a.py"}\nPROGRESS: {broken\n')
+    assert ev[0][0] == "progress" and ev[0][1] == {"n": 1, "m": 4, "label": "a.py"}
+    assert ev[1][0] == "text"
+    assert p.feed('SUMMARY: {"count": 4}') == []
+    assert p.close()[0][:2] == ("summary", {"count": 4})
+    assert p.summary == {"count": 4} and p.last_progress["n"] == 1
+
+
+def test_progress_text_and_emit_roundtrip(capsys):
+    assert progress_text("Snap", {"n": 2, "m": 9, "label": "x"}) == "Snap… 2/9 • x"
+    assert progress_text("Run", {"n": 1, "m": 2, "ok": 1}) == "Run… 1/2 • ok:1 fail:0 skip:0"
+    assert progress_text("Idle", {}) == "Idle…"
+    emit("progress", {"n": 1})
+    assert LineProtocol().feed(capsys.readouterr().out)[0][:2] == ("progress", {"n": 1})
+    buf = io.StringIO()
+    emit("summary", {"ok": True}, stream=buf)
+    assert LineProtocol().feed(buf.getvalue())[0][:2] == ("summary", {"ok": True})
+
+
+def test_sync_tickets_progress_can_abort_before_writes(tmp_path):
+    findings = [{"path": f"f{i}.py", "issue": "missing_header", "detail": "d"} for i in range(3)]
+    with TicketStore(str(tmp_path / "t.db")) as store:
+        seen = []
+
+        def stop_at_two(n, m, path):
+            seen.append((n, m))
+            if n == 2:
+                raise RuntimeError("cancelled")
+
+        with pytest.raises(RuntimeError):
+            sync_tickets(findings, store, str(tmp_path / "tickets"), progress=stop_at_two)
+        assert seen == [(1, 3), (2, 3)] and store.count() == 0
+
+        counts, touched, _, _ = sync_tickets(findings, store, str(tmp_path / "tickets"))
+        assert counts["created"] == 3 and len(touched) == 3
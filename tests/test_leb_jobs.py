@@ -0,0 +1,57 @@
+import sys
+import time
+
+from core.leb_jobs import JobRunner, parse_sse, sse_events
+
+PY = f'"{sys.executable}"'
+
+
+def _py(code: str) -> str:
+    return f'{PY} -c "{code}"'
+
+
+def test_streams_lines_in_order_with_exit_code():
+    runner = JobRunner(max_workers=1)
+    job = runner.submit(_py("import sys; print('a'); print('b'); sys.stderr.write('oops' + chr(10)); sys.exit(3)"))
+    assert job.wait(20)
+    assert job.state == "failed" and job.rc == 3
+    assert job.output("stdout") == "a\nb\n"
+    assert job.output("stderr") == "oops\n"
+    entries, nxt, done = job.read(1)
+    assert done and nxt == 3 and [e[0] for e in entries] == [1, 2]
+    runner.shutdown()
+
+
+def test_pool_is_bounded_and_queued_jobs_cancel():
+    runner = JobRunner(max_workers=1, kill_grace=0.5)
+    first = runner.submit(_py("import time; time.sleep(30)"))
+    second = runner.submit(_py("print(1)"))
+    deadline = time.time() + 10
+    while first.state != "running" and time.time() < deadline:
+        time.sleep(0.01)
+    assert first.state == "running" and second.state == "queued"
+    assert runner.cancel(second.id) and second.state == "cancelled"
+    assert runner.cancel(first.id)
+    assert first.wait(10) and first.state == "cancelled"
+    assert not runner.cancel(first.id)                      # already finished
+    assert {j["id"] for j in runner.list()} == {first.id, second.id}
+    runner.shutdown()
+
+
+def test_timeout_stops_the_process():
+    runner = JobRunner(max_workers=1, kill_grace=0.5)
+    job = runner.submit(_py("import time; time.sleep(30)"), timeout=0.5)
+    assert job.wait(10)
+    assert job.state == "timeout" and "timed out" in job.error
+    runner.shutdown()
+
+
+def test_sse_round_trip_and_resume():
+    runner = JobRunner(max_workers=1)
+    job = runner.submit(_py("print('x'); print('y')"))
+    events = list(parse_sse("".join(sse_events(job, keepalive=0.2)).splitlines()))
+    assert [(e, d) for e, d, _ in events[:-1]] == [("stdout", "x"), ("stdout", "y")]
+    assert events[-1][0] == "exit" and '"state": "ok"' in events[-1][1]
+    resumed = list(parse_sse("".join(sse_events(job, since=1)).splitlines()))
+    assert [(e, d, i) for e, d, i in resumed[:-1]] == [("stdout", "y", "1")]
+    runner.shutdown()
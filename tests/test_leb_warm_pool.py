@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+import core.leb_warm_pool as warm_pool
+from core.leb_jobs import JobRunner
+from core.leb_warm_pool import WarmPool, parse_command
+
+
+def test_parse_command_accepts_only_plain_python_and_pytest():
+    assert parse_command("pytest -q tests")["argv"] == ["pytest", "-q", "tests"]
+    assert parse_command("python -m tools.leb_runner --x") == {
+        "mode": "module", "target": "tools.leb_runner", "argv": ["tools.leb_runner", "--x"]}
+    spec = parse_command("python tools/leb_runner.py -- a")
+    assert spec["mode"] == "script" and spec["argv"][1:] == ["--", "a"]
+    assert parse_command("python ../outside.py") is None          # not a project script
+    assert parse_command("python -u tools/leb_runner.py") is None   # interpreter flags
+    assert parse_command("pytest -q | tee out.txt") is None          # shell syntax
+    assert parse_command("git status") is None
+
+
+@pytest.fixture
+def pool():
+    p = WarmPool(size=1, preload=("yaml",), boot_timeout=30)
+    yield p
+    p.close()
+
+
+def _script(tmp_path, name, body):
+    path = tmp_path / name
+    path.write_text(body, encoding="utf-8")
+    return {"mode": "script", "target": str(path), "argv": [str(path)]}
+
+
+def _run(pool, spec, **kw):
+    lines = []
+    rc, status = pool.run(spec, lambda s, t: lines.append((s, t)), **kw)
+    return rc, status, lines
+
+
+def test_runs_reuse_worker_with_fresh_namespace(pool, tmp_path):
+    (tmp_path / "helper_mod.py").write_text("X = 1\n", encoding="utf-8")
+    spec = _script(tmp_path, "probe.py",
+                   "import os, sys\n"
+                   "print(globals().get('seen', False), 'helper_mod' in sys.modules, os.getpid())\n"
+                   "seen = True\n"
+                   "import helper_mod\n"
+                   "sys.stderr.write('err' + chr(10))\n"
+                   "sys.exit(4)\n")
+    rc1, st1, out1 = _run(pool, spec)
+    rc2, st2, out2 = _run(pool, spec)
+    assert (rc1, st1) == (rc2, st2) == (4, "ok")
+    first, second = ([t for s, t in out if s == "stdout"][0].split() for out in (out1, out2))
+    assert first[:2] == second[:2] == ["False", "False"]
+    assert first[2] == second[2]                                   # same warm interpreter
+    assert ("stderr", "err") in out1
+    assert pool.info()["spawned"] == 1 and pool.info()["warm_runs"] == 2
+
+
+def test_uncaught_exception_recycles_worker(pool, tmp_path):
+    pid = _script(tmp_path, "pid.py", "import os\nprint(os.getpid())\n")
+    boom = _script(tmp_path, "boom.py", "raise RuntimeError('boom')\n")
+    before = _run(pool, pid)[2][0][1]
+    rc, status, lines = _run(pool, boom)
+    assert rc == 1 and any("RuntimeError: boom" in t for s, t in lines if s == "stderr")
+    assert _run(pool, pid)[2][0][1] != before
+
+
+def test_timeout_kills_worker(pool, tmp_path):
+    spec = _script(tmp_path, "slow.py", "import time\ntime.sleep(30)\n")
+    rc, status, _ = _run(pool, spec, timeout=0.5)
+    assert status == "timeout"
+    assert _run(pool, _script(tmp_path, "ok.py", "print('ok')\n"))[:2] == (0, "ok")
+
+
+def test_job_runner_uses_warm_pool(tmp_path, monkeypatch):
+    monkeypatch.setenv("PA_LEB_LOG_DIR", str(tmp_path / "leb"))     # workers inherit it
+    runner = JobRunner(max_workers=1, warm=WarmPool(size=1, preload=()))
+    job = runner.submit("python tools/leb_runner.py")               # prints usage, rc 2
+    assert job.wait(30)
+    assert job.warm and job.rc == 2 and "usage" in job.output("stdout")
+    runner.shutdown()
+    assert (tmp_path / "leb").is_dir()
+
+
+def test_failed_spawns_fall_back_at_once_and_retry(monkeypatch):
+    monkeypatch.setattr(warm_pool, "SPAWN_RETRY", 0.01)
+    attempts = []
+    monkeypatch.setattr(WarmPool, "_spawn", lambda self: attempts.append(1))
+    p = WarmPool(size=1, boot_timeout=30)
+    try:
+        deadline = time.time() + 2
+        while len(attempts) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(attempts) >= 3                                   # keeps trying to refill
+        t0 = time.monotonic()
+        assert p.run({"mode": "module", "target": "x", "argv": ["x"]}, lambda s, t: None) is None
+        assert time.monotonic() - t0 < 1                            # not boot_timeout
+    finally:
+        p.close()
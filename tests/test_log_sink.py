@@ -0,0 +1,40 @@
+import time
+
+from core.log_sink import LogSink
+
+
+def test_buffers_then_flushes_on_close(tmp_path):
+    p = tmp_path / "logs" / "run.log"
+    sink = LogSink(str(p), flush_interval=60, flush_bytes=10**6)
+    for i in range(1000):
+        sink.write(f"line {i}")
+    assert not p.exists()                                   # nothing hit the disk yet
+    sink.close()
+    lines = p.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1000 and lines[-1] == "line 999" and sink.flushes == 1
+    sink.write("late")                                      # ignored after close
+    assert sink.since(0)[0] == 1000
+
+
+def test_size_policy_wakes_flusher(tmp_path):
+    p = tmp_path / "run.log"
+    with LogSink(str(p), flush_interval=60, flush_bytes=100) as sink:
+        sink.write("x" * 200)
+        expected, text = "x" * 200 + "\n", ""
+        deadline = time.time() + 2
+        while text != expected and time.time() < deadline:
+            time.sleep(0.01)
+            text = p.read_text(encoding="utf-8") if p.exists() else ""
+        assert text == expected and sink.flushes == 1      # before close(), by size alone
+
+
+def test_since_reads_ring_and_reports_drops(tmp_path):
+    with LogSink(str(tmp_path / "r.log"), ring_lines=5) as sink:
+        sink.write("a\nb")
+        seq, lines, dropped = sink.since(0)
+        assert (seq, lines, dropped) == (2, ["a", "b"], 0)
+        for i in range(10):
+            sink.write(str(i))
+        seq, lines, dropped = sink.since(seq)
+        assert seq == 12 and lines == ["5", "6", "7", "8", "9"] and dropped == 5
+        assert sink.since(seq) == (12, [], 0)
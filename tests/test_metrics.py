@@ -0,0 +1,43 @@
+import json
+
+from core.metrics import Histogram, MetricsRegistry, SLOT_SEC, WINDOW_SLOTS, _bucket, _bucket_range
+
+
+def test_bucket_ranges_cover_values():
+    for us in (0, 1, 31, 32, 33, 1000, 123456, 10**9):
+        lo, hi = _bucket_range(_bucket(us))
+        assert lo <= us <= hi
+        assert (hi - lo) <= max(1, us // 16)                 # ~3-6% relative width
+
+
+def test_histogram_quantiles():
+    h = Histogram()
+    for ms in range(1, 1001):
+        h.record(ms / 1000.0)
+    assert abs(h.quantile(0.5) - 0.5) < 0.03
+    assert abs(h.quantile(0.99) - 0.99) < 0.05
+    assert h.count_le(0.25) <= 250 and h.count_le(60) == 1000
+
+
+def test_registry_snapshot_window_and_prometheus(tmp_path):
+    now = [1000.0]
+    reg = MetricsRegistry(clock=lambda: now[0])
+    for _ in range(9):
+        reg.observe_call("openai", "m", 0.2, ttft_s=0.05, tokens_in=10, tokens_out=20, cost=0.001)
+    reg.observe_call("openai", "m", 5.0, ok=False, error="HTTP 500")
+
+    rec = reg.snapshot()["series"]["openai/m"]
+    assert rec["calls"] == 10 and rec["errors"] == 1 and rec["error_rate"] == 0.1
+    assert rec["tokens_out"] == 180 and abs(rec["tokens_per_sec"] - 100.0) < 1e-6
+    assert rec["latency_s"]["p99"] > 4.0 and rec["ttft_s"]["p50"] < 0.06
+
+    now[0] += SLOT_SEC * WINDOW_SLOTS                          # window rolls over, totals stay
+    rec = reg.snapshot()["series"]["openai/m"]
+    assert rec["window_calls"] == 0 and rec["latency_s"]["p50"] is None and rec["calls"] == 10
+
+    text = reg.render_prometheus()
+    assert 'pa_ai_calls_total{provider="openai",model="m"} 10' in text
+    assert 'pa_ai_latency_seconds_bucket{provider="openai",model="m",le="+Inf"} 10' in text
+
+    out = reg.write_snapshot(tmp_path / "snap.json")
+    assert json.loads(out.read_text())["series"]["openai/m"]["errors"] == 1
@@ -0,0 +1,71 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import core.ai_client as ai
+from tools.bench_ai_client import percentile
+from tools.mock_provider import MockConfig, MockProviderServer, parse_latency
+
+
+def _post(url, body):
+    req = urllib.request.Request(url, data=json.dumps(body).encode(), method="POST",
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=10) as r:
+        return r.read().decode()
+
+
+def test_wire_shapes_and_streaming():
+    with MockProviderServer(MockConfig(reply_words=3, seed=1)) as srv:
+        j = json.loads(_post(srv.url + "/v1/chat/completions", {"model": "m", "messages": [{"role": "user", "content": "hi"}]}))
+        assert len(j["choices"][0]["message"]["content"].split()) == 3 and j["usage"]["completion_tokens"] == 3
+
+        j = json.loads(_post(srv.url + "/v1/messages", {"model": "m", "system": [{"type": "text", "text": "S"}],
+                                                         "messages": [{"role": "user", "content": "hi"}]}))
+        assert j["content"][0]["type"] == "text" and "cache_read_input_tokens" in j["usage"]
+
+        assert json.loads(_post(srv.url + "/ask", {"text": "q"}))["reply"]
+
+        raw = _post(srv.url + "/openai/v1/chat/completions", {"messages": [], "stream": True})
+        data = [ln[6:] for ln in raw.splitlines() if ln.startswith("data: ")]
+        assert data[-1] == "[DONE]" and len(data) == 5
+        assert srv.stats()["status"]["200"] == 4
+
+
+def test_rate_limit_and_errors():
+    with MockProviderServer(MockConfig(rate_limit=1.0, retry_after=2)) as srv:
+        with pytest.raises(urllib.error.HTTPError) as e:
+            _post(srv.url + "/v1/chat/completions", {"messages": []})
+        assert e.value.code == 429 and e.value.headers["Retry-After"] == "2"
+    with MockProviderServer(MockConfig(error_rate=1.0)) as srv:
+        with pytest.raises(urllib.error.HTTPError) as e:
+            _post(srv.url + "/v1/messages", {"messages": []})
+        assert e.value.code == 500
+
+
+def test_latency_specs_and_percentile():
+    import random
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.25")(rng) == 0.25
+    assert all(0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2 for _ in range(50))
+    with pytest.raises(ValueError):
+        parse_latency("pareto:1")
+    vals = [i / 100 for i in range(1, 101)]
+    assert percentile(vals, 50) == 0.5 and percentile(vals, 99) == 0.99 and percentile([], 50) is None
+
+
+def test_send_many_keeps_order_and_captures_errors(monkeypatch):
+    monkeypatch.setenv("PA_METRICS_SNAPSHOT", "0")
+
+    def fake_send(self, prompt, **kw):
+        if prompt == "bad":
+            raise RuntimeError("HTTP 500")
+        return {"reply": prompt.upper()}
+
+    monkeypatch.setattr(ai.AIClient, "send", fake_send)
+    c = ai.AIClient("openai", "k", base_url="http://127.0.0.1:1/v1")
+    assert c.base_url == "http://127.0.0.1:1/v1"
+    out = c.send_many(["a", "bad", "c"], concurrency=3)
+    assert out[0]["reply"] == "A" and out[2]["reply"] == "C"
+    assert out[1]["error"] == "HTTP 500" and out[1]["prompt_index"] == 1
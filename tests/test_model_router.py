@@ -0,0 +1,68 @@
+import pytest
+
+from core.catalogue import Catalogue
+from core.model_router import ModelRouter, RouteRequest
+
+
+def _rec(provider, model, pin, pout, max_tokens=100000, caps=None, health=None):
+    return {"provider": provider, "model": model, "interface": "chat", "tags": ["chat"],
+            "pricing": {"in": pin, "out": pout}, "max_tokens": max_tokens,
+            "capabilities": caps or {"coding": 3, "reasoning": 3}, "health": health or {}}
+
+
+def _catalogue():
+    return Catalogue({"models": [
+        _rec("openai", "cheap", 1e-7, 2e-7, max_tokens=8000, caps={"coding": 2}),
+        _rec("anthropic", "smart", 3e-6, 1.5e-5, caps={"coding": 5, "reasoning": 5}),
+        _rec("groq", "fast", 5e-7, 8e-7, health={"probe_ok": True, "latency_ms": 200}),
+        _rec("google", "down", 1e-8, 1e-8, health={"probe_ok": False, "category": "permission"}),
+        {"provider": "openai", "model": "whisper-1", "interface": "audio", "tags": ["audio"],
+         "pricing": {"in": 0, "out": 0}},
+    ]})
+
+
+def test_rank_filters_capability_context_and_health():
+    r = ModelRouter(_catalogue())
+    names = [c.model for c in r.rank(RouteRequest(prompt_tokens=100, prefer="cost"))]
+    assert "down" not in names and "whisper-1" not in names
+    assert names[0] == "cheap"
+
+    names = [c.model for c in r.rank(RouteRequest(prompt_tokens=100, capabilities={"coding": 4}))]
+    assert names == ["smart"]
+
+    names = [c.model for c in r.rank(RouteRequest(prompt_tokens=9000))]
+    assert "cheap" not in names                               # context window too small
+
+
+def test_rank_learns_from_latency_and_errors():
+    r = ModelRouter(_catalogue())
+    req = RouteRequest(prompt_tokens=100, providers=["openai", "groq"], prefer="latency")
+    assert r.rank(req)[0].model == "fast"                     # seeded from probe latency
+    for _ in range(5):
+        r.record("groq", "fast", 0.2, ok=False)
+        r.record("openai", "cheap", 0.1, ok=True)
+    assert r.rank(req)[0].model == "cheap"
+    assert r.stats()["groq/fast"]["error_rate"] == 1.0
+
+
+def test_auto_falls_back_and_records(monkeypatch):
+    import core.ai_client as ai
+
+    calls = []
+
+    def fake_send(self, prompt, *, include_memory=None):
+        calls.append(self.provider)
+        if self.provider == "openai":
+            raise RuntimeError("HTTP 503")
+        return {"reply": "ok", "provider": self.provider, "model": self.model,
+                "tokens_in": 1, "tokens_out": 1, "cost": 0.0, "time": 0.01, "context_used": False}
+
+    monkeypatch.setattr(ai.AIClient, "send", fake_send)
+    router = ModelRouter(_catalogue())
+    res = ai.AIClient.auto("hello", keys={"openai": "k", "groq": "k"}, prefer="cost", router=router)
+    assert calls == ["openai", "groq"]
+    assert res["provider"] == "groq" and res["routed"]["failed"][0]["provider"] == "openai"
+    assert router.stats()["openai/cheap"]["error_rate"] == 1.0
+
+    with pytest.raises(RuntimeError):
+        ai.AIClient.auto("hello", keys={}, router=router)
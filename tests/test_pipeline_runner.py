@@ -0,0 +1,58 @@
+import pytest
+
+from tools.pipeline_runner import Step, run_pipeline, validate
+
+
+def _script(tmp_path, name, body):
+    p = tmp_path / f"{name}.py"
+    p.write_text(body)
+    return str(p)
+
+
+@pytest.mark.parametrize("serial", [True, False])
+def test_dag_order_skip_and_summary(tmp_path, serial):
+    ok = _script(tmp_path, "ok", 'import os, json\nprint("SUMMARY: " + json.dumps({"v": os.environ.get("PA_X")}))\n')
+    bad = _script(tmp_path, "bad", "import sys\nsys.exit(3)\n")
+    steps = [
+        Step("a", ok, env={"PA_X": "1"}),
+        Step("b", bad, needs=["a"]),
+        Step("c", ok, needs=["b"]),
+        Step("d", ok),
+        Step("e", bad, allow_fail=True),
+        Step("f", ok, needs=["e"]),
+    ]
+    rep = run_pipeline("t", steps, workers=2, serial=serial)
+    status = {s["name"]: s["status"] for s in rep["steps"]}
+    assert status == {"a": "ok", "b": "fail", "c": "skipped", "d": "ok", "e": "allowed_fail", "f": "ok"}
+    assert rep["steps"][0]["summary"] == {"v": "1"}
+    assert rep["steps"][1]["rc"] == 3
+    assert not rep["ok"]
+
+
+def test_validate_rejects_cycles_and_unknown_needs():
+    with pytest.raises(ValueError):
+        validate([Step("a", "x.py", needs=["b"]), Step("b", "x.py", needs=["a"])])
+    with pytest.raises(ValueError):
+        validate([Step("a", "x.py", needs=["zzz"])])
+
+
+@pytest.mark.parametrize("serial", [True, False])
+def test_steps_in_one_worker_do_not_leak_state(tmp_path, serial):
+    (tmp_path / "leaky_helper.py").write_text("X = 1\n")
+    first = _script(tmp_path, "first", (
+        "import logging, os, sys\n"
+        f"logging.getLogger().addHandler(logging.FileHandler({str(tmp_path / 'first.log')!r}))\n"
+        f"sys.path.insert(0, {str(tmp_path)!r})\n"
+        "import leaky_helper\n"
+        f"os.chdir({str(tmp_path)!r})\n"))
+    second = _script(tmp_path, "second", (
+        "import json, logging, os, sys\n"
+        "print('SUMMARY: ' + json.dumps({'logs': [getattr(h, 'baseFilename', '')\n"
+        "    for h in logging.getLogger().handlers], 'helper': 'leaky_helper' in sys.modules,\n"
+        f"    'path': {str(tmp_path)!r} in sys.path, 'cwd': os.getcwd() == {str(tmp_path)!r}}}))\n"))
+    rep = run_pipeline("t", [Step("first", first), Step("second", second, needs=["first"])],
+                       workers=1, serial=serial)
+    assert rep["ok"]
+    seen = rep["steps"][1]["summary"]
+    assert str(tmp_path / "first.log") not in seen.pop("logs")
+    assert seen == {"helper": False, "path": False, "cwd": False}
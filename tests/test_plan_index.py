@@ -0,0 +1,58 @@
+import os
+
+import yaml
+
+from core.plan_index import ROOT_KEY, PlanIndex, diff_children
+
+
+def _plan(steps_a, status="planned"):
+    return {"phases": [
+        {"name": "A", "steps": [{"id": s, "status": status if s == "1.1" else "planned",
+                                 "description": f"step {s}", "items": [{"title": "x", "status": "done"}]}
+                                for s in steps_a]},
+        {"name": "B", "steps": [{"id": "2.1", "description": "b"}]},
+    ]}
+
+
+def _write(path, doc, bump):
+    path.write_text(yaml.safe_dump(doc), encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))       # defeat coarse mtimes
+
+
+def test_reload_is_cached_and_diffs_are_fine_grained(tmp_path):
+    p = tmp_path / "plan.yaml"
+    _write(p, _plan(["1.1", "1.2"]), 0)
+    ix = PlanIndex(p)
+    first = ix.reload()
+    assert [c.inserted for c in first.children] == [[(0, "phase:A"), (1, "phase:B")]]
+    assert ix.children("phase:A") == ["step:1.1", "step:1.2"]
+    assert ix.node("step:1.1/item:0").status == "done"
+    assert not ix.reload()                                            # stat unchanged: no parse
+
+    _write(p, _plan(["1.1", "1.15", "1.2"], status="done"), 10**9)
+    d = ix.reload()
+    assert d.changed == ["step:1.1"]
+    assert [(c.parent, c.removed, c.inserted) for c in d.children] == [("phase:A", [], [(1, "step:1.15")])]
+
+
+def test_bad_yaml_keeps_last_good_plan(tmp_path):
+    p = tmp_path / "plan.yaml"
+    _write(p, _plan(["1.1"]), 0)
+    ix = PlanIndex(p)
+    ix.reload()
+    p.write_text("phases: [unclosed", encoding="utf-8")
+    assert not ix.reload() and ix.error
+    assert ix.find("1.1") is not None
+
+
+def test_child_ops_replay_to_new_order():
+    old, new = ["a", "b", "c", "d"], ["a", "x", "c", "y", "d"]
+    cd = diff_children(ROOT_KEY, old, new)
+    rows = list(old)
+    for r in cd.removed:
+        rows.pop(r)
+    for r, k in cd.inserted:
+        rows.insert(r, k)
+    assert rows == new and not cd.reset
+    assert diff_children(ROOT_KEY, ["a", "b"], ["b", "a"]).reset
@@ -0,0 +1,53 @@
+import importlib
+import sys
+import types
+
+import core.providers as providers
+
+SDKS = {"openai", "anthropic", "google", "groq"}
+
+
+def test_ai_client_import_loads_no_sdk_until_a_client_is_made(monkeypatch):
+    attempted = []
+
+    class Spy:
+        def find_spec(self, name, path=None, target=None):
+            attempted.append(name)
+            return None
+
+    for k in list(sys.modules):
+        if k == "core.ai_client" or k.startswith("core.providers") or k.split(".")[0] in SDKS:
+            monkeypatch.delitem(sys.modules, k)
+    monkeypatch.setattr(sys, "meta_path", [Spy()] + sys.meta_path)
+
+    ai = importlib.import_module("core.ai_client")
+    assert ai.COSTS["openai"] and not [n for n in attempted if n.split(".")[0] in SDKS]
+    assert "core.providers.groq_adapter" not in attempted
+
+    ai.AIClient("groq", "k")
+    assert "groq" in attempted and "core.providers.groq_adapter" in attempted
+    assert not {"openai", "anthropic", "google"} & set(attempted)
+    assert sys.modules["core.providers"].loaded() == ["groq"]
+
+
+def test_registered_adapter_handles_dispatch(monkeypatch):
+    monkeypatch.setenv("PA_METRICS_SNAPSHOT", "0")
+    fake = types.ModuleType("fake_adapter")
+    fake.make_client = lambda key, model, base_url=None: object()
+
+    def dispatch(client, model, prompt, prefix, history, usage, on_delta=None, cancel=None):
+        usage.update({"in": 7, "out": 2})
+        return f"{model}:{prompt}"
+    fake.dispatch = dispatch
+
+    monkeypatch.setitem(sys.modules, "fake_adapter", fake)
+    monkeypatch.setattr(providers, "ADAPTERS", dict(providers.ADAPTERS))
+    monkeypatch.setattr(providers, "_loaded", {})
+    providers.register("openai", "fake_adapter")
+
+    import core.ai_client as ai
+    monkeypatch.setattr(ai, "get_adapter", providers.get_adapter)
+    monkeypatch.setattr(ai, "_calibrate", lambda *a: None)
+    res = ai.AIClient("openai", "k").send("hi", include_memory=False)
+    assert res["reply"] == "gpt-4o-mini:hi" and res["tokens_in"] == 7 and res["tokens_out"] == 2
+    assert providers.get_adapter("deepseek") is None
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from core.scheduler import CircuitOpenError, Scheduler, TokenBucket, classify, retry_after
+
+
+class FakeTime:
+    def __init__(self):
+        self.t = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.t
+
+    def sleep(self, d):
+        self.sleeps.append(d)
+        self.t += d
+
+
+class HTTPErr(Exception):
+    def __init__(self, status, msg="", retry=None):
+        super().__init__(msg or f"HTTP {status}")
+        self.status_code = status
+        if retry is not None:
+            self.retry_after = retry
+
+
+def _sched(ft, **cfg):
+    base = {"defaults": {"rpm": 600, "burst_sec": 1, "max_retries": 3, "base_delay": 0.5,
+                         "max_delay": 8, "breaker": {"failures": 3, "cooldown_sec": 10}, **cfg}}
+    return Scheduler(base, clock=ft.clock, sleep=ft.sleep, rng=random.Random(1))
+
+
+def test_classify_and_retry_after():
+    assert classify(HTTPErr(429)) == (True, True)
+    assert classify(HTTPErr(503)) == (True, False)
+    assert classify(HTTPErr(401)) == (False, False)
+    assert classify(TimeoutError("read timed out")) == (True, False)
+    assert classify(RuntimeError("Error code: 429 - rate limit")) == (True, True)
+    assert retry_after(HTTPErr(429, retry=7)) == 7.0
+    assert retry_after(RuntimeError("please retry after 3 seconds")) == 3.0
+
+
+def test_token_bucket_paces_and_adapts():
+    ft = FakeTime()
+    b = TokenBucket(60, burst_sec=2, clock=ft.clock)          # 1/s, burst of 2
+    assert b.reserve() == 0 and b.reserve() == 0
+    assert abs(b.reserve() - 1.0) < 1e-9
+    b.throttle()
+    assert b.rate == pytest.approx(42.0)
+    for _ in range(20):
+        b.recover()
+    assert b.rate == 60.0
+
+
+def test_retry_honours_retry_after_then_succeeds():
+    ft = FakeTime()
+    s = _sched(ft)
+    outcomes = [HTTPErr(429, retry=5), HTTPErr(502), "ok"]
+
+    def fn():
+        o = outcomes.pop(0)
+        if isinstance(o, Exception):
+            raise o
+        return o
+
+    assert s.call("openai", "m", fn) == "ok"
+    assert ft.sleeps[0] >= 5.0 and len(ft.sleeps) == 2
+    assert s.status()["openai/m"]["breaker"] == "closed"
+
+
+def test_non_retryable_raises_immediately():
+    ft = FakeTime()
+    s = _sched(ft)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise HTTPErr(401)
+
+    with pytest.raises(HTTPErr):
+        s.call("openai", "m", fn)
+    assert len(calls) == 1 and not ft.sleeps
+
+
+def test_breaker_opens_and_half_opens():
+    ft = FakeTime()
+    s = _sched(ft, max_retries=0)
+
+    def boom():
+        raise HTTPErr(500)
+
+    for _ in range(3):
+        with pytest.raises(HTTPErr):
+            s.call("groq", "m", boom)
+    with pytest.raises(CircuitOpenError):
+        s.call("groq", "m", lambda: "never")
+    ft.t += 11
+    assert s.call("groq", "m", lambda: "ok") == "ok"          # half-open trial closes it
+    assert s.status()["groq/m"]["breaker"] == "closed"
@@ -0,0 +1,81 @@
+import os
+import time
+
+import pytest
+import yaml
+
+from core.session_store import Field, SessionStore
+
+SCHEMA = {
+    "chat.mode": Field(str, "API", choices=("API", "Browser")),
+    "chat.model": Field(str),
+}
+
+
+def test_burst_of_sets_is_one_atomic_write(tmp_path):
+    p = tmp_path / "s.yaml"
+    p.write_text("keep: 1\n", encoding="utf-8")
+    store = SessionStore(str(p), schema=SCHEMA, debounce=0.05)
+    for i in range(100):
+        store.set("chat.model", f"m{i}")
+    assert store.dirty and store.writes == 0
+    deadline = time.time() + 2
+    while store.writes == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert store.writes == 1 and not store.dirty
+    assert yaml.safe_load(p.read_text(encoding="utf-8")) == {"keep": 1, "chat": {"model": "m99"}}
+    assert os.listdir(tmp_path) == ["s.yaml"]                         # no temp files left behind
+
+    store.set(["chat", "model"], "m99")                                # unchanged: nothing to write
+    assert store.flush() is False
+
+
+def test_schema_checks_and_defaults(tmp_path):
+    store = SessionStore(str(tmp_path / "s.yaml"), schema=SCHEMA, debounce=60)
+    assert store.get("chat.mode") == "API" and store.get("chat.model", "x") == "x"
+    with pytest.raises(TypeError):
+        store.set("chat.model", 3)
+    with pytest.raises(ValueError):
+        store.set("chat", {"mode": "Phone"})                          # nested values are checked too
+    store.set("chat", {"mode": "Browser", "model": "gpt"})
+    assert store.get("chat.mode") == "Browser"
+    store.close()
+    assert SessionStore(str(tmp_path / "s.yaml")).get("chat.model") == "gpt"
+
+
+def test_change_notifications_by_prefix(tmp_path):
+    store = SessionStore(str(tmp_path / "s.yaml"), debounce=60)
+    chat, other = [], []
+    unsub = store.subscribe(lambda *a: chat.append(a), prefix="chat.selection")
+    store.subscribe(lambda *a: other.append(a), prefix="window")
+    store.set("chat.selection.model", "a")
+    store.set("chat", {"selection": {"model": "b"}})                  # parent replaced
+    store.set("chat.selection.model", "b")                             # no change, no event
+    assert chat == [("chat.selection.model", None, "a"),
+                    ("chat", {"selection": {"model": "a"}}, {"selection": {"model": "b"}})]
+    assert other == []
+    unsub()
+    store.replace({"window": {"w": 1}})
+    assert len(chat) == 2 and other == [("window", None, {"w": 1})]
+    store.reload()
+    assert store.snapshot() == {} and not store.dirty
+
+
+def test_external_edits_are_picked_up_unless_unsaved(tmp_path):
+    p = tmp_path / "s.yaml"
+    store = SessionStore(str(p), debounce=60)
+    store.set("chat.model", "a")
+    store.flush()
+    seen = []
+    store.subscribe(lambda *a: seen.append(a), prefix="chat")
+    p.write_text("chat: {model: other-process}\nextra: 1\n", encoding="utf-8")
+    assert store.get("chat.model") == "other-process" and store.get("extra") == 1
+    assert seen == [("chat", {"model": "a"}, {"model": "other-process"})]
+
+    store.set("chat.model", "mine")                                    # unsaved here wins
+    p.write_text("chat: {model: theirs, size: 12345}\n", encoding="utf-8")
+    assert store.get("chat.model") == "mine"
+    store.flush()
+    assert yaml.safe_load(p.read_text(encoding="utf-8")) == {"chat": {"model": "mine"}, "extra": 1}
+    assert store.get("extra") == 1                                     # own write is not re-read
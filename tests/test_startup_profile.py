@@ -0,0 +1,32 @@
+import json
+
+from core.startup_profile import StartupProfile, by_package, parse_importtime, top_imports
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       206 |        206 |       copyreg
+import time:       618 |       8118 |     re
+import time:       551 |       9467 |   json.decoder
+import time:       607 |        607 |   json.encoder
+import time:       320 |      10392 | json
+Interpreter: /usr/bin/python
+"""
+
+
+def test_parse_importtime_rows_and_depth():
+    rows = parse_importtime(SAMPLE)
+    assert [r.module for r in rows] == ["copyreg", "re", "json.decoder", "json.encoder", "json"]
+    assert [r.depth for r in rows] == [3, 2, 1, 1, 0]
+    assert rows[-1].cumulative_us == 10392 and rows[-1].self_us == 320
+    assert [r["module"] for r in top_imports(rows, 2)] == ["json", "json.decoder"]
+    assert by_package(rows) == {"json": 1478, "re": 618, "copyreg": 206}
+
+
+def test_marks_keep_first_value_and_report_saves(tmp_path):
+    prof = StartupProfile(t0=0.0)
+    first = prof.mark("first_paint")
+    assert prof.mark("first_paint") == first and first > 0
+    path = prof.save(str(tmp_path / "out" / "p.json"), importtime_text=SAMPLE, top=3)
+    rep = json.loads(open(path, encoding="utf-8").read())
+    assert rep["marks_ms"] == {"first_paint": first}
+    assert len(rep["imports"]) == 3 and list(rep["packages_us"])[0] == "json"
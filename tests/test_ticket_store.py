@@ -0,0 +1,57 @@
+from core.ticket_store import TicketStore
+
+
+def _ticket(i, status="open", issue="function_missing_doc", labels=("auto",)):
+    return {
+        "id": f"id{i:04d}", "key": f"f{i % 7}.py|{issue}|s{i}", "title": f"T{i}",
+        "status": status, "issue": issue, "file_path": f"f{i % 7}.py", "symbol": f"s{i}",
+        "detail": "d", "source": "introspection_v1", "priority": "normal",
+        "created": f"2025-08-18T00:{i % 60:02d}:00", "updated": None,
+        "labels": list(labels), "acceptance_criteria": ["x"], "path": None,
+    }
+
+
+def test_query_count_paging_and_labels(tmp_path):
+    with TicketStore(str(tmp_path / "t.db")) as store:
+        store.upsert_many(_ticket(i, status="open" if i % 2 else "done",
+                                  labels=("auto", "hot") if i % 10 == 0 else ("auto",))
+                          for i in range(500))
+        assert store.count() == 500
+        assert store.count(status="open") == 250
+        assert store.count(label="hot") == 50
+        page1 = store.query(status="done", limit=20, offset=0)
+        page2 = store.query(status="done", limit=20, offset=20)
+        assert len(page1) == 20 and not {t["id"] for t in page1} & {t["id"] for t in page2}
+        assert page1[0]["acceptance_criteria"] == ["x"]
+
+        # Upsert replaces fields and labels
+        t = _ticket(0, status="open", labels=("auto",))
+        store.upsert_many([t])
+        assert store.count() == 500 and store.count(label="hot") == 49
+        assert store.set_status(["id0000"], "resolved") == 1
+        assert store.get("id0000")["status"] == "resolved"
+
+
+def test_yaml_roundtrip(tmp_path):
+    index = tmp_path / "tickets" / "index.yaml"
+    with TicketStore(str(tmp_path / "a.db")) as a:
+        t = _ticket(1)
+        t["path"] = str(tmp_path / "tickets" / "task_x.yaml")
+        a.upsert_many([t])
+        a.set_sources({"f1.py": "abc"})
+        assert a.export_yaml(str(index)) == 1
+    with TicketStore(str(tmp_path / "b.db")) as b:
+        assert b.import_yaml(str(index)) == 1
+        got = b.get("id0001")
+        assert got["acceptance_criteria"] == ["x"] and got["key"] == t["key"]
+        assert b.get_sources() == {"f1.py": "abc"}
+
+
+def test_upsert_replaces_ticket_with_same_key_and_new_id(tmp_path):
+    with TicketStore(str(tmp_path / "k.db")) as store:
+        store.upsert_many([_ticket(1, labels=("old",))])
+        regen = dict(_ticket(1, status="done", labels=("new",)), id="regen1")
+        store.upsert_many([regen, dict(regen, id="regen2")])     # same key twice: last wins
+        assert store.count() == 1 and store.get("id0001") is None
+        assert store.get_by_key(regen["key"])["id"] == "regen2"
+        assert store.distinct("label") == ["new"]
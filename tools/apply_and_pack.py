@@ -8,6 +8,9 @@ if str(ROOT) not in sys.path:
 import os, sys, time, shutil, subprocess, zipfile, pathlib, json
 from datetime import datetime, timezone
 
+from tools.batch_apply import apply_changeset, load_changeset
+from tools.archive_store import ArchiveStore, BACKUP_RE
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 TMP = ROOT / "tmp"
 ARCHIVE = TMP / "archive"
@@ -38,20 +41,26 @@ def log_replace(msg: str):
     print(msg)
 
 def tidy_tmp(retain_candidates: bool = True, purge_days: int = 7):
-    ARCHIVE.mkdir(parents=True, exist_ok=True)
-    cand_dir = ARCHIVE / "candidates"
-    cand_dir.mkdir(parents=True, exist_ok=True)
+    """
+    Archive tmp/ candidates (.py/.yaml) and .bak/.reject files into the
+    content-addressed store (tools/archive_store.py): each distinct version is
+    kept once. Backups are removed from tmp/ once archived; candidates too
+    unless retain_candidates.
+    """
+    store = ArchiveStore()
     now = time.time()
     for f in TMP.iterdir():
-        if f.is_dir() and f.name in ("feedback","archive","prep_next"): 
+        if f.is_dir():
             continue
-        if ".bak." in f.name or ".reject." in f.name:
-            shutil.move(str(f), str(ARCHIVE / f.name)); continue
+        m = BACKUP_RE.match(f.name)
+        if m and m.group("kind") in ("bak", "reject"):
+            store.put(f, name=f"tmp/{m.group('base')}", source=m.group("kind"))
+            f.unlink(); continue
         if f.suffix in (".py",".yaml") and f.name != "last_summary.txt":
-            if retain_candidates:
-                shutil.copy2(str(f), str(cand_dir / f.name))
-            else:
-                shutil.move(str(f), str(cand_dir / f.name))
+            store.put(f, name=f"tmp/{f.name}", source="candidate")
+            if not retain_candidates:
+                f.unlink()
+    # legacy tmp/archive tree: age out non-zip files as before
     for f in ARCHIVE.glob("**/*"):
         if f.is_file():
             age_days = (now - f.stat().st_mtime)/86400.0
@@ -81,11 +90,16 @@ def pack_feedback(tag: str, extras: dict[str, str]) -> pathlib.Path:
 def main():
     # Modes:
     #   apply_and_pack.py <target> <new> [label]
+    #   apply_and_pack.py --changeset <manifest.yaml> [label]
     #   apply_and_pack.py                (pack only)
     label = None
     target = None
     newf = None
-    if len(sys.argv) >= 3:
+    changeset = None
+    if len(sys.argv) >= 3 and sys.argv[1] == "--changeset":
+        changeset = load_changeset(sys.argv[2])
+        label = sys.argv[3] if len(sys.argv) >= 4 else (changeset.get("label") or "changeset")
+    elif len(sys.argv) >= 3:
         target = pathlib.Path(sys.argv[1])
         newf   = pathlib.Path(sys.argv[2])
         label  = sys.argv[3] if len(sys.argv) >= 4 else target.stem
@@ -105,25 +119,32 @@ def main():
 
     replaced_ok = False
     attempted = False
-    # 2) guarded replace if target/new provided
+    # 2) guarded replace (single target/new pair is a one-entry changeset)
     if target is not None and newf is not None:
-        attempted = True
         if not target.exists():
             log_replace(f"SKIP: target missing -> {target}")
+            attempted = True
         elif not newf.exists():
             log_replace(f"SKIP: new file missing -> {newf}")
+            attempted = True
         else:
-            expected = file_sha(target)
-            rc, out, err = run([sys.executable, "tools/safe_replace.py",
-                                "--path", str(target),
-                                "--expected-sha", expected,
-                                "--new", str(newf)], check=False)
-            if rc == 0:
-                replaced_ok = True
-                log_replace(f"OK: replaced {target}")
-            else:
-                log_replace(f"SKIP: replace failed for {target} (see .reject/.bak)")
-    else:
+            changeset = {"label": label, "changes": [
+                {"path": str(target.resolve()), "new": str(newf.resolve()), "expected_sha": file_sha(target)}]}
+    if changeset is not None:
+        attempted = True
+        res = apply_changeset(changeset)
+        for f in res.get("failures") or []:
+            log_replace(f"SKIP: {f['path']}: {f['reason']}")
+        if not res.get("ok") and newf is not None and newf.exists():
+            rejected = f"{target}.reject.{time.strftime('%Y%m%d_%H%M%S')}"
+            shutil.copy2(newf, rejected)
+        if res.get("ok"):
+            replaced_ok = True
+            log_replace(f"OK: applied {res.get('applied', 0)} file(s), unchanged {res.get('unchanged', 0)} "
+                        f"(txid={res.get('txid', '-')})")
+        else:
+            log_replace(f"SKIP: changeset not applied: {res.get('error')}")
+    elif not attempted:
         log_replace("SKIP: replace not attempted (pack-only mode)")
 
     # 3) post-inventory
@@ -0,0 +1,278 @@
+# =============================================================================
+# File: tools/archive_store.py
+# Persistent Assistant v3 – Content-addressed archive for tmp/ candidates & backups
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 11:40 BST
+# Update History:
+#   - 2025-08-23 11:40 BST: Initial version (put/list/restore/sweep/migrate).
+#   - 2025-08-23 16:10 BST: Microsecond archive stamps; --at compares as a time.
+# =============================================================================
+"""
+Each distinct file version is stored once, as a compressed blob named by its
+sha256 (zstd when the 'zstandard' package is installed, zlib otherwise). A
+line-per-version catalog (catalog.jsonl) maps names and times to blobs.
+
+Layout (default tmp/.pa_archive, excluded from scanners):
+    objects/ab/abcdef....z      compressed blob
+    catalog.jsonl               {"name", "sha256", "size", "codec", "mtime", "archived", "source"}
+
+Usage:
+    python tools/archive_store.py put <file>... [--name N]
+    python tools/archive_store.py list [pattern]
+    python tools/archive_store.py restore <name> [--at 2025-08-22T13:00] [--out path]
+    python tools/archive_store.py sweep-bak [dir ...] [--delete]
+    python tools/archive_store.py migrate [--delete]      # ingest tmp/archive/**
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import os, re, json, time, zlib, hashlib, fnmatch, argparse
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+try:
+    import zstandard  # optional, better ratio and speed
+except Exception:
+    zstandard = None
+
+from core.fileutil import atomic_write_bytes
+
+ARCHIVE_DIRNAME = ".pa_archive"
+ARCHIVE_ROOT = ROOT / "tmp" / ARCHIVE_DIRNAME
+LEGACY_ARCHIVE = ROOT / "tmp" / "archive"
+
+# name.bak.<stamp> / name.reject.<stamp> -> (name, kind)
+BACKUP_RE = re.compile(r"^(?P<base>.+?)\.(?P<kind>bak|reject)(?:[._].*)?$")
+
+# precision of an --at value: date, minutes, seconds or fraction -> how far "at" reaches
+_AT_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[T ](?P<hm>\d{2}:\d{2})(?P<s>:\d{2})?(?P<f>\.\d+)?)?")
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+def _parse_time(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _upper_bound(at: str) -> datetime:
+    """First instant after the period `at` names (2025-08-22 covers the whole day)."""
+    m = _AT_RE.match(at)
+    if not m:
+        raise ValueError(f"not an ISO time: {at!r}")
+    step = (timedelta(microseconds=1) if m.group("f") else timedelta(seconds=1) if m.group("s")
+            else timedelta(minutes=1) if m.group("hm") else timedelta(days=1))
+    return _parse_time(at) + step
+
+def _rel_name(path: pathlib.Path) -> str:
+    try:
+        return path.resolve().relative_to(ROOT).as_posix()
+    except ValueError:
+        return path.resolve().as_posix()
+
+class ArchiveStore:
+    """Deduplicated, compressed version store with a JSONL catalog."""
+    def __init__(self, root: pathlib.Path | str = ARCHIVE_ROOT):
+        self.root = pathlib.Path(root)
+        self.objects = self.root / "objects"
+        self.catalog_path = self.root / "catalog.jsonl"
+        self._catalog: Optional[List[Dict[str, Any]]] = None
+
+    # -- blobs ------------------------------------------------------------
+    def _blob_path(self, sha: str, codec: str) -> pathlib.Path:
+        return self.objects / sha[:2] / f"{sha}.{'zst' if codec == 'zstd' else 'z'}"
+
+    def _find_blob(self, sha: str) -> Optional[tuple[pathlib.Path, str]]:
+        for codec in ("zstd", "zlib"):
+            p = self._blob_path(sha, codec)
+            if p.exists():
+                return p, codec
+        return None
+
+    def put_bytes(self, data: bytes, name: str, *, mtime: float | None = None, source: str = "") -> Dict[str, Any]:
+        """Store data under name; writes a blob only for unseen content."""
+        sha = hashlib.sha256(data).hexdigest()
+        found = self._find_blob(sha)
+        if found:
+            codec = found[1]
+        else:
+            if zstandard is not None:
+                codec, blob = "zstd", zstandard.ZstdCompressor(level=10).compress(data)
+            else:
+                codec, blob = "zlib", zlib.compress(data, 9)
+            p = self._blob_path(sha, codec)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(str(p), blob)
+
+        last = self.latest(name)
+        if last and last["sha256"] == sha:
+            return last  # same version already catalogued under this name
+        entry = {"name": name, "sha256": sha, "size": len(data), "codec": codec,
+                 "mtime": int(mtime if mtime is not None else time.time()),
+                 "archived": _now(), "source": source}
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.catalog_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.catalog().append(entry)
+        return entry
+
+    def put(self, path: pathlib.Path | str, name: str | None = None, source: str = "") -> Dict[str, Any]:
+        p = pathlib.Path(path)
+        return self.put_bytes(p.read_bytes(), name or _rel_name(p), mtime=p.stat().st_mtime, source=source)
+
+    def read(self, sha: str) -> bytes:
+        found = self._find_blob(sha)
+        if not found:
+            raise FileNotFoundError(f"blob not in archive: {sha}")
+        p, codec = found
+        raw = p.read_bytes()
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("blob is zstd-compressed but 'zstandard' is not installed")
+            return zstandard.ZstdDecompressor().decompress(raw)
+        return zlib.decompress(raw)
+
+    # -- catalog ----------------------------------------------------------
+    def catalog(self) -> List[Dict[str, Any]]:
+        if self._catalog is None:
+            self._catalog = []
+            if self.catalog_path.exists():
+                with open(self.catalog_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            try:
+                                self._catalog.append(json.loads(line))
+                            except ValueError:
+                                continue
+        return self._catalog
+
+    def versions(self, name: str) -> List[Dict[str, Any]]:
+        return [e for e in self.catalog() if e["name"] == name]
+
+    def latest(self, name: str) -> Optional[Dict[str, Any]]:
+        v = self.versions(name)
+        return v[-1] if v else None
+
+    def list(self, pattern: str | None = None) -> List[Dict[str, Any]]:
+        if not pattern:
+            return list(self.catalog())
+        return [e for e in self.catalog() if fnmatch.fnmatch(e["name"], pattern)]
+
+    def resolve(self, name: str, at: str | None = None) -> Optional[Dict[str, Any]]:
+        """
+        Version of name current at ISO time `at` (archived within or before the
+        period `at` names); latest when None. The exact `archived` value of an
+        entry always selects that entry.
+        """
+        vs = self.versions(name)
+        if at:
+            exact = [e for e in vs if e["archived"] == at]
+            if exact:
+                return exact[-1]
+            upper = _upper_bound(at)
+            vs = [e for e in vs if _parse_time(e["archived"]) < upper]
+        return vs[-1] if vs else None
+
+    def restore(self, name: str, at: str | None = None, out: pathlib.Path | str | None = None) -> pathlib.Path:
+        e = self.resolve(name, at)
+        if e is None:
+            raise FileNotFoundError(f"no archived version of {name!r}" + (f" at {at}" if at else ""))
+        dest = pathlib.Path(out) if out else ROOT / name
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(str(dest), self.read(e["sha256"]))
+        return dest
+
+    def stats(self) -> Dict[str, Any]:
+        blobs = [p for p in self.objects.rglob("*") if p.is_file()] if self.objects.exists() else []
+        logical = sum(e["size"] for e in self.catalog())
+        return {"versions": len(self.catalog()), "blobs": len(blobs),
+                "stored_bytes": sum(p.stat().st_size for p in blobs), "logical_bytes": logical}
+
+# --------------------------------------------------------------------------- #
+# Bulk helpers
+# --------------------------------------------------------------------------- #
+SKIP_WALK = {".git", ".venv", "venv", "__pycache__", ARCHIVE_DIRNAME}
+
+def sweep_backups(store: ArchiveStore, dirs: List[pathlib.Path], delete: bool = False) -> Dict[str, int]:
+    """Archive name.bak.* / name.reject.* files (catalogued under name) and optionally remove them."""
+    n = removed = 0
+    for d in dirs:
+        for r, dirnames, files in os.walk(d):
+            dirnames[:] = [x for x in dirnames if x not in SKIP_WALK]
+            for fn in files:
+                m = BACKUP_RE.match(fn)
+                if not m:
+                    continue
+                p = pathlib.Path(r) / fn
+                base = _rel_name(p.parent / m.group("base"))
+                store.put(p, name=base, source=m.group("kind"))
+                n += 1
+                if delete:
+                    p.unlink()
+                    removed += 1
+    return {"archived": n, "removed": removed}
+
+def migrate_legacy(store: ArchiveStore, legacy: pathlib.Path = LEGACY_ARCHIVE, delete: bool = False) -> Dict[str, int]:
+    """Ingest the old tmp/archive tree (candidates, .bak/.reject copies); zips are left in place."""
+    n = removed = 0
+    if not legacy.exists():
+        return {"archived": 0, "removed": 0}
+    for p in sorted(legacy.rglob("*"), key=lambda x: x.stat().st_mtime if x.exists() else 0):
+        if not p.is_file() or p.suffix.lower() == ".zip" or "__pycache__" in p.parts:
+            continue
+        m = BACKUP_RE.match(p.name)
+        name = f"tmp/{m.group('base') if m else p.name}"
+        store.put(p, name=name, source=m.group("kind") if m else "candidate")
+        n += 1
+        if delete:
+            p.unlink()
+            removed += 1
+    return {"archived": n, "removed": removed}
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Deduplicated archive for tmp candidates and backups.")
+    ap.add_argument("--root", default=str(ARCHIVE_ROOT))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("put"); p.add_argument("files", nargs="+"); p.add_argument("--name")
+    l = sub.add_parser("list"); l.add_argument("pattern", nargs="?")
+    r = sub.add_parser("restore"); r.add_argument("name"); r.add_argument("--at"); r.add_argument("--out")
+    s = sub.add_parser("sweep-bak"); s.add_argument("dirs", nargs="*"); s.add_argument("--delete", action="store_true")
+    m = sub.add_parser("migrate"); m.add_argument("--delete", action="store_true")
+    sub.add_parser("stats")
+    args = ap.parse_args()
+
+    store = ArchiveStore(args.root)
+    if args.cmd == "put":
+        if args.name and len(args.files) > 1:
+            ap.error("--name only applies to a single file")
+        for f in args.files:
+            e = store.put(f, name=args.name, source="cli")
+            print(f"{e['sha256'][:12]}  {e['name']}")
+        summary: Dict[str, Any] = {"stored": len(args.files)}
+    elif args.cmd == "list":
+        for e in store.list(args.pattern):
+            print(f"{e['archived']}  {e['sha256'][:12]}  {e['size']:>8}  {e['source']:<9} {e['name']}")
+        return 0
+    elif args.cmd == "restore":
+        dest = store.restore(args.name, args.at, args.out)
+        summary = {"restored": args.name, "to": str(dest).replace("\\", "/")}
+    elif args.cmd == "sweep-bak":
+        dirs = [pathlib.Path(d) for d in args.dirs] or [ROOT / d for d in ("core", "gui", "tools", "server", "config")]
+        summary = sweep_backups(store, dirs, delete=args.delete)
+    elif args.cmd == "migrate":
+        summary = migrate_legacy(store, delete=args.delete)
+    else:
+        summary = store.stats()
+    print("SUMMARY:", json.dumps(summary))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+# =============================================================================
+# File: tools/batch_apply.py
+# Persistent Assistant v3 – Transactional batch file apply (verify, atomic replace, rollback)
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 10:05 BST
+# Update History:
+#   - 2025-08-23 10:05 BST: Initial version (changeset manifest, journal, rollback).
+# =============================================================================
+"""
+Apply a multi-file changeset in one process with all-or-nothing semantics.
+
+Changeset manifest (YAML or JSON):
+
+    label: step_4_2
+    changes:
+      - path: core/foo.py            # target, relative to project root
+        new: tmp/foo.py              # file holding the new content ...
+        expected_sha: <sha256>       # ... installed only if the current file matches
+      - path: core/bar.py
+        content: "print('hi')\\n"    # inline content instead of 'new'
+        expected_sha: "[not in inventory]"
+      - path: core/old.py
+        delete: true
+
+Flow:
+  1. verify  – every target's current sha256 is checked up front. Hashes come
+               from project/structure/file_manifest.yaml when size+mtime still
+               match, so unchanged files are not re-read. Any mismatch aborts
+               before anything is written.
+  2. stage   – new content goes to temp files beside each target (fsync'd).
+  3. journal – data/insights/apply_journal/<txid>.json records every target,
+               its backup and hashes before the first replace.
+  4. commit  – .bak.<ts> backups (hardlinks where possible), then os.replace
+               per target. Any failure rolls back the files already replaced.
+
+Usage:
+    python tools/batch_apply.py apply changeset.yaml [--dry-run]
+    python tools/batch_apply.py rollback [<txid>|last] [--force]
+    python tools/batch_apply.py list
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import os, json, time, shutil, hashlib, argparse, uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from core.fileutil import sha256_file, write_temp_beside, atomic_write_bytes, atomic_write_text
+
+MANIFEST_PATH = ROOT / "project" / "structure" / "file_manifest.yaml"
+JOURNAL_DIR = ROOT / "data" / "insights" / "apply_journal"
+NOT_IN_INVENTORY = "[not in inventory]"
+
+# --------------------------------------------------------------------------- #
+# Inputs
+# --------------------------------------------------------------------------- #
+def load_changeset(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    data = json.loads(text) if path.lower().endswith(".json") else yaml.safe_load(text)
+    if not isinstance(data, dict) or not isinstance(data.get("changes"), list):
+        raise ValueError(f"Invalid changeset (expected mapping with 'changes' list): {path}")
+    return data
+
+def load_manifest_cache(manifest_path: pathlib.Path = MANIFEST_PATH) -> Dict[str, Tuple[int, int, str]]:
+    """{rel_path: (size, mtime, sha256)} from the file manifest; empty if unavailable."""
+    if not manifest_path or not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            data = yaml.load(f, Loader=loader) or {}
+    except Exception:
+        return {}
+    out: Dict[str, Tuple[int, int, str]] = {}
+    for e in data.get("files") or []:
+        if e.get("sha256") and "size" in e and "mtime" in e:
+            out[str(e["path"]).replace("\\", "/")] = (int(e["size"]), int(e["mtime"]), e["sha256"])
+    return out
+
+def _current_sha(target: str, rel: str, cache: Dict[str, Tuple[int, int, str]]) -> Optional[str]:
+    if not os.path.exists(target):
+        return None
+    st = os.stat(target)
+    hit = cache.get(rel)
+    if hit and hit[0] == st.st_size and hit[1] == int(st.st_mtime):
+        return hit[2]
+    return sha256_file(target)
+
+# --------------------------------------------------------------------------- #
+# Verify
+# --------------------------------------------------------------------------- #
+def verify(changes: List[Dict[str, Any]], root: pathlib.Path = ROOT,
+           manifest_path: pathlib.Path = MANIFEST_PATH) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Check every change before touching disk. Returns (plan, failures); the
+    plan holds resolved targets with their new bytes loaded.
+    """
+    cache = load_manifest_cache(manifest_path)
+    plan: List[Dict[str, Any]] = []
+    failures: List[Dict[str, Any]] = []
+    seen = set()
+    for ch in changes:
+        rel = str(ch.get("path", "")).replace("\\", "/")
+        if not rel:
+            failures.append({"path": rel, "reason": "missing 'path'"})
+            continue
+        target = os.path.abspath(os.path.join(root, rel))
+        if target in seen:
+            failures.append({"path": rel, "reason": "duplicate target in changeset"})
+            continue
+        seen.add(target)
+
+        delete = bool(ch.get("delete"))
+        data: Optional[bytes] = None
+        if not delete:
+            if "content" in ch:
+                data = str(ch["content"]).encode("utf-8")
+            elif ch.get("new"):
+                src = os.path.join(root, ch["new"]) if not os.path.isabs(ch["new"]) else ch["new"]
+                if not os.path.exists(src):
+                    failures.append({"path": rel, "reason": f"new content missing: {ch['new']}"})
+                    continue
+                with open(src, "rb") as f:
+                    data = f.read()
+            else:
+                failures.append({"path": rel, "reason": "need one of 'new', 'content' or 'delete'"})
+                continue
+
+        current = _current_sha(target, rel, cache)
+        expected = ch.get("expected_sha")
+        if expected and str(expected).lower() != NOT_IN_INVENTORY and current != str(expected).lower():
+            failures.append({"path": rel, "reason": "hash mismatch", "expected": expected, "actual": current})
+            continue
+        if delete and current is None:
+            failures.append({"path": rel, "reason": "delete target does not exist"})
+            continue
+
+        new_sha = hashlib.sha256(data).hexdigest() if data is not None else None
+        plan.append({
+            "path": rel,
+            "target": target,
+            "action": "delete" if delete else "write",
+            "existed": current is not None,
+            "old_sha": current,
+            "new_sha": new_sha,
+            "unchanged": (not delete) and current == new_sha,
+            "_data": data,
+        })
+    return plan, failures
+
+# --------------------------------------------------------------------------- #
+# Journal
+# --------------------------------------------------------------------------- #
+def _journal_path(txid: str, journal_dir: pathlib.Path) -> pathlib.Path:
+    return pathlib.Path(journal_dir) / f"{txid}.json"
+
+def _write_journal(journal: Dict[str, Any], journal_dir: pathlib.Path) -> None:
+    os.makedirs(journal_dir, exist_ok=True)
+    clean = dict(journal)
+    clean["entries"] = [{k: v for k, v in e.items() if not k.startswith("_")} for e in journal["entries"]]
+    atomic_write_text(str(_journal_path(journal["txid"], journal_dir)), json.dumps(clean, indent=2))
+
+def list_journals(journal_dir: pathlib.Path = JOURNAL_DIR) -> List[Dict[str, Any]]:
+    out = []
+    if not os.path.isdir(journal_dir):
+        return out
+    for fn in sorted(os.listdir(journal_dir)):
+        if fn.endswith(".json"):
+            try:
+                with open(os.path.join(journal_dir, fn), "r", encoding="utf-8") as f:
+                    j = json.load(f)
+                out.append({"txid": j.get("txid"), "label": j.get("label"), "state": j.get("state"),
+                            "created": j.get("created"), "files": len(j.get("entries") or [])})
+            except Exception:
+                continue
+    return out
+
+# --------------------------------------------------------------------------- #
+# Apply / rollback
+# --------------------------------------------------------------------------- #
+def _backup(target: str, stamp: str) -> str:
+    backup = f"{target}.bak.{stamp}"
+    n = 1
+    while os.path.exists(backup):
+        backup = f"{target}.bak.{stamp}_{n}"
+        n += 1
+    try:
+        os.link(target, backup)        # old inode survives the os.replace below
+    except OSError:
+        shutil.copy2(target, backup)
+    return backup
+
+def _restore(entry: Dict[str, Any]) -> None:
+    target = entry["target"]
+    if entry.get("existed"):
+        with open(entry["backup"], "rb") as f:
+            atomic_write_bytes(target, f.read())
+        shutil.copystat(entry["backup"], target)
+    elif os.path.exists(target):
+        os.remove(target)
+
+def _cleanup_tmp(entries: List[Dict[str, Any]], backups: bool = False) -> None:
+    """Remove staged temp files (and, with backups, the .bak copies made so far)."""
+    for e in entries:
+        for key in ("tmp", "backup") if backups else ("tmp",):
+            path = e.get(key)
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+def apply_changeset(changeset: Dict[str, Any], *, root: pathlib.Path = ROOT, dry_run: bool = False,
+                    manifest_path: pathlib.Path = MANIFEST_PATH,
+                    journal_dir: pathlib.Path = JOURNAL_DIR) -> Dict[str, Any]:
+    """Verify then apply every change, or none. Returns a summary dict ('ok' key)."""
+    t0 = time.time()
+    label = changeset.get("label") or "changeset"
+    plan, failures = verify(changeset.get("changes") or [], root, manifest_path)
+    summary: Dict[str, Any] = {"label": label, "ok": False, "dry_run": dry_run, "planned": len(plan),
+                               "failures": failures}
+    if failures:
+        summary["error"] = f"verification failed for {len(failures)} file(s); nothing written"
+        return summary
+    work = [e for e in plan if not e["unchanged"]]
+    summary["unchanged"] = len(plan) - len(work)
+    if dry_run or not work:
+        summary.update({"ok": True, "applied": 0, "elapsed_sec": round(time.time() - t0, 3),
+                        "would_apply": [e["path"] for e in work]})
+        return summary
+
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    txid = f"{stamp}_{uuid.uuid4().hex[:6]}"
+    journal = {"txid": txid, "label": label, "created": stamp, "state": "staging", "entries": work}
+    try:
+        for e in work:
+            if e["action"] == "write":
+                e["tmp"] = write_temp_beside(e["target"], e["_data"], tag=f"pa_{txid}")
+        for e in work:
+            e["backup"] = _backup(e["target"], stamp) if e["existed"] else None
+        journal["state"] = "applying"
+        _write_journal(journal, journal_dir)
+    except Exception as ex:
+        # nothing has been replaced and no journal points at the backups:
+        # dropping temp files and backups undoes staging
+        _cleanup_tmp(work, backups=True)
+        summary["error"] = f"staging failed: {ex}"
+        return summary
+
+    done: List[Dict[str, Any]] = []
+    try:
+        for e in work:
+            if e["action"] == "write":
+                os.replace(e["tmp"], e["target"])
+            else:
+                os.remove(e["target"])
+            done.append(e)
+    except Exception as ex:
+        for e in reversed(done):
+            _restore(e)
+        _cleanup_tmp(work)
+        journal["state"] = "rolled_back"
+        journal["error"] = str(ex)
+        _write_journal(journal, journal_dir)
+        summary.update({"txid": txid, "error": f"apply failed, rolled back {len(done)} file(s): {ex}"})
+        return summary
+
+    journal["state"] = "committed"
+    _write_journal(journal, journal_dir)
+    summary.update({"ok": True, "txid": txid, "applied": len(work),
+                    "journal": str(_journal_path(txid, journal_dir)).replace("\\", "/"),
+                    "elapsed_sec": round(time.time() - t0, 3)})
+    return summary
+
+def rollback(txid: str = "last", *, force: bool = False, journal_dir: pathlib.Path = JOURNAL_DIR) -> Dict[str, Any]:
+    """
+    Undo a committed (or interrupted) transaction from its journal. Files edited
+    since the apply are left alone unless force=True.
+    """
+    if txid == "last":
+        js = [j for j in list_journals(journal_dir) if j["state"] in ("committed", "applying")]
+        if not js:
+            return {"ok": False, "error": "no transaction to roll back"}
+        txid = js[-1]["txid"]
+    jp = _journal_path(txid, journal_dir)
+    if not jp.exists():
+        return {"ok": False, "error": f"journal not found: {txid}"}
+    with open(jp, "r", encoding="utf-8") as f:
+        journal = json.load(f)
+    if journal.get("state") not in ("committed", "applying"):
+        return {"ok": False, "txid": txid, "error": f"state is {journal.get('state')!r}; nothing to roll back"}
+
+    entries = journal.get("entries") or []
+    conflicts, restored, skipped = [], 0, 0
+    for e in entries:
+        target = e["target"]
+        cur = sha256_file(target) if os.path.exists(target) else None
+        if cur == e.get("old_sha"):
+            skipped += 1          # never applied (interrupted run) or already restored
+            continue
+        if cur != e.get("new_sha") and not force:
+            conflicts.append(e["path"])
+    if conflicts:
+        return {"ok": False, "txid": txid, "conflicts": conflicts,
+                "error": "files changed since apply; use --force to overwrite"}
+    for e in entries:
+        cur = sha256_file(e["target"]) if os.path.exists(e["target"]) else None
+        if cur == e.get("old_sha"):
+            continue
+        _restore(e)
+        restored += 1
+    _cleanup_tmp(entries)
+    journal["state"] = "rolled_back"
+    _write_journal(journal, journal_dir)
+    return {"ok": True, "txid": txid, "restored": restored, "skipped": skipped}
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Transactional batch apply of a changeset manifest.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    a = sub.add_parser("apply", help="verify and apply a changeset")
+    a.add_argument("changeset")
+    a.add_argument("--dry-run", action="store_true")
+    a.add_argument("--no-manifest-cache", action="store_true", help="hash every target instead of trusting the manifest")
+    r = sub.add_parser("rollback", help="undo a transaction from its journal")
+    r.add_argument("txid", nargs="?", default="last")
+    r.add_argument("--force", action="store_true")
+    sub.add_parser("list", help="list journals")
+    args = ap.parse_args()
+
+    if args.cmd == "apply":
+        cs = load_changeset(args.changeset)
+        summary = apply_changeset(cs, dry_run=args.dry_run,
+                                  manifest_path=None if args.no_manifest_cache else MANIFEST_PATH)
+        for f in summary.get("failures") or []:
+            print(f"FAIL: {f['path']}: {f['reason']}")
+    elif args.cmd == "rollback":
+        summary = rollback(args.txid, force=args.force)
+    else:
+        for j in list_journals():
+            print(f"{j['txid']}  {j['state']:<12} {j['files']:>4} file(s)  {j['label']}")
+        return 0
+    print("SUMMARY:", json.dumps(summary))
+    return 0 if summary.get("ok") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+# =============================================================================
+# File: tools/bench_ai_client.py
+# Persistent Assistant v3 – Offline load / latency benchmark for the AI call paths
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 17:40 BST
+# Update History:
+#   - 2025-08-23 17:40 BST: Initial version (send, send_many, sidecar bridge, raw stream TTFT).
+# =============================================================================
+"""
+Drives the AI call paths against tools/mock_provider.py (started in-process
+unless --base-url is given) and reports throughput and p50/p99 latency.
+
+Modes:
+    send       AIClient.send from --concurrency threads (scheduler, metrics, cost incl.)
+    send_many  one AIClient.send_many batch at --concurrency
+    sidecar    server.agent_sidecar._ai_bridge (the /ask worker path)
+    stream     raw streamed chat completion; reports time-to-first-token too
+
+AIClient modes need the provider SDK installed (openai / anthropic / groq);
+the sidecar mode needs Flask. Missing pieces are reported as skipped.
+
+Usage:
+    python tools/bench_ai_client.py [--modes send,send_many,sidecar,stream]
+        [--provider openai] [-n 200] [--concurrency 8]
+        [--latency lognormal:0.05,0.4] [--error-rate 0] [--rate-limit 0]
+        [--base-url http://127.0.0.1:8799] [--out data/insights/bench_ai_client.json]
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import os, json, math, time, argparse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from tools.mock_provider import MockConfig, MockProviderServer
+
+MODES = ("send", "send_many", "sidecar", "stream")
+PROMPT = "Summarise the current plan step in two sentences."
+
+def percentile(values: List[float], q: float) -> float | None:
+    """Nearest-rank percentile (q in 0..100)."""
+    if not values:
+        return None
+    v = sorted(values)
+    k = max(0, min(len(v) - 1, math.ceil(q / 100.0 * len(v)) - 1))
+    return v[k]
+
+def summarize(mode: str, latencies: List[float], errors: int, wall: float, **extra) -> Dict[str, Any]:
+    n = len(latencies) + errors
+    ms = lambda x: None if x is None else round(x * 1000.0, 2)
+    return dict({"mode": mode, "requests": n, "ok": len(latencies), "errors": errors,
+                 "wall_s": round(wall, 3), "rps": round(n / wall, 2) if wall > 0 else None,
+                 "p50_ms": ms(percentile(latencies, 50)), "p99_ms": ms(percentile(latencies, 99)),
+                 "max_ms": ms(max(latencies) if latencies else None)}, **extra)
+
+def _hammer(fn: Callable[[int], Any], n: int, concurrency: int):
+    """Run fn(i) n times on a pool -> (latencies of successes, error count, wall seconds)."""
+    def timed(i: int):
+        t = time.perf_counter()
+        try:
+            fn(i)
+            return time.perf_counter() - t, None
+        except Exception as e:
+            return None, e
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+        out = list(ex.map(timed, range(n)))
+    wall = time.perf_counter() - t0
+    return [lat for lat, err in out if err is None], sum(1 for _, err in out if err is not None), wall
+
+def _client_base(provider: str, url: str) -> str:
+    return url.rstrip("/") + "/v1" if provider == "openai" else url
+
+def _make_client(provider: str, url: str):
+    from core.ai_client import AIClient
+    c = AIClient(provider, "mock", base_url=_client_base(provider, url))
+    if c.client is None:
+        raise RuntimeError(f"{provider} SDK not installed")
+    return c
+
+def bench_send(url: str, provider: str, n: int, concurrency: int) -> Dict[str, Any]:
+    c = _make_client(provider, url)
+    lat, err, wall = _hammer(lambda i: c.send(PROMPT, include_memory=False), n, concurrency)
+    return summarize("send", lat, err, wall, provider=provider)
+
+def bench_send_many(url: str, provider: str, n: int, concurrency: int) -> Dict[str, Any]:
+    c = _make_client(provider, url)
+    t0 = time.perf_counter()
+    res = c.send_many([PROMPT] * n, concurrency=concurrency, include_memory=False)
+    wall = time.perf_counter() - t0
+    lat = [r["time"] for r in res if "error" not in r]
+    return summarize("send_many", lat, n - len(lat), wall, provider=provider)
+
+def bench_sidecar(url: str, n: int, concurrency: int) -> Dict[str, Any]:
+    try:
+        from server import agent_sidecar
+    except ImportError as e:
+        raise RuntimeError(f"sidecar unavailable: {e}")
+    def one(i: int):
+        reply = agent_sidecar._ai_bridge(PROMPT, base=url)
+        if reply.startswith("[SIMULATED REPLY]"):
+            raise RuntimeError("bridge fell back to simulated reply")
+    lat, err, wall = _hammer(one, n, concurrency)
+    return summarize("sidecar", lat, err, wall)
+
+def bench_stream(url: str, n: int, concurrency: int) -> Dict[str, Any]:
+    ttft: List[float] = []
+    body = json.dumps({"model": "mock-small", "stream": True,
+                       "messages": [{"role": "user", "content": PROMPT}]}).encode("utf-8")
+    def one(i: int):
+        t = time.perf_counter()
+        req = urllib.request.Request(url.rstrip("/") + "/v1/chat/completions", data=body, method="POST",
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=60) as r:
+            first = None
+            for line in r:
+                if line.startswith(b"data: ") and first is None:
+                    first = time.perf_counter() - t
+                if line.strip() == b"data: [DONE]":
+                    break
+        if first is not None:
+            ttft.append(first)
+    lat, err, wall = _hammer(one, n, concurrency)
+    ms = lambda x: None if x is None else round(x * 1000.0, 2)
+    return summarize("stream", lat, err, wall, ttft_p50_ms=ms(percentile(ttft, 50)),
+                     ttft_p99_ms=ms(percentile(ttft, 99)))
+
+def run(modes, url: str, provider: str, n: int, concurrency: int) -> List[Dict[str, Any]]:
+    results = []
+    for mode in modes:
+        try:
+            if mode == "send":
+                r = bench_send(url, provider, n, concurrency)
+            elif mode == "send_many":
+                r = bench_send_many(url, provider, n, concurrency)
+            elif mode == "sidecar":
+                r = bench_sidecar(url, n, concurrency)
+            elif mode == "stream":
+                r = bench_stream(url, n, concurrency)
+            else:
+                raise ValueError(f"unknown mode {mode}")
+        except (RuntimeError, ValueError) as e:
+            r = {"mode": mode, "skipped": str(e)}
+        print("PROGRESS: " + json.dumps(r), flush=True)
+        results.append(r)
+    return results
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark AI call paths against the mock provider")
+    ap.add_argument("--modes", default=",".join(MODES))
+    ap.add_argument("--provider", default="openai", choices=["openai", "groq", "anthropic"])
+    ap.add_argument("-n", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--latency", default="lognormal:0.05,0.4")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--base-url", default=None, help="use a running mock instead of starting one")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+    os.environ.setdefault("PA_METRICS_SNAPSHOT", "0")
+    # the mock reports len(text)//4 tokens: keep that out of the real chars/token
+    # calibration (saved to data/insights/token_calibration.json at exit)
+    import core.ai_client as ai_client
+    ai_client._calibrate = lambda provider, chars, tokens: None
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+
+    srv = None
+    url = args.base_url
+    if not url:
+        srv = MockProviderServer(MockConfig(latency=args.latency, error_rate=args.error_rate,
+                                            rate_limit=args.rate_limit, seed=args.seed)).start()
+        url = srv.url
+    try:
+        results = run(modes, url, args.provider, args.n, args.concurrency)
+    finally:
+        if srv:
+            srv.stop()
+
+    summary = {"url": url, "n": args.n, "concurrency": args.concurrency, "latency": args.latency,
+               "results": results}
+    if args.out:
+        out = pathlib.Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print("SUMMARY: " + json.dumps(summary))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
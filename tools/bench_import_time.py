@@ -0,0 +1,102 @@
+# =============================================================================
+# File: tools/bench_import_time.py
+# Persistent Assistant v3 – Import-time regression benchmark
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 18:50 BST
+# Update History:
+#   - 2025-08-23 18:50 BST: Initial version (-X importtime, SDK leak check, budget).
+# =============================================================================
+"""
+Imports each module in a fresh `python -X importtime` interpreter and reports
+its cumulative import cost (median over --runs), the heaviest dependencies,
+and any provider SDK that got pulled in. Exits 1 when a module goes over
+--budget-ms or loads a forbidden package, so it can guard CLI start-up time
+(core.ai_client must not import openai / anthropic / google / groq).
+
+Usage:
+    python tools/bench_import_time.py [--modules core.ai_client,core.cost_engine]
+        [--runs 5] [--budget-ms 50] [--forbid openai,anthropic,google.generativeai,groq]
+        [--top 10] [--out data/insights/import_time.json]
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import os, json, argparse, statistics, subprocess
+from typing import Any, Dict, List
+
+from core.startup_profile import parse_importtime, top_imports
+
+DEFAULT_MODULES = ("core.ai_client", "core.cost_engine")
+DEFAULT_FORBID = ("openai", "anthropic", "google.generativeai", "groq")
+
+def import_once(module: str) -> List:
+    """importtime rows for one fresh `import module` (run from the project root)."""
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=str(ROOT),
+                       env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"), capture_output=True, text=True)
+    rows = parse_importtime(p.stderr)
+    if p.returncode != 0:
+        tail = (p.stderr or "").strip().splitlines()[-1:] or [f"rc={p.returncode}"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+    return rows
+
+def measure(module: str, runs: int = 5, forbid=DEFAULT_FORBID, top: int = 10) -> Dict[str, Any]:
+    totals, rows = [], []
+    for _ in range(max(1, runs)):
+        rows = import_once(module)
+        own = [r for r in rows if r.module == module]
+        totals.append(own[-1].cumulative_us if own else 0)
+    names = {r.module for r in rows}
+    leaked = sorted(n for n in names if any(n == f or n.startswith(f + ".") for f in forbid))
+    return {"module": module, "runs": len(totals),
+            "median_ms": round(statistics.median(totals) / 1000.0, 1),
+            "min_ms": round(min(totals) / 1000.0, 1),
+            "modules_imported": len(rows), "forbidden_loaded": leaked,
+            "heaviest": top_imports([r for r in rows if r.module != module], top)}
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modules", default=",".join(DEFAULT_MODULES))
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=50.0)
+    ap.add_argument("--forbid", default=",".join(DEFAULT_FORBID))
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--out", default=str(ROOT / "data" / "insights" / "import_time.json"))
+    args = ap.parse_args()
+
+    forbid = tuple(f.strip() for f in args.forbid.split(",") if f.strip())
+    mods = [m.strip() for m in args.modules.split(",") if m.strip()]
+    results, failures = [], []
+    for i, mod in enumerate(mods, 1):
+        try:
+            res = measure(mod, args.runs, forbid, args.top)
+        except RuntimeError as e:
+            failures.append(str(e))
+            print(f"{mod}: {e}")
+            continue
+        res["over_budget"] = res["median_ms"] > args.budget_ms
+        results.append(res)
+        flag = " OVER BUDGET" if res["over_budget"] else ""
+        print(f"{mod}: {res['median_ms']} ms median (min {res['min_ms']}), "
+              f"{res['modules_imported']} modules{flag}")
+        if res["forbidden_loaded"]:
+            print(f"  forbidden: {', '.join(res['forbidden_loaded'])}")
+        for row in res["heaviest"][:5]:
+            print(f"  {row['cumulative_us'] / 1000.0:>7.1f} ms  {row['module']}")
+        print("PROGRESS: " + json.dumps({"n": i, "m": len(mods), "label": mod}))
+
+    ok = not failures and not any(r["over_budget"] or r["forbidden_loaded"] for r in results)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"budget_ms": args.budget_ms, "forbid": list(forbid), "results": results,
+                   "failures": failures}, f, indent=2)
+    print("SUMMARY: " + json.dumps({"ok": ok, "out": args.out,
+                                   "median_ms": {r["module"]: r["median_ms"] for r in results}}))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# =============================================================================
+# File: tools/compile_catalogue.py
+# Persistent Assistant v3 – Compile the model catalogue snapshot
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 16:20 BST
+# =============================================================================
+"""
+Merge every model-metadata source into data/catalogue/catalogue.json
+(see core/catalogue.py). Runs automatically on first use when stale; this
+script forces a rebuild and prints a summary.
+
+Usage:
+    python tools/compile_catalogue.py [--query provider/model]
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import json, time, argparse
+
+from core.catalogue import get_catalogue, SNAPSHOT_PATH
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compile the model catalogue snapshot.")
+    ap.add_argument("--query", help="print one compiled record, e.g. openai/gpt-4o-mini")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    cat = get_catalogue(refresh=True)
+    if args.query:
+        prov, _, model = args.query.partition("/")
+        print(json.dumps(cat.get(prov, model), indent=2))
+    summary = {
+        "file": str(SNAPSHOT_PATH.relative_to(ROOT)).replace("\\", "/"),
+        "models": len(cat),
+        "providers": {p: len(cat.models(provider=p)) for p in cat.providers()},
+        "priced": len(cat.models(priced_only=True)),
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
+    }
+    print("SUMMARY:", json.dumps(summary))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
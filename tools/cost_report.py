@@ -0,0 +1,57 @@
+# =============================================================================
+# File: tools/cost_report.py
+# Persistent Assistant v3 – Daily AI spend report from the interaction store
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 15:40 BST
+# Update History:
+#   - 2025-08-23 15:40 BST: Initial version (core/cost_engine batch pricing).
+# =============================================================================
+"""
+Re-prices every logged interaction (logs/ai_request_log.csv, else
+data/interactions/INT_*.yaml) with the current rate table and aggregates spend
+per day and provider/model.
+
+Usage:
+    python tools/cost_report.py [--since YYYY-MM-DD] [--out data/insights/cost_report.json]
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import json, time, argparse
+
+from core.cost_engine import daily_report, get_engine, load_records
+from core.fileutil import atomic_write_text
+
+OUT_PATH = ROOT / "data" / "insights" / "cost_report.json"
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Daily AI spend report")
+    ap.add_argument("--since", help="first day to include (YYYY-MM-DD)")
+    ap.add_argument("--out", default=str(OUT_PATH))
+    a = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    records = load_records()
+    report = daily_report(records, get_engine().table, since=a.since)
+    report["elapsed_sec"] = round(time.perf_counter() - t0, 3)
+
+    out = pathlib.Path(a.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(str(out), json.dumps(report, indent=2))
+
+    for day, usd in report["per_day_usd"].items():
+        print(f"{day}  ${usd:,.4f}")
+    if report["unpriced"]:
+        print("WARN: unpriced models: " + ", ".join(report["unpriced"]))
+    print("SUMMARY: " + json.dumps({"records": report["records"], "total_usd": report["total_usd"],
+                                    "days": len(report["per_day_usd"]), "unpriced": len(report["unpriced"]),
+                                    "out": str(out), "elapsed_sec": report["elapsed_sec"]}))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
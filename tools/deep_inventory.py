@@ -12,7 +12,7 @@ ROOT = os.getcwd()
 OUT_DIR = os.path.join("data","insights")
 os.makedirs(OUT_DIR, exist_ok=True)
 
-SKIP_DIRS = {".git", ".venv", "venv", "__pycache__", ".mypy_cache", ".ruff_cache", ".idea", ".vscode"}
+SKIP_DIRS = {".git", ".venv", "venv", "__pycache__", ".mypy_cache", ".ruff_cache", ".idea", ".vscode", ".pa_archive"}
 
 def sha256_file(path):
     h = hashlib.sha256()
@@ -7,6 +7,8 @@
 #   - 2025-08-19 14:05 BST: Added path bootstrap, ASCII-safe logging/output,
 #     OpenAI model list fetch, seed sets for Anthropic/Google to align with
 #     deterministic enrichment, classification for interface/family/probe_route.
+#   - 2025-08-23 14:10 BST: OpenAI model list via tools/http_cache (conditional
+#     GET, offline replay with PA_HTTP_OFFLINE=1); SDK kept as fallback.
 # =============================================================================
 
 from __future__ import annotations
@@ -33,6 +35,7 @@ from typing import Dict, Any
 # Local utilities
 from tools._env import load_keys
 from tools.model_classifier import classify
+from tools.http_cache import get_cache, is_offline
 
 # Optional: OpenAI model list (best-effort; we still seed critical ids)
 try:
@@ -41,6 +44,8 @@ except Exception:
     OpenAI = None  # type: ignore
 
 RAW_PATH = os.path.join(PROJECT_ROOT, "ai_models_raw.yaml")
+OPENAI_MODELS_URL = "https://api.openai.com/v1/models"
+MODELS_MAX_AGE = float(os.environ.get("PA_MODELS_MAX_AGE", 3600))
 
 # --- Logging (ASCII to avoid cp1252 console issues) ---------------------------
 os.makedirs(os.path.join(PROJECT_ROOT, "logs"), exist_ok=True)
@@ -77,6 +82,10 @@ def _fetch_openai_ids(keys: Dict[str, str]) -> set[str]:
     ids.update(seeded)
 
     api_key = keys.get("openai")
+    listed = _list_openai_http(api_key) if (api_key or is_offline()) else None
+    if listed is not None:
+        ids.update(listed)
+        return ids
     if not api_key or OpenAI is None:
         log.warning("OpenAI key or SDK missing; using seeded OpenAI ids only.")
         return ids
@@ -93,6 +102,21 @@ def _fetch_openai_ids(keys: Dict[str, str]) -> set[str]:
 
     return ids
 
+def _list_openai_http(api_key: str | None) -> set[str] | None:
+    """GET /v1/models through the response cache; None if nothing usable."""
+    cache = get_cache()
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    r = cache.fetch(OPENAI_MODELS_URL, headers=headers, max_age=MODELS_MAX_AGE)
+    if r.error:
+        log.warning("OpenAI models list: %s (source=%s)", r.error, r.source)
+    try:
+        ids = cache.cached_parse("openai_models", "1", r,
+                                 lambda t: sorted(m["id"] for m in json.loads(t).get("data", []) if m.get("id")))
+    except Exception as e:
+        log.error("OpenAI models list parse failed: %s", e)
+        return None
+    return set(ids) if ids else None
+
 def _seed_anthropic_ids() -> set[str]:
     """
     Deterministic ids that match provider_docs.py parsing:
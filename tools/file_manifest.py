@@ -19,7 +19,7 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DEFAULT_OUT = os.path.join(PROJECT_ROOT, "project", "structure", "file_manifest.yaml")
 
 INCLUDE_EXT = {".py", ".yaml", ".yml", ".md", ".json", ".ui", ".toml"}
-EXCLUDE_DIRS = {".git", ".venv", "__pycache__", "logs", "data\\insights\\runs"}
+EXCLUDE_DIRS = {".git", ".venv", "__pycache__", "logs", "data\\insights\\runs", ".pa_archive"}
 
 def sha256_of(path: str) -> str:
     h = hashlib.sha256()
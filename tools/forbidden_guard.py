@@ -1,5 +1,5 @@
 from __future__ import annotations
-import re, sys, pathlib, yaml
+import os, re, sys, pathlib, yaml
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 RULES = ROOT / "tools" / "forbidden_patterns.yaml"
@@ -21,19 +21,26 @@ def is_excluded(p: pathlib.Path, exds: list[str]) -> bool:
 def scan():
     forb, exds = load_rules()
     hits = []
-    for p in ROOT.rglob("*"):
-        if not p.is_file():
-            continue
-        if is_excluded(p, exds):
-            continue
-        try:
-            text = p.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            continue
-        for rx in forb:
-            m = rx.search(text)
-            if m:
-                hits.append({"file": str(p), "pattern": rx.pattern, "match": m.group(0)})
+    for dirpath, dirnames, filenames in os.walk(ROOT):
+        # prune excluded directories instead of walking into them
+        dirnames[:] = [d for d in dirnames if not is_excluded(pathlib.Path(dirpath) / d, exds)]
+        for fn in filenames:
+            p = pathlib.Path(dirpath) / fn
+            if is_excluded(p, exds):
+                continue
+            hits.extend(_scan_file(p, forb))
+    return hits
+
+def _scan_file(p: pathlib.Path, forb) -> list[dict]:
+    hits = []
+    try:
+        text = p.read_text(encoding="utf-8", errors="ignore")
+    except Exception:
+        return hits
+    for rx in forb:
+        m = rx.search(text)
+        if m:
+            hits.append({"file": str(p), "pattern": rx.pattern, "match": m.group(0)})
     return hits
 
 def main():
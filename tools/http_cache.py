@@ -0,0 +1,247 @@
+# =============================================================================
+# File: tools/http_cache.py
+# Persistent Assistant v3 – Cached, concurrent HTTP fetch layer for catalogue refreshes
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 14:10 BST
+# Update History:
+#   - 2025-08-23 14:10 BST: Initial version (conditional GET, fetch_many, parse cache, offline replay).
+# =============================================================================
+"""
+Disk-backed HTTP GET used by provider_docs / fetch_ai_models.
+
+  * Responses are stored under data/http_cache/ (one <key>.json meta + <key>.body
+    per URL). Revalidation sends If-None-Match / If-Modified-Since; a 304 reuses
+    the stored body. Entries younger than max_age are served without a request.
+  * fetch_many() runs fetches on a thread pool.
+  * cached_parse() memoizes parser output by (parser name, version, body sha256),
+    so unchanged pages are not re-parsed (and do not need BeautifulSoup).
+  * Offline replay: PA_HTTP_OFFLINE=1 (or offline=True) serves only from the cache
+    directory; PA_HTTP_CACHE_DIR points at another directory, e.g. a fixture set
+    recorded with a normal run.
+
+Usage:
+    python tools/http_cache.py get <url> [--max-age S] [--offline]
+    python tools/http_cache.py list
+    python tools/http_cache.py clear
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import os, json, time, hashlib, argparse
+import urllib.request, urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from core.fileutil import atomic_write_bytes, atomic_write_text
+
+DEFAULT_DIR = ROOT / "data" / "http_cache"
+USER_AGENT = "PA-v3/1.0"
+TIMEOUT = 25
+WORKERS = 8
+
+def cache_dir() -> pathlib.Path:
+    return pathlib.Path(os.environ.get("PA_HTTP_CACHE_DIR") or DEFAULT_DIR)
+
+def is_offline() -> bool:
+    return os.environ.get("PA_HTTP_OFFLINE", "").strip().lower() in ("1", "true", "yes")
+
+def _key(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int                 # 200 for fresh and revalidated bodies, 0 if nothing usable
+    body: Optional[bytes]
+    sha256: Optional[str] = None
+    source: str = "network"     # network | revalidated | cache | offline | none
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.body is not None
+
+    @property
+    def text(self) -> Optional[str]:
+        return None if self.body is None else self.body.decode("utf-8", errors="replace")
+
+def _transport(url: str, headers: Dict[str, str], timeout: float) -> Tuple[int, Dict[str, str], bytes]:
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return r.status, {k.lower(): v for k, v in r.headers.items()}, r.read()
+    except urllib.error.HTTPError as e:
+        return e.code, {k.lower(): v for k, v in (e.headers or {}).items()}, b""
+
+class HttpCache:
+    def __init__(self, root: pathlib.Path | str | None = None, transport: Callable = _transport):
+        self.root = pathlib.Path(root) if root else cache_dir()
+        self.transport = transport
+
+    # -- storage ------------------------------------------------------------
+    def _paths(self, url: str) -> Tuple[pathlib.Path, pathlib.Path]:
+        k = _key(url)
+        return self.root / f"{k}.json", self.root / f"{k}.body"
+
+    def meta(self, url: str) -> Optional[Dict[str, Any]]:
+        mp, _ = self._paths(url)
+        try:
+            return json.loads(mp.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _load(self, url: str) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+        meta = self.meta(url)
+        if meta is None:
+            return None, None
+        try:
+            return meta, self._paths(url)[1].read_bytes()
+        except OSError:
+            return None, None
+
+    def _store(self, url: str, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+        mp, bp = self._paths(url)
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "size": len(body),
+            "fetched": time.time(),
+            "validated": time.time(),
+        }
+        atomic_write_bytes(str(bp), body)
+        atomic_write_text(str(mp), json.dumps(meta, indent=1))
+        return meta
+
+    def _touch(self, url: str, meta: Dict[str, Any]) -> None:
+        meta["validated"] = time.time()
+        atomic_write_text(str(self._paths(url)[0]), json.dumps(meta, indent=1))
+
+    # -- fetch --------------------------------------------------------------
+    def fetch(self, url: str, *, headers: Dict[str, str] | None = None, max_age: float = 0,
+              timeout: float = TIMEOUT, offline: bool | None = None) -> FetchResult:
+        """
+        GET with conditional revalidation. On network errors a stored body is
+        returned (source='cache') rather than nothing.
+        """
+        offline = is_offline() if offline is None else offline
+        meta, body = self._load(url)
+        if offline:
+            if body is None:
+                return FetchResult(url, 0, None, source="none", error="offline: not cached")
+            return FetchResult(url, 200, body, meta.get("sha256"), source="offline")
+        if body is not None and max_age and time.time() - meta.get("validated", 0) < max_age:
+            return FetchResult(url, 200, body, meta.get("sha256"), source="cache")
+
+        h = {"User-Agent": USER_AGENT}
+        h.update(headers or {})
+        if body is not None:
+            if meta.get("etag"):
+                h["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                h["If-Modified-Since"] = meta["last_modified"]
+        try:
+            status, rh, data = self.transport(url, h, timeout)
+        except Exception as e:
+            if body is not None:
+                return FetchResult(url, 200, body, meta.get("sha256"), source="cache", error=str(e))
+            return FetchResult(url, 0, None, source="none", error=str(e))
+
+        if status == 304 and body is not None:
+            self._touch(url, meta)
+            return FetchResult(url, 200, body, meta.get("sha256"), source="revalidated")
+        if status == 200:
+            meta = self._store(url, rh, data)
+            return FetchResult(url, 200, data, meta["sha256"], source="network")
+        err = f"HTTP {status}"
+        if body is not None:
+            return FetchResult(url, 200, body, meta.get("sha256"), source="cache", error=err)
+        return FetchResult(url, status, None, source="none", error=err)
+
+    def fetch_many(self, urls: Iterable[str], *, workers: int = WORKERS, **kw) -> Dict[str, FetchResult]:
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as ex:
+            return dict(zip(urls, ex.map(lambda u: self.fetch(u, **kw), urls)))
+
+    # -- parse cache --------------------------------------------------------
+    def cached_parse(self, name: str, version: str, result: FetchResult, parser: Callable[[str], Any]) -> Any:
+        """parser(text) -> JSON-able value, memoized by (name, version, body sha256)."""
+        if not result.ok:
+            return None
+        pdir = self.root / "parsed"
+        pp = pdir / f"{name}_{version}_{result.sha256}.json"
+        try:
+            return json.loads(pp.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass
+        value = parser(result.text)
+        try:
+            pdir.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(str(pp), json.dumps(value))
+        except OSError:
+            pass
+        return value
+
+    def entries(self):
+        for mp in sorted(self.root.glob("*.json")):
+            try:
+                yield json.loads(mp.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+
+    def clear(self) -> int:
+        n = 0
+        for p in list(self.root.glob("*.json")) + list(self.root.glob("*.body")) + list((self.root / "parsed").glob("*.json")):
+            p.unlink()
+            n += 1
+        return n
+
+_default: Optional[HttpCache] = None
+
+def get_cache() -> HttpCache:
+    global _default
+    if _default is None or _default.root != cache_dir():
+        _default = HttpCache()
+    return _default
+
+def fetch(url: str, **kw) -> FetchResult:
+    return get_cache().fetch(url, **kw)
+
+def fetch_many(urls: Iterable[str], **kw) -> Dict[str, FetchResult]:
+    return get_cache().fetch_many(urls, **kw)
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Cached HTTP fetch layer")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    g = sub.add_parser("get")
+    g.add_argument("url")
+    g.add_argument("--max-age", type=float, default=0)
+    g.add_argument("--offline", action="store_true")
+    sub.add_parser("list")
+    sub.add_parser("clear")
+    a = ap.parse_args(argv)
+    c = get_cache()
+    if a.cmd == "get":
+        r = c.fetch(a.url, max_age=a.max_age, offline=a.offline or None)
+        print("SUMMARY: " + json.dumps({"url": r.url, "status": r.status, "source": r.source,
+                                        "bytes": len(r.body or b""), "error": r.error}))
+        return 0 if r.ok else 1
+    if a.cmd == "list":
+        for m in c.entries():
+            print(f"{m.get('size', 0):>9}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(m.get('validated', 0)))}  {m.get('url')}")
+        return 0
+    print("SUMMARY: " + json.dumps({"removed": c.clear()}))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
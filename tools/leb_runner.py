@@ -1,20 +1,37 @@
 from __future__ import annotations
-import sys, subprocess, json, time, pathlib, shlex
+import os, sys, subprocess, json, time, pathlib, shlex
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
-LOGS = ROOT/"logs"/"leb"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+LOGS = pathlib.Path(os.environ.get("PA_LEB_LOG_DIR") or ROOT/"logs"/"leb")
 LOGS.mkdir(parents=True, exist_ok=True)
 
 ALLOW = ("python ", "pytest ")
 
+def run_warm(cmdline: str):
+    """Run through a local LEB (its warm workers skip both interpreter starts); None if it isn't up."""
+    try:
+        from core.leb_client import LEBClient
+        client = LEBClient(port=int(os.environ.get("LEB_PORT", "8765")), timeout=2.0)
+        if not client.ping().get("warm"):
+            return None
+        return client.run(cmdline)
+    except Exception:
+        return None
+
 def main():
-    if len(sys.argv) < 2:
-        print("usage: python tools/leb_runner.py -- <cmdline>")
+    args = sys.argv[1:]
+    warm = bool(args) and args[0] == "--warm"
+    if warm:
+        args = args[1:]
+    if not args:
+        print("usage: python tools/leb_runner.py [--warm] -- <cmdline>")
         return 2
-    if sys.argv[1] != "--":
+    if args[0] != "--":
         print("use -- then the command to run")
         return 2
-    cmdline = " ".join(sys.argv[2:]).strip()
+    cmdline = " ".join(args[1:]).strip()
     if not cmdline.startswith(ALLOW):
         print(f"[BLOCKED] Only commands starting with {ALLOW} are allowed (MVP).")
         return 3
@@ -22,6 +39,16 @@ def main():
     ts = time.strftime("%Y%m%d_%H%M%S")
     log_path = LOGS/f"leb_{ts}.log"
 
+    res = run_warm(cmdline) if warm else None
+    if res is not None:
+        out = res.get("stdout", "") + ("\n" + res["stderr"] if res.get("stderr") else "")
+        log_path.write_text(out, encoding="utf-8")
+        code = res.get("rc")
+        code = 1 if code is None else code
+        print(json.dumps({"ok": code == 0, "code": code, "log": str(log_path),
+                          "head": out[:4000], "warm": True}, ensure_ascii=False))
+        return code
+
     # Prefer our supervised capture tool if available
     runner = [sys.executable, str(ROOT/"tools"/"run_with_capture.py"), "--", cmdline]
     try:
@@ -1,14 +1,28 @@
 # tools/leb_server.py
 from __future__ import annotations
-import os, sys, threading, subprocess, time
+import os, sys, threading
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from core.leb_jobs import JobRunner, sse_events
+from core.leb_warm_pool import WarmPool
 
 APP = Flask(__name__)
 LOG_LOCK = threading.Lock()
 LOGS: list[dict] = []
 STARTED = datetime.utcnow().isoformat() + "Z"
-VERSION = "0.1"
+VERSION = "0.2"
+
+# bounded pool: at most LEB_MAX_JOBS commands run at once, the rest queue
+MAX_JOBS = int(os.environ.get("LEB_MAX_JOBS", "2"))
+# LEB_WARM=1: python/pytest commands run in pre-started interpreters (one per job slot)
+WARM = (WarmPool(size=MAX_JOBS, max_runs=int(os.environ.get("LEB_WARM_RUNS", "50")))
+        if os.environ.get("LEB_WARM") == "1" else None)
+JOBS = JobRunner(max_workers=MAX_JOBS, warm=WARM)
+KEEPALIVE = 15.0
 
 def _add_log(kind: str, msg: str) -> None:
     with LOG_LOCK:
@@ -17,30 +31,86 @@ def _add_log(kind: str, msg: str) -> None:
         if len(LOGS) > 500:
             del LOGS[: len(LOGS) - 500]
 
+def _submit(data: dict):
+    cmd = data.get("cmd")
+    if not cmd or not isinstance(cmd, str):
+        return None, (jsonify({"ok": False, "error": "missing cmd"}), 400)
+    timeout = data.get("timeout")
+    job = JOBS.submit(cmd, cwd=data.get("cwd") or None,
+                      timeout=float(timeout) if timeout else None)
+    _add_log("run", f"{job.id} cmd={cmd!r}")
+    return job, None
+
 @APP.get("/ping")
 def ping():
-    return jsonify({"ok": True, "service": "LEB", "version": VERSION, "started": STARTED})
+    return jsonify({"ok": True, "service": "LEB", "version": VERSION, "started": STARTED,
+                    "jobs": True, "max_jobs": JOBS.max_workers,
+                    "warm": WARM.info() if WARM is not None else None})
 
 @APP.post("/run")
 def run():
-    data = request.get_json(silent=True) or {}
-    cmd = data.get("cmd")
-    if not cmd or not isinstance(cmd, str):
-        return jsonify({"ok": False, "error": "missing cmd"}), 400
+    """Blocking run (kept for old clients); goes through the same bounded pool as /jobs."""
+    job, err = _submit(request.get_json(silent=True) or {})
+    if err:
+        return err
+    job.wait()
+    _add_log("done", f"{job.id} rc={job.rc}")
+    if job.state == "failed" and job.rc is None:
+        return jsonify({"ok": False, "error": job.error}), 500
+    return jsonify({
+        "ok": True,
+        "rc": job.rc,
+        "stdout": job.output("stdout"),
+        "stderr": job.output("stderr")
+    })
+
+@APP.post("/jobs")
+def jobs_submit():
+    job, err = _submit(request.get_json(silent=True) or {})
+    if err:
+        return err
+    return jsonify({"ok": True, "id": job.id, "state": job.state,
+                    "stream": f"/jobs/{job.id}/stream"}), 202
+
+@APP.get("/jobs")
+def jobs_list():
+    return jsonify({"ok": True, "jobs": JOBS.list()})
 
-    _add_log("run", f"cmd={cmd!r}")
+@APP.get("/jobs/<job_id>")
+def jobs_status(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "unknown job"}), 404
+    out = dict(job.to_dict(), ok=True)
+    if request.args.get("output"):
+        out.update(stdout=job.output("stdout"), stderr=job.output("stderr"))
+    return jsonify(out)
+
+@APP.get("/jobs/<job_id>/stream")
+def jobs_stream(job_id: str):
+    """SSE: stdout/stderr events per line, then `exit`; resume with ?since=N or Last-Event-ID."""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "unknown job"}), 404
+    arg, last = request.args.get("since"), request.headers.get("Last-Event-ID")
     try:
-        p = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        _add_log("done", f"rc={p.returncode}")
-        return jsonify({
-            "ok": True,
-            "rc": p.returncode,
-            "stdout": p.stdout,
-            "stderr": p.stderr
-        })
-    except Exception as e:
-        _add_log("error", f"{type(e).__name__}: {e}")
-        return jsonify({"ok": False, "error": str(e)}), 500
+        since = int(arg) if arg else (int(last) + 1 if last else 0)
+    except ValueError:
+        since = -1
+    if since < 0:
+        return jsonify({"ok": False, "error": "since / Last-Event-ID must be a non-negative integer"}), 400
+    return Response(stream_with_context(sse_events(job, since, keepalive=KEEPALIVE)),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@APP.post("/jobs/<job_id>/cancel")
+def jobs_cancel(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "unknown job"}), 404
+    ok = JOBS.cancel(job_id)
+    _add_log("cancel", f"{job_id} accepted={ok}")
+    return jsonify({"ok": ok, "id": job_id, "state": job.state})
 
 @APP.get("/logs")
 def logs():
@@ -51,4 +121,4 @@ if __name__ == "__main__":
     # Default host/port via env or args later if needed
     port = int(os.environ.get("LEB_PORT", "8765"))
     _add_log("start", f"LEB start 127.0.0.1:{port}")
-    APP.run(host="127.0.0.1", port=port)
+    APP.run(host="127.0.0.1", port=port, threaded=True)
@@ -0,0 +1,325 @@
+# =============================================================================
+# File: tools/mock_provider.py
+# Persistent Assistant v3 – Local stand-in provider server for offline benchmarks
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 17:20 BST
+# Update History:
+#   - 2025-08-23 17:20 BST: Initial version (OpenAI/Groq/Anthropic shapes, /ask, SSE, 429s).
+# =============================================================================
+"""
+Stdlib HTTP server that answers like the providers AIClient talks to, so
+AIClient, the sidecar's _ai_bridge and the probe tools can be exercised and
+benchmarked without keys or network.
+
+Routes (any bearer/x-api-key is accepted):
+    POST /v1/chat/completions            OpenAI shape   (stream: SSE "data:" chunks)
+    POST /openai/v1/chat/completions     Groq shape     (same as OpenAI)
+    POST /v1/messages                    Anthropic shape (stream: SSE events)
+    POST /ask  /v1/ask  /chat  /v1/chat  sidecar bridge  -> {"reply": ...}
+    GET  /v1/models                      tiny model list
+    GET  /__mock__/stats                 request / status counters
+
+Behaviour knobs (MockConfig, CLI flags or the config dict on the server):
+    latency      "fixed:0.05" | "uniform:0.02,0.2" | "normal:0.1,0.03" | "lognormal:0.1,0.5"
+                 (lognormal: median, sigma) – seconds before the first byte
+    error_rate   fraction answered with HTTP 500
+    rate_limit   fraction answered with HTTP 429 + Retry-After
+    chunk_delay  seconds between streamed chunks
+    reply_words  words in each reply
+
+Point clients at it:
+    AIClient("openai", "x", base_url=f"{url}/v1"), AIClient("groq", "x", base_url=url),
+    AIClient("anthropic", "x", base_url=url), PA_AI_BASE=url for _ai_bridge,
+    or env_for(url) for SDK env vars (probe tools).
+
+Usage:
+    python tools/mock_provider.py [--port 8799] [--latency lognormal:0.1,0.5]
+                                  [--error-rate 0.01] [--rate-limit 0.02] [--seed 1]
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import json, time, random, argparse, threading
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator
+
+DEFAULT_PORT = 8799
+CHAT_PATHS = ("/v1/chat/completions", "/openai/v1/chat/completions", "/chat/completions")
+ASK_PATHS = ("/ask", "/v1/ask", "/chat", "/v1/chat")
+WORDS = ("alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu "
+         "nu xi omicron pi rho sigma tau upsilon phi chi psi omega").split()
+
+@dataclass
+class MockConfig:
+    latency: str = "fixed:0.0"
+    error_rate: float = 0.0
+    rate_limit: float = 0.0
+    retry_after: float = 1.0
+    chunk_delay: float = 0.0
+    reply_words: int = 24
+    seed: int | None = None
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """'kind:a,b' -> sampler(rng) returning seconds (never negative)."""
+    kind, _, args = (spec or "fixed:0").partition(":")
+    vals = [float(x) for x in args.split(",") if x.strip()] or [0.0]
+    kind = kind.strip().lower()
+    if kind == "fixed":
+        return lambda rng: max(0.0, vals[0])
+    if kind == "uniform":
+        lo, hi = vals[0], vals[1] if len(vals) > 1 else vals[0]
+        return lambda rng: max(0.0, rng.uniform(lo, hi))
+    if kind == "normal":
+        mu, sd = vals[0], vals[1] if len(vals) > 1 else 0.0
+        return lambda rng: max(0.0, rng.gauss(mu, sd))
+    if kind == "lognormal":
+        import math
+        median, sigma = vals[0], vals[1] if len(vals) > 1 else 0.5
+        mu = math.log(median) if median > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, sigma) if median > 0 else 0.0
+    raise ValueError(f"unknown latency distribution: {spec!r}")
+
+def env_for(base_url: str) -> Dict[str, str]:
+    """SDK base-url env vars pointing every provider at the mock."""
+    base = base_url.rstrip("/")
+    return {"OPENAI_BASE_URL": base + "/v1", "ANTHROPIC_BASE_URL": base,
+            "GROQ_BASE_URL": base, "PA_AI_BASE": base}
+
+def _tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "MockProviderServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *a):             # keep benchmark output clean
+        pass
+
+    # -- plumbing ---------------------------------------------------------
+    def _json(self, status: int, obj: Any, headers: Dict[str, str] | None = None) -> None:
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(status)
+
+    def _sse(self, events: Iterator[str]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        delay = self.server.config.chunk_delay
+        for i, ev in enumerate(events):
+            if i and delay:
+                time.sleep(delay)
+            self.wfile.write(ev.encode("utf-8"))
+            self.wfile.flush()
+        self.server.count(200)
+
+    def _body(self) -> Dict[str, Any]:
+        n = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(n) or b"{}")
+        except ValueError:
+            return {}
+
+    def _fault(self) -> bool:
+        """Sleep the sampled latency, then maybe answer 429/500. True if handled."""
+        kind, wait = self.server.draw()
+        time.sleep(wait)
+        cfg = self.server.config
+        if kind == "429":
+            self._json(429, {"error": {"type": "rate_limit_error", "message": "mock rate limit"}},
+                       {"Retry-After": str(cfg.retry_after)})
+            return True
+        if kind == "500":
+            self._json(500, {"error": {"type": "server_error", "message": "mock failure"}})
+            return True
+        return False
+
+    # -- routes -----------------------------------------------------------
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/__mock__/stats":
+            return self._json(200, self.server.stats())
+        if path.endswith("/models"):
+            return self._json(200, {"object": "list", "data": [
+                {"id": m, "object": "model"} for m in ("mock-small", "mock-large")]})
+        self._json(404, {"error": {"message": f"no route {path}"}})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        body = self._body()
+        if path in CHAT_PATHS:
+            handler = self._openai
+        elif path.endswith("/v1/messages"):
+            handler = self._anthropic
+        elif path in ASK_PATHS:
+            handler = self._ask
+        else:
+            return self._json(404, {"error": {"message": f"no route {path}"}})
+        if not self._fault():
+            handler(body)
+
+    def _openai(self, body: Dict[str, Any]) -> None:
+        model = body.get("model") or "mock-small"
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages") or [])
+        words = self.server.reply_words()
+        rid = self.server.next_id("chatcmpl")
+        usage = {"prompt_tokens": _tokens(prompt), "completion_tokens": len(words),
+                 "total_tokens": _tokens(prompt) + len(words), "prompt_tokens_details": {"cached_tokens": 0}}
+        if body.get("stream"):
+            def events():
+                for i, w in enumerate(words):
+                    chunk = {"id": rid, "object": "chat.completion.chunk", "model": model,
+                             "choices": [{"index": 0, "delta": {"content": (" " if i else "") + w},
+                                          "finish_reason": None}]}
+                    yield "data: " + json.dumps(chunk) + "\n\n"
+                done = {"id": rid, "object": "chat.completion.chunk", "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage}
+                yield "data: " + json.dumps(done) + "\n\n"
+                yield "data: [DONE]\n\n"
+            return self._sse(events())
+        self._json(200, {"id": rid, "object": "chat.completion", "created": int(time.time()), "model": model,
+                         "choices": [{"index": 0, "finish_reason": "stop",
+                                      "message": {"role": "assistant", "content": " ".join(words)}}],
+                         "usage": usage})
+
+    def _anthropic(self, body: Dict[str, Any]) -> None:
+        model = body.get("model") or "mock-small"
+        system = body.get("system") or ""
+        if isinstance(system, list):
+            system = " ".join(b.get("text", "") for b in system if isinstance(b, dict))
+        prompt = system + " ".join(str(m.get("content", "")) for m in body.get("messages") or [])
+        words = self.server.reply_words()
+        rid = self.server.next_id("msg")
+        usage = {"input_tokens": _tokens(prompt), "output_tokens": len(words),
+                 "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}
+        if body.get("stream"):
+            def ev(name, data):
+                return f"event: {name}\ndata: {json.dumps(dict(data, type=name))}\n\n"
+            def events():
+                yield ev("message_start", {"message": {"id": rid, "type": "message", "role": "assistant",
+                                                       "model": model, "content": [],
+                                                       "usage": dict(usage, output_tokens=0)}})
+                yield ev("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+                for i, w in enumerate(words):
+                    yield ev("content_block_delta", {"index": 0, "delta": {"type": "text_delta",
+                                                                           "text": (" " if i else "") + w}})
+                yield ev("content_block_stop", {"index": 0})
+                yield ev("message_delta", {"delta": {"stop_reason": "end_turn"},
+                                           "usage": {"output_tokens": len(words)}})
+                yield ev("message_stop", {})
+            return self._sse(events())
+        self._json(200, {"id": rid, "type": "message", "role": "assistant", "model": model,
+                         "content": [{"type": "text", "text": " ".join(words)}],
+                         "stop_reason": "end_turn", "usage": usage})
+
+    def _ask(self, body: Dict[str, Any]) -> None:
+        text = str(body.get("text") or "")
+        self._json(200, {"ok": True, "reply": " ".join(self.server.reply_words()),
+                         "tokens_in": _tokens(text)})
+
+class MockProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: MockConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        self._latency = parse_latency(self.config.latency)
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._seq = 0
+        self._thread: threading.Thread | None = None
+        super().__init__((host, port), _Handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self):
+        """(outcome, latency) from one locked rng draw: outcome is "ok", "429" or "500"."""
+        cfg = self.config
+        with self._lock:
+            wait = self._latency(self._rng)
+            u = self._rng.random()
+        if u < cfg.rate_limit:
+            return "429", wait
+        if u < cfg.rate_limit + cfg.error_rate:
+            return "500", wait
+        return "ok", wait
+
+    def reply_words(self):
+        with self._lock:
+            return [self._rng.choice(WORDS) for _ in range(max(1, self.config.reply_words))]
+
+    def next_id(self, prefix: str) -> str:
+        with self._lock:
+            self._seq += 1
+            return f"{prefix}_mock{self._seq:06d}"
+
+    def count(self, status: int) -> None:
+        with self._lock:
+            self._counts[str(status)] = self._counts.get(str(status), 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": sum(self._counts.values()), "status": dict(self._counts),
+                    "config": asdict(self.config)}
+
+    # -- lifecycle --------------------------------------------------------
+    def start(self) -> "MockProviderServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-provider", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MockProviderServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Local stand-in provider server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--latency", default="fixed:0.0")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit", type=float, default=0.0)
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--chunk-delay", type=float, default=0.0)
+    ap.add_argument("--reply-words", type=int, default=24)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+    cfg = MockConfig(latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit,
+                     retry_after=args.retry_after, chunk_delay=args.chunk_delay,
+                     reply_words=args.reply_words, seed=args.seed)
+    srv = MockProviderServer(cfg, args.host, args.port)
+    print("SUMMARY: " + json.dumps({"url": srv.url, "env": env_for(srv.url), "config": asdict(cfg)}))
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -61,7 +61,24 @@ def _normalize_models(d: Dict[str, Any]) -> Dict[str, Any]:
     return {"providers": providers}
 
 def load_ai_models() -> Dict[str, Any]:
-    for path in CANDIDATES:
+    """
+    Model catalogue in the legacy {providers: {p: {models: {m: meta}}}} shape.
+    config/model_catalog.yaml still wins when present (manual override);
+    otherwise this is served from the compiled, memoized core.catalogue.
+    """
+    override = CANDIDATES[0]
+    if override.exists():
+        try:
+            raw = yaml.safe_load(override.read_text(encoding="utf-8")) or {}
+            return _normalize_models(raw)
+        except Exception:
+            pass
+    try:
+        from core.catalogue import get_catalogue
+        return get_catalogue().as_providers_dict()
+    except Exception:
+        pass
+    for path in CANDIDATES[1:]:
         if path.exists():
             try:
                 raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
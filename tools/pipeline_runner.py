@@ -0,0 +1,324 @@
+# =============================================================================
+# File: tools/pipeline_runner.py
+# Persistent Assistant v3 – DAG pipeline runner (warm worker pool, parallel steps)
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 14:10 BST
+# Update History:
+#   - 2025-08-23 14:10 BST: Initial version (config/pipelines.yaml, timing report).
+# =============================================================================
+"""
+Runs a named pipeline from config/pipelines.yaml. Tool scripts are executed
+with runpy inside a small pool of warm worker processes (imports such as yaml
+are paid once per worker, not once per tool). Steps whose 'needs' are met run
+in parallel; a failed step skips its dependents.
+
+Output follows the Tools tab protocol:
+    PROGRESS: {"n", "m", "ok", "fail", "skipped", "label"}
+    SUMMARY:  {...}
+and a timing report is written to data/insights/pipeline_report.json
+(per-pipeline entry, latest run). The step output log goes to tmp/logs/,
+outside the tree the forbidden-pattern guard scans.
+
+Usage:
+    python tools/pipeline_runner.py self_check [--workers 4] [--serial] [--verbose]
+    python tools/pipeline_runner.py --list
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import os, io, json, time, runpy, logging, argparse, contextlib, subprocess, traceback
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+PIPELINES_PATH = ROOT / "config" / "pipelines.yaml"
+REPORT_PATH = ROOT / "data" / "insights" / "pipeline_report.json"
+LOG_DIR = ROOT / "tmp" / "logs"      # guard-excluded: step logs quote what the guard finds
+
+@dataclass
+class Step:
+    name: str
+    script: str
+    args: List[str] = field(default_factory=list)
+    env: Dict[str, str] = field(default_factory=dict)
+    needs: List[str] = field(default_factory=list)
+    isolate: bool = False
+    allow_fail: bool = False
+    timeout: Optional[float] = None
+
+def load_pipelines(path: pathlib.Path = PIPELINES_PATH) -> Dict[str, List[Step]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    out: Dict[str, List[Step]] = {}
+    for pname, steps in (data.get("pipelines") or {}).items():
+        out[pname] = [Step(**{k: v for k, v in s.items() if k in Step.__dataclass_fields__}) for s in steps or []]
+    return out
+
+def validate(steps: List[Step]) -> None:
+    """Raise ValueError on duplicate names, unknown needs or cycles."""
+    names = [s.name for s in steps]
+    if len(names) != len(set(names)):
+        raise ValueError("duplicate step names")
+    by = {s.name: s for s in steps}
+    for s in steps:
+        for d in s.needs:
+            if d not in by:
+                raise ValueError(f"step {s.name!r} needs unknown step {d!r}")
+    state: Dict[str, int] = {}
+    def visit(n: str) -> None:
+        if state.get(n) == 1:
+            raise ValueError(f"dependency cycle through {n!r}")
+        if state.get(n) == 2:
+            return
+        state[n] = 1
+        for d in by[n].needs:
+            visit(d)
+        state[n] = 2
+    for n in names:
+        visit(n)
+
+# --------------------------------------------------------------------------- #
+# Step execution
+# --------------------------------------------------------------------------- #
+def _parse_summary(text: str) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("SUMMARY:"):
+            try:
+                summary = json.loads(line[len("SUMMARY:"):].strip())
+            except Exception:
+                pass
+    return summary
+
+def _worker_init(root: str) -> None:
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    os.chdir(root)
+    # warm the common imports once per worker
+    import yaml  # noqa: F401
+
+def _restore_process(modules: set, path: List[str], cwd: str, handlers: list, level: int) -> None:
+    """Undo what a step left behind so the next step in this worker starts clean."""
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        if h not in handlers:
+            root.removeHandler(h)
+            try:
+                h.close()
+            except Exception:
+                pass
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    for name in set(sys.modules) - modules:
+        del sys.modules[name]
+    sys.path[:] = path
+    os.chdir(cwd)
+
+def run_step_inprocess(script: str, args: List[str], env: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Execute a tool script as __main__ in this process, capturing its output.
+    argv, env, cwd, sys.path, newly imported modules and root logging handlers
+    are put back afterwards; tools with other process-wide side effects
+    should be marked isolate: true.
+    """
+    t0 = time.perf_counter()
+    out, err = io.StringIO(), io.StringIO()
+    saved_argv, saved_env = sys.argv[:], {k: os.environ.get(k) for k in env}
+    root_log = logging.getLogger()
+    saved = (set(sys.modules), sys.path[:], os.getcwd(), root_log.handlers[:], root_log.level)
+    sys.argv = [script] + list(args)
+    os.environ.update({k: str(v) for k, v in env.items()})
+    rc = 0
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                runpy.run_path(str(ROOT / script), run_name="__main__")
+            except SystemExit as e:
+                code = e.code
+                rc = code if isinstance(code, int) else (0 if code is None else 1)
+                if code is not None and not isinstance(code, int):
+                    print(code, file=sys.stderr)
+            except BaseException:
+                traceback.print_exc()
+                rc = 1
+    finally:
+        sys.argv = saved_argv
+        _restore_process(*saved)
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+    stdout = out.getvalue()
+    return {"rc": rc, "stdout": stdout, "stderr": err.getvalue(),
+            "elapsed_sec": round(time.perf_counter() - t0, 3), "summary": _parse_summary(stdout)}
+
+def run_step_isolated(script: str, args: List[str], env: Dict[str, str], timeout: Optional[float]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    full_env = dict(os.environ)
+    full_env.update({k: str(v) for k, v in env.items()})
+    full_env.setdefault("PYTHONIOENCODING", "utf-8")
+    try:
+        p = subprocess.run([sys.executable, script] + list(args), cwd=str(ROOT), env=full_env,
+                           capture_output=True, text=True, timeout=timeout)
+        rc, stdout, stderr = p.returncode, p.stdout or "", p.stderr or ""
+    except subprocess.TimeoutExpired as e:
+        rc, stdout, stderr = 124, (e.stdout or "") if isinstance(e.stdout, str) else "", f"timeout after {timeout}s"
+    return {"rc": rc, "stdout": stdout, "stderr": stderr,
+            "elapsed_sec": round(time.perf_counter() - t0, 3), "summary": _parse_summary(stdout)}
+
+class _InlineExecutor:
+    """Serial stand-in for ProcessPoolExecutor (--serial, tests)."""
+    def submit(self, fn, *a, **kw) -> Future:
+        f: Future = Future()
+        try:
+            f.set_result(fn(*a, **kw))
+        except BaseException as e:
+            f.set_exception(e)
+        return f
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+# --------------------------------------------------------------------------- #
+# Scheduler
+# --------------------------------------------------------------------------- #
+def _progress(n: int, m: int, ok: int, fail: int, skipped: int, label: str) -> None:
+    print("PROGRESS: " + json.dumps({"n": n, "m": m, "ok": ok, "fail": fail, "skipped": skipped, "label": label}),
+          flush=True)
+
+def run_pipeline(name: str, steps: List[Step], *, workers: int = 4, serial: bool = False,
+                 log_path: Optional[pathlib.Path] = None, verbose: bool = False) -> Dict[str, Any]:
+    validate(steps)
+    started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    t0 = time.perf_counter()
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = list(steps)
+    running: Dict[Future, Step] = {}
+    counts = {"ok": 0, "fail": 0, "skipped": 0}
+    m = len(steps)
+
+    pool = _InlineExecutor() if serial else ProcessPoolExecutor(
+        max_workers=max(1, min(workers, m)), initializer=_worker_init, initargs=(str(ROOT),))
+    log = open(log_path, "a", encoding="utf-8") if log_path else None
+
+    def settle(step: Step, res: Dict[str, Any]) -> None:
+        status = "ok" if res["rc"] == 0 else ("allowed_fail" if step.allow_fail else "fail")
+        res["status"] = status
+        results[step.name] = res
+        counts["ok" if status != "fail" else "fail"] += 1
+        if log:
+            log.write(f"===== {step.name} ({step.script}) rc={res['rc']} {res['elapsed_sec']}s\n")
+            log.write(res.get("stdout", ""))
+            if res.get("stderr"):
+                log.write("---- stderr ----\n" + res["stderr"])
+            log.write("\n")
+        if verbose:
+            sys.stdout.write(res.get("stdout", ""))
+        _progress(len(results), m, counts["ok"], counts["fail"], counts["skipped"], f"{step.name}: {status}")
+
+    try:
+        while pending or running:
+            # skip steps whose dependency failed
+            for s in list(pending):
+                if any(results.get(d, {}).get("status") in ("fail", "skipped") for d in s.needs):
+                    pending.remove(s)
+                    results[s.name] = {"rc": None, "status": "skipped", "elapsed_sec": 0.0, "summary": {},
+                                       "reason": "dependency failed"}
+                    counts["skipped"] += 1
+                    _progress(len(results), m, counts["ok"], counts["fail"], counts["skipped"], f"{s.name}: skipped")
+            ready = [s for s in pending if all(d in results and results[d]["status"] in ("ok", "allowed_fail")
+                                               for d in s.needs)]
+            for s in ready:
+                pending.remove(s)
+                if s.isolate:
+                    # isolated steps still run concurrently: the pool worker just waits on the child
+                    fut = pool.submit(run_step_isolated, s.script, s.args, s.env, s.timeout)
+                else:
+                    fut = pool.submit(run_step_inprocess, s.script, s.args, s.env)
+                running[fut] = s
+            if not running:
+                if pending:   # unreachable after validate(), but never spin
+                    break
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                try:
+                    res = fut.result()
+                except BaseException as e:
+                    res = {"rc": 1, "stdout": "", "stderr": f"worker error: {e}", "elapsed_sec": 0.0, "summary": {}}
+                settle(s, res)
+    finally:
+        pool.shutdown(wait=True)
+        if log:
+            log.close()
+
+    wall = round(time.perf_counter() - t0, 3)
+    steps_report = [{"name": s.name, "script": s.script, "status": results[s.name]["status"],
+                     "rc": results[s.name].get("rc"), "elapsed_sec": results[s.name]["elapsed_sec"],
+                     "summary": results[s.name].get("summary") or {}} for s in steps]
+    return {
+        "pipeline": name,
+        "started": started,
+        "ok": counts["fail"] == 0,
+        "wall_sec": wall,
+        "sum_step_sec": round(sum(r["elapsed_sec"] for r in steps_report), 3),
+        "counts": counts,
+        "steps": steps_report,
+    }
+
+def write_report(report: Dict[str, Any], path: pathlib.Path = REPORT_PATH) -> None:
+    from core.fileutil import atomic_write_text
+    data: Dict[str, Any] = {}
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+    data[report["pipeline"]] = report
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(str(path), json.dumps(data, indent=2))
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Run a tool pipeline (DAG, warm workers).")
+    ap.add_argument("pipeline", nargs="?")
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    ap.add_argument("--serial", action="store_true", help="run steps one by one in this process")
+    ap.add_argument("--verbose", action="store_true", help="echo step output")
+    ap.add_argument("--list", action="store_true")
+    args = ap.parse_args()
+
+    pipes = load_pipelines()
+    if args.list or not args.pipeline:
+        for n, steps in pipes.items():
+            print(f"{n}: " + ", ".join(s.name for s in steps))
+        return 0
+    if args.pipeline not in pipes:
+        print(f"Unknown pipeline {args.pipeline!r}; known: {', '.join(pipes)}")
+        return 2
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / f"pipeline_{args.pipeline}_{time.strftime('%Y%m%d_%H%M%S')}.log"
+    report = run_pipeline(args.pipeline, pipes[args.pipeline], workers=args.workers,
+                          serial=args.serial, log_path=log_path, verbose=args.verbose)
+    write_report(report)
+    for s in report["steps"]:
+        print(f"  {s['status']:<12} {s['elapsed_sec']:>7.3f}s  {s['name']}")
+    c = report["counts"]
+    print("SUMMARY: " + json.dumps({"pipeline": report["pipeline"], "ok": report["ok"], "passed": c["ok"],
+                                     "failed": c["fail"], "skipped": c["skipped"],
+                                     "wall_sec": report["wall_sec"], "sum_step_sec": report["sum_step_sec"],
+                                     "log": str(log_path).replace("\\", "/")}))
+    return 0 if report["ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
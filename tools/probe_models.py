@@ -5,6 +5,7 @@
 # Created: 2025-08-19 12:40 BST
 # Update History:
 #   - 2025-08-19 12:40 BST: Endpoint-aware probing; skip non-chat; categorize outcomes.
+#   - 2025-08-23 15:00 BST: Calls go through core/scheduler (rate limits, retry, breaker).
 # =============================================================================
 
 from __future__ import annotations
@@ -20,12 +21,17 @@ from openai import OpenAI
 import anthropic
 from tools._env import load_keys
 from tools.model_classifier import classify
+from core.scheduler import get_scheduler
 
 CATALOGUE = "ai_models.yaml"
 HEALTH_OUT = "ai_models_health.yaml"
 TMP_OUT = "ai_models_tmp.yaml"
 
 KEYS = load_keys()
+PROBE_RETRIES = 2   # probes should report, not wait out long outages
+
+def _call(prov: str, model: str, fn):
+    return get_scheduler().call(prov, model, fn, tokens=16, max_retries=PROBE_RETRIES)
 
 def _load_yaml(path: str) -> Dict[str, Any]:
     if not os.path.exists(path): return {}
@@ -40,9 +46,9 @@ def _probe_openai_chat(model: str) -> Dict[str, Any]:
     t0=time.perf_counter()
     try:
         client = OpenAI(api_key=KEYS.get("openai"))
-        r = client.chat.completions.create(
+        r = _call("openai", model, lambda: client.chat.completions.create(
             model=model, messages=[{"role":"user","content":"ping"}], temperature=0, max_tokens=8
-        )
+        ))
         ok = bool(getattr(r, "choices", None))
         return {"probe_ok": ok, "category": "ok" if ok else "fail",
                 "latency_ms": round((time.perf_counter()-t0)*1000,1), "error": ""}
@@ -56,7 +62,7 @@ def _probe_openai_responses(model: str) -> Dict[str, Any]:
     t0=time.perf_counter()
     try:
         client = OpenAI(api_key=KEYS.get("openai"))
-        r = client.responses.create(model=model, input="ping", max_output_tokens=8)
+        r = _call("openai", model, lambda: client.responses.create(model=model, input="ping", max_output_tokens=8))
         ok = bool(getattr(r, "output", None) or getattr(r, "choices", None))
         return {"probe_ok": ok, "category": "ok" if ok else "fail",
                 "latency_ms": round((time.perf_counter()-t0)*1000,1), "error": ""}
@@ -70,7 +76,8 @@ def _probe_anthropic_chat(model: str) -> Dict[str, Any]:
     t0=time.perf_counter()
     try:
         client = anthropic.Anthropic(api_key=KEYS.get("anthropic"))
-        _ = client.messages.create(model=model, max_tokens=8, messages=[{"role":"user","content":"ping"}])
+        _ = _call("anthropic", model, lambda: client.messages.create(
+            model=model, max_tokens=8, messages=[{"role":"user","content":"ping"}]))
         return {"probe_ok": True, "category": "ok", "latency_ms": round((time.perf_counter()-t0)*1000,1), "error": ""}
     except Exception as e:
         msg = str(e)
@@ -0,0 +1,104 @@
+# =============================================================================
+# File: tools/profile_startup.py
+# Persistent Assistant v3 – GUI launch-time profiler
+# Author: G. Rapson | GR-Analysis
+# Created: 2025-08-23 18:20 BST
+# Update History:
+#   - 2025-08-23 18:20 BST: Initial version (first-paint marks + -X importtime costs).
+# =============================================================================
+"""
+Launches main.py under `python -X importtime` with PA_PROFILE_STARTUP=exit,
+so the app records its startup marks (imports, session, window_built,
+first_paint, project_loaded; ms since interpreter start) and quits once the
+project has loaded. Reports the median marks over --runs launches, plus the
+most expensive imports and packages from the last run.
+
+--eager sets PA_EAGER_TABS=1 (every tab built in MainWindow.__init__) for a
+before/after comparison. --offscreen uses Qt's offscreen platform (CI, SSH).
+
+Usage:
+    python tools/profile_startup.py [--runs 3] [--eager] [--offscreen] [--top 20]
+        [--timeout 60] [--out data/insights/startup_profile.json]
+"""
+
+from __future__ import annotations
+# --- PA_ROOT_IMPORT ---
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+# --- /PA_ROOT_IMPORT ---
+import os, json, argparse, statistics, subprocess
+from typing import Any, Dict, List
+
+from core.startup_profile import REPORT_PATH, parse_importtime, top_imports, by_package
+
+def run_once(env: Dict[str, str], timeout: float) -> Dict[str, Any]:
+    report = ROOT / REPORT_PATH
+    if report.exists():
+        report.unlink()
+    p = subprocess.run([sys.executable, "-X", "importtime", "main.py"], cwd=str(ROOT), env=env,
+                       capture_output=True, text=True, timeout=timeout)
+    if not report.exists():
+        tail = (p.stderr or "").strip().splitlines()[-1:] or [f"rc={p.returncode}"]
+        raise RuntimeError(f"no startup profile written: {tail[0]}")
+    data = json.loads(report.read_text(encoding="utf-8"))
+    data["importtime"] = parse_importtime(p.stderr)
+    return data
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--eager", action="store_true", help="build every tab up front (PA_EAGER_TABS=1)")
+    ap.add_argument("--offscreen", action="store_true", help="QT_QPA_PLATFORM=offscreen")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--out", default=str(ROOT / "data" / "insights" / "startup_profile.json"))
+    args = ap.parse_args()
+
+    env = dict(os.environ, PA_PROFILE_STARTUP="exit", PYTHONIOENCODING="utf-8")
+    if args.eager:
+        env["PA_EAGER_TABS"] = "1"
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    runs: List[Dict[str, Any]] = []
+    for i in range(max(1, args.runs)):
+        try:
+            runs.append(run_once(env, args.timeout))
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"run {i + 1}: {e}")
+            print("SUMMARY: " + json.dumps({"ok": False, "error": str(e)}))
+            return 1
+        print("PROGRESS: " + json.dumps({"n": i + 1, "m": args.runs, "label": "launch"}))
+
+    names = list(runs[-1]["marks_ms"])
+    marks = {k: round(statistics.median(r["marks_ms"][k] for r in runs if k in r["marks_ms"]), 1) for k in names}
+    costs = runs[-1]["importtime"]
+    result = {
+        "mode": "eager" if args.eager else "lazy",
+        "runs": len(runs),
+        "marks_ms": marks,
+        "modules_loaded": runs[-1].get("modules_loaded"),
+        "import_total_ms": round(sum(c.self_us for c in costs) / 1000.0, 1),
+        "imports": top_imports(costs, args.top),
+        "packages_us": dict(list(by_package(costs).items())[:args.top]),
+    }
+
+    print(f"Startup ({result['mode']}, median of {len(runs)}):")
+    for k, v in marks.items():
+        print(f"  {k:<16} {v:>9.1f} ms")
+    print(f"Imports: {result['import_total_ms']} ms across {len(costs)} modules; most expensive:")
+    for row in result["imports"][:args.top]:
+        print(f"  {row['cumulative_us'] / 1000.0:>8.1f} ms cum  {row['self_us'] / 1000.0:>7.1f} ms self  {row['module']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print("SUMMARY: " + json.dumps({"ok": True, "out": args.out, "first_paint_ms": marks.get("first_paint"),
+                                   "project_loaded_ms": marks.get("project_loaded"),
+                                   "import_total_ms": result["import_total_ms"]}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,8 @@
 # Update History:
 #   - 2025-08-19 15:55 BST: 3-tier pricing pipeline with explicit drop reasons,
 #     ASCII-safe logs, capability scoring, allow-list, and built-in baselines.
+#   - 2025-08-23 14:10 BST: Pages fetched concurrently via tools/http_cache
+#     (conditional GET, offline replay); parse results cached by body hash.
 # =============================================================================
 
 from __future__ import annotations
@@ -19,14 +21,18 @@ if str(ROOT) not in sys.path:
 import os, re, json, logging, datetime, ast
 from typing import Dict, Any, Optional, Tuple
 
-# Optional runtime deps for scraping; module still works with overrides/baselines
+from tools.http_cache import get_cache
+
+# Optional runtime dep for parsing; module still works with overrides/baselines
+# (and with cached parse results from an earlier run)
 try:
-    import requests
     from bs4 import BeautifulSoup
 except Exception:
-    requests = None
     BeautifulSoup = None
 
+DOCS_MAX_AGE = float(os.environ.get("PA_DOCS_MAX_AGE", 6 * 3600))   # skip revalidation within this window
+PARSER_VERSION = "1"   # bump when a _parse_* function changes
+
 # ---------- bootstrap logging (ASCII safe) ----------
 os.makedirs("logs", exist_ok=True)
 logging.basicConfig(
@@ -148,26 +154,19 @@ BASELINES: Dict[str, Dict[str, Dict[str, Any]]] = {
 BASELINE_ASOF = "2025-08-19"
 
 # ---------- scraping (best effort; ok if blocked) ----------
-def _get(url: str) -> Optional[str]:
-    if requests is None:
-        log.warning("requests not installed; skipping scrape")
-        return None
-    try:
-        r = requests.get(url, headers={"User-Agent": "PA-v3/1.0"}, timeout=25)
-        if r.status_code == 200:
-            return r.text
-        log.warning(f"GET {url} -> HTTP {r.status_code}")
-    except Exception as e:
-        log.error(f"GET {url} failed: {e}")
-    return None
+OPENAI_URL = "https://openai.com/api/pricing"
+ANTHROPIC_URL = "https://www.anthropic.com/pricing"
+GOOGLE_URL = "https://ai.google.dev/gemini-api/docs/pricing"
+
+def _soup_text(html: str, sep: str) -> str:
+    if BeautifulSoup is None:
+        raise RuntimeError("bs4 not installed")
+    return BeautifulSoup(html, "lxml").get_text(sep)
 
-def _scrape_openai() -> Dict[str, Dict[str, Any]]:
-    url = "https://openai.com/api/pricing"
-    html = _get(url)
+def _parse_openai(html: str) -> Dict[str, Dict[str, Any]]:
+    url = OPENAI_URL
     results: Dict[str, Dict[str, Any]] = {}
-    if not html or BeautifulSoup is None:
-        return results
-    text = BeautifulSoup(html, "lxml").get_text(" ")
+    text = _soup_text(html, " ")
     pat = re.compile(
         r"(GPT[\-\s]?(?:4\.1|4o(?:\s*mini)?|o3(?:\s*mini)?))[^$]*?\$?\s*([0-9.]+)\s*/\s*(?:1M|1,?000,?000)\s*(?:input|in)[^$]*?\$?\s*([0-9.]+)\s*/\s*(?:1M|1,?000,?000)\s*(?:output|out)",
         re.IGNORECASE
@@ -191,13 +190,10 @@ def _scrape_openai() -> Dict[str, Dict[str, Any]]:
         }
     return results
 
-def _scrape_anthropic() -> Dict[str, Dict[str, Any]]:
-    url = "https://www.anthropic.com/pricing"
-    html = _get(url)
+def _parse_anthropic(html: str) -> Dict[str, Dict[str, Any]]:
+    url = ANTHROPIC_URL
     res: Dict[str, Dict[str, Any]] = {}
-    if not html or BeautifulSoup is None:
-        return res
-    text = BeautifulSoup(html, "lxml").get_text("\n")
+    text = _soup_text(html, "\n")
     def parse_pair(block: str) -> Tuple[Optional[float], Optional[float]]:
         m = re.search(r"Input\s*\$([0-9.]+)\s*/\s*MTok.*?Output\s*\$([0-9.]+)\s*/\s*MTok", block, re.IGNORECASE|re.DOTALL)
         if m: return float(m.group(1)), float(m.group(2))
@@ -212,13 +208,10 @@ def _scrape_anthropic() -> Dict[str, Dict[str, Any]]:
     pin,pout = parse_pair(seg("haiku",None));      res["claude-haiku-3.5"]= {"pricing":{"in":_per_token(pin),"out":_per_token(pout)}, "limits":{"max_tokens":200_000},  "source":url, "notes":"Scraped Anthropic pricing"}
     return res
 
-def _scrape_google() -> Dict[str, Dict[str, Any]]:
-    url = "https://ai.google.dev/gemini-api/docs/pricing"
-    html = _get(url)
+def _parse_google(html: str) -> Dict[str, Dict[str, Any]]:
+    url = GOOGLE_URL
     res: Dict[str, Dict[str, Any]] = {}
-    if not html or BeautifulSoup is None:
-        return res
-    text = BeautifulSoup(html, "lxml").get_text("\n")
+    text = _soup_text(html, "\n")
     def block(title: str) -> str:
         i = text.lower().find(title.lower())
         if i == -1: return ""
@@ -254,6 +247,29 @@ def _scrape_google() -> Dict[str, Dict[str, Any]]:
         }
     return res
 
+SCRAPERS = {
+    "openai":    (OPENAI_URL, _parse_openai),
+    "anthropic": (ANTHROPIC_URL, _parse_anthropic),
+    "google":    (GOOGLE_URL, _parse_google),
+}
+
+def _scrape_all() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Fetch all pricing pages concurrently; parse each (or reuse the parse of an identical body)."""
+    cache = get_cache()
+    pages = cache.fetch_many([url for url, _ in SCRAPERS.values()], max_age=DOCS_MAX_AGE)
+    out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for prov, (url, parser) in SCRAPERS.items():
+        r = pages[url]
+        if r.error:
+            log.warning(f"GET {url} -> {r.error} (source={r.source})")
+        try:
+            out[prov] = cache.cached_parse(f"provider_docs_{prov}", PARSER_VERSION, r, parser) or {}
+        except Exception as e:
+            log.warning(f"Scrape parse skipped for {prov}: {e}")
+            out[prov] = {}
+        log.info(f"scrape {prov}: source={r.source} models={len(out[prov])}")
+    return out
+
 # ---------- assembly (override -> scrape -> baseline) ----------
 def _complete(node: Optional[Dict[str, Any]]) -> bool:
     if not node: return False
@@ -335,11 +351,7 @@ def fetch_curated_dynamic() -> Dict[str, Dict[str, Any]]:
       1) overrides → 2) scrape → 3) baseline. Drops incomplete and logs reasons.
     """
     overrides = _load_overrides()
-    scraped_by_provider: Dict[str, Dict[str, Dict[str, Any]]] = {
-        "openai": _scrape_openai(),
-        "anthropic": _scrape_anthropic(),
-        "google": _scrape_google(),
-    }
+    scraped_by_provider = _scrape_all()
 
     out: Dict[str, Dict[str, Any]] = {}
     for prov, model_list in ALLOWLIST.items():
@@ -5,30 +5,27 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 # --- /PA_ROOT_IMPORT ---
 import json, yaml, os
-from importlib import reload
-import core.ai_client as m
+from core.cost_engine import OVERRIDES_PATH, get_engine
 
-ov_path = os.path.join("config","provider_pricing_overrides.yaml")
 overrides = {}
-if os.path.exists(ov_path):
-    with open(ov_path,"r",encoding="utf-8") as f:
+if os.path.exists(OVERRIDES_PATH):
+    with open(OVERRIDES_PATH,"r",encoding="utf-8") as f:
         overrides = yaml.safe_load(f) or {}
 
 print("== Overrides present ==")
 print(json.dumps(overrides, indent=2))
 
-print("\n== Effective COSTS (selected) ==")
+print("\n== Effective rates (USD per token; selected) ==")
+table = get_engine().table
 sel = {}
 for prov, models in (overrides or {}).items():
     sel[prov] = {}
-    for model in (models or {}).keys():
-        key = model
-        # try canonical and raw
-        v = m.COSTS.get(prov, {}).get(key)
-        if v is None:
-            # try normalized anthropic alias
-            key2 = key.replace("claude-3.5-sonnet", "claude-3-5-sonnet-20240620")
-            v = m.COSTS.get(prov, {}).get(key2)
-            key = key2 if v is not None else key
-        sel[prov][key] = v
+    models = (models or {}).get("models", models) if isinstance(models, dict) else {}
+    for model in models.keys():
+        key = table.key(prov, model)
+        if key is None:
+            sel[prov][model] = None
+            continue
+        rin, rout = table.rates[key]
+        sel[prov][model] = {"resolved": key[1], "in": rin, "out": rout, "source": table.sources.get(key)}
 print(json.dumps(sel, indent=2))
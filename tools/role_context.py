@@ -1,20 +1,31 @@
+from __future__ import annotations
 # --- PA_ROOT_IMPORT ---
 import sys, pathlib
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 # --- /PA_ROOT_IMPORT ---
+import os, yaml
 
-from __future__ import annotations
-import yaml, pathlib
+POLICY_PATH = ROOT / "config" / "policies" / "role_policies.yaml"
+
+_cache: dict = {"stamp": None, "roles": {}}
 
-POLICY_PATH = pathlib.Path("config/policies/role_policies.yaml")
+def _roles() -> dict:
+    """Parsed role policies, re-read only when the file changes (the text is a cacheable prompt prefix)."""
+    try:
+        st = os.stat(POLICY_PATH)
+    except OSError:
+        return {}
+    stamp = (st.st_size, st.st_mtime_ns)
+    if _cache["stamp"] != stamp:
+        with open(POLICY_PATH, "r", encoding="utf-8") as f:
+            d = yaml.safe_load(f) or {}
+        _cache["roles"] = d.get("roles", {}) or {}
+        _cache["stamp"] = stamp
+    return _cache["roles"]
 
 def get_role_system_text(role: str) -> str:
-    if not POLICY_PATH.exists():
-        return ""
-    with open(POLICY_PATH, "r", encoding="utf-8") as f:
-        d = yaml.safe_load(f) or {}
-    roles = d.get("roles", {})
+    roles = _roles()
     r = roles.get(role) or roles.get(role.capitalize()) or {}
     return (r.get("system") or "").strip()
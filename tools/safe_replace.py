@@ -7,6 +7,8 @@ if str(ROOT) not in sys.path:
 # --- /PA_ROOT_IMPORT ---
 import os, sys, hashlib, argparse, time, shutil
 
+from core.fileutil import write_temp_beside
+
 def sha256_of(path: str) -> str:
     h = hashlib.sha256()
     with open(path, "rb") as f:
@@ -45,7 +47,11 @@ def main():
     ts = time.strftime("%Y%m%d_%H%M%S")
     backup = f"{target}.bak.{ts}"
     shutil.copy2(target, backup)
-    shutil.copy2(new_path, target)
+    # temp file + os.replace: the target is never left half-written
+    with open(new_path, "rb") as f:
+        tmp = write_temp_beside(target, f.read())
+    shutil.copystat(new_path, tmp)
+    os.replace(tmp, target)
     print(f"OK: replaced {target}\n backup: {backup}")
     return 0
 
@@ -5,36 +5,31 @@ ROOT = pathlib.Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 # --- /PA_ROOT_IMPORT ---
-import os, yaml
 from pathlib import Path
 
+from core.session_store import Field, get_session_store
+
 ROOT = Path(__file__).resolve().parents[1]
 SESSION = ROOT / "project_session.yaml"
 
-def _load() -> dict:
-    if SESSION.exists():
-        try:
-            return yaml.safe_load(SESSION.read_text(encoding="utf-8")) or {}
-        except Exception:
-            return {}
-    return {}
+SCHEMA = {
+    "chat_tab.selection": Field(dict),
+    "chat_tab.selection.provider": Field(str),
+    "chat_tab.selection.model": Field(str),
+    "chat_tab.selection.mode": Field(str),
+}
+
+def _store():
+    # loaded once; set() is written back (atomically, coalesced) shortly after, and at exit
+    return get_session_store(str(SESSION), schema=SCHEMA)
 
 def get(path: list[str], default=None):
-    d = _load()
-    cur = d
-    try:
-        for k in path:
-            cur = cur.get(k, {})
-        return cur if cur != {} else default
-    except Exception:
-        return default
+    cur = _store().get(path)
+    return cur if cur not in (None, {}) else default
 
 def set(path: list[str], value) -> None:
-    d = _load()
-    cur = d
-    for k in path[:-1]:
-        if k not in cur or not isinstance(cur[k], dict):
-            cur[k] = {}
-        cur = cur[k]
-    cur[path[-1]] = value
-    SESSION.write_text(yaml.safe_dump(d, sort_keys=False), encoding="utf-8")
+    _store().set(path, value)
+
+def flush() -> None:
+    """Write pending changes now (e.g. before another process reads the file)."""
+    _store().flush()
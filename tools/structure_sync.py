@@ -260,13 +260,19 @@ def snapshot_file(root: Path, p: Path, preview_lines: int = 10) -> Dict[str, Any
 
     return info
 
-def run_snapshot(root: Path, out_yaml: Path, out_md: Path, preview_lines: int = 10) -> Dict[str, Any]:
+PROGRESS_EVERY = 50
+
+def run_snapshot(root: Path, out_yaml: Path, out_md: Path, preview_lines: int = 10,
+                 progress=None) -> Dict[str, Any]:
+    """progress: optional callable(n, m, path) invoked every PROGRESS_EVERY files and at the end."""
+    paths = [p for p in root.rglob("*")
+             if p.is_file() and p.suffix.lower() in INCLUDE_EXT
+             and not any(x in p.parts for x in (".venv", "venv", "__pycache__", ".git", ".pa_archive"))]
     items: List[Dict[str, Any]] = []
-    for p in root.rglob("*"):
-        if p.is_file() and p.suffix.lower() in INCLUDE_EXT:
-            if any(x in p.parts for x in (".venv", "venv", "__pycache__", ".git")):
-                continue
-            items.append(snapshot_file(root, p, preview_lines))
+    for i, p in enumerate(paths, 1):
+        items.append(snapshot_file(root, p, preview_lines))
+        if progress and (i % PROGRESS_EVERY == 0 or i == len(paths)):
+            progress(i, len(paths), p.relative_to(root).as_posix())
 
     items.sort(key=lambda d: d.get("path", ""))
     out_yaml.parent.mkdir(parents=True, exist_ok=True)
@@ -291,10 +297,13 @@ def main(argv: List[str]) -> int:
     out_yaml = root / "project" / "structure" / "project_structure_snapshot_full.yaml"
     out_md = root / "project" / "structure" / "project_structure_snapshot_index.md"
 
-    res = run_snapshot(root, out_yaml, out_md, preview_lines=10)
+    from core.job_protocol import emit
+    res = run_snapshot(root, out_yaml, out_md, preview_lines=10,
+                       progress=lambda n, m, path: emit("progress", {"n": n, "m": m, "label": path}))
     print(f"Snapshot complete: {res['count']} files")
     print(f"YAML: {res['yaml']}")
     print(f"MD  : {res['md']}")
+    emit("summary", res)
     return 0
 
 if __name__ == "__main__":